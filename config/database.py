@@ -1,22 +1,291 @@
 import os
+import json
+import time
+import threading
 from dotenv import load_dotenv
-from supabase import create_client, Client
+import httpx
+from postgrest import AsyncPostgrestClient
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
+
+from utils.metrics import QueryMetrics
+from utils.resilience import CircuitBreaker, ResilientTransport
+from utils.fake_postgrest import FakePostgrestStore, FakeAsyncTransport, FakeSyncTransport
 
 # Cargar variables de entorno si no se han cargado ya
 if not os.getenv("SUPABASE_URL"):
     load_dotenv()
 
+# Backend de datos: "supabase" o "fake" (PostgREST simulado en memoria, sin red)
+SUPABASE_BACKEND = os.getenv("SUPABASE_BACKEND", "supabase").lower()
+
 # Configuración de Supabase
 supabase_url = os.getenv("SUPABASE_URL")
 supabase_key = os.getenv("SUPABASE_KEY")
 
-# Inicializar cliente de Supabase
-try:
-    supabase: Client = create_client(supabase_url, supabase_key)
-    print(f"Conexión a Supabase establecida correctamente: {supabase_url}")
-except Exception as e:
-    print(f"Error al conectar con Supabase: {e}")
-    raise
+# Backend simulado: latencia inyectada por petición (ms) y archivo JSON opcional con datos iniciales
+supabase_fake_store = None
+if SUPABASE_BACKEND == "fake":
+    supabase_fake_store = FakePostgrestStore(
+        latency_ms=float(os.getenv("FAKE_SUPABASE_LATENCY_MS", "0")),
+        jitter_ms=float(os.getenv("FAKE_SUPABASE_JITTER_MS", "0")),
+    )
+    if os.getenv("FAKE_SUPABASE_SEED"):
+        supabase_fake_store.load_file(os.getenv("FAKE_SUPABASE_SEED"))
+    # El cliente exige una URL y una clave con formato válido aunque no se usen
+    supabase_url = supabase_url or "http://fake-supabase.local"
+    supabase_key = supabase_key or "fake.supabase.key"
+
+# Configuración del pool de conexiones HTTP del cliente asíncrono
+SUPABASE_POOL_MAX_CONNECTIONS = int(os.getenv("SUPABASE_POOL_MAX_CONNECTIONS", "20"))
+SUPABASE_POOL_MAX_KEEPALIVE = int(os.getenv("SUPABASE_POOL_MAX_KEEPALIVE", "10"))
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "30"))
+
+# Reintentos de las lecturas ante fallos transitorios (backoff exponencial con jitter)
+SUPABASE_MAX_RETRIES = int(os.getenv("SUPABASE_MAX_RETRIES", "3"))
+SUPABASE_BACKOFF_BASE = float(os.getenv("SUPABASE_BACKOFF_BASE", "0.2"))
+SUPABASE_BACKOFF_MAX = float(os.getenv("SUPABASE_BACKOFF_MAX", "5"))
+
+# Plazo total (segundos) de una llamada, incluidos sus reintentos, 0 lo desactiva
+SUPABASE_DEADLINE = float(os.getenv("SUPABASE_DEADLINE", "30"))
+
+# Circuito: fallos consecutivos que lo abren (0 lo desactiva) y segundos que permanece abierto
+SUPABASE_CIRCUIT_THRESHOLD = int(os.getenv("SUPABASE_CIRCUIT_THRESHOLD", "5"))
+SUPABASE_CIRCUIT_RESET = float(os.getenv("SUPABASE_CIRCUIT_RESET", "30"))
+
+# Circuito compartido por todas las llamadas del cliente asíncrono
+supabase_breaker = CircuitBreaker(
+    failure_threshold=SUPABASE_CIRCUIT_THRESHOLD,
+    reset_timeout=SUPABASE_CIRCUIT_RESET,
+)
+
+# Latencia (ms) a partir de la cual una llamada a Supabase se registra como lenta, 0 la desactiva
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "1000"))
+
+# Métricas de las llamadas hechas con el cliente asíncrono
+supabase_metrics = QueryMetrics(slow_query_ms=SLOW_QUERY_MS)
+
+# Operaciones de PostgREST según el método HTTP
+OPERACIONES_HTTP = {
+    "GET": "select",
+    "HEAD": "count",
+    "POST": "insert",
+    "PATCH": "update",
+    "DELETE": "delete",
+}
+
+
+def describe_request(request: httpx.Request):
+    """Obtiene la tabla (o función RPC) y la operación de una petición a PostgREST."""
+    ruta = request.url.path.split("/rest/v1/", 1)[-1].strip("/")
+    if ruta.startswith("rpc/"):
+        return ruta, "rpc"
+    operacion = OPERACIONES_HTTP.get(request.method, request.method.lower())
+    if operacion == "insert" and "merge-duplicates" in request.headers.get("prefer", ""):
+        operacion = "upsert"
+    return ruta, operacion
+
+
+def rows_from_content_range(content_range: str):
+    """Obtiene el número de filas de una cabecera Content-Range ("0-24/*"), o None."""
+    rango = content_range.split("/", 1)[0]
+    if "-" not in rango:
+        return 0 if rango == "*" else None
+    inicio, _, fin = rango.partition("-")
+    return int(fin) - int(inicio) + 1 if inicio.isdigit() and fin.isdigit() else None
+
+
+class MeasuredStream(httpx.AsyncByteStream):
+    """Cuerpo de respuesta que registra la llamada en las métricas al terminar de leerse."""
+
+    def __init__(self, stream, request: httpx.Request, response: httpx.Response, inicio: float):
+        self.stream = stream
+        self.request = request
+        self.response = response
+        self.inicio = inicio
+        self.total_bytes = 0
+        self.chunks = []
+        self.registrado = False
+
+    async def __aiter__(self):
+        async for chunk in self.stream:
+            self.total_bytes += len(chunk)
+            # Solo se guarda el cuerpo cuando hace falta para contar las filas
+            if self.response.headers.get("content-range") is None:
+                self.chunks.append(chunk)
+            yield chunk
+
+    async def aclose(self):
+        await self.stream.aclose()
+        self.record()
+
+    def record(self):
+        if self.registrado:
+            return
+        self.registrado = True
+
+        error = self.response.status_code >= 400
+        filas = None if error else rows_from_content_range(self.response.headers.get("content-range", ""))
+        if filas is None and self.chunks and not error:
+            try:
+                cuerpo = json.loads(b"".join(self.chunks))
+                filas = len(cuerpo) if isinstance(cuerpo, list) else 1
+            except ValueError:
+                filas = None
+
+        tabla, operacion = describe_request(self.request)
+        supabase_metrics.record(
+            tabla,
+            operacion,
+            (time.perf_counter() - self.inicio) * 1000,
+            rows=filas,
+            response_bytes=self.total_bytes,
+            error=error,
+            detail=str(self.request.url.params),
+        )
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Transporte HTTP que mide latencia, filas, bytes y errores de cada llamada."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        inicio = time.perf_counter()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except Exception:
+            tabla, operacion = describe_request(request)
+            supabase_metrics.record(tabla, operacion, (time.perf_counter() - inicio) * 1000, error=True,
+                                    detail=str(request.url.params))
+            raise
+        medido = MeasuredStream(response.stream, request, response, inicio)
+        if response.is_closed:
+            # El cuerpo ya fue leído (respuestas construidas en memoria), se registra de inmediato
+            medido.total_bytes = len(response.content)
+            medido.chunks = [response.content]
+            medido.record()
+            return response
+        response.stream = medido
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+class AsyncSupabaseClient(AsyncPostgrestClient):
+    """Cliente PostgREST asíncrono que reutiliza conexiones HTTP keep-alive.
+
+    Cada intento se mide por separado, y los reintentos, el circuito y el plazo
+    total de la llamada se aplican por encima de la medición.
+    """
+
+    def create_session(self, base_url, headers, timeout) -> httpx.AsyncClient:
+        if supabase_fake_store is not None:
+            transport = FakeAsyncTransport(supabase_fake_store)
+        else:
+            transport = httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=SUPABASE_POOL_MAX_CONNECTIONS,
+                    max_keepalive_connections=SUPABASE_POOL_MAX_KEEPALIVE,
+                ),
+            )
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            transport=ResilientTransport(
+                InstrumentedTransport(transport),
+                supabase_breaker,
+                max_retries=SUPABASE_MAX_RETRIES,
+                backoff_base=SUPABASE_BACKOFF_BASE,
+                backoff_max=SUPABASE_BACKOFF_MAX,
+                deadline=SUPABASE_DEADLINE,
+            ),
+        )
+
+
+class LazyClient:
+    """Cliente que se crea en su primer uso y se comparte en todo el proceso.
+
+    Importar el módulo no crea clientes ni importa el paquete supabase; la
+    creación ocurre la primera vez que se accede a un atributo del cliente.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def initialized(self) -> bool:
+        return self._client is not None
+
+    def get(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._factory()
+        return self._client
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+
+def _log_backend(tipo: str, inicio: float) -> None:
+    ms = (time.perf_counter() - inicio) * 1000
+    if supabase_fake_store is not None:
+        print(f"Cliente {tipo} creado con el backend simulado de Supabase (SUPABASE_BACKEND=fake) en {ms:.0f} ms")
+    else:
+        print(f"Cliente {tipo} de Supabase creado en {ms:.0f} ms: {supabase_url}")
+
+
+def create_sync_client():
+    """Crea el cliente síncrono, usado por los scripts de mantenimiento."""
+    inicio = time.perf_counter()
+    try:
+        # El paquete supabase (auth, storage, realtime) solo lo necesitan los scripts
+        from supabase import create_client
+        client = create_client(supabase_url, supabase_key)
+        if supabase_fake_store is not None:
+            client.postgrest.session._transport = FakeSyncTransport(supabase_fake_store)
+    except Exception as e:
+        print(f"Error al conectar con Supabase: {e}")
+        raise
+    _log_backend("síncrono", inicio)
+    return client
+
+
+def create_async_client() -> AsyncSupabaseClient:
+    """Crea el cliente asíncrono, usado por la capa de datos y los routers."""
+    inicio = time.perf_counter()
+    try:
+        client = AsyncSupabaseClient(
+            f"{supabase_url}/rest/v1",
+            headers={
+                **DEFAULT_POSTGREST_CLIENT_HEADERS,
+                "apiKey": supabase_key,
+                "Authorization": f"Bearer {supabase_key}",
+            },
+            timeout=SUPABASE_TIMEOUT,
+        )
+    except Exception as e:
+        print(f"Error al conectar con Supabase: {e}")
+        raise
+    _log_backend("asíncrono", inicio)
+    return client
+
+
+# Clientes compartidos del proceso, creados en su primer uso
+supabase = LazyClient(create_sync_client)
+supabase_async = LazyClient(create_async_client)
+
+
+async def close_supabase_async() -> None:
+    """Cierra el pool de conexiones del cliente asíncrono si llegó a crearse."""
+    if supabase_async.initialized:
+        await supabase_async.aclose()
+
 
 # Exportar supabase para que pueda ser importado desde este módulo
-__all__ = ['supabase']
+__all__ = ['supabase', 'supabase_async', 'close_supabase_async', 'supabase_metrics', 'supabase_breaker', 'supabase_fake_store']
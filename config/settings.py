@@ -23,5 +23,60 @@ CORS_ORIGINS = os.getenv("CORS_ORIGINS", "*").split(",")
 CORS_METHODS = ["*"]
 CORS_HEADERS = ["*"]
 
+# Configuración de paginación
+DEFAULT_PAGE_LIMIT = int(os.getenv("DEFAULT_PAGE_LIMIT", "100"))
+MAX_PAGE_LIMIT = int(os.getenv("MAX_PAGE_LIMIT", "1000"))
+
+# Configuración de la caché de lecturas (TTL en segundos, 0 la desactiva)
+CACHE_MAX_SIZE = int(os.getenv("CACHE_MAX_SIZE", "1024"))
+CACHE_DEFAULT_TTL = float(os.getenv("CACHE_DEFAULT_TTL", "30"))
+CACHE_TABLE_TTLS = {
+    "programas": 600,
+    "servicios": 600,
+    "usuarios": 0
+}
+
+# Token requerido por el endpoint interno de métricas (sin token el endpoint queda deshabilitado)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+# Réplica local de lectura (SQLite). Sin tablas configuradas la réplica queda deshabilitada
+REPLICA_TABLES = [t.strip() for t in os.getenv("REPLICA_TABLES", "").split(",") if t.strip()]
+REPLICA_PATH = os.getenv("REPLICA_PATH", ":memory:")
+REPLICA_MAX_STALENESS = float(os.getenv("REPLICA_MAX_STALENESS", "60"))
+REPLICA_SYNC_INTERVAL = float(os.getenv("REPLICA_SYNC_INTERVAL", "30"))
+REPLICA_FULL_SYNC_INTERVAL = float(os.getenv("REPLICA_FULL_SYNC_INTERVAL", "3600"))
+
+# Índice en memoria documento -> ID de estudiante (TTL en segundos; ESTUDIANTES_INDEX_WARM lo carga al iniciar)
+ESTUDIANTES_INDEX_MAX_SIZE = int(os.getenv("ESTUDIANTES_INDEX_MAX_SIZE", "50000"))
+ESTUDIANTES_INDEX_TTL = float(os.getenv("ESTUDIANTES_INDEX_TTL", "3600"))
+ESTUDIANTES_INDEX_NEGATIVE_TTL = float(os.getenv("ESTUDIANTES_INDEX_NEGATIVE_TTL", "60"))
+ESTUDIANTES_INDEX_WARM = os.getenv("ESTUDIANTES_INDEX_WARM", "False").lower() == "true"
+
+# Índice de búsqueda de estudiantes: segundos tras los cuales se recarga completo en segundo plano
+ESTUDIANTES_SEARCH_REFRESH = float(os.getenv("ESTUDIANTES_SEARCH_REFRESH", "900"))
+
+# Caché de respuestas de las estadísticas: segundos de vigencia, segundos adicionales durante
+# los que se sirve vencida mientras se recalcula (stale-while-revalidate) y número de respuestas
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+RESPONSE_CACHE_STALE_TTL = float(os.getenv("RESPONSE_CACHE_STALE_TTL", "300"))
+RESPONSE_CACHE_MAX_SIZE = int(os.getenv("RESPONSE_CACHE_MAX_SIZE", "256"))
+
+# Snapshot columnar de lectura (archivos .npy por columna, mapeados en memoria y compartidos
+# por los workers). Sin tablas configuradas queda deshabilitado
+SNAPSHOT_TABLES = [t.strip() for t in os.getenv("SNAPSHOT_TABLES", "").split(",") if t.strip()]
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "snapshots"))
+SNAPSHOT_REFRESH_INTERVAL = float(os.getenv("SNAPSHOT_REFRESH_INTERVAL", "30"))
+SNAPSHOT_FULL_REFRESH_INTERVAL = float(os.getenv("SNAPSHOT_FULL_REFRESH_INTERVAL", "3600"))
+SNAPSHOT_MAX_SEGMENTS = int(os.getenv("SNAPSHOT_MAX_SEGMENTS", "32"))
+
+# Contadores de permanencia del dashboard: segundos tras los cuales se reconstruyen en segundo plano
+PERMANENCIA_COUNTERS_REFRESH = float(os.getenv("PERMANENCIA_COUNTERS_REFRESH", "900"))
+
+# Respuestas condicionales (ETag): segundos durante los que se reutiliza la versión de una tabla
+# antes de volver a consultarla, y políticas Cache-Control de catálogos y listados
+ETAG_VERSION_TTL = float(os.getenv("ETAG_VERSION_TTL", "5"))
+CATALOG_CACHE_CONTROL = os.getenv("CATALOG_CACHE_CONTROL", "public, max-age=60")
+LIST_CACHE_CONTROL = os.getenv("LIST_CACHE_CONTROL", "private, no-cache")
+
 # Otras configuraciones
 UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "uploads")
@@ -1,49 +1,478 @@
-from typing import Dict, List, Any, Optional, Type
+from typing import Dict, List, Any, Optional, Type, Tuple, AsyncIterator, Iterator
 from datetime import datetime
+import base64
+import io
+import json
+import re
 
 import sys
 import os
 
 # Importar la configuración existente
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import supabase
+from config import supabase_async
+from postgrest.exceptions import APIError
+from postgrest.types import CountMethod
+from .cache import LRUCache, get_table_cache, invalidate_responses
+from .replica import LocalReplica, get_replica
+from .versions import get_table_versions
+
+# Tamaño de página por defecto para los recorridos paginados
+DEFAULT_PAGE_SIZE = 500
+
+# Número de registros por petición en las inserciones masivas
+DEFAULT_CHUNK_SIZE = 500
+
+# Número máximo de valores por consulta in_, para no exceder la longitud de la URL
+IN_CHUNK_SIZE = 200
+
+# Columnas necesarias para construir el cursor de la paginación por llave
+CURSOR_COLUMNS = ["created_at", "id"]
+
+# Nombres de columna y de recurso embebido aceptados en una proyección
+_IDENTIFICADOR = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+# Modos de conteo de PostgREST: exacto, según el planificador o estimado
+COUNT_MODES = ("exact", "planned", "estimated")
+
+# Operadores admitidos en los filtros de apply_filters
+FILTER_OPERATORS = ("eq", "neq", "gt", "gte", "lt", "lte", "like", "ilike", "is_", "in_")
+
+def apply_filters(query, filters: Optional[Dict[str, Any]] = None):
+    """
+    Aplica filtros a una consulta de PostgREST.
+    
+    Args:
+        query: Consulta sin ejecutar
+        filters: Diccionario columna -> valor (igualdad) o columna ->
+            (operador, valor), por ejemplo {"inscritos": ("gt", 0)}
+        
+    Returns:
+        La consulta con los filtros aplicados
+        
+    Raises:
+        ValueError: Si un operador o una columna no es válido
+    """
+    for columna, condicion in (filters or {}).items():
+        if not _IDENTIFICADOR.match(columna):
+            raise ValueError(f"El campo '{columna}' no es válido")
+        operador, valor = condicion if isinstance(condicion, tuple) else ("eq", condicion)
+        if operador not in FILTER_OPERATORS:
+            raise ValueError(f"El operador '{operador}' no es válido")
+        query = getattr(query, operador)(columna, valor)
+    return query
+
+def build_select(columns: Optional[List[str]] = None, embedded: Optional[Dict[str, Optional[List[str]]]] = None) -> str:
+    """
+    Construye la cláusula select de PostgREST para una proyección de columnas.
+    
+    Args:
+        columns: Columnas de la tabla, None para todas
+        embedded: Recursos embebidos y sus columnas (None para todas las del recurso)
+        
+    Returns:
+        Cláusula select, por ejemplo "id,nivel_riesgo,estudiantes(nombres,documento)"
+        
+    Raises:
+        ValueError: Si algún nombre de columna o recurso no es válido
+    """
+    for nombre in list(columns or []) + list(embedded or {}):
+        if not _IDENTIFICADOR.match(nombre):
+            raise ValueError(f"El campo '{nombre}' no es válido")
+    
+    partes = [",".join(columns) if columns else "*"]
+    for recurso, columnas_recurso in (embedded or {}).items():
+        partes.append(f"{recurso}({build_select(columnas_recurso)})")
+    return ",".join(partes)
+
+def encode_cursor(registro: Dict[str, Any], order_by: str = "created_at") -> str:
+    """
+    Codifica la posición de un registro como cursor opaco.
+    
+    Args:
+        registro: Último registro de la página
+        order_by: Columna por la que se ordena la paginación
+        
+    Returns:
+        Cursor en base64 con el par (valor de order_by, id)
+    """
+    valor = json.dumps([registro.get(order_by), registro.get("id")])
+    return base64.urlsafe_b64encode(valor.encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[Any, str]:
+    """
+    Decodifica un cursor generado por encode_cursor.
+    
+    Args:
+        cursor: Cursor opaco recibido del cliente
+        
+    Returns:
+        Par (valor de la columna de orden, id); el valor puede ser None
+        
+    Raises:
+        ValueError: Si el cursor no es válido
+    """
+    try:
+        valor, id = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except Exception:
+        raise ValueError("El cursor de paginación no es válido")
+    if not id:
+        raise ValueError("El cursor de paginación no es válido")
+    return valor, id
+
+def read_csv_frame(contenido: bytes, columns: Optional[List[str]], categorical: Optional[List[str]] = None):
+    """
+    Convierte una respuesta CSV de PostgREST en un DataFrame de pandas.
+    
+    Args:
+        contenido: Cuerpo de la respuesta (encabezado y una fila por registro)
+        columns: Columnas del DataFrame, None para las del encabezado
+        categorical: Columnas que se cargan como categóricas
+        
+    Returns:
+        DataFrame con una columna por cada elemento de columns
+    """
+    # pandas se importa en el primer uso para no retrasar el arranque del servidor
+    import pandas as pd
+    
+    dtypes = {col: "category" for col in categorical or []}
+    try:
+        # Solo el campo vacío es nulo: un valor como "NA" se conserva tal cual
+        frame = pd.read_csv(io.BytesIO(contenido), dtype=dtypes, keep_default_na=False, na_values=[""])
+    except pd.errors.EmptyDataError:
+        frame = pd.DataFrame()
+    return frame.reindex(columns=columns) if columns is not None else frame
+
+def _postgrest_value(valor: Any) -> str:
+    """Representa un valor como literal entre comillas de un filtro de PostgREST."""
+    if isinstance(valor, bool):
+        valor = "true" if valor else "false"
+    texto = str(valor).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{texto}"'
+
+def _write_chunks(rows: List[Dict[str, Any]], chunk_size: int) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+    """
+    Divide los registros en bloques consecutivos con las mismas llaves.
+    
+    Con columns, PostgREST escribe NULL en las llaves que le faltan a un objeto:
+    en un bloque con llaves distintas el upsert borraría columnas existentes y
+    la inserción ignoraría los valores por defecto de la tabla.
+    
+    Args:
+        rows: Registros a escribir
+        chunk_size: Número máximo de registros por bloque
+    
+    Returns:
+        Iterador de tuplas (posición del primer registro, bloque)
+    """
+    inicio = 0
+    while inicio < len(rows):
+        llaves = rows[inicio].keys()
+        fin = inicio + 1
+        while fin < len(rows) and fin - inicio < chunk_size and rows[fin].keys() == llaves:
+            fin += 1
+        yield inicio, rows[inicio:fin]
+        inicio = fin
 
 class BaseData:
-    """Clase base para el acceso a datos."""
+    """Clase base para el acceso asíncrono a datos."""
     
-    def __init__(self, table_name: str):
+    def __init__(self, table_name: str, cache: Optional[LRUCache] = None, replica: Optional[LocalReplica] = None):
         """
         Inicializa el acceso a datos para una tabla específica.
         
         Args:
             table_name: Nombre de la tabla en Supabase
+            cache: Caché de lecturas, por defecto la compartida de la tabla
+            replica: Réplica local desde la que se sirven get_all, get_page,
+                get_by_id, get_by_values y count; por defecto la compartida si
+                la tabla está en REPLICA_TABLES
         """
         self.table_name = table_name
+        self.cache = cache if cache is not None else get_table_cache(table_name)
+        self.replica = replica if replica is not None else get_replica(table_name)
+    
+    def _changed(self) -> None:
+        """Invalida las lecturas y respuestas en caché y la versión de la tabla tras una escritura."""
+        self.cache.clear()
+        get_table_versions().touch(self.table_name)
+        invalidate_responses(self.table_name)
+    
+    async def _use_replica(self) -> bool:
+        """Indica si la lectura se sirve desde la réplica local (vigente o recién sincronizada)."""
+        return self.replica is not None and await self.replica.ready(self.table_name)
+    
+    async def _execute_cached(self, query) -> List[Dict[str, Any]]:
+        """
+        Ejecuta una consulta de lectura a través de la caché de la tabla.
+        
+        La llave es la cadena de parámetros de la consulta (select y filtros).
+        Los resultados vacíos no se almacenan, para no ocultar registros
+        creados por escrituras que no pasan por BaseData.
+        
+        Args:
+            query: Consulta de PostgREST sin ejecutar
+            
+        Returns:
+            Registros de la consulta
+        """
+        key = str(query.params)
+        found, data = self.cache.get(key)
+        if found:
+            return data
+        
+        response = await query.execute()
+        if response.data:
+            self.cache.set(key, response.data)
+        return response.data
     
-    def get_all(self) -> List[Dict[str, Any]]:
+    async def get_all(self, columns: Optional[List[str]] = None, filters: Optional[Dict[str, Any]] = None,
+                      order_by: Optional[str] = None, descending: bool = False) -> List[Dict[str, Any]]:
         """
         Obtiene todos los registros de la tabla.
         
+        Args:
+            columns: Columnas a retornar, None para todas
+            filters: Filtros en el formato de apply_filters
+            order_by: Columna por la que se ordena (los valores nulos al final), None sin orden
+            descending: Si el orden es descendente
+            
         Returns:
             Lista de registros
         """
-        response = supabase.table(self.table_name).select("*").execute()
+        select = build_select(columns)
+        self._check_order(order_by)
+        if await self._use_replica():
+            return self.replica.select(self.table_name, filters, columns, order_by=order_by, descending=descending)
+        query = apply_filters(supabase_async.table(self.table_name).select(select), filters)
+        if order_by:
+            direccion = "desc" if descending else "asc"
+            query.params = query.params.add("order", f"{order_by}.{direccion}.nullslast,id.{direccion}")
+        response = await query.execute()
         return response.data
     
-    def get_by_id(self, id: str) -> Optional[Dict[str, Any]]:
+    async def get_frame(self, columns: Optional[List[str]], categorical: Optional[List[str]] = None,
+                        filters: Optional[Dict[str, Any]] = None, use_replica: bool = True,
+                        after: Optional[Tuple[Any, Any]] = None):
+        """
+        Obtiene todos los registros de la tabla como un DataFrame de pandas.
+        
+        La consulta pide la respuesta en CSV (Accept: text/csv), que pandas lee
+        directamente a columnas con su lector en C, sin crear un diccionario por
+        registro; además el CSV no repite los nombres de columna en cada fila.
+        
+        Args:
+            columns: Columnas a retornar, None para todas
+            categorical: Columnas que se cargan como categóricas
+            filters: Filtros en el formato de apply_filters
+            use_replica: Si se puede servir desde la réplica local; False consulta
+                siempre Supabase, que incluye las escrituras directas aún no sincronizadas
+            after: Par (created_at, id) a partir del cual se leen los registros,
+                ordenados por (created_at, id); siempre se consulta Supabase
+        
+        Returns:
+            DataFrame con una columna por cada elemento de columns (los valores
+            nulos como NaN)
+        """
+        # pandas se importa en el primer uso para no retrasar el arranque del servidor
+        import pandas as pd
+        
+        select = build_select(columns)
+        if after is None and use_replica and await self._use_replica():
+            registros = self.replica.select(self.table_name, filters, columns)
+            return pd.DataFrame.from_records(registros, columns=columns).astype({col: "category" for col in categorical or []})
+        
+        query = apply_filters(supabase_async.table(self.table_name).select(select), filters)
+        if after is not None:
+            valor, id = after
+            # postgrest-py 0.13 no expone or_(), por lo que el filtro se añade directamente
+            query.params = query.params.add(
+                "or",
+                f"(created_at.gt.{_postgrest_value(valor)},and(created_at.eq.{_postgrest_value(valor)},id.gt.{_postgrest_value(id)}))"
+            ).add("order", "created_at,id")
+        headers = query.headers.copy()
+        headers["accept"] = "text/csv"
+        response = await query.session.request("GET", query.path, params=query.params, headers=headers)
+        if not 200 <= response.status_code <= 299:
+            try:
+                error = response.json()
+            except ValueError:
+                error = {"message": f"Error al consultar {self.table_name}: {response.text}", "code": str(response.status_code)}
+            raise APIError(error)
+        
+        return read_csv_frame(response.content, columns, categorical)
+    
+    async def get_page(self, limit: int, cursor: Optional[str] = None, columns: Optional[List[str]] = None,
+                       filters: Optional[Dict[str, Any]] = None, order_by: Optional[str] = None,
+                       descending: bool = False) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Obtiene una página de registros usando paginación por llave (columna de orden, id).
+        
+        Args:
+            limit: Número máximo de registros de la página
+            cursor: Cursor devuelto por la página anterior, None para la primera
+            columns: Columnas a retornar, None para todas (siempre se incluyen
+                la columna de orden e id)
+            filters: Filtros en el formato de apply_filters
+            order_by: Columna por la que se ordena (los valores nulos al final),
+                por defecto created_at; el cursor solo es válido con el mismo orden
+            descending: Si el orden es descendente
+            
+        Returns:
+            Tupla con los registros de la página y el cursor de la siguiente
+            (None si no hay más registros)
+        """
+        order_by = order_by or CURSOR_COLUMNS[0]
+        self._check_order(order_by)
+        if columns:
+            columns = list(columns) + [c for c in (order_by, "id") if c not in columns]
+        query = apply_filters(supabase_async.table(self.table_name).select(build_select(columns)), filters)
+        
+        if await self._use_replica():
+            after = decode_cursor(cursor) if cursor else None
+            registros = self.replica.select(self.table_name, filters, columns, after=after, limit=limit + 1,
+                                            order_by=order_by, descending=descending)
+        else:
+            registros = await self._get_page_remote(query, limit, cursor, order_by, descending)
+        
+        if len(registros) > limit:
+            registros = registros[:limit]
+            return registros, encode_cursor(registros[-1], order_by)
+        return registros, None
+    
+    async def _get_page_remote(self, query, limit: int, cursor: Optional[str], order_by: str = "created_at",
+                               descending: bool = False) -> List[Dict[str, Any]]:
+        """Obtiene de Supabase hasta limit + 1 registros a partir del cursor."""
+        operador = "lt" if descending else "gt"
+        if cursor:
+            valor, id = decode_cursor(cursor)
+            if valor is None:
+                # Los registros sin valor van al final: solo quedan los de ID posterior
+                query.params = query.params.add(order_by, "is.null").add("id", f"{operador}.{id}")
+            else:
+                condiciones = [
+                    f"{order_by}.{operador}.{_postgrest_value(valor)}",
+                    f"and({order_by}.eq.{_postgrest_value(valor)},id.{operador}.{_postgrest_value(id)})"
+                ]
+                if order_by not in CURSOR_COLUMNS:
+                    condiciones.append(f"{order_by}.is.null")
+                # postgrest-py 0.13 no expone or_(), por lo que el filtro se añade directamente
+                query.params = query.params.add("or", f"({','.join(condiciones)})")
+        
+        # order() de postgrest-py 0.13 repite el parámetro en cada llamada y PostgREST
+        # no los combina, así que el orden compuesto se envía en un solo parámetro
+        if order_by == CURSOR_COLUMNS[0] and not descending:
+            query.params = query.params.add("order", "created_at,id")
+        else:
+            direccion = "desc" if descending else "asc"
+            query.params = query.params.add("order", f"{order_by}.{direccion}.nullslast,id.{direccion}")
+        
+        # Se pide un registro extra para saber si existe una página siguiente
+        response = await query.limit(limit + 1).execute()
+        return response.data
+    
+    @staticmethod
+    def _check_order(order_by: Optional[str]) -> None:
+        """Valida el nombre de la columna de orden."""
+        if order_by is not None and not _IDENTIFICADOR.match(order_by):
+            raise ValueError(f"El campo '{order_by}' no es válido")
+    
+    async def iter_all(self, page_size: int = DEFAULT_PAGE_SIZE, columns: Optional[List[str]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Recorre todos los registros de la tabla página a página.
+        
+        Args:
+            page_size: Número de registros por consulta
+            columns: Columnas a retornar, None para todas
+            
+        Yields:
+            Registros de la tabla en orden (created_at, id)
+        """
+        cursor = None
+        while True:
+            registros, cursor = await self.get_page(page_size, cursor, columns)
+            for registro in registros:
+                yield registro
+            if not cursor:
+                break
+    
+    async def count(self, filters: Optional[Dict[str, Any]] = None, mode: str = "exact") -> int:
+        """
+        Cuenta los registros de la tabla sin descargarlos.
+        
+        Args:
+            filters: Filtros en el formato de apply_filters
+            mode: "exact", "planned" (estimación del planificador) o "estimated"
+                (exacto hasta el límite de filas y estimado por encima)
+            
+        Returns:
+            Número de registros
+            
+        Raises:
+            ValueError: Si el modo o los filtros no son válidos
+        """
+        if mode not in COUNT_MODES:
+            raise ValueError(f"El modo de conteo '{mode}' no es válido")
+        
+        query = apply_filters(supabase_async.table(self.table_name).select(count=CountMethod(mode)), filters)
+        if await self._use_replica():
+            return self.replica.count(self.table_name, filters)
+        
+        # La petición es HEAD: el total llega solo en la cabecera Content-Range.
+        # Se envía directamente porque execute() de postgrest-py 0.13 retorna
+        # count=0 cuando la respuesta no tiene cuerpo
+        response = await query.session.request(query.http_method, query.path, params=query.params, headers=query.headers)
+        if not 200 <= response.status_code <= 299:
+            raise APIError({"message": f"Error al contar registros de {self.table_name}", "code": str(response.status_code)})
+        
+        total = response.headers.get("content-range", "").rpartition("/")[2]
+        if not total.isdigit():
+            raise APIError({"message": f"PostgREST no retornó el conteo de {self.table_name}", "code": str(response.status_code)})
+        return int(total)
+    
+    async def get_by_id(self, id: str, columns: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
         """
         Obtiene un registro por su ID.
         
         Args:
             id: ID del registro
+            columns: Columnas a retornar, None para todas
             
         Returns:
             Registro encontrado o None si no existe
         """
-        response = supabase.table(self.table_name).select("*").eq("id", id).execute()
-        return response.data[0] if response.data else None
+        query = supabase_async.table(self.table_name).select(build_select(columns)).eq("id", id)
+        if await self._use_replica():
+            return self.replica.get_by_id(self.table_name, id, columns)
+        data = await self._execute_cached(query)
+        return data[0] if data else None
     
-    def create(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    async def get_by_values(self, column: str, values: List[Any], columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Obtiene los registros cuya columna toma alguno de los valores dados,
+        usando una consulta in_ por cada bloque de valores.
+        
+        Args:
+            column: Columna por la que se filtra
+            values: Valores buscados (los repetidos se consultan una sola vez)
+            columns: Columnas a retornar, None para todas
+            
+        Returns:
+            Lista de registros encontrados, sin un orden garantizado
+        """
+        values = list(dict.fromkeys(values))
+        build_select(columns)
+        if await self._use_replica():
+            return self.replica.select_in(self.table_name, column, values, columns)
+        
+        registros = []
+        for inicio in range(0, len(values), IN_CHUNK_SIZE):
+            response = await supabase_async.table(self.table_name).select(build_select(columns))\
+                .in_(column, values[inicio:inicio + IN_CHUNK_SIZE]).execute()
+            registros.extend(response.data)
+        return registros
+    
+    async def create(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Crea un nuevo registro.
         
@@ -59,10 +488,98 @@ class BaseData:
         if "updated_at" not in data:
             data["updated_at"] = datetime.now().isoformat()
             
-        response = supabase.table(self.table_name).insert(data).execute()
+        response = await supabase_async.table(self.table_name).insert(data).execute()
+        self._changed()
+        if self.replica is not None:
+            self.replica.apply(self.table_name, response.data)
         return response.data[0] if response.data else {}
     
-    def update(self, id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    async def create_many(self, rows: List[Dict[str, Any]], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Any]:
+        """
+        Crea varios registros enviando una petición por bloque.
+        
+        Args:
+            rows: Datos de los registros
+            chunk_size: Número de registros por petición
+            
+        Returns:
+            Diccionario con "ids", los IDs creados en el orden de rows (None en
+            las posiciones de un bloque fallido), y "errors", los bloques que
+            fallaron con su rango de posiciones y el error
+        """
+        ahora = datetime.now().isoformat()
+        rows = [{"created_at": ahora, "updated_at": ahora, **row} for row in rows]
+        return await self._write_many(rows, chunk_size)
+    
+    async def upsert_many(self, rows: List[Dict[str, Any]], on_conflict: str = "id", chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Any]:
+        """
+        Crea o actualiza varios registros enviando una petición por bloque.
+        
+        Args:
+            rows: Datos de los registros
+            on_conflict: Columnas únicas (separadas por comas) que identifican
+                un registro existente
+            chunk_size: Número de registros por petición
+            
+        Returns:
+            Diccionario con "ids" y "errors", igual que create_many
+        """
+        ahora = datetime.now().isoformat()
+        rows = [{"updated_at": ahora, **row} for row in rows]
+        return await self._write_many(rows, chunk_size, on_conflict)
+    
+    async def _write_many(self, rows: List[Dict[str, Any]], chunk_size: int, on_conflict: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Inserta (o hace upsert de) los registros por bloques sin detenerse en
+        los bloques que fallan. Un bloque se corta antes de chunk_size cuando
+        cambian las llaves de los registros.
+        
+        Args:
+            rows: Registros a escribir
+            chunk_size: Número de registros por petición
+            on_conflict: Columnas del upsert, None para una inserción simple
+            
+        Returns:
+            Diccionario con "ids" y "errors"
+            
+        Raises:
+            ValueError: Si chunk_size es menor que 1
+        """
+        if chunk_size < 1:
+            raise ValueError(f"El tamaño de bloque debe ser al menos 1 y es {chunk_size}")
+        
+        ids: List[Optional[Any]] = [None] * len(rows)
+        errors: List[Dict[str, Any]] = []
+        
+        for inicio, chunk in _write_chunks(rows, chunk_size):
+            fin = inicio + len(chunk)
+            
+            # Todos los registros del bloque tienen las mismas llaves, que se indican como columnas
+            columnas = list(chunk[0])
+            
+            try:
+                table = supabase_async.table(self.table_name)
+                if on_conflict:
+                    query = table.upsert(chunk, on_conflict=on_conflict)
+                else:
+                    query = table.insert(chunk)
+                query.params = query.params.add("columns", ",".join(columnas))
+                response = await query.execute()
+                
+                if len(response.data) != len(chunk):
+                    raise ValueError(f"Se esperaban {len(chunk)} registros y se recibieron {len(response.data)}")
+                for posicion, registro in enumerate(response.data, start=inicio):
+                    ids[posicion] = registro.get("id")
+                if self.replica is not None:
+                    self.replica.apply(self.table_name, response.data)
+            except Exception as e:
+                print(f"Error al escribir los registros {inicio}-{fin - 1} en {self.table_name}: {e}")
+                errors.append({"start": inicio, "end": fin, "error": str(e)})
+        
+        self._changed()
+        return {"ids": ids, "errors": errors}
+    
+    async def update(self, id: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Actualiza un registro existente.
         
@@ -76,10 +593,13 @@ class BaseData:
         # Actualizar timestamp
         data["updated_at"] = datetime.now().isoformat()
         
-        response = supabase.table(self.table_name).update(data).eq("id", id).execute()
+        response = await supabase_async.table(self.table_name).update(data).eq("id", id).execute()
+        self._changed()
+        if self.replica is not None:
+            self.replica.apply(self.table_name, response.data)
         return response.data[0] if response.data else {}
     
-    def delete(self, id: str) -> bool:
+    async def delete(self, id: str) -> bool:
         """
         Elimina un registro.
         
@@ -89,5 +609,8 @@ class BaseData:
         Returns:
             True si se eliminó correctamente, False en caso contrario
         """
-        response = supabase.table(self.table_name).delete().eq("id", id).execute()
+        response = await supabase_async.table(self.table_name).delete().eq("id", id).execute()
+        self._changed()
+        if self.replica is not None:
+            self.replica.remove(self.table_name, id)
         return len(response.data) > 0
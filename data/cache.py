@@ -0,0 +1,348 @@
+from typing import Dict, Any, Tuple, Hashable, Callable, Awaitable, Optional
+from collections import OrderedDict
+import asyncio
+import copy
+import functools
+import time
+import os
+import sys
+
+# Importar la configuración existente
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    CACHE_MAX_SIZE, CACHE_DEFAULT_TTL, CACHE_TABLE_TTLS,
+    RESPONSE_CACHE_TTL, RESPONSE_CACHE_STALE_TTL, RESPONSE_CACHE_MAX_SIZE
+)
+from .versions import TableVersions, get_table_versions
+
+class LRUCache:
+    """Caché en memoria con expiración por tiempo y desalojo LRU."""
+    
+    def __init__(self, max_size: int = CACHE_MAX_SIZE, ttl: float = CACHE_DEFAULT_TTL):
+        """
+        Inicializa la caché.
+        
+        Args:
+            max_size: Número máximo de entradas
+            ttl: Segundos de vida de cada entrada, 0 desactiva la caché
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+    
+    @property
+    def enabled(self) -> bool:
+        """Indica si la caché almacena entradas."""
+        return self.ttl > 0 and self.max_size > 0
+    
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """
+        Busca una entrada vigente.
+        
+        Args:
+            key: Llave de la entrada
+        
+        Returns:
+            Tupla (encontrada, valor); el valor es una copia de lo almacenado
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, copy.deepcopy(entry[1])
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Almacena una entrada, desalojando la menos usada si la caché está llena.
+        
+        Args:
+            key: Llave de la entrada
+            value: Valor a almacenar
+        """
+        if not self.enabled:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, copy.deepcopy(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def delete(self, key: Hashable) -> None:
+        """
+        Elimina una entrada si existe.
+        
+        Args:
+            key: Llave de la entrada
+        """
+        self._entries.pop(key, None)
+    
+    def clear(self) -> None:
+        """Elimina todas las entradas."""
+        self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Obtiene las estadísticas de uso de la caché.
+        
+        Returns:
+            Diccionario con entradas, aciertos, fallos y configuración
+        """
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+class ResponseCache:
+    """
+    Caché de respuestas de endpoints de lectura costosos sobre una tabla.
+    
+    Cada respuesta es vigente durante ttl segundos; vencida, se sigue sirviendo
+    durante stale_ttl segundos más mientras una sola tarea la recalcula en segundo
+    plano (stale-while-revalidate). Las peticiones simultáneas sobre una llave sin
+    respuesta comparten un único cálculo (single-flight). Cada respuesta guarda la
+    versión de la tabla con que se calculó (data/versions.py) y no se sirve si la
+    tabla cambió, incluso desde otro proceso; invalidate la descarta de inmediato
+    tras una escritura propia.
+    """
+    
+    def __init__(self, table_name: str, ttl: float = RESPONSE_CACHE_TTL, stale_ttl: float = RESPONSE_CACHE_STALE_TTL,
+                 max_size: int = RESPONSE_CACHE_MAX_SIZE, versions: Optional[TableVersions] = None):
+        """
+        Inicializa la caché.
+        
+        Args:
+            table_name: Tabla de la que dependen las respuestas
+            ttl: Segundos durante los que una respuesta es vigente, 0 desactiva la caché
+            stale_ttl: Segundos adicionales durante los que se sirve vencida mientras se recalcula
+            max_size: Número máximo de respuestas
+            versions: Versiones de las tablas, por defecto las compartidas
+        """
+        self.table_name = table_name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_size = max_size
+        self.versions = versions if versions is not None else get_table_versions()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.computations = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, Optional[str], Any]]" = OrderedDict()
+        self._calculos: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self._generacion = 0
+    
+    @property
+    def enabled(self) -> bool:
+        """Indica si la caché almacena respuestas."""
+        return self.ttl > 0 and self.max_size > 0
+    
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Obtiene la respuesta de una llave, calculándola si no hay una vigente.
+        
+        Args:
+            key: Llave de la respuesta
+            compute: Función que calcula la respuesta
+        
+        Returns:
+            Respuesta (compartida entre peticiones: no debe modificarse)
+        """
+        if not self.enabled:
+            return await compute()
+        
+        try:
+            version = await self.versions.version(self.table_name)
+        except Exception as e:
+            # Sin versión se confía en el TTL, para seguir respondiendo si Supabase no está disponible
+            print(f"Error al obtener la versión de {self.table_name}: {str(e)}")
+            version = None
+        
+        entry = self._entries.get(key)
+        if entry is not None and (version is None or entry[1] == version):
+            edad = time.monotonic() - entry[0]
+            if edad < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            if edad < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                if key not in self._calculos:
+                    asyncio.ensure_future(self._revalidar(key, compute, version))
+                return entry[2]
+        
+        self.misses += 1
+        return await asyncio.shield(self._calcular(key, compute, version))
+    
+    def _calcular(self, key: Hashable, compute: Callable[[], Awaitable[Any]], version: Optional[str]) -> "asyncio.Future[Any]":
+        """Obtiene el cálculo en curso de una llave o inicia uno."""
+        calculo = self._calculos.get(key)
+        if calculo is None:
+            calculo = asyncio.ensure_future(self._ejecutar(key, compute, version))
+            self._calculos[key] = calculo
+            calculo.add_done_callback(lambda _: self._calculos.pop(key, None))
+        return calculo
+    
+    async def _ejecutar(self, key: Hashable, compute: Callable[[], Awaitable[Any]], version: Optional[str]) -> Any:
+        """Calcula una respuesta y la almacena si no hubo escrituras mientras tanto."""
+        generacion = self._generacion
+        self.computations += 1
+        valor = await compute()
+        if generacion == self._generacion:
+            self._entries[key] = (time.monotonic(), version, valor)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return valor
+    
+    async def _revalidar(self, key: Hashable, compute: Callable[[], Awaitable[Any]], version: Optional[str]) -> None:
+        """Recalcula una respuesta vencida en segundo plano, conservando la anterior si falla."""
+        try:
+            await self._calcular(key, compute, version)
+        except Exception as e:
+            print(f"Error al recalcular la respuesta en caché de {self.table_name}: {str(e)}")
+    
+    def invalidate(self) -> None:
+        """Descarta todas las respuestas, incluidas las que se están calculando."""
+        self._generacion += 1
+        self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Obtiene las estadísticas de uso de la caché.
+        
+        Returns:
+            Diccionario con respuestas, aciertos (vigentes y vencidas), fallos,
+            cálculos y configuración
+        """
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "computations": self.computations,
+            "in_flight": len(self._calculos)
+        }
+
+# Cachés compartidas por tabla, para que una escritura desde cualquier instancia
+# de acceso a datos invalide las lecturas de todas las demás
+_table_caches: Dict[str, LRUCache] = {}
+
+def get_table_cache(table_name: str) -> LRUCache:
+    """
+    Obtiene la caché compartida de una tabla, creándola si no existe.
+    
+    El TTL se toma de la variable de entorno CACHE_TTL_<TABLA>, luego de
+    CACHE_TABLE_TTLS y por último de CACHE_DEFAULT_TTL.
+    
+    Args:
+        table_name: Nombre de la tabla
+    
+    Returns:
+        Caché de la tabla
+    """
+    if table_name not in _table_caches:
+        ttl = float(os.getenv(f"CACHE_TTL_{table_name.upper()}", CACHE_TABLE_TTLS.get(table_name, CACHE_DEFAULT_TTL)))
+        _table_caches[table_name] = LRUCache(ttl=ttl)
+    return _table_caches[table_name]
+
+def set_table_cache(table_name: str, cache: LRUCache) -> None:
+    """
+    Reemplaza la caché de una tabla por otra implementación.
+    
+    Args:
+        table_name: Nombre de la tabla
+        cache: Caché con la misma interfaz que LRUCache
+    """
+    _table_caches[table_name] = cache
+
+def invalidate_table(table_name: str) -> None:
+    """
+    Invalida la caché y la versión de una tabla tras una escritura hecha fuera de BaseData.
+    
+    Args:
+        table_name: Nombre de la tabla
+    """
+    if table_name in _table_caches:
+        _table_caches[table_name].clear()
+    get_table_versions().touch(table_name)
+    invalidate_responses(table_name)
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Obtiene las estadísticas de las cachés de todas las tablas.
+    
+    Returns:
+        Diccionario con las estadísticas por tabla
+    """
+    return {table_name: cache.stats() for table_name, cache in _table_caches.items()}
+
+# Cachés de respuestas compartidas por tabla
+_response_caches: Dict[str, ResponseCache] = {}
+
+def get_response_cache(table_name: str) -> ResponseCache:
+    """
+    Obtiene la caché de respuestas de una tabla, creándola si no existe.
+    
+    Args:
+        table_name: Nombre de la tabla
+    
+    Returns:
+        Caché de respuestas de la tabla
+    """
+    if table_name not in _response_caches:
+        _response_caches[table_name] = ResponseCache(table_name)
+    return _response_caches[table_name]
+
+def invalidate_responses(table_name: str) -> None:
+    """
+    Descarta las respuestas en caché que dependen de una tabla.
+    
+    Args:
+        table_name: Nombre de la tabla
+    """
+    if table_name in _response_caches:
+        _response_caches[table_name].invalidate()
+
+def cached_response(table_name: str):
+    """
+    Decorador que sirve un endpoint de lectura desde la caché de respuestas de una tabla.
+    
+    La llave es el endpoint junto con sus argumentos. Las excepciones (por ejemplo
+    HTTPException) no se almacenan.
+    
+    Args:
+        table_name: Tabla de la que depende la respuesta del endpoint
+    
+    Returns:
+        Decorador del endpoint
+    """
+    def decorador(endpoint):
+        nombre = f"{endpoint.__module__}.{endpoint.__qualname__}"
+        
+        @functools.wraps(endpoint)
+        async def envoltura(*args, **kwargs):
+            llave = (nombre, args, tuple(sorted(kwargs.items())))
+            return await get_response_cache(table_name).get_or_compute(llave, lambda: endpoint(*args, **kwargs))
+        
+        return envoltura
+    return decorador
+
+def response_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Obtiene las estadísticas de las cachés de respuestas de todas las tablas.
+    
+    Returns:
+        Diccionario con las estadísticas por tabla
+    """
+    return {table_name: cache.stats() for table_name, cache in _response_caches.items()}
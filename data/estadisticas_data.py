@@ -0,0 +1,92 @@
+from typing import Dict, List, Any, Optional
+from .base_data import BaseData
+import sys
+import os
+
+# Importar la configuración existente
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import supabase_async
+from postgrest.exceptions import APIError
+
+# Funciones SQL de agregación de permanencia (scripts/crear_funciones_estadisticas.sql)
+PROGRAMAS_DISTRIBUCION_RPC = "estadisticas_programas_distribucion"
+RIESGO_DESERCION_RPC = "estadisticas_riesgo_desercion"
+PROGRAMA_RIESGO_RPC = "estadisticas_programa_riesgo"
+SERVICIOS_POR_MES_RPC = "estadisticas_servicios_por_mes"
+
+class EstadisticasData(BaseData):
+    """Clase para las agregaciones de la tabla de permanencia, calculadas en Postgres."""
+    
+    def __init__(self):
+        """Inicializa el acceso a datos para la tabla de permanencia."""
+        super().__init__("permanencia")
+    
+    async def _agregar(self, funcion: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Ejecuta una función de agregación a través de la caché de la tabla.
+        
+        Args:
+            funcion: Nombre de la función SQL
+            params: Argumentos de la función
+        
+        Returns:
+            Filas agrupadas que retorna la función
+        """
+        params = params or {}
+        key = ("rpc", funcion, tuple(sorted(params.items())))
+        found, data = self.cache.get(key)
+        if found:
+            return data
+        
+        try:
+            response = await supabase_async.rpc(funcion, params).execute()
+        except APIError as e:
+            if e.code == "PGRST202":
+                raise ValueError(f"La función {funcion} no existe; ejecute scripts/crear_funciones_estadisticas.sql")
+            raise
+        if response.data:
+            self.cache.set(key, response.data)
+        return response.data
+    
+    async def get_programas_distribucion(self) -> List[Dict[str, Any]]:
+        """
+        Obtiene los inscritos por programa académico.
+        
+        Returns:
+            Lista de {"programa", "value"}, sin orden
+        """
+        return await self._agregar(PROGRAMAS_DISTRIBUCION_RPC)
+    
+    async def get_riesgo_desercion(self) -> List[Dict[str, Any]]:
+        """
+        Obtiene los registros por nivel de riesgo de deserción.
+        
+        Returns:
+            Lista de {"riesgo", "cantidad"}, sin orden
+        """
+        return await self._agregar(RIESGO_DESERCION_RPC)
+    
+    async def get_programa_riesgo(self, limite: int = 5) -> List[Dict[str, Any]]:
+        """
+        Obtiene los registros por programa y riesgo simplificado de los programas
+        con más registros.
+        
+        Args:
+            limite: Número de programas
+        
+        Returns:
+            Lista de {"programa", "bajo", "medio", "alto"} de mayor a menor total
+        """
+        return await self._agregar(PROGRAMA_RIESGO_RPC, {"limite": limite})
+    
+    async def get_servicios_por_mes(self, desde: str) -> List[Dict[str, Any]]:
+        """
+        Obtiene los registros por servicio y mes de creación.
+        
+        Args:
+            desde: Fecha ISO desde la que se cuentan los registros
+        
+        Returns:
+            Lista de {"servicio", "mes" (YYYY-MM), "cantidad"}, sin orden
+        """
+        return await self._agregar(SERVICIOS_POR_MES_RPC, {"desde": desde})
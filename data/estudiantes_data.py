@@ -1,20 +1,327 @@
-from typing import Dict, List, Any, Optional
-from .base_data import BaseData
+from typing import Dict, List, Any, Optional, Tuple
+from datetime import datetime
+from .base_data import BaseData, DEFAULT_PAGE_SIZE, DEFAULT_CHUNK_SIZE
+from .cache import LRUCache
+from .search_index import SearchIndex
+import asyncio
+import time
 import sys
 import os
 
 # Importar la configuración existente
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import supabase
+from config import (
+    supabase_async,
+    ESTUDIANTES_INDEX_MAX_SIZE, ESTUDIANTES_INDEX_TTL, ESTUDIANTES_INDEX_NEGATIVE_TTL,
+    ESTUDIANTES_SEARCH_REFRESH
+)
+from postgrest.exceptions import APIError
+
+# Función SQL del upsert atómico por documento (scripts/crear_funcion_upsert_estudiantes.sql)
+UPSERT_ESTUDIANTES_RPC = "upsert_estudiantes"
+
+# Campos por los que se filtra y se ordena el listado de estudiantes (con índices
+# declarados en scripts/corregir_tabla_estudiantes.sql)
+CAMPOS_FILTRO = ("programa_academico", "semestre", "estrato", "riesgo_desercion")
+CAMPOS_ORDEN = ("apellidos", "nombres", "documento", "programa_academico", "semestre", "estrato", "riesgo_desercion", "created_at")
+
+# Campos por los que se buscan estudiantes y campos retornados con cada resultado
+CAMPOS_BUSQUEDA = ("nombres", "apellidos", "documento", "correo")
+CAMPOS_RESULTADO_BUSQUEDA = CAMPOS_BUSQUEDA + ("programa_academico", "semestre")
+
+class EstudiantesIndex:
+    """
+    Índice en memoria documento -> ID de estudiante, compartido por el proceso.
+    
+    Recuerda también los documentos que no existen (con un TTL corto), para
+    que registrar un servicio a un estudiante conocido o nuevo no requiera
+    consultar antes la tabla. La memoria está acotada por el desalojo LRU.
+    """
+    
+    def __init__(self, max_size: int = ESTUDIANTES_INDEX_MAX_SIZE, ttl: float = ESTUDIANTES_INDEX_TTL,
+                 negative_ttl: float = ESTUDIANTES_INDEX_NEGATIVE_TTL):
+        """
+        Inicializa el índice.
+        
+        Args:
+            max_size: Número máximo de estudiantes (y de documentos ausentes) recordados
+            ttl: Segundos de vida de cada estudiante recordado
+            negative_ttl: Segundos de vida de cada documento recordado como ausente
+        """
+        self._ids = LRUCache(max_size=max_size, ttl=ttl)
+        self._documentos = LRUCache(max_size=max_size, ttl=ttl)
+        self._ausentes = LRUCache(max_size=max_size, ttl=negative_ttl)
+        self.warmed = 0
+    
+    def lookup(self, documento: Any) -> Tuple[bool, Optional[str]]:
+        """
+        Busca un documento en el índice.
+        
+        Args:
+            documento: Número de documento
+            
+        Returns:
+            Tupla (conocido, ID); el ID es None si se sabe que el documento no existe
+        """
+        documento = str(documento)
+        found, id = self._ids.get(documento)
+        if found:
+            return True, id
+        found, _ = self._ausentes.get(documento)
+        return found, None
+    
+    def remember(self, estudiante: Dict[str, Any]) -> None:
+        """
+        Registra un estudiante existente.
+        
+        Args:
+            estudiante: Datos del estudiante, al menos id y documento
+        """
+        if estudiante.get("id") is None or estudiante.get("documento") is None:
+            return
+        documento, id = str(estudiante["documento"]), estudiante["id"]
+        self._ids.set(documento, id)
+        self._documentos.set(str(id), documento)
+        self._ausentes.delete(documento)
+    
+    def remember_missing(self, documento: Any) -> None:
+        """
+        Registra que un documento no corresponde a ningún estudiante.
+        
+        Args:
+            documento: Número de documento
+        """
+        self._ausentes.set(str(documento), True)
+    
+    def forget(self, documento: Any = None, id: Any = None) -> None:
+        """
+        Olvida un estudiante por documento o por ID, tras una modificación o eliminación.
+        
+        Args:
+            documento: Número de documento
+            id: ID del estudiante
+        """
+        if id is not None:
+            found, documento_id = self._documentos.get(str(id))
+            self._documentos.delete(str(id))
+            if found:
+                self._ids.delete(documento_id)
+        if documento is not None:
+            self._ids.delete(str(documento))
+            self._ausentes.delete(str(documento))
+    
+    def clear(self) -> None:
+        """Elimina todas las entradas del índice."""
+        self._ids.clear()
+        self._documentos.clear()
+        self._ausentes.clear()
+    
+    async def warm(self, data: "EstudiantesData", page_size: int = DEFAULT_PAGE_SIZE) -> int:
+        """
+        Carga el índice con todos los estudiantes, descargando solo id y documento.
+        
+        Args:
+            data: Acceso a datos de estudiantes
+            page_size: Número de registros por consulta
+            
+        Returns:
+            Número de estudiantes cargados
+        """
+        total = 0
+        async for estudiante in data.iter_all(page_size, columns=["id", "documento"]):
+            self.remember(estudiante)
+            total += 1
+        self.warmed = total
+        return total
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Obtiene las estadísticas de uso del índice.
+        
+        Returns:
+            Diccionario con las estadísticas de estudiantes y documentos ausentes
+        """
+        return {
+            "warmed": self.warmed,
+            "estudiantes": self._ids.stats(),
+            "ausentes": self._ausentes.stats()
+        }
+
+# Índice compartido del proceso
+_estudiantes_index: Optional[EstudiantesIndex] = None
+
+def get_estudiantes_index() -> EstudiantesIndex:
+    """
+    Obtiene el índice de estudiantes compartido, creándolo si no existe.
+    
+    Returns:
+        Índice de estudiantes
+    """
+    global _estudiantes_index
+    if _estudiantes_index is None:
+        _estudiantes_index = EstudiantesIndex()
+    return _estudiantes_index
+
+class EstudiantesSearch:
+    """
+    Índice de búsqueda aproximada de estudiantes compartido por el proceso.
+    
+    Se carga completo en la primera búsqueda y luego se mantiene con las
+    escrituras hechas con EstudiantesData. Para incorporar las escrituras de
+    otros procesos se recarga en segundo plano cada refresh segundos, sin
+    bloquear las búsquedas.
+    """
+    
+    def __init__(self, refresh: float = ESTUDIANTES_SEARCH_REFRESH):
+        """
+        Inicializa el índice de búsqueda.
+        
+        Args:
+            refresh: Segundos tras los cuales se recarga el índice, 0 para no recargarlo
+        """
+        self.refresh = refresh
+        self.index = SearchIndex(CAMPOS_BUSQUEDA, CAMPOS_RESULTADO_BUSQUEDA + ("id",))
+        self.loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._recarga: Optional[asyncio.Task] = None
+        # Escrituras recibidas mientras se descarga la tabla, para aplicarlas después de cargarla
+        self._pendientes: Optional[List[Tuple[str, Any]]] = None
+    
+    async def load(self, data: "EstudiantesData") -> int:
+        """
+        Carga el índice con todos los estudiantes.
+        
+        Args:
+            data: Acceso a datos de estudiantes
+            
+        Returns:
+            Número de estudiantes indexados
+        """
+        async with self._lock:
+            return await self._load(data)
+    
+    async def _load(self, data: "EstudiantesData") -> int:
+        """Descarga la tabla y reemplaza el índice; se llama con el candado tomado."""
+        self._pendientes = []
+        try:
+            estudiantes = [e async for e in data.iter_all(columns=list(CAMPOS_RESULTADO_BUSQUEDA) + ["id"])]
+            self.index.load(estudiantes)
+            for operacion, valor in self._pendientes:
+                if operacion == "add":
+                    self.index.add(valor)
+                else:
+                    self.index.remove(valor)
+            self.loaded_at = time.monotonic()
+        finally:
+            self._pendientes = None
+        return len(self.index)
+    
+    async def search(self, data: "EstudiantesData", texto: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Busca estudiantes, cargando el índice si es la primera búsqueda.
+        
+        Args:
+            data: Acceso a datos de estudiantes
+            texto: Texto buscado
+            limit: Número máximo de resultados
+            
+        Returns:
+            Estudiantes encontrados con su puntaje en "score"
+        """
+        if self.loaded_at is None:
+            async with self._lock:
+                # Otra búsqueda pudo haber cargado el índice mientras se esperaba el candado
+                if self.loaded_at is None:
+                    await self._load(data)
+        elif self.refresh and time.monotonic() - self.loaded_at > self.refresh and self._recarga is None:
+            self._recarga = asyncio.ensure_future(self._reload(data))
+        return self.index.search(texto, limit)
+    
+    async def _reload(self, data: "EstudiantesData") -> None:
+        """Recarga el índice en segundo plano, conservando el anterior si falla."""
+        try:
+            await self.load(data)
+        except Exception as e:
+            print(f"Error al recargar el índice de búsqueda de estudiantes: {e}")
+            self.loaded_at = time.monotonic()
+        finally:
+            self._recarga = None
+    
+    def add(self, estudiante: Dict[str, Any]) -> None:
+        """
+        Indexa un estudiante creado o modificado.
+        
+        Args:
+            estudiante: Datos del estudiante, con id
+        """
+        if self._pendientes is not None:
+            self._pendientes.append(("add", estudiante))
+        self.index.add(estudiante)
+    
+    def remove(self, id: Any) -> None:
+        """
+        Quita del índice un estudiante eliminado.
+        
+        Args:
+            id: ID del estudiante
+        """
+        if self._pendientes is not None:
+            self._pendientes.append(("remove", id))
+        self.index.remove(id)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Obtiene el estado del índice de búsqueda.
+        
+        Returns:
+            Diccionario con el tamaño del índice y su antigüedad en segundos
+        """
+        return {
+            **self.index.stats(),
+            "age": round(time.monotonic() - self.loaded_at, 1) if self.loaded_at is not None else None
+        }
+
+# Índice de búsqueda compartido del proceso
+_estudiantes_search: Optional[EstudiantesSearch] = None
+
+def get_estudiantes_search() -> EstudiantesSearch:
+    """
+    Obtiene el índice de búsqueda de estudiantes compartido, creándolo si no existe.
+    
+    Returns:
+        Índice de búsqueda de estudiantes
+    """
+    global _estudiantes_search
+    if _estudiantes_search is None:
+        _estudiantes_search = EstudiantesSearch()
+    return _estudiantes_search
+
+async def warm_estudiantes_index() -> None:
+    """Carga el índice de estudiantes y el de búsqueda compartidos, registrando el resultado."""
+    data = EstudiantesData()
+    try:
+        total = await get_estudiantes_index().warm(data)
+        print(f"Índice de estudiantes cargado con {total} estudiantes")
+        total = await get_estudiantes_search().load(data)
+        print(f"Índice de búsqueda de estudiantes cargado con {total} estudiantes")
+    except Exception as e:
+        print(f"Error al cargar el índice de estudiantes: {e}")
 
 class EstudiantesData(BaseData):
     """Clase para el acceso a datos de estudiantes."""
     
-    def __init__(self):
-        """Inicializa el acceso a datos para la tabla de estudiantes."""
+    def __init__(self, index: Optional[EstudiantesIndex] = None):
+        """
+        Inicializa el acceso a datos para la tabla de estudiantes.
+        
+        Args:
+            index: Índice documento -> ID, por defecto el compartido del proceso
+        """
         super().__init__("estudiantes")
+        self.index = index if index is not None else get_estudiantes_index()
+        self.search = get_estudiantes_search()
     
-    def get_by_documento(self, documento: str) -> Optional[Dict[str, Any]]:
+    async def get_by_documento(self, documento: str) -> Optional[Dict[str, Any]]:
         """
         Obtiene un estudiante por su número de documento.
         
@@ -24,10 +331,12 @@ class EstudiantesData(BaseData):
         Returns:
             Estudiante encontrado o None si no existe
         """
-        response = supabase.table(self.table_name).select("*").eq("documento", documento).execute()
-        return response.data[0] if response.data else None
+        data = await self._execute_cached(
+            supabase_async.table(self.table_name).select("*").eq("documento", documento)
+        )
+        return data[0] if data else None
     
-    def get_by_correo(self, correo: str) -> Optional[Dict[str, Any]]:
+    async def get_by_correo(self, correo: str) -> Optional[Dict[str, Any]]:
         """
         Obtiene un estudiante por su correo electrónico.
         
@@ -37,10 +346,12 @@ class EstudiantesData(BaseData):
         Returns:
             Estudiante encontrado o None si no existe
         """
-        response = supabase.table(self.table_name).select("*").eq("correo", correo).execute()
-        return response.data[0] if response.data else None
+        data = await self._execute_cached(
+            supabase_async.table(self.table_name).select("*").eq("correo", correo)
+        )
+        return data[0] if data else None
     
-    def get_by_programa(self, programa_academico: str) -> List[Dict[str, Any]]:
+    async def get_by_programa(self, programa_academico: str) -> List[Dict[str, Any]]:
         """
         Obtiene todos los estudiantes de un programa académico.
         
@@ -50,10 +361,140 @@ class EstudiantesData(BaseData):
         Returns:
             Lista de estudiantes del programa
         """
-        response = supabase.table(self.table_name).select("*").eq("programa_academico", programa_academico).execute()
-        return response.data
+        return await self._execute_cached(
+            supabase_async.table(self.table_name).select("*").eq("programa_academico", programa_academico)
+        )
+    
+    @staticmethod
+    def build_filters(**valores: Any) -> Dict[str, Any]:
+        """
+        Construye los filtros de igualdad del listado de estudiantes.
+        
+        Args:
+            **valores: Valor de cada campo de CAMPOS_FILTRO; los None se omiten
+            
+        Returns:
+            Filtros en el formato de apply_filters
+            
+        Raises:
+            ValueError: Si algún campo no admite filtro
+        """
+        filtros = {}
+        for campo, valor in valores.items():
+            if campo not in CAMPOS_FILTRO:
+                raise ValueError(f"No se puede filtrar estudiantes por {campo}")
+            if valor is not None:
+                filtros[campo] = valor
+        return filtros
+    
+    async def buscar(self, texto: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Busca estudiantes por nombres, apellidos, documento o correo, sin
+        distinguir tildes ni mayúsculas y admitiendo prefijos y errores de escritura.
+        
+        Args:
+            texto: Texto buscado
+            limit: Número máximo de resultados
+            
+        Returns:
+            Estudiantes encontrados, del más al menos parecido, con su puntaje en "score"
+        """
+        return await self.search.search(self, texto, limit)
     
-    def buscar_o_crear(self, datos_estudiante: Dict[str, Any]) -> str:
+    async def get_id_by_documento(self, documento: Any) -> Optional[str]:
+        """
+        Obtiene el ID de un estudiante por su número de documento, consultando
+        primero el índice en memoria.
+        
+        Args:
+            documento: Número de documento del estudiante
+            
+        Returns:
+            ID del estudiante o None si no existe
+        """
+        conocido, estudiante_id = self.index.lookup(documento)
+        if conocido:
+            return estudiante_id
+        
+        registros = await self._execute_cached(
+            supabase_async.table(self.table_name).select("id,documento").eq("documento", documento)
+        )
+        if registros:
+            self.index.remember(registros[0])
+            return registros[0]["id"]
+        self.index.remember_missing(documento)
+        return None
+    
+    async def create(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Crea un nuevo estudiante y lo registra en el índice.
+        
+        Args:
+            data: Datos del estudiante
+            
+        Returns:
+            Estudiante creado
+        """
+        result = await super().create(data)
+        self.index.remember(result)
+        self.search.add(result)
+        return result
+    
+    async def _write_many(self, rows: List[Dict[str, Any]], chunk_size: int, on_conflict: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Escribe los estudiantes por bloques y registra en el índice los escritos.
+        
+        Args:
+            rows: Registros a escribir
+            chunk_size: Número de registros por petición
+            on_conflict: Columnas del upsert, None para una inserción simple
+            
+        Returns:
+            Diccionario con "ids" y "errors"
+        """
+        result = await super()._write_many(rows, chunk_size, on_conflict)
+        for row, estudiante_id in zip(rows, result["ids"]):
+            if estudiante_id is None:
+                continue
+            # Un upsert puede haber cambiado el documento de un estudiante existente
+            self.index.forget(id=estudiante_id)
+            if row.get("documento") is not None:
+                self.index.remember({"id": estudiante_id, "documento": row["documento"]})
+            self.search.add({**row, "id": estudiante_id})
+        return result
+    
+    async def update(self, id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Actualiza un estudiante y refresca su entrada en el índice.
+        
+        Args:
+            id: ID del estudiante
+            data: Datos a actualizar
+            
+        Returns:
+            Estudiante actualizado
+        """
+        self.index.forget(id=id)
+        result = await super().update(id, data)
+        self.index.remember(result)
+        self.search.add(result)
+        return result
+    
+    async def delete(self, id: str) -> bool:
+        """
+        Elimina un estudiante y lo olvida en el índice.
+        
+        Args:
+            id: ID del estudiante
+            
+        Returns:
+            True si se eliminó correctamente, False en caso contrario
+        """
+        self.index.forget(id=id)
+        self.search.remove(id)
+        return await super().delete(id)
+    
+    async def buscar_o_crear(self, datos_estudiante: Dict[str, Any]) -> str:
         """
         Busca un estudiante por número de documento o crea uno nuevo si no existe.
         
@@ -82,30 +523,255 @@ class EstudiantesData(BaseData):
         if not datos_estudiante.get("semestre"):
             raise ValueError("El semestre es obligatorio")
             
-        # Buscar estudiante por número de documento
-        estudiante = self.get_by_documento(datos_estudiante["documento"])
-        
-        if estudiante:
-            # Estudiante encontrado, retornar su ID
-            return estudiante["id"]
-        else:
-            # Crear nuevo estudiante
-            nuevo_estudiante = {
-                "documento": datos_estudiante["documento"],
-                "tipo_documento": datos_estudiante["tipo_documento"],
-                "nombres": datos_estudiante["nombres"],
-                "apellidos": datos_estudiante["apellidos"],
-                "correo": datos_estudiante["correo"],
-                "telefono": datos_estudiante.get("telefono") or "",
-                "direccion": datos_estudiante.get("direccion") or "",
-                "programa_academico": datos_estudiante["programa_academico"],
-                "semestre": datos_estudiante["semestre"],
-                "estrato": datos_estudiante.get("estrato") or 1,  # Valor por defecto
-            }
-            
-            result = self.create(nuevo_estudiante)
-            
-            if result and "id" in result:
-                return result["id"]
-            else:
-                raise ValueError("No se pudo crear el estudiante")
+        # Estudiante conocido por el índice: no hace falta ninguna consulta
+        conocido, estudiante_id = self.index.lookup(datos_estudiante["documento"])
+        if conocido and estudiante_id:
+            return estudiante_id
+        
+        # Crear el estudiante si no existe, u obtener el existente, en una sola llamada atómica
+        nuevo_estudiante = {
+            "documento": datos_estudiante["documento"],
+            "tipo_documento": datos_estudiante["tipo_documento"],
+            "nombres": datos_estudiante["nombres"],
+            "apellidos": datos_estudiante["apellidos"],
+            "correo": datos_estudiante["correo"],
+            "telefono": datos_estudiante.get("telefono") or "",
+            "direccion": datos_estudiante.get("direccion") or "",
+            "programa_academico": datos_estudiante["programa_academico"],
+            "semestre": datos_estudiante["semestre"],
+            "estrato": datos_estudiante.get("estrato") or 1,  # Valor por defecto
+        }
+        return await self.upsert_by_documento(nuevo_estudiante)
+    
+    async def upsert_by_documento(self, datos_estudiante: Dict[str, Any]) -> str:
+        """
+        Crea un estudiante si su documento no existe, en una sola llamada atómica.
+        
+        Un estudiante existente se conserva sin modificar.
+        
+        Args:
+            datos_estudiante: Datos del estudiante, con documento
+            
+        Returns:
+            ID del estudiante creado o existente
+        """
+        result = await self.upsert_many_by_documento([datos_estudiante])
+        if result["errors"]:
+            raise ValueError(f"No se pudo crear el estudiante: {result['errors'][0]['error']}")
+        return result["ids"][0]
+    
+    async def upsert_many_by_documento(self, estudiantes: List[Dict[str, Any]], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Any]:
+        """
+        Crea los estudiantes cuyo documento no existe y obtiene el ID de todos,
+        con una llamada atómica a la función upsert_estudiantes por bloque.
+        
+        Los estudiantes existentes se conservan sin modificar, y dos llamadas
+        concurrentes con el mismo documento nuevo obtienen el mismo ID.
+        
+        Args:
+            estudiantes: Datos de los estudiantes; documento es obligatorio y los
+                campos ausentes o en None toman el valor por defecto de la tabla
+                (por ejemplo tipo_documento = 'CC')
+            chunk_size: Número de estudiantes por llamada
+            
+        Returns:
+            Diccionario con "ids", los IDs en el orden de estudiantes (None en las
+            posiciones de un bloque fallido), y "errors", igual que create_many
+            
+        Raises:
+            ValueError: Si chunk_size es menor que 1 o algún estudiante no tiene documento
+        """
+        if chunk_size < 1:
+            raise ValueError(f"El tamaño de bloque debe ser al menos 1 y es {chunk_size}")
+        sin_documento = [posicion for posicion, e in enumerate(estudiantes) if e.get("documento") in (None, "")]
+        if sin_documento:
+            raise ValueError(f"Los estudiantes en las posiciones {sin_documento} no tienen documento")
+        
+        ids: List[Optional[str]] = [None] * len(estudiantes)
+        errors: List[Dict[str, Any]] = []
+        ahora = datetime.now().isoformat()
+        
+        for inicio in range(0, len(estudiantes), chunk_size):
+            # Un campo en None se omite: upsert_estudiantes guardaría NULL en lugar del valor por defecto
+            chunk = [
+                {"created_at": ahora, "updated_at": ahora, **{campo: valor for campo, valor in e.items() if valor is not None}}
+                for e in estudiantes[inicio:inicio + chunk_size]
+            ]
+            fin = inicio + len(chunk)
+            
+            try:
+                try:
+                    response = await supabase_async.rpc(UPSERT_ESTUDIANTES_RPC, {"registros": chunk}).execute()
+                except APIError as e:
+                    if e.code == "PGRST202":
+                        raise ValueError(
+                            f"La función {UPSERT_ESTUDIANTES_RPC} no existe; ejecute scripts/crear_funcion_upsert_estudiantes.sql"
+                        )
+                    raise
+                
+                por_documento = {str(registro["documento"]): registro for registro in response.data}
+                faltantes = [e["documento"] for e in chunk if str(e["documento"]) not in por_documento]
+                if faltantes:
+                    raise ValueError(f"No se recibieron los estudiantes con documento {faltantes}")
+                for posicion, estudiante in enumerate(chunk, start=inicio):
+                    ids[posicion] = por_documento[str(estudiante["documento"])]["id"]
+                
+                for registro in response.data:
+                    self.index.remember(registro)
+                    self.search.add(registro)
+                if self.replica is not None:
+                    self.replica.apply(self.table_name, response.data)
+            except Exception as e:
+                print(f"Error al registrar los estudiantes {inicio}-{fin - 1}: {e}")
+                errors.append({"start": inicio, "end": fin, "error": str(e)})
+        
+        self._changed()
+        return {"ids": ids, "errors": errors}
+
+class EstudiantesLoader:
+    """
+    Agrupa las búsquedas de estudiantes por documento o ID en consultas in_.
+    
+    Las búsquedas concurrentes se resuelven con una sola consulta y los
+    resultados (incluidos los estudiantes no encontrados) se recuerdan durante
+    la vida del cargador, que debe limitarse a una petición o a una importación.
+    
+    Las búsquedas por documento consultan antes el índice compartido: si lo
+    conoce, se retorna sin consulta un registro parcial con solo id y documento.
+    """
+    
+    CAMPOS = ("documento", "id")
+    
+    def __init__(self, data: Optional[EstudiantesData] = None):
+        """
+        Inicializa el cargador.
+        
+        Args:
+            data: Acceso a datos de estudiantes, por defecto uno nuevo
+        """
+        self.data = data if data is not None else EstudiantesData()
+        self._resueltos: Dict[str, Dict[str, Optional[Dict[str, Any]]]] = {campo: {} for campo in self.CAMPOS}
+        self._pendientes: Dict[str, Dict[str, asyncio.Future]] = {campo: {} for campo in self.CAMPOS}
+        self._despacho: Optional[asyncio.Future] = None
+    
+    async def load(self, campo: str, valor: Any) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene un estudiante por documento o ID, agrupando la consulta con las
+        demás búsquedas pendientes.
+        
+        Args:
+            campo: "documento" o "id"
+            valor: Valor buscado
+            
+        Returns:
+            Estudiante encontrado o None si no existe
+        """
+        if campo not in self.CAMPOS:
+            raise ValueError(f"No se pueden buscar estudiantes por {campo}")
+        
+        valor = str(valor)
+        if valor in self._resueltos[campo]:
+            return self._resueltos[campo][valor]
+        
+        if campo == "documento":
+            conocido, estudiante_id = self.data.index.lookup(valor)
+            if conocido:
+                # El registro parcial solo se guarda bajo el documento, para que
+                # load_by_id siga retornando el estudiante completo
+                estudiante = {"id": estudiante_id, "documento": valor} if estudiante_id else None
+                self._resueltos[campo][valor] = estudiante
+                return estudiante
+        
+        futuro = self._pendientes[campo].get(valor)
+        if futuro is None:
+            futuro = asyncio.get_running_loop().create_future()
+            self._pendientes[campo][valor] = futuro
+            if self._despacho is None:
+                self._despacho = asyncio.ensure_future(self._dispatch())
+        return await futuro
+    
+    async def load_by_documento(self, documento: Any) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene un estudiante por su número de documento.
+        
+        Args:
+            documento: Número de documento del estudiante
+            
+        Returns:
+            Estudiante encontrado o None si no existe
+        """
+        return await self.load("documento", documento)
+    
+    async def load_by_id(self, id: Any) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene un estudiante por su ID.
+        
+        Args:
+            id: ID del estudiante
+            
+        Returns:
+            Estudiante encontrado o None si no existe
+        """
+        return await self.load("id", id)
+    
+    async def load_many(self, campo: str, valores: List[Any]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Obtiene varios estudiantes con una sola consulta por bloque de valores.
+        
+        Args:
+            campo: "documento" o "id"
+            valores: Valores buscados
+            
+        Returns:
+            Estudiantes en el orden de valores (None para los que no existen)
+        """
+        return list(await asyncio.gather(*(self.load(campo, valor) for valor in valores)))
+    
+    def prime(self, estudiante: Dict[str, Any]) -> None:
+        """
+        Registra un estudiante conocido, por ejemplo uno recién creado.
+        
+        Args:
+            estudiante: Datos del estudiante
+        """
+        for campo in self.CAMPOS:
+            if estudiante.get(campo) is not None:
+                self._resueltos[campo][str(estudiante[campo])] = estudiante
+        self.data.index.remember(estudiante)
+    
+    async def _dispatch(self) -> None:
+        """Resuelve todas las búsquedas pendientes con consultas in_."""
+        # Ceder el control para que se acumulen las búsquedas concurrentes
+        await asyncio.sleep(0)
+        self._despacho = None
+        pendientes = self._pendientes
+        self._pendientes = {campo: {} for campo in self.CAMPOS}
+        
+        for campo, futuros in pendientes.items():
+            if not futuros:
+                continue
+            try:
+                estudiantes = await self.data.get_by_values(campo, list(futuros))
+            except Exception as e:
+                for futuro in futuros.values():
+                    if not futuro.done():
+                        futuro.set_exception(e)
+                continue
+            
+            for estudiante in estudiantes:
+                self.prime(estudiante)
+            for valor, futuro in futuros.items():
+                resultado = self._resueltos[campo].setdefault(valor, None)
+                if resultado is None and campo == "documento":
+                    self.data.index.remember_missing(valor)
+                if not futuro.done():
+                    futuro.set_result(resultado)
+
+def get_estudiantes_loader() -> EstudiantesLoader:
+    """
+    Dependencia de FastAPI que crea un cargador de estudiantes por petición.
+    
+    Returns:
+        Cargador de estudiantes
+    """
+    return EstudiantesLoader()
@@ -1,6 +1,6 @@
 from typing import Dict, List, Any, Optional
 from .base_data import BaseData
-from config import supabase
+from config import supabase_async
 
 class ProgramasData(BaseData):
     """Clase para el acceso a datos de programas académicos."""
@@ -9,7 +9,7 @@ class ProgramasData(BaseData):
         """Inicializa el acceso a datos para la tabla de programas."""
         super().__init__("programas")
     
-    def get_by_codigo(self, codigo: str) -> Optional[Dict[str, Any]]:
+    async def get_by_codigo(self, codigo: str) -> Optional[Dict[str, Any]]:
         """
         Obtiene un programa por su código.
         
@@ -19,10 +19,12 @@ class ProgramasData(BaseData):
         Returns:
             Programa encontrado o None si no existe
         """
-        response = supabase.table(self.table_name).select("*").eq("codigo", codigo).execute()
-        return response.data[0] if response.data else None
+        data = await self._execute_cached(
+            supabase_async.table(self.table_name).select("*").eq("codigo", codigo)
+        )
+        return data[0] if data else None
     
-    def get_by_facultad(self, facultad: str) -> List[Dict[str, Any]]:
+    async def get_by_facultad(self, facultad: str) -> List[Dict[str, Any]]:
         """
         Obtiene programas por facultad.
         
@@ -32,10 +34,11 @@ class ProgramasData(BaseData):
         Returns:
             Lista de programas de la facultad
         """
-        response = supabase.table(self.table_name).select("*").eq("facultad", facultad).execute()
-        return response.data
+        return await self._execute_cached(
+            supabase_async.table(self.table_name).select("*").eq("facultad", facultad)
+        )
     
-    def get_by_nivel(self, nivel: str) -> List[Dict[str, Any]]:
+    async def get_by_nivel(self, nivel: str) -> List[Dict[str, Any]]:
         """
         Obtiene programas por nivel.
         
@@ -45,15 +48,17 @@ class ProgramasData(BaseData):
         Returns:
             Lista de programas del nivel especificado
         """
-        response = supabase.table(self.table_name).select("*").eq("nivel", nivel).execute()
-        return response.data
+        return await self._execute_cached(
+            supabase_async.table(self.table_name).select("*").eq("nivel", nivel)
+        )
     
-    def get_activos(self) -> List[Dict[str, Any]]:
+    async def get_activos(self) -> List[Dict[str, Any]]:
         """
         Obtiene todos los programas activos.
         
         Returns:
             Lista de programas activos
         """
-        response = supabase.table(self.table_name).select("*").eq("estado", True).execute()
-        return response.data
+        return await self._execute_cached(
+            supabase_async.table(self.table_name).select("*").eq("estado", True)
+        )
@@ -0,0 +1,507 @@
+from typing import Dict, List, Any, Optional, Tuple
+import asyncio
+import json
+import re
+import sqlite3
+import time
+
+import sys
+import os
+
+# Importar la configuración existente
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    supabase_async,
+    REPLICA_TABLES, REPLICA_PATH, REPLICA_MAX_STALENESS,
+    REPLICA_SYNC_INTERVAL, REPLICA_FULL_SYNC_INTERVAL
+)
+from postgrest.exceptions import APIError
+
+# Registros por petición durante la sincronización
+SYNC_PAGE_SIZE = 1000
+
+# Columnas candidatas a marca de agua, en orden de preferencia
+WATERMARK_COLUMNS = ("updated_at", "created_at")
+
+# Número máximo de parámetros por consulta IN de SQLite
+SQLITE_IN_CHUNK_SIZE = 500
+
+# Nombres de tabla aceptados en la réplica
+_TABLA = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+# Traducción de los operadores de apply_filters a SQL sobre el documento JSON
+_OPERADORES_SQL = {
+    "eq": "=",
+    "neq": "!=",
+    "gt": ">",
+    "gte": ">=",
+    "lt": "<",
+    "lte": "<=",
+}
+
+# Valor de un filtro convertido al tipo JSON del campo, como PostgREST lo convierte al
+# tipo de la columna: "3" coincide con 3, 3 con "3" y "true" con true. Sus parámetros
+# son la ruta JSON y luego el valor tantas veces como aparece "?" tras ella
+_VALOR_COMPARABLE = (
+    "CASE json_type(data, ?)"
+    " WHEN 'integer' THEN CAST(? AS NUMERIC)"
+    " WHEN 'real' THEN CAST(? AS NUMERIC)"
+    " WHEN 'text' THEN CAST(? AS TEXT)"
+    " WHEN 'true' THEN lower(?) IN ('true', 't', '1')"
+    " WHEN 'false' THEN lower(?) IN ('true', 't', '1')"
+    " ELSE ? END"
+)
+_USOS_VALOR = _VALOR_COMPARABLE.count("?") - 1
+
+class LocalReplica:
+    """Réplica local en SQLite de tablas de Supabase, sincronizada por marca de agua."""
+    
+    def __init__(self, tables: List[str], path: str = ":memory:", max_staleness: float = 60,
+                 full_sync_interval: float = 3600):
+        """
+        Inicializa la réplica y crea sus tablas locales.
+        
+        Args:
+            tables: Tablas de Supabase a replicar
+            path: Archivo SQLite, ":memory:" para mantenerla solo en memoria
+            max_staleness: Segundos máximos desde la última sincronización para
+                que una lectura se sirva desde la réplica
+            full_sync_interval: Segundos entre sincronizaciones completas, que
+                además eliminan los registros borrados en Supabase
+        """
+        for tabla in tables:
+            if not _TABLA.match(tabla):
+                raise ValueError(f"La tabla '{tabla}' no es válida para la réplica")
+        
+        self.tables = list(tables)
+        self.path = path
+        self.max_staleness = max_staleness
+        self.full_sync_interval = full_sync_interval
+        self._locks = {tabla: asyncio.Lock() for tabla in self.tables}
+        self._task: Optional[asyncio.Task] = None
+        
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS _replica_estado ("
+                "tabla TEXT PRIMARY KEY, columna TEXT, marca TEXT, marca_id TEXT, "
+                "ultima_sync REAL, ultima_sync_completa REAL, filas INTEGER)"
+            )
+            for tabla in self.tables:
+                # El id se guarda sin afinidad de tipo para conservar llaves numéricas o uuid
+                self.conn.execute(f'CREATE TABLE IF NOT EXISTS "{tabla}" (id PRIMARY KEY, created_at TEXT, data TEXT NOT NULL)')
+                self.conn.execute(f'CREATE INDEX IF NOT EXISTS "{tabla}_created_at_id" ON "{tabla}" (created_at, id)')
+    
+    def handles(self, table_name: str) -> bool:
+        """Indica si la tabla está replicada."""
+        return table_name in self._locks
+    
+    async def ready(self, table_name: str) -> bool:
+        """
+        Asegura que la réplica de una tabla esté dentro de la ventana de
+        desactualización, sincronizándola si hace falta.
+        
+        Args:
+            table_name: Nombre de la tabla
+        
+        Returns:
+            True si la lectura puede servirse desde la réplica, False si la
+            sincronización falló y debe leerse de Supabase
+        """
+        if self._is_fresh(table_name):
+            return True
+        async with self._locks[table_name]:
+            # Otra corrutina pudo sincronizarla mientras se esperaba el candado
+            if self._is_fresh(table_name):
+                return True
+            try:
+                await self._sync(table_name)
+                return True
+            except Exception as e:
+                print(f"Error al sincronizar la réplica de {table_name}: {e}")
+                return False
+    
+    async def sync(self, table_name: str, full: bool = False) -> Dict[str, Any]:
+        """
+        Sincroniza una tabla con Supabase.
+        
+        Args:
+            table_name: Nombre de la tabla
+            full: Forzar una sincronización completa
+        
+        Returns:
+            Estado de la tabla tras la sincronización
+        """
+        async with self._locks[table_name]:
+            await self._sync(table_name, full)
+        return self.status()[table_name]
+    
+    async def sync_all(self) -> None:
+        """Sincroniza todas las tablas replicadas, sin detenerse en las que fallan."""
+        for tabla in self.tables:
+            try:
+                await self.sync(tabla)
+            except Exception as e:
+                print(f"Error al sincronizar la réplica de {tabla}: {e}")
+    
+    def start(self, interval: float) -> None:
+        """
+        Inicia la sincronización periódica en segundo plano.
+        
+        Args:
+            interval: Segundos entre sincronizaciones
+        """
+        async def ciclo():
+            while True:
+                await self.sync_all()
+                await asyncio.sleep(interval)
+        
+        if self._task is None:
+            self._task = asyncio.create_task(ciclo())
+    
+    async def stop(self) -> None:
+        """Detiene la sincronización periódica y cierra la base de datos local."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.conn.close()
+    
+    def _estado(self, table_name: str) -> Optional[Tuple]:
+        return self.conn.execute(
+            "SELECT columna, marca, marca_id, ultima_sync, ultima_sync_completa FROM _replica_estado WHERE tabla = ?",
+            (table_name,)
+        ).fetchone()
+    
+    def _is_fresh(self, table_name: str) -> bool:
+        estado = self._estado(table_name)
+        return estado is not None and time.time() - estado[3] <= self.max_staleness
+    
+    async def _sync(self, table_name: str, full: bool = False) -> None:
+        """Aplica los cambios de Supabase: completa si toca, incremental en otro caso."""
+        estado = self._estado(table_name)
+        ahora = time.time()
+        
+        if full or estado is None or estado[0] is None or ahora - estado[4] >= self.full_sync_interval:
+            columna = await self._watermark_column(table_name)
+            # La marca se toma antes de descargar: lo que cambie durante la descarga
+            # queda después de ella y llega en la siguiente sincronización incremental
+            marca, marca_id = await self._remote_watermark(table_name, columna) if columna else (None, None)
+            await self._full_sync(table_name)
+            ultima_completa = ahora
+        else:
+            columna = estado[0]
+            marca, marca_id = await self._incremental_sync(table_name, columna, estado[1], estado[2])
+            ultima_completa = estado[4]
+        
+        filas = self.conn.execute(f'SELECT COUNT(*) FROM "{table_name}"').fetchone()[0]
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO _replica_estado VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (table_name, columna, marca, marca_id, ahora, ultima_completa, filas)
+            )
+    
+    async def _watermark_column(self, table_name: str) -> Optional[str]:
+        """Obtiene la primera columna de WATERMARK_COLUMNS que existe en la tabla remota."""
+        for columna in WATERMARK_COLUMNS:
+            try:
+                await supabase_async.table(table_name).select(columna).limit(1).execute()
+                return columna
+            except APIError:
+                continue
+        return None
+    
+    async def _remote_watermark(self, table_name: str, columna: str) -> Tuple[Optional[str], Optional[str]]:
+        """Obtiene el par (marca, id) del registro modificado más recientemente en Supabase."""
+        query = supabase_async.table(table_name).select(f"{columna},id").limit(1)
+        # order() de postgrest-py 0.13 no admite nullslast y en orden descendente los nulos van primero
+        query.params = query.params.add("order", f"{columna}.desc.nullslast,id.desc")
+        response = await query.execute()
+        if not response.data or response.data[0].get(columna) is None:
+            return None, None
+        return response.data[0][columna], str(response.data[0]["id"])
+    
+    async def _full_sync(self, table_name: str) -> None:
+        """Descarga la tabla completa por páginas de id y elimina los registros que ya no existen."""
+        vistos = []
+        ultimo_id = None
+        while True:
+            query = supabase_async.table(table_name).select("*").order("id").limit(SYNC_PAGE_SIZE)
+            if ultimo_id is not None:
+                query = query.gt("id", ultimo_id)
+            registros = (await query.execute()).data
+            self.apply(table_name, registros)
+            vistos.extend(registro["id"] for registro in registros)
+            if len(registros) < SYNC_PAGE_SIZE:
+                break
+            ultimo_id = registros[-1]["id"]
+        
+        with self.conn:
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS _replica_vistos (id PRIMARY KEY)")
+            self.conn.execute("DELETE FROM _replica_vistos")
+            self.conn.executemany("INSERT OR IGNORE INTO _replica_vistos VALUES (?)", ((id,) for id in vistos))
+            self.conn.execute(f'DELETE FROM "{table_name}" WHERE id NOT IN (SELECT id FROM _replica_vistos)')
+    
+    async def _incremental_sync(self, table_name: str, columna: str, marca: Optional[str], marca_id: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+        """Descarga los registros con (marca, id) posterior a la última sincronización y retorna la nueva marca."""
+        while True:
+            query = supabase_async.table(table_name).select("*")
+            if marca is not None:
+                # postgrest-py 0.13 no expone or_(), por lo que el filtro se añade directamente
+                query.params = query.params.add(
+                    "or",
+                    f'({columna}.gt."{marca}",and({columna}.eq."{marca}",id.gt."{marca_id}"))'
+                )
+            else:
+                query = query.not_.is_(columna, "null")
+            query.params = query.params.add("order", f"{columna},id")
+            registros = (await query.limit(SYNC_PAGE_SIZE).execute()).data
+            self.apply(table_name, registros)
+            if registros:
+                marca, marca_id = registros[-1][columna], str(registros[-1]["id"])
+            if len(registros) < SYNC_PAGE_SIZE:
+                return marca, marca_id
+    
+    def apply(self, table_name: str, registros: List[Dict[str, Any]]) -> None:
+        """
+        Inserta o reemplaza registros en la réplica.
+        
+        Se usa durante la sincronización y tras las escrituras hechas con
+        BaseData, para que la réplica refleje de inmediato los cambios propios.
+        
+        Args:
+            table_name: Nombre de la tabla
+            registros: Registros completos retornados por Supabase
+        """
+        filas = [
+            (registro["id"], registro.get("created_at"), json.dumps(registro, default=str))
+            for registro in registros if registro.get("id") is not None
+        ]
+        if filas:
+            with self.conn:
+                self.conn.executemany(f'INSERT OR REPLACE INTO "{table_name}" VALUES (?, ?, ?)', filas)
+    
+    def remove(self, table_name: str, id: Any) -> None:
+        """
+        Elimina un registro de la réplica.
+        
+        Args:
+            table_name: Nombre de la tabla
+            id: ID del registro
+        """
+        with self.conn:
+            self.conn.execute(f'DELETE FROM "{table_name}" WHERE CAST(id AS TEXT) = ?', (str(id),))
+    
+    def select(self, table_name: str, filters: Optional[Dict[str, Any]] = None, columns: Optional[List[str]] = None,
+               after: Optional[Tuple[Any, Any]] = None, limit: Optional[int] = None,
+               order_by: Optional[str] = None, descending: bool = False) -> List[Dict[str, Any]]:
+        """
+        Lee registros de la réplica.
+        
+        Args:
+            table_name: Nombre de la tabla
+            filters: Filtros en el formato de apply_filters
+            columns: Columnas a retornar, None para todas
+            after: Par (valor de order_by, id) para leer en orden de paginación
+                por llave a partir de esa posición; con limit y sin after también se ordena
+            limit: Número máximo de registros
+            order_by: Columna de orden (los valores nulos al final), por defecto created_at
+            descending: Si el orden es descendente
+        
+        Returns:
+            Lista de registros
+        """
+        where, params = self._where(filters)
+        sql = f'SELECT data FROM "{table_name}"'
+        
+        # created_at tiene columna propia; las demás se leen del JSON con la ruta como parámetro
+        if order_by in (None, "created_at"):
+            campo, ruta = "created_at", []
+        else:
+            campo, ruta = "json_extract(data, ?)", [f'$."{order_by}"']
+        comparacion, direccion = ("<", "DESC") if descending else (">", "ASC")
+        
+        if after is not None:
+            valor, id = after
+            if valor is None:
+                where.append(f"({campo} IS NULL AND id {comparacion} ?)")
+                params.extend(ruta + [id])
+            else:
+                where.append(f"({campo} {comparacion} ? OR ({campo} = ? AND id {comparacion} ?) OR {campo} IS NULL)")
+                params.extend(ruta + [valor] + ruta + [valor, id] + ruta)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if after is not None or limit is not None or order_by is not None:
+            sql += f" ORDER BY {campo} IS NULL, {campo} {direccion}, id {direccion}"
+            params.extend(ruta + ruta)
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        
+        registros = [json.loads(fila[0]) for fila in self.conn.execute(sql, params)]
+        if columns:
+            registros = [{columna: registro.get(columna) for columna in columns} for registro in registros]
+        return registros
+    
+    def get_by_id(self, table_name: str, id: Any, columns: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene un registro de la réplica por su ID.
+        
+        Args:
+            table_name: Nombre de la tabla
+            id: ID del registro (se compara como texto, igual que en la URL de PostgREST)
+            columns: Columnas a retornar, None para todas
+        
+        Returns:
+            Registro encontrado o None si no existe
+        """
+        fila = self.conn.execute(f'SELECT data FROM "{table_name}" WHERE CAST(id AS TEXT) = ?', (str(id),)).fetchone()
+        if fila is None:
+            return None
+        registro = json.loads(fila[0])
+        return {columna: registro.get(columna) for columna in columns} if columns else registro
+    
+    def count(self, table_name: str, filters: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Cuenta registros de la réplica.
+        
+        Args:
+            table_name: Nombre de la tabla
+            filters: Filtros en el formato de apply_filters
+        
+        Returns:
+            Número de registros
+        """
+        where, params = self._where(filters)
+        sql = f'SELECT COUNT(*) FROM "{table_name}"'
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return self.conn.execute(sql, params).fetchone()[0]
+    
+    def select_in(self, table_name: str, column: str, values: List[Any], columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Lee los registros cuya columna toma alguno de los valores dados.
+        
+        Args:
+            table_name: Nombre de la tabla
+            column: Columna por la que se filtra
+            values: Valores buscados
+            columns: Columnas a retornar, None para todas
+        
+        Returns:
+            Lista de registros
+        """
+        registros = []
+        for inicio in range(0, len(values), SQLITE_IN_CHUNK_SIZE):
+            registros.extend(self.select(table_name, {column: ("in_", values[inicio:inicio + SQLITE_IN_CHUNK_SIZE])}, columns))
+        return registros
+    
+    @staticmethod
+    def _where(filters: Optional[Dict[str, Any]]) -> Tuple[List[str], List[Any]]:
+        """Traduce filtros en el formato de apply_filters a condiciones SQL con parámetros."""
+        condiciones: List[str] = []
+        params: List[Any] = []
+        for columna, condicion in (filters or {}).items():
+            operador, valor = condicion if isinstance(condicion, tuple) else ("eq", condicion)
+            # La ruta JSON va como parámetro, así que el nombre de la columna no llega al SQL
+            campo = "json_extract(data, ?)"
+            ruta = f'$."{columna}"'
+            params.append(ruta)
+            
+            if operador in _OPERADORES_SQL:
+                condiciones.append(f"{campo} {_OPERADORES_SQL[operador]} {_VALOR_COMPARABLE}")
+                params.extend([ruta] + [valor] * _USOS_VALOR)
+            elif operador == "like":
+                condiciones.append(f"{campo} GLOB ?")
+                params.append(str(valor).replace("%", "*").replace("_", "?"))
+            elif operador == "ilike":
+                condiciones.append(f"{campo} LIKE ?")
+                params.append(str(valor).replace("*", "%"))
+            elif operador == "is_":
+                if valor is None or str(valor).lower() == "null":
+                    condiciones.append(f"{campo} IS NULL")
+                else:
+                    condiciones.append(f"{campo} = ?")
+                    params.append(1 if str(valor).lower() == "true" else 0)
+            elif operador == "in_":
+                valores = list(valor)
+                if not valores:
+                    condiciones.append("0")
+                    params.pop()
+                    continue
+                condiciones.append(f"{campo} IN ({', '.join([_VALOR_COMPARABLE] * len(valores))})")
+                for valor in valores:
+                    params.extend([ruta] + [valor] * _USOS_VALOR)
+            else:
+                raise ValueError(f"El operador '{operador}' no es válido")
+        return condiciones, params
+    
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Obtiene el estado de sincronización de cada tabla.
+        
+        Returns:
+            Diccionario por tabla con la columna y el valor de la marca de agua,
+            la antigüedad de la última sincronización y el número de filas
+        """
+        estado = {}
+        ahora = time.time()
+        for tabla in self.tables:
+            fila = self.conn.execute(
+                "SELECT columna, marca, ultima_sync, ultima_sync_completa, filas FROM _replica_estado WHERE tabla = ?",
+                (tabla,)
+            ).fetchone()
+            estado[tabla] = {
+                "watermark_column": fila[0] if fila else None,
+                "watermark": fila[1] if fila else None,
+                "age_seconds": round(ahora - fila[2], 1) if fila else None,
+                "full_sync_age_seconds": round(ahora - fila[3], 1) if fila else None,
+                "rows": fila[4] if fila else 0,
+                "fresh": bool(fila) and ahora - fila[2] <= self.max_staleness
+            }
+        return estado
+
+# Réplica compartida del proceso, creada al primer uso si hay tablas configuradas
+_replica: Optional[LocalReplica] = None
+
+def get_replica(table_name: Optional[str] = None) -> Optional[LocalReplica]:
+    """
+    Obtiene la réplica local compartida.
+    
+    Args:
+        table_name: Si se indica, retorna la réplica solo si esa tabla está replicada
+    
+    Returns:
+        Réplica local, o None si está deshabilitada o no replica la tabla
+    """
+    global _replica
+    if not REPLICA_TABLES:
+        return None
+    if _replica is None:
+        _replica = LocalReplica(
+            REPLICA_TABLES,
+            path=REPLICA_PATH,
+            max_staleness=REPLICA_MAX_STALENESS,
+            full_sync_interval=REPLICA_FULL_SYNC_INTERVAL
+        )
+    if table_name is not None and not _replica.handles(table_name):
+        return None
+    return _replica
+
+def start_replica() -> None:
+    """Inicia la sincronización periódica de la réplica si está habilitada."""
+    replica = get_replica()
+    if replica is not None:
+        print(f"Réplica local habilitada para: {', '.join(replica.tables)} ({replica.path})")
+        replica.start(REPLICA_SYNC_INTERVAL)
+
+async def stop_replica() -> None:
+    """Detiene la sincronización periódica de la réplica."""
+    global _replica
+    if _replica is not None:
+        await _replica.stop()
+        _replica = None
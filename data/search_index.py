@@ -0,0 +1,330 @@
+from typing import Dict, List, Any, Optional, Set, Tuple, Hashable, Iterable
+from collections import Counter
+import bisect
+import heapq
+import re
+import unicodedata
+
+# Caracteres que separan palabras después de normalizar
+_SEPARADORES = re.compile(r"[^a-z0-9]+")
+
+# Puntaje de una palabra de la consulta según cómo coincide con una palabra del registro
+PUNTAJE_EXACTO = 3.0
+PUNTAJE_PREFIJO = 2.0
+
+# Palabras del vocabulario que se consideran como máximo al expandir un prefijo
+# en una consulta de una palabra, y al reunir los candidatos de una consulta de varias
+MAX_EXPANSIONES = 1000
+MAX_CANDIDATOS = 20000
+
+def normalize(texto: Any) -> str:
+    """
+    Normaliza un texto para la búsqueda: minúsculas y sin tildes.
+    
+    Args:
+        texto: Texto a normalizar
+    
+    Returns:
+        Texto normalizado
+    """
+    texto = str(texto).lower()
+    if texto.isascii():
+        return texto
+    # Descomponer separa las tildes, que se descartan al pasar a ASCII
+    return unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+
+def tokenize(texto: Any) -> List[str]:
+    """
+    Divide un texto normalizado en palabras.
+    
+    Args:
+        texto: Texto a dividir
+    
+    Returns:
+        Palabras del texto
+    """
+    return [palabra for palabra in _SEPARADORES.split(normalize(texto)) if palabra]
+
+def trigrams(palabra: str) -> Set[str]:
+    """
+    Obtiene los trigramas de una palabra, con el relleno de pg_trgm
+    (dos espacios al inicio y uno al final).
+    
+    Args:
+        palabra: Palabra normalizada
+    
+    Returns:
+        Conjunto de trigramas
+    """
+    relleno = f"  {palabra} "
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+class SearchIndex:
+    """
+    Índice de búsqueda aproximada en memoria por trigramas y prefijos.
+    
+    Cada registro se indexa por las palabras (normalizadas sin tildes) de los
+    campos configurados. Una consulta retorna los registros en los que cada
+    palabra buscada coincide exactamente, como prefijo o por similitud de
+    trigramas (como pg_trgm) con alguna palabra del registro, ordenados por
+    puntaje. Los trigramas se indexan sobre el vocabulario y no sobre los
+    registros, y los registros se agregan y eliminan de forma incremental.
+    """
+    
+    def __init__(self, fields: Tuple[str, ...], stored_fields: Optional[Tuple[str, ...]] = None,
+                 min_similarity: float = 0.3):
+        """
+        Inicializa el índice.
+        
+        Args:
+            fields: Campos indexados
+            stored_fields: Campos que se guardan y retornan con cada resultado,
+                por defecto los indexados
+            min_similarity: Similitud de trigramas mínima (entre 0 y 1) para que
+                una palabra se considere parecida a la buscada
+        """
+        self.fields = fields
+        self.stored_fields = stored_fields or fields
+        self.min_similarity = min_similarity
+        self._registros: Dict[Hashable, Dict[str, Any]] = {}
+        self._palabras_registro: Dict[Hashable, Set[str]] = {}
+        self._claves: Dict[Hashable, str] = {}
+        self._ids_palabra: Dict[str, Set[Hashable]] = {}
+        # Vocabulario ordenado para buscar prefijos con bisect (None durante una carga masiva)
+        self._palabras: Optional[List[str]] = []
+        self._palabras_trigrama: Dict[str, Set[str]] = {}
+    
+    def __len__(self) -> int:
+        return len(self._registros)
+    
+    def add(self, record: Dict[str, Any]) -> None:
+        """
+        Agrega o reemplaza un registro. Un registro parcial se combina con los
+        campos ya indexados del mismo ID.
+        
+        Args:
+            record: Registro con id
+        """
+        id = record.get("id")
+        if id is None:
+            return
+        anterior = self._registros.get(id, {})
+        registro = {campo: record.get(campo, anterior.get(campo)) for campo in self.stored_fields}
+        registro["id"] = id
+        
+        self.remove(id)
+        textos = [normalize(registro[campo]) for campo in self.fields if registro.get(campo) is not None]
+        palabras = {palabra for texto in textos for palabra in _SEPARADORES.split(texto) if palabra}
+        self._registros[id] = registro
+        self._palabras_registro[id] = palabras
+        self._claves[id] = " ".join(textos)
+        for palabra in palabras:
+            ids = self._ids_palabra.get(palabra)
+            if ids is None:
+                ids = self._ids_palabra[palabra] = set()
+                self._agregar_palabra(palabra)
+            ids.add(id)
+    
+    def load(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Reemplaza el contenido del índice por los registros dados, ordenando el
+        vocabulario una sola vez al final.
+        
+        Args:
+            records: Registros con id
+            
+        Returns:
+            Número de registros indexados
+        """
+        self.clear()
+        self._palabras = None
+        try:
+            for record in records:
+                self.add(record)
+        finally:
+            self._palabras = sorted(self._ids_palabra)
+        return len(self._registros)
+    
+    def remove(self, id: Hashable) -> None:
+        """
+        Elimina un registro si está indexado.
+        
+        Args:
+            id: ID del registro
+        """
+        palabras = self._palabras_registro.pop(id, None)
+        if palabras is None:
+            return
+        del self._registros[id]
+        del self._claves[id]
+        for palabra in palabras:
+            ids = self._ids_palabra[palabra]
+            ids.discard(id)
+            if not ids:
+                del self._ids_palabra[palabra]
+                self._quitar_palabra(palabra)
+    
+    def clear(self) -> None:
+        """Elimina todos los registros."""
+        self._registros.clear()
+        self._palabras_registro.clear()
+        self._claves.clear()
+        self._ids_palabra.clear()
+        self._palabras = []
+        self._palabras_trigrama.clear()
+    
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Busca los registros que coinciden con todas las palabras de la consulta.
+        
+        Args:
+            query: Texto buscado
+            limit: Número máximo de resultados
+            
+        Returns:
+            Registros encontrados con su puntaje en "score", de mayor a menor
+        """
+        palabras = list(dict.fromkeys(tokenize(query)))
+        if not palabras or self._palabras is None:
+            return []
+        
+        if len(palabras) == 1:
+            return self._top_single(self._match(palabras[0]), limit)
+        
+        # Intersección de los registros de cada palabra buscada, de la más selectiva a
+        # la menos; una palabra con un prefijo muy frecuente no se expande y se compara
+        # después con las palabras (pocas) de cada candidato
+        conjuntos = sorted(
+            (self._ids_matching(palabra) for palabra in palabras if self._prefix_count(palabra) <= MAX_CANDIDATOS),
+            key=len
+        )
+        if not conjuntos:
+            conjuntos = [self._ids_matching(palabras[0])]
+        candidatos = conjuntos[0].intersection(*conjuntos[1:])
+        
+        comparadas: Dict[str, Dict[str, float]] = {palabra: {} for palabra in palabras}
+        puntajes: Dict[Hashable, float] = {}
+        for id in candidatos:
+            palabras_registro = self._palabras_registro[id]
+            total = 0.0
+            for buscada, memoria in comparadas.items():
+                mejor = 0.0
+                for indexada in palabras_registro:
+                    valor = memoria.get(indexada)
+                    if valor is None:
+                        valor = memoria[indexada] = self._score(buscada, indexada)
+                    if valor > mejor:
+                        mejor = valor
+                if not mejor:
+                    break
+                total += mejor
+            else:
+                puntajes[id] = total
+        
+        # Desempate alfabético por los campos indexados
+        mejores = heapq.nsmallest(limit, puntajes.items(), key=lambda item: (-item[1], self._claves[item[0]]))
+        return [{**self._registros[id], "score": round(puntaje, 3)} for id, puntaje in mejores]
+    
+    def _ids_matching(self, palabra: str) -> Set[Hashable]:
+        """Obtiene los IDs de los registros con alguna palabra que coincide con una palabra buscada."""
+        inicio = bisect.bisect_left(self._palabras, palabra)
+        fin = inicio + self._prefix_count(palabra)
+        palabras = self._palabras[inicio:fin] + list(self._similar(palabra))
+        return set().union(*map(self._ids_palabra.__getitem__, palabras))
+    
+    def _top_single(self, coincidencias: Dict[str, float], limit: int) -> List[Dict[str, Any]]:
+        """Obtiene los mejores registros de una consulta de una sola palabra sin puntuar todos los candidatos."""
+        resultados: List[Dict[str, Any]] = []
+        vistos: Set[Hashable] = set()
+        for palabra, puntaje in sorted(coincidencias.items(), key=lambda item: (-item[1], item[0])):
+            ids = [id for id in self._ids_palabra[palabra] if id not in vistos]
+            for id in heapq.nsmallest(limit - len(resultados), ids, key=self._claves.__getitem__):
+                vistos.add(id)
+                resultados.append({**self._registros[id], "score": round(puntaje, 3)})
+            if len(resultados) >= limit:
+                break
+        return resultados
+    
+    def _match(self, palabra: str) -> Dict[str, float]:
+        """
+        Obtiene las palabras del vocabulario que coinciden con una palabra buscada
+        y su puntaje: exacta, prefijo (más alto cuanto más completa) o parecida
+        (la similitud de trigramas).
+        """
+        puntajes = self._similar(palabra)
+        inicio = bisect.bisect_left(self._palabras, palabra)
+        for indexada in self._palabras[inicio:inicio + MAX_EXPANSIONES]:
+            if not indexada.startswith(palabra):
+                break
+            puntajes[indexada] = self._score(palabra, indexada)
+        return puntajes
+    
+    def _similar(self, palabra: str) -> Dict[str, float]:
+        """Obtiene las palabras alfabéticas del vocabulario parecidas a una palabra buscada y su similitud."""
+        similares: Dict[str, float] = {}
+        if not palabra.isalpha():
+            return similares
+        buscados = trigrams(palabra)
+        conteo: Counter = Counter()
+        for trigrama in buscados:
+            conteo.update(self._palabras_trigrama.get(trigrama, ()))
+        for indexada, compartidos in conteo.items():
+            # len(palabra) + 1 es el número de trigramas de una palabra (sin repetidos en la práctica)
+            similitud = compartidos / (len(buscados) + len(indexada) + 1 - compartidos)
+            if similitud >= self.min_similarity:
+                similares[indexada] = similitud
+        return similares
+    
+    def _prefix_count(self, palabra: str) -> int:
+        """Cuenta las palabras del vocabulario que empiezan por una palabra buscada."""
+        inicio = bisect.bisect_left(self._palabras, palabra)
+        return bisect.bisect_left(self._palabras, palabra + "\uffff", inicio) - inicio
+    
+    def _score(self, buscada: str, indexada: str) -> float:
+        """Puntaje de una palabra indexada para una palabra buscada, 0 si no coinciden."""
+        if indexada == buscada:
+            return PUNTAJE_EXACTO
+        if indexada.startswith(buscada):
+            return PUNTAJE_PREFIJO + len(buscada) / len(indexada) / 2
+        if buscada.isalpha() and indexada.isalpha():
+            buscados, propios = trigrams(buscada), trigrams(indexada)
+            compartidos = len(buscados & propios)
+            similitud = compartidos / (len(buscados) + len(propios) - compartidos)
+            if similitud >= self.min_similarity:
+                return similitud
+        return 0.0
+    
+    def _agregar_palabra(self, palabra: str) -> None:
+        """Agrega una palabra nueva al vocabulario ordenado y al índice de trigramas."""
+        if self._palabras is not None:
+            bisect.insort(self._palabras, palabra)
+        # Solo las palabras alfabéticas (nombres, apellidos, correos) admiten
+        # coincidencias aproximadas; los documentos se buscan por prefijo
+        if palabra.isalpha():
+            for trigrama in trigrams(palabra):
+                self._palabras_trigrama.setdefault(trigrama, set()).add(palabra)
+    
+    def _quitar_palabra(self, palabra: str) -> None:
+        """Quita del vocabulario una palabra que ya no aparece en ningún registro."""
+        if self._palabras is not None:
+            del self._palabras[bisect.bisect_left(self._palabras, palabra)]
+        if palabra.isalpha():
+            for trigrama in trigrams(palabra):
+                palabras = self._palabras_trigrama.get(trigrama)
+                if palabras is not None:
+                    palabras.discard(palabra)
+                    if not palabras:
+                        del self._palabras_trigrama[trigrama]
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Obtiene el tamaño del índice.
+        
+        Returns:
+            Diccionario con registros, palabras y trigramas indexados
+        """
+        return {
+            "records": len(self._registros),
+            "words": len(self._ids_palabra),
+            "trigrams": len(self._palabras_trigrama)
+        }
@@ -1,6 +1,6 @@
 from typing import Dict, List, Any, Optional
 from .base_data import BaseData
-from config import supabase
+from config import supabase_async
 
 class ServiciosData(BaseData):
     """Clase para el acceso a datos de servicios."""
@@ -9,7 +9,7 @@ class ServiciosData(BaseData):
         """Inicializa el acceso a datos para la tabla de servicios."""
         super().__init__("servicios")
     
-    def get_by_tipo(self, tipo: str) -> List[Dict[str, Any]]:
+    async def get_by_tipo(self, tipo: str) -> List[Dict[str, Any]]:
         """
         Obtiene servicios por tipo.
         
@@ -19,18 +19,20 @@ class ServiciosData(BaseData):
         Returns:
             Lista de servicios del tipo especificado
         """
-        response = supabase.table(self.table_name).select("*").eq("tipo", tipo).execute()
-        return response.data
+        return await self._execute_cached(
+            supabase_async.table(self.table_name).select("*").eq("tipo", tipo)
+        )
     
-    def get_activos(self) -> List[Dict[str, Any]]:
+    async def get_activos(self) -> List[Dict[str, Any]]:
         """
         Obtiene todos los servicios activos.
         
         Returns:
             Lista de servicios activos
         """
-        response = supabase.table(self.table_name).select("*").eq("estado", True).execute()
-        return response.data
+        return await self._execute_cached(
+            supabase_async.table(self.table_name).select("*").eq("estado", True)
+        )
 
 
 class AsistenciasData(BaseData):
@@ -40,7 +42,7 @@ class AsistenciasData(BaseData):
         """Inicializa el acceso a datos para la tabla de asistencias."""
         super().__init__("asistencias")
     
-    def get_by_estudiante(self, estudiante_id: str) -> List[Dict[str, Any]]:
+    async def get_by_estudiante(self, estudiante_id: str) -> List[Dict[str, Any]]:
         """
         Obtiene asistencias por estudiante.
         
@@ -50,10 +52,10 @@ class AsistenciasData(BaseData):
         Returns:
             Lista de asistencias del estudiante
         """
-        response = supabase.table(self.table_name).select("*").eq("estudiante_id", estudiante_id).execute()
+        response = await supabase_async.table(self.table_name).select("*").eq("estudiante_id", estudiante_id).execute()
         return response.data
     
-    def get_by_servicio(self, servicio_id: str) -> List[Dict[str, Any]]:
+    async def get_by_servicio(self, servicio_id: str) -> List[Dict[str, Any]]:
         """
         Obtiene asistencias por servicio.
         
@@ -63,10 +65,10 @@ class AsistenciasData(BaseData):
         Returns:
             Lista de asistencias al servicio
         """
-        response = supabase.table(self.table_name).select("*").eq("servicio_id", servicio_id).execute()
+        response = await supabase_async.table(self.table_name).select("*").eq("servicio_id", servicio_id).execute()
         return response.data
     
-    def get_by_fecha(self, fecha_inicio: str, fecha_fin: str) -> List[Dict[str, Any]]:
+    async def get_by_fecha(self, fecha_inicio: str, fecha_fin: str) -> List[Dict[str, Any]]:
         """
         Obtiene asistencias por rango de fechas.
         
@@ -77,7 +79,7 @@ class AsistenciasData(BaseData):
         Returns:
             Lista de asistencias en el rango de fechas
         """
-        response = supabase.table(self.table_name).select("*")\
+        response = await supabase_async.table(self.table_name).select("*")\
             .gte("fecha", fecha_inicio)\
             .lte("fecha", fecha_fin)\
             .execute()
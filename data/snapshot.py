@@ -0,0 +1,552 @@
+from typing import Dict, List, Any, Optional, Tuple
+import asyncio
+import json
+import os
+import re
+import shutil
+import time
+
+try:
+    import fcntl
+except ImportError:
+    # Sin fcntl (Windows) no hay candado entre procesos: un solo worker debe escribir el snapshot
+    fcntl = None
+
+import sys
+
+# Importar la configuración existente
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    SNAPSHOT_TABLES, SNAPSHOT_PATH, SNAPSHOT_REFRESH_INTERVAL,
+    SNAPSHOT_FULL_REFRESH_INTERVAL, SNAPSHOT_MAX_SEGMENTS
+)
+from .base_data import BaseData
+from .replica import WATERMARK_COLUMNS
+from .versions import split_version
+
+# Archivo con el estado del snapshot de una tabla (columnas, diccionarios y segmentos)
+MANIFEST_NAME = "manifest.json"
+
+# Archivo sobre el que se toma el candado de escritura entre procesos
+LOCK_NAME = ".lock"
+
+# Columnas que se guardan como texto y no como categóricas (casi todos sus valores son distintos)
+TEXT_COLUMNS = ("id", "created_at", "updated_at")
+
+# Nombres de tabla y de columna aceptados en el snapshot (también nombran archivos)
+_IDENTIFICADOR = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+def _tipo_codigos(num_valores: int):
+    """Tipo entero más pequeño para los códigos de un diccionario, el mismo que usa pandas."""
+    import numpy as np
+    
+    for tipo in (np.int8, np.int16, np.int32):
+        if num_valores < np.iinfo(tipo).max:
+            return tipo
+    return np.int64
+
+def _valor_json(valor: Any) -> Any:
+    """Convierte un escalar de numpy en el valor de Python equivalente."""
+    return valor.item() if hasattr(valor, "item") else valor
+
+def _fecha(valor: Optional[str]):
+    """Convierte una marca de agua en un Timestamp en UTC, None si no es una fecha."""
+    import pandas as pd
+    
+    if not valor:
+        return None
+    fecha = pd.to_datetime(valor, utc=True, errors="coerce", format="ISO8601")
+    return None if pd.isna(fecha) else fecha
+
+class ColumnarSnapshot:
+    """
+    Snapshot columnar de una tabla de Supabase en disco, compartido por los workers.
+    
+    Cada columna de cada segmento es un archivo .npy que se abre mapeado en
+    memoria y de solo lectura (np.load con mmap_mode="r"): los workers comparten
+    las páginas del sistema operativo y los DataFrames de segments apuntan a los
+    archivos sin copiarlos. Las columnas de texto se guardan como códigos enteros
+    de un diccionario por columna (manifest.json), que solo crece, de modo que
+    los segmentos anteriores siguen siendo válidos al agregar valores.
+    
+    La actualización incremental agrega como un segmento nuevo los registros con
+    (created_at, id) posterior a la marca de agua. Las modificaciones y los
+    borrados se reflejan en la recarga completa, que se hace cada
+    full_refresh_interval segundos o al superar max_segments segmentos; con
+    matches se detecta si una versión de la tabla ya no coincide con el snapshot.
+    """
+    
+    def __init__(self, table_name: str, path: str, full_refresh_interval: float = 3600,
+                 max_segments: int = 32, data: Optional[BaseData] = None):
+        """
+        Inicializa el snapshot y crea su directorio.
+        
+        Args:
+            table_name: Tabla de Supabase
+            path: Directorio de los snapshots (cada tabla en un subdirectorio)
+            full_refresh_interval: Segundos entre recargas completas
+            max_segments: Segmentos a partir de los cuales se recarga completo
+            data: Acceso a datos de la tabla, por defecto BaseData(table_name)
+        """
+        if not _IDENTIFICADOR.match(table_name):
+            raise ValueError(f"La tabla '{table_name}' no es válida para el snapshot")
+        
+        self.table_name = table_name
+        self.dir = os.path.join(path, table_name)
+        self.full_refresh_interval = full_refresh_interval
+        self.max_segments = max_segments
+        self.data = data if data is not None else BaseData(table_name)
+        self.refreshes = 0
+        self.full_refreshes = 0
+        self.appended_rows = 0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._manifest: Optional[Dict[str, Any]] = None
+        self._manifest_mtime: Optional[int] = None
+        # Arreglos mapeados por segmento y diccionarios por columna del manifiesto cargado
+        self._segmentos: Dict[str, Dict[str, Any]] = {}
+        self._categorias: Dict[str, Any] = {}
+        os.makedirs(self.dir, exist_ok=True)
+    
+    def manifest(self) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene el manifiesto vigente, recargándolo si otro proceso lo reemplazó.
+        
+        Returns:
+            Manifiesto (no debe modificarse) o None si el snapshot no existe aún
+        """
+        ruta = os.path.join(self.dir, MANIFEST_NAME)
+        try:
+            mtime = os.stat(ruta).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if mtime != self._manifest_mtime:
+            with open(ruta, encoding="utf-8") as archivo:
+                self._adoptar(json.load(archivo), mtime)
+        return self._manifest
+    
+    def _adoptar(self, manifest: Dict[str, Any], mtime: int) -> None:
+        """Reemplaza el manifiesto cargado y suelta los segmentos que ya no forman parte de él."""
+        vigentes = {segmento["name"] for segmento in manifest["segments"]}
+        self._segmentos = {nombre: arreglos for nombre, arreglos in self._segmentos.items() if nombre in vigentes}
+        self._categorias = {}
+        self._manifest = manifest
+        self._manifest_mtime = mtime
+    
+    def _arreglos(self, nombre: str) -> Dict[str, Any]:
+        """Abre mapeadas en memoria las columnas de un segmento."""
+        import numpy as np
+        
+        arreglos = self._segmentos.get(nombre)
+        if arreglos is None:
+            arreglos = {
+                col: np.load(os.path.join(self.dir, nombre, f"{col}.npy"), mmap_mode="r")
+                for col in self._manifest["columns"]
+            }
+            self._segmentos[nombre] = arreglos
+        return arreglos
+    
+    def _diccionario(self, col: str):
+        """Obtiene el diccionario de una columna categórica como un Index de pandas."""
+        import pandas as pd
+        
+        categorias = self._categorias.get(col)
+        if categorias is None:
+            categorias = pd.Index(self._manifest["dictionaries"][col], dtype=object)
+            self._categorias[col] = categorias
+        return categorias
+    
+    def segments(self, columns: Optional[List[str]] = None) -> List[Tuple[str, Any]]:
+        """
+        Obtiene los segmentos del snapshot como DataFrames sobre los archivos mapeados.
+        
+        Las columnas numéricas y los códigos de las categóricas no se copian. Cada
+        segmento usa el diccionario tal como estaba al escribirlo, de modo que sus
+        códigos conservan el tipo con el que se guardaron.
+        
+        Args:
+            columns: Columnas a incluir, None para todas; las que el snapshot no
+                tiene se omiten
+        
+        Returns:
+            Lista de (nombre del segmento, DataFrame); el nombre identifica el
+            contenido del segmento, que nunca cambia
+        """
+        # pandas se importa en el primer uso para no retrasar el arranque del servidor
+        import pandas as pd
+        
+        manifest = self.manifest()
+        if manifest is None:
+            return []
+        
+        segmentos = []
+        for segmento in manifest["segments"]:
+            arreglos = self._arreglos(segmento["name"])
+            datos = {}
+            for col in columns or manifest["columns"]:
+                tipo = manifest["kinds"].get(col)
+                if tipo == "categorical":
+                    categorias = self._diccionario(col)[:segmento["dictionary_sizes"][col]]
+                    datos[col] = pd.Categorical.from_codes(arreglos[col], categories=categorias, validate=False)
+                elif tipo is not None:
+                    datos[col] = arreglos[col]
+            frame = pd.DataFrame(datos, index=pd.RangeIndex(segmento["rows"]), copy=False)
+            segmentos.append((segmento["name"], frame))
+        return segmentos
+    
+    async def refresh(self, full: bool = False) -> Dict[str, Any]:
+        """
+        Actualiza el snapshot con Supabase: agrega los registros nuevos o lo recarga
+        completo si toca.
+        
+        Solo un proceso escribe a la vez (candado sobre el archivo .lock); los
+        demás esperan y luego parten del manifiesto que dejó el anterior.
+        
+        Args:
+            full: Forzar una recarga completa
+        
+        Returns:
+            Estado del snapshot tras la actualización
+        """
+        async with self._lock:
+            descriptor = await self._bloquear()
+            try:
+                await self._refresh(full)
+            finally:
+                self._desbloquear(descriptor)
+        return self.status()
+    
+    def matches(self, version: str) -> bool:
+        """
+        Indica si el snapshot refleja una versión de la tabla (data/versions.py).
+        
+        La actualización incremental solo agrega inserciones: si el número de
+        registros de la versión difiere del snapshot o su marca de agua es
+        posterior, la tabla tuvo modificaciones o borrados y hay que recargarlo
+        completo.
+        
+        Args:
+            version: Versión de la tabla
+        
+        Returns:
+            True si el snapshot coincide con la versión
+        """
+        manifest = self.manifest()
+        if manifest is None:
+            return False
+        registros, marca = split_version(version)
+        if registros is not None and registros != manifest["rows"]:
+            return False
+        fecha = _fecha(marca)
+        if fecha is None:
+            return True
+        propia = _fecha(manifest.get("version_mark"))
+        return propia is not None and fecha <= propia
+    
+    async def _bloquear(self) -> int:
+        """Toma el candado de escritura entre procesos sin bloquear el bucle de eventos."""
+        descriptor = os.open(os.path.join(self.dir, LOCK_NAME), os.O_RDWR | os.O_CREAT)
+        if fcntl is not None:
+            try:
+                await asyncio.to_thread(fcntl.flock, descriptor, fcntl.LOCK_EX)
+            except BaseException:
+                os.close(descriptor)
+                raise
+        return descriptor
+    
+    @staticmethod
+    def _desbloquear(descriptor: int) -> None:
+        """Libera el candado de escritura."""
+        if fcntl is not None:
+            fcntl.flock(descriptor, fcntl.LOCK_UN)
+        os.close(descriptor)
+    
+    async def _refresh(self, full: bool) -> None:
+        """Decide entre recarga completa e incremental; se llama con los candados tomados."""
+        manifest = self.manifest()
+        ahora = time.time()
+        
+        if (full or manifest is None or len(manifest["segments"]) >= self.max_segments
+                or ahora - manifest["full_refreshed_at"] >= self.full_refresh_interval):
+            await self._full_refresh(manifest, ahora)
+        elif manifest["watermark"] is None:
+            # Tabla vacía en la última recarga: volver a descargarla es barato y
+            # además infiere los tipos de las columnas con datos
+            if manifest["incremental"]:
+                await self._full_refresh(manifest, ahora)
+        else:
+            await self._append_delta(manifest, ahora)
+        self.refreshes += 1
+    
+    async def _full_refresh(self, anterior: Optional[Dict[str, Any]], ahora: float) -> None:
+        """Descarga la tabla completa como un solo segmento de una generación nueva."""
+        # Desde Supabase y no desde la réplica: el snapshot debe coincidir con la tabla
+        frame = await self.data.get_frame(None, use_replica=False)
+        columnas = []
+        for col in frame.columns:
+            if _IDENTIFICADOR.match(col):
+                columnas.append(col)
+            else:
+                print(f"La columna '{col}' de {self.table_name} no se incluye en el snapshot")
+        
+        tipos = {col: self._tipo(col, frame[col]) for col in columnas}
+        manifest = {
+            "table": self.table_name,
+            "generation": anterior["generation"] + 1 if anterior else 1,
+            "columns": columnas,
+            "kinds": tipos,
+            "dictionaries": {col: [] for col, tipo in tipos.items() if tipo == "categorical"},
+            "segments": [],
+            "rows": 0,
+            "incremental": "created_at" in columnas and "id" in columnas,
+            "watermark": None,
+            "watermark_id": None,
+            "version_mark": self._marca_version(frame),
+            "refreshed_at": ahora,
+            "full_refreshed_at": ahora
+        }
+        if len(frame):
+            self._escribir_segmento(manifest, frame)
+        if manifest["incremental"]:
+            manifest["watermark"], manifest["watermark_id"] = self._marca_maxima(frame)
+        self._publicar(manifest)
+        
+        # Los procesos que aún tengan mapeados los segmentos anteriores conservan
+        # sus páginas hasta soltarlos
+        for segmento in (anterior or {}).get("segments", []):
+            shutil.rmtree(os.path.join(self.dir, segmento["name"]), ignore_errors=True)
+        self.full_refreshes += 1
+    
+    async def _append_delta(self, manifest: Dict[str, Any], ahora: float) -> None:
+        """Agrega como un segmento nuevo los registros posteriores a la marca de agua."""
+        categoricas = [col for col, tipo in manifest["kinds"].items() if tipo == "categorical"]
+        frame = await self.data.get_frame(
+            None, categoricas, use_replica=False, after=(manifest["watermark"], manifest["watermark_id"])
+        )
+        if not len(frame):
+            return
+        
+        manifest = json.loads(json.dumps(manifest))
+        self._escribir_segmento(manifest, frame)
+        # La consulta viene ordenada por (created_at, id): el último registro es la nueva marca
+        manifest["watermark"] = str(frame["created_at"].iloc[-1])
+        manifest["watermark_id"] = str(_valor_json(frame["id"].iloc[-1]))
+        marca = self._marca_version(frame)
+        anterior = _fecha(manifest.get("version_mark"))
+        if _fecha(marca) is not None and (anterior is None or _fecha(marca) > anterior):
+            manifest["version_mark"] = marca
+        manifest["refreshed_at"] = ahora
+        self._publicar(manifest)
+        self.appended_rows += len(frame)
+    
+    @staticmethod
+    def _tipo(col: str, serie) -> str:
+        """Tipo de almacenamiento de una columna: text, numeric (float64) o categorical."""
+        import pandas as pd
+        
+        if col in TEXT_COLUMNS:
+            return "text"
+        if pd.api.types.is_numeric_dtype(serie.dtype):
+            return "numeric"
+        return "categorical"
+    
+    @staticmethod
+    def _marca_maxima(frame) -> Tuple[Optional[str], Optional[str]]:
+        """Obtiene el par (created_at, id) más reciente de una descarga completa."""
+        import pandas as pd
+        
+        fechas = pd.to_datetime(frame["created_at"], utc=True, errors="coerce", format="ISO8601")
+        validos = fechas.notna()
+        if not validos.any():
+            return None, None
+        orden = pd.DataFrame({"fecha": fechas[validos], "id": frame["id"][validos]}).sort_values(["fecha", "id"])
+        ultimo = orden.index[-1]
+        return str(frame["created_at"][ultimo]), str(_valor_json(frame["id"][ultimo]))
+    
+    @staticmethod
+    def _marca_version(frame) -> Optional[str]:
+        """Obtiene el mayor valor de la marca de agua de las versiones (updated_at o created_at)."""
+        import pandas as pd
+        
+        columna = next((col for col in WATERMARK_COLUMNS if col in frame), None)
+        if columna is None or not len(frame):
+            return None
+        fechas = pd.to_datetime(frame[columna], utc=True, errors="coerce", format="ISO8601")
+        if not fechas.notna().any():
+            return None
+        return str(frame[columna][fechas.idxmax()])
+    
+    def _escribir_segmento(self, manifest: Dict[str, Any], frame) -> None:
+        """
+        Escribe un segmento con las columnas del manifiesto y lo agrega a él.
+        
+        Las columnas se escriben en un directorio temporal que luego se renombra,
+        para que ningún lector vea un segmento a medio escribir.
+        """
+        import numpy as np
+        import pandas as pd
+        
+        nombre = f"{manifest['generation']:06d}-{len(manifest['segments']):06d}"
+        temporal = os.path.join(self.dir, f".{nombre}.tmp")
+        shutil.rmtree(temporal, ignore_errors=True)
+        os.makedirs(temporal)
+        
+        tamanos = {}
+        for col in manifest["columns"]:
+            serie = frame[col] if col in frame else pd.Series([None] * len(frame), dtype=object)
+            tipo = manifest["kinds"][col]
+            if tipo == "numeric":
+                arreglo = pd.to_numeric(serie, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+            elif tipo == "text":
+                arreglo = serie.astype(object).where(serie.notna(), "").astype(str).to_numpy(dtype=str)
+            else:
+                diccionario = manifest["dictionaries"][col]
+                arreglo = self._codificar(diccionario, serie)
+                tamanos[col] = len(diccionario)
+            np.save(os.path.join(temporal, f"{col}.npy"), arreglo)
+        
+        os.rename(temporal, os.path.join(self.dir, nombre))
+        manifest["segments"].append({
+            "name": nombre,
+            "rows": len(frame),
+            "dictionary_sizes": tamanos,
+            "bytes": sum(entrada.stat().st_size for entrada in os.scandir(os.path.join(self.dir, nombre)))
+        })
+        manifest["rows"] += len(frame)
+    
+    @staticmethod
+    def _codificar(diccionario: List[Any], serie):
+        """
+        Codifica una columna con el diccionario, agregándole los valores nuevos al final.
+        
+        Returns:
+            Códigos enteros (-1 para los nulos) del tipo que pandas usa para el
+            tamaño final del diccionario
+        """
+        import numpy as np
+        import pandas as pd
+        
+        codigos, valores = pd.factorize(serie.astype(object), sort=False)
+        posiciones = {valor: i for i, valor in enumerate(diccionario)}
+        mapa = np.empty(len(valores) + 1, dtype=np.int64)
+        for i, valor in enumerate(valores):
+            valor = _valor_json(valor)
+            if valor not in posiciones:
+                posiciones[valor] = len(diccionario)
+                diccionario.append(valor)
+            mapa[i] = posiciones[valor]
+        # El código nulo (-1) toma la última posición del mapa
+        mapa[-1] = -1
+        return mapa[codigos].astype(_tipo_codigos(len(diccionario)))
+    
+    def _publicar(self, manifest: Dict[str, Any]) -> None:
+        """Reemplaza el manifiesto en disco de forma atómica."""
+        ruta = os.path.join(self.dir, MANIFEST_NAME)
+        temporal = f"{ruta}.tmp"
+        with open(temporal, "w", encoding="utf-8") as archivo:
+            json.dump(manifest, archivo, ensure_ascii=False)
+        os.replace(temporal, ruta)
+        self._adoptar(manifest, os.stat(ruta).st_mtime_ns)
+    
+    def start(self, interval: float) -> None:
+        """
+        Inicia la actualización periódica en segundo plano.
+        
+        Args:
+            interval: Segundos entre actualizaciones
+        """
+        async def ciclo():
+            while True:
+                try:
+                    await self.refresh()
+                except Exception as e:
+                    print(f"Error al actualizar el snapshot de {self.table_name}: {e}")
+                await asyncio.sleep(interval)
+        
+        if self._task is None:
+            self._task = asyncio.create_task(ciclo())
+    
+    async def stop(self) -> None:
+        """Detiene la actualización periódica y suelta los archivos mapeados."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._segmentos = {}
+    
+    def status(self) -> Dict[str, Any]:
+        """
+        Obtiene el estado del snapshot.
+        
+        Returns:
+            Diccionario con filas, segmentos, bytes en disco, generación, marca de
+            agua, antigüedad de la última actualización y de la última recarga
+            completa, segmentos mapeados por este proceso y actualizaciones hechas
+        """
+        manifest = self.manifest()
+        ahora = time.time()
+        return {
+            "rows": manifest["rows"] if manifest else 0,
+            "segments": len(manifest["segments"]) if manifest else 0,
+            "bytes": sum(segmento["bytes"] for segmento in manifest["segments"]) if manifest else 0,
+            "generation": manifest["generation"] if manifest else None,
+            "incremental": manifest["incremental"] if manifest else None,
+            "watermark": manifest["watermark"] if manifest else None,
+            "age_seconds": round(ahora - manifest["refreshed_at"], 1) if manifest else None,
+            "full_refresh_age_seconds": round(ahora - manifest["full_refreshed_at"], 1) if manifest else None,
+            "mapped_segments": len(self._segmentos),
+            "refreshes": self.refreshes,
+            "full_refreshes": self.full_refreshes,
+            "appended_rows": self.appended_rows
+        }
+
+# Snapshots del proceso por tabla, creados al primer uso
+_snapshots: Dict[str, ColumnarSnapshot] = {}
+
+def get_snapshot(table_name: str) -> Optional[ColumnarSnapshot]:
+    """
+    Obtiene el snapshot columnar de una tabla.
+    
+    Args:
+        table_name: Nombre de la tabla
+    
+    Returns:
+        Snapshot de la tabla, o None si la tabla no está en SNAPSHOT_TABLES
+    """
+    if table_name not in SNAPSHOT_TABLES:
+        return None
+    if table_name not in _snapshots:
+        _snapshots[table_name] = ColumnarSnapshot(
+            table_name,
+            SNAPSHOT_PATH,
+            full_refresh_interval=SNAPSHOT_FULL_REFRESH_INTERVAL,
+            max_segments=SNAPSHOT_MAX_SEGMENTS
+        )
+    return _snapshots[table_name]
+
+def snapshot_status() -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Obtiene el estado de los snapshots configurados.
+    
+    Returns:
+        Estado por tabla, o None si los snapshots están deshabilitados
+    """
+    if not SNAPSHOT_TABLES:
+        return None
+    return {tabla: get_snapshot(tabla).status() for tabla in SNAPSHOT_TABLES}
+
+def start_snapshots() -> None:
+    """Inicia la actualización periódica de los snapshots si están habilitados."""
+    if SNAPSHOT_TABLES:
+        print(f"Snapshot columnar habilitado para: {', '.join(SNAPSHOT_TABLES)} ({SNAPSHOT_PATH})")
+        for tabla in SNAPSHOT_TABLES:
+            get_snapshot(tabla).start(SNAPSHOT_REFRESH_INTERVAL)
+
+async def stop_snapshots() -> None:
+    """Detiene la actualización periódica de los snapshots."""
+    for snapshot in list(_snapshots.values()):
+        await snapshot.stop()
+    _snapshots.clear()
@@ -0,0 +1,149 @@
+from typing import Dict, Any, Optional, Tuple
+import asyncio
+import time
+
+import sys
+import os
+
+# Importar la configuración existente
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import supabase_async, ETAG_VERSION_TTL
+from postgrest.exceptions import APIError
+from postgrest.types import CountMethod
+
+from .replica import WATERMARK_COLUMNS
+
+class TableVersions:
+    """
+    Versiones de las tablas de Supabase para las respuestas condicionales.
+    
+    La versión de una tabla es su número de registros junto con la mayor marca
+    de agua (updated_at o created_at), que se obtienen en una sola consulta de
+    una fila. Es la misma en todos los procesos mientras la tabla no cambie.
+    Cada versión se reutiliza durante ttl segundos; las escrituras hechas desde
+    este proceso la descartan de inmediato con touch.
+    """
+    
+    def __init__(self, ttl: float = ETAG_VERSION_TTL):
+        """
+        Inicializa las versiones.
+        
+        Args:
+            ttl: Segundos durante los que se reutiliza una versión, 0 para
+                consultarla en cada petición
+        """
+        self.ttl = ttl
+        self.queries = 0
+        self._generaciones: Dict[str, int] = {}
+        self._versiones: Dict[str, Tuple[float, int, str]] = {}
+        self._columnas: Dict[str, Optional[str]] = {}
+        self._consultas: Dict[str, "asyncio.Future[str]"] = {}
+    
+    def touch(self, table_name: str) -> None:
+        """
+        Registra una escritura en una tabla, descartando su versión conocida.
+        
+        Args:
+            table_name: Nombre de la tabla
+        """
+        self._generaciones[table_name] = self._generaciones.get(table_name, 0) + 1
+        self._versiones.pop(table_name, None)
+    
+    async def version(self, table_name: str) -> str:
+        """
+        Obtiene la versión actual de una tabla.
+        
+        Las peticiones simultáneas sobre la misma tabla comparten una sola consulta.
+        
+        Args:
+            table_name: Nombre de la tabla
+        
+        Returns:
+            Versión de la tabla
+        """
+        generacion = self._generaciones.get(table_name, 0)
+        conocida = self._versiones.get(table_name)
+        if conocida is not None and conocida[0] >= time.monotonic() and conocida[1] == generacion:
+            return conocida[2]
+        
+        consulta = self._consultas.get(table_name)
+        if consulta is None:
+            consulta = asyncio.ensure_future(self._remote_version(table_name))
+            self._consultas[table_name] = consulta
+            consulta.add_done_callback(lambda _: self._consultas.pop(table_name, None))
+        version = await asyncio.shield(consulta)
+        
+        # Una escritura durante la consulta deja la versión obtenida sin guardar
+        if self.ttl > 0 and self._generaciones.get(table_name, 0) == generacion:
+            self._versiones[table_name] = (time.monotonic() + self.ttl, generacion, version)
+        return version
+    
+    async def _remote_version(self, table_name: str) -> str:
+        """Consulta el número de registros y la mayor marca de agua de la tabla."""
+        self.queries += 1
+        if table_name not in self._columnas:
+            self._columnas[table_name] = await self._watermark_column(table_name)
+        columna = self._columnas[table_name]
+        
+        query = supabase_async.table(table_name).select(columna or "id", count=CountMethod.exact).limit(1)
+        if columna:
+            # order() de postgrest-py 0.13 no admite nullslast y en orden descendente los nulos van primero
+            query.params = query.params.add("order", f"{columna}.desc.nullslast")
+        response = await query.execute()
+        marca = response.data[0].get(columna) if columna and response.data else None
+        return f"{response.count}:{marca or ''}"
+    
+    async def _watermark_column(self, table_name: str) -> Optional[str]:
+        """Obtiene la primera columna de WATERMARK_COLUMNS que existe en la tabla remota."""
+        for columna in WATERMARK_COLUMNS:
+            try:
+                await supabase_async.table(table_name).select(columna).limit(1).execute()
+                return columna
+            except APIError:
+                continue
+        return None
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Obtiene el estado de las versiones.
+        
+        Returns:
+            Diccionario con el TTL, las consultas hechas y la versión conocida de cada tabla
+        """
+        ahora = time.monotonic()
+        return {
+            "ttl": self.ttl,
+            "queries": self.queries,
+            "tables": {
+                tabla: {"version": version, "expires_in": round(max(expira - ahora, 0), 1)}
+                for tabla, (expira, _, version) in self._versiones.items()
+            }
+        }
+
+_table_versions: Optional[TableVersions] = None
+
+def get_table_versions() -> TableVersions:
+    """
+    Obtiene las versiones compartidas de las tablas, creándolas si no existen.
+    
+    Returns:
+        Versiones de las tablas
+    """
+    global _table_versions
+    if _table_versions is None:
+        _table_versions = TableVersions()
+    return _table_versions
+
+def split_version(version: str) -> Tuple[Optional[int], Optional[str]]:
+    """
+    Separa una versión en el número de registros y la mayor marca de agua.
+    
+    Args:
+        version: Versión obtenida con TableVersions.version
+    
+    Returns:
+        Tupla con el número de registros (None si Supabase no lo informó) y la
+        marca de agua (None si la tabla no tiene registros o columna de marca)
+    """
+    registros, _, marca = version.partition(":")
+    return (int(registros) if registros.isdigit() else None), (marca or None)
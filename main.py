@@ -1,3 +1,9 @@
+import asyncio
+import time
+
+# Inicio del arranque, para reportar el tiempo de arranque en frío
+_inicio_arranque = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
@@ -6,9 +12,17 @@ from fastapi.openapi.utils import get_openapi
 from config import (
     APP_NAME, APP_VERSION, APP_DESCRIPTION,
     HOST, PORT,
-    CORS_ORIGINS, CORS_METHODS, CORS_HEADERS
+    CORS_ORIGINS, CORS_METHODS, CORS_HEADERS,
+    close_supabase_async, ESTUDIANTES_INDEX_WARM,
+    CATALOG_CACHE_CONTROL, LIST_CACHE_CONTROL
 )
 
+from utils.responses import NEXT_CURSOR_HEADER
+from utils.conditional import ConditionalGetMiddleware
+from data.replica import start_replica, stop_replica
+from data.snapshot import start_snapshots, stop_snapshots
+from data.estudiantes_data import warm_estudiantes_index
+
 # Importar rutas
 from routes.usuarios import router as usuarios_router
 from routes.programas import router as programas_router
@@ -22,6 +36,10 @@ from routes.intervenciones_grupales import router as intervenciones_grupales_rou
 from routes.importar_intervenciones import router as importar_intervenciones_router
 from routes.remisiones_psicologicas import router as remisiones_psicologicas_router
 from routes.importar_remisiones import router as importar_remisiones_router
+from routes.metricas import router as metricas_router
+
+# Tiempo de importación de la aplicación (configuración, routers y dependencias)
+_importacion_ms = (time.perf_counter() - _inicio_arranque) * 1000
 
 # Inicializar FastAPI
 app = FastAPI(
@@ -33,6 +51,32 @@ app = FastAPI(
     openapi_url="/openapi.json"
 )
 
+# Recursos con respuestas condicionales (ETag / If-None-Match): ruta -> (tablas, Cache-Control).
+# Los catálogos cambian poco y pueden reutilizarse sin revalidar; los listados y las
+# estadísticas se revalidan en cada petición
+RECURSOS_CONDICIONALES = {
+    "/api/programas": (("programas",), CATALOG_CACHE_CONTROL),
+    "/api/servicios": (("servicios",), CATALOG_CACHE_CONTROL),
+    "/api/estadisticas-generales": (("permanencia",), LIST_CACHE_CONTROL),
+    "/api/estadisticas": (("permanencia",), LIST_CACHE_CONTROL),
+    "/api/estadisticas-totales": (("permanencia",), LIST_CACHE_CONTROL),
+    "/api/datos-permanencia": (("permanencia",), LIST_CACHE_CONTROL),
+    "/api/estrato-servicio": (("permanencia",), LIST_CACHE_CONTROL),
+    "/api/estadisticas/cubo": (("permanencia",), LIST_CACHE_CONTROL),
+    "/api/dashboard": (("permanencia",), LIST_CACHE_CONTROL),
+    "/api/estudiantes": (("estudiantes",), LIST_CACHE_CONTROL),
+    "/api/asistencias": (("asistencias",), LIST_CACHE_CONTROL),
+    "/api/remisiones-psicologicas": (("remisiones_psicologicas",), LIST_CACHE_CONTROL),
+    "/api/tutoria": (("tutorias_academicas", "estudiantes"), LIST_CACHE_CONTROL),
+    "/api/psicologia": (("asesorias_psicologicas", "estudiantes"), LIST_CACHE_CONTROL),
+    "/api/vocacional": (("orientaciones_vocacionales", "estudiantes"), LIST_CACHE_CONTROL),
+    "/api/comedor": (("comedores_universitarios", "estudiantes"), LIST_CACHE_CONTROL),
+    "/api/socioeconomico": (("apoyos_socioeconomicos", "estudiantes"), LIST_CACHE_CONTROL),
+    "/api/talleres": (("talleres_habilidades", "estudiantes"), LIST_CACHE_CONTROL),
+    "/api/seguimiento": (("seguimientos_academicos", "estudiantes"), LIST_CACHE_CONTROL),
+}
+app.add_middleware(ConditionalGetMiddleware, resources=RECURSOS_CONDICIONALES)
+
 # Configuración CORS
 app.add_middleware(
     CORSMiddleware,
@@ -40,8 +84,38 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=CORS_METHODS,
     allow_headers=CORS_HEADERS,
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
+# Iniciar la sincronización de la réplica local de lectura (si hay tablas configuradas)
+@app.on_event("startup")
+async def start_local_replica():
+    start_replica()
+
+# Iniciar la actualización del snapshot columnar (si hay tablas configuradas)
+@app.on_event("startup")
+async def start_columnar_snapshots():
+    start_snapshots()
+
+# Cargar en segundo plano el índice documento -> ID de estudiantes (si está activado)
+@app.on_event("startup")
+async def start_estudiantes_index():
+    if ESTUDIANTES_INDEX_WARM:
+        asyncio.create_task(warm_estudiantes_index())
+
+# Reportar el tiempo de arranque en frío (se registra después de los demás eventos de inicio)
+@app.on_event("startup")
+async def log_cold_start():
+    total_ms = (time.perf_counter() - _inicio_arranque) * 1000
+    print(f"Arranque en frío: {total_ms:.0f} ms (importación de la aplicación: {_importacion_ms:.0f} ms)")
+
+# Cerrar el pool de conexiones HTTP hacia Supabase al detener el servidor
+@app.on_event("shutdown")
+async def shutdown_supabase():
+    await stop_replica()
+    await stop_snapshots()
+    await close_supabase_async()
+
 # Personalización de la documentación OpenAPI
 @app.get("/openapi.json", include_in_schema=False)
 async def get_open_api_endpoint():
@@ -64,6 +138,7 @@ app.include_router(intervenciones_grupales_router, prefix="/api", tags=["Interve
 app.include_router(importar_intervenciones_router, prefix="/api", tags=["Importación de Intervenciones"])
 app.include_router(remisiones_psicologicas_router, prefix="/api", tags=["Remisiones Psicológicas"])
 app.include_router(importar_remisiones_router, prefix="/api", tags=["Importación de Remisiones"])
+app.include_router(metricas_router, prefix="/api", tags=["Métricas"])
 
 # Ruta raíz
 @app.get("/", tags=["Root"])
@@ -1,12 +1,17 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field
 import uuid
 from datetime import datetime
 
-from config import supabase
+from config import supabase_async, DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT
+from data.base_data import BaseData
+from data.cache import invalidate_table
+from data.estudiantes_data import EstudiantesLoader, get_estudiantes_loader
+from utils.responses import paged_list_response, parse_fields
 
 router = APIRouter()
+actas_data = BaseData("actas_negacion")
 
 class ActaNegacion(BaseModel):
     """Modelo para representar un acta de negación de servicio."""
@@ -30,13 +35,23 @@ class ActaNegacion(BaseModel):
           summary="Obtener todas las actas de negación",
           description="Retorna una lista de todas las actas de negación registradas",
           response_model=List[Dict[str, Any]])
-async def get_actas_negacion():
+async def get_actas_negacion(
+    http_response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="Número máximo de actas por página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en la cabecera X-Next-Cursor por la página anterior"),
+    fields: Optional[str] = Query(None, description="Columnas a retornar separadas por comas")
+):
     """Obtiene todas las actas de negación."""
     try:
-        response = supabase.table("actas_negacion").select("*").execute()
+        columns, _ = parse_fields(fields)
+        next_cursor = None
+        if limit is not None or cursor is not None:
+            actas, next_cursor = await actas_data.get_page(limit or DEFAULT_PAGE_LIMIT, cursor, columns)
+        else:
+            actas = await actas_data.get_all(columns)
         
         # Formatear las fechas para evitar el problema de "Invalid Date" en el frontend
-        for acta in response.data:
+        for acta in actas:
             # Crear una fecha completa a partir de los componentes
             if all(k in acta for k in ["fecha_firma_anio", "fecha_firma_mes", "fecha_firma_dia"]):
                 try:
@@ -66,7 +81,9 @@ async def get_actas_negacion():
                 except Exception as e:
                     print(f"Error al formatear created_at: {e}")
         
-        return response.data
+        return paged_list_response(http_response, actas, next_cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"Error al obtener actas de negación: {e}")
         raise HTTPException(status_code=500, detail=f"Error al obtener actas de negación: {str(e)}")
@@ -75,7 +92,7 @@ async def get_actas_negacion():
            summary="Crear una nueva acta de negación",
            description="Registra una nueva acta de negación de servicio",
            response_model=Dict[str, Any])
-async def create_acta_negacion(acta: Dict[str, Any]):
+async def create_acta_negacion(acta: Dict[str, Any], estudiantes_loader: EstudiantesLoader = Depends(get_estudiantes_loader)):
     """Crea una nueva acta de negación."""
     try:
         print(f"Datos recibidos para acta de negación: {acta}")
@@ -124,9 +141,9 @@ async def create_acta_negacion(acta: Dict[str, Any]):
         
         # Buscar estudiante por número de documento si no se proporciona estudiante_id
         if "documento_numero" in acta and not acta.get("estudiante_id"):
-            estudiante = supabase.table("estudiantes").select("id").eq("documento", acta["documento_numero"]).execute()
-            if estudiante.data and len(estudiante.data) > 0:
-                acta["estudiante_id"] = estudiante.data[0]["id"]
+            estudiante = await estudiantes_loader.load_by_documento(acta["documento_numero"])
+            if estudiante:
+                acta["estudiante_id"] = estudiante["id"]
                 print(f"Estudiante encontrado con ID: {acta['estudiante_id']}")
             else:
                 # Si no se encuentra el estudiante, establecer estudiante_id como NULL
@@ -149,7 +166,8 @@ async def create_acta_negacion(acta: Dict[str, Any]):
                 acta_filtrada[campo] = acta[campo]
         
         print(f"Acta de negación filtrada para inserción: {acta_filtrada}")
-        response = supabase.table("actas_negacion").insert(acta_filtrada).execute()
+        response = await supabase_async.table("actas_negacion").insert(acta_filtrada).execute()
+        invalidate_table("actas_negacion")
         
         if response.data and len(response.data) > 0:
             print(f"Acta de negación creada con ID: {response.data[0].get('id')}")
@@ -1,180 +1,200 @@
-from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Any
+from fastapi import APIRouter, HTTPException, Query
+from typing import List, Dict, Any, Optional
+import asyncio
 import traceback
+from datetime import datetime, timedelta
 
-from config import supabase
+from data.base_data import BaseData
+from data.cache import cached_response
+from data.estadisticas_data import EstadisticasData
+from services.estadisticas_service import (
+    EstadisticasService, ReglasEstadisticas, MEDIDAS_CUBO,
+    componer_estadisticas, programas_distribucion, riesgo_desercion, programa_riesgo, estrato_servicio
+)
 
 router = APIRouter()
 
 # Tabla de permanencia para consultas
 TABLA_PERMANENCIA = "permanencia"
+permanencia_data = BaseData(TABLA_PERMANENCIA)
+estadisticas_service = EstadisticasService()
+# Agregaciones calculadas en Postgres (scripts/crear_funciones_estadisticas.sql)
+estadisticas_data = EstadisticasData()
+
+# Reglas de las estadísticas generales: totales sumados, riesgo y tutoría sin distinguir
+# mayúsculas, categorías tal como aparecen y estratos con la suma de inscritos
+REGLAS_ESTADISTICAS = ReglasEstadisticas(totales="suma", normalizar=True)
+
+# Conteos de las tarjetas del dashboard: nombre -> filtros sobre la tabla de permanencia
+CONTEOS_DASHBOARD = {
+    "registros": None,
+    "inscritos": {"inscritos": ("gt", 0)},
+    "matriculados": {"matriculados": ("gt", 0)},
+    "desertores": {"desertores": ("gt", 0)},
+    "graduados": {"graduados": ("gt", 0)},
+    "requierenTutoria": {"requiere_tutoria": ("ilike", "sí")},
+    "riesgoAlto": {"riesgo_desercion": ("ilike", "%alto")}
+}
+
+# Parámetros de la consulta del cubo -> dimensión de permanencia
+PARAMETROS_CUBO = {
+    "servicio": "servicio",
+    "estrato": "estrato",
+    "programa": "estudiante_programa_academico",
+    "riesgo": "riesgo_desercion",
+    "vulnerabilidad": "tipo_vulnerabilidad",
+    "periodo": "periodo"
+}
+
+# Gráficos que puede retornar /dashboard, con los mismos datos que sus endpoints
+GRAFICOS_DASHBOARD = (
+    "estadisticas-generales", "datos-permanencia", "estrato-servicio", "programas-distribucion",
+    "riesgo-desercion", "programa-riesgo", "tendencias-tiempo"
+)
+
+def estadisticas_vacias() -> Dict[str, Any]:
+    """Estadísticas generales de una tabla de permanencia sin registros."""
+    return {
+        "totals": {
+            "inscritos": 0,
+            "matriculados": 0,
+            "desertores": 0,
+            "graduados": 0
+        },
+        "programaStats": [],
+        "riesgoDesercionData": [],
+        "tutoriaData": [],
+        "vulnerabilidadData": [],
+        "serviciosData": [],
+        "edadDesertores": [],
+        "estratoInscritos": []
+    }
 
 @router.get("/estadisticas-generales", 
           summary="Obtener estadísticas generales para el dashboard",
           description="Retorna estadísticas generales del sistema de permanencia",
           response_model=Dict[str, Any])
+@cached_response(TABLA_PERMANENCIA)
 async def get_estadisticas():
     """Obtiene estadísticas generales para el dashboard."""
     try:
         print(f"Consultando tabla: {TABLA_PERMANENCIA}")
         
-        # Consultar datos reales de la tabla de permanencia
-        permanencia_data = supabase.table(TABLA_PERMANENCIA).select("*").execute()
+        # Componer las estadísticas desde los contadores de permanencia
+        estadisticas = await estadisticas_service.get_estadisticas_generales(REGLAS_ESTADISTICAS)
         
-        if not permanencia_data or not permanencia_data.data:
+        if estadisticas is None:
             print("No se encontraron datos en la tabla permanencia")
-            return {
-                "totals": {
-                    "inscritos": 0,
-                    "matriculados": 0,
-                    "desertores": 0,
-                    "graduados": 0
-                },
-                "programaStats": [],
-                "riesgoDesercionData": [],
-                "tutoriaData": [],
-                "vulnerabilidadData": [],
-                "serviciosData": [],
-                "edadDesertores": [],
-                "estratoInscritos": []
-            }
-        
-        datos_reales = permanencia_data.data
-        total_estudiantes = len(datos_reales)
-        print(f"Procesando {total_estudiantes} registros de la base de datos")
-        
-        # Calcular estadísticas básicas
-        estudiantes_inscritos = sum(item.get("inscritos", 0) for item in datos_reales)
-        estudiantes_matriculados = sum(item.get("matriculados", 0) for item in datos_reales)
-        desertores = sum(item.get("desertores", 0) for item in datos_reales)
-        graduados = sum(item.get("graduados", 0) for item in datos_reales)
-        
-        # Datos para RiesgoDesercionChart
-        riesgo_count = {"Alto": 0, "Medio": 0, "Bajo": 0}
-        for item in datos_reales:
-            riesgo = item.get("riesgo_desercion", "").lower()
-            if riesgo in ["alto", "muy alto"]:
-                riesgo_count["Alto"] += 1
-            elif riesgo == "medio":
-                riesgo_count["Medio"] += 1
-            elif riesgo in ["bajo", "muy bajo"]:
-                riesgo_count["Bajo"] += 1
-        
-        riesgo_desercion_data = [
-            {"riesgo": nivel, "cantidad": count} 
-            for nivel, count in riesgo_count.items()
-        ]
-        
-        # Datos para TutoriaDonutChart
-        requieren_tutoria = sum(1 for item in datos_reales if item.get("requiere_tutoria", "").lower() == "sí")
-        no_requieren_tutoria = total_estudiantes - requieren_tutoria
-        
-        tutoria_data = [
-            {"name": "Requieren", "value": requieren_tutoria},
-            {"name": "No requieren", "value": no_requieren_tutoria}
-        ]
-        
-        # Datos para VulnerabilidadBarChart
-        vulnerabilidad_count = {}
-        for item in datos_reales:
-            tipo = item.get("tipo_vulnerabilidad")
-            if tipo:
-                vulnerabilidad_count[tipo] = vulnerabilidad_count.get(tipo, 0) + 1
-        
-        vulnerabilidad_data = [
-            {"name": tipo, "cantidad": count} 
-            for tipo, count in vulnerabilidad_count.items()
-        ]
+            return estadisticas_vacias()
         
-        # Datos para ServiciosBarChart
-        servicios_count = {}
-        for item in datos_reales:
-            servicio = item.get("servicio")
-            if servicio:
-                servicios_count[servicio] = servicios_count.get(servicio, 0) + 1
-        
-        servicios_data = [
-            {"name": servicio, "cantidad": count} 
-            for servicio, count in servicios_count.items()
-        ]
-        
-        # Datos para ScatterChartPanel (estrato vs inscritos)
-        estrato_count = {}
-        for item in datos_reales:
-            try:
-                estrato = int(item.get("estrato", 0))
-                inscritos = int(item.get("inscritos", 0))
-                if estrato > 0:
-                    if estrato not in estrato_count:
-                        estrato_count[estrato] = 0
-                    estrato_count[estrato] += inscritos
-            except (ValueError, TypeError):
-                continue
-        
-        estrato_inscritos = [
-            {"estrato": estrato, "inscritos": count} 
-            for estrato, count in estrato_count.items()
-        ]
+        # Para edades de desertores necesitarías una columna edad en tu tabla
+        # Por ahora el motor devuelve un array vacío
+        return estadisticas
         
-        # Datos para el gráfico de programas (top 5)
-        programa_count = {}
-        for item in datos_reales:
-            programa = item.get("estudiante_programa_academico")
-            if programa:
-                programa_count[programa] = programa_count.get(programa, 0) + 1
+    except Exception as e:
+        print(f"Error en get_estadisticas: {e}")
+        print(f"Traceback: {traceback.format_exc()}")
+        raise HTTPException(status_code=500, detail=f"Error al obtener estadísticas: {str(e)}")
+
+@router.post("/estadisticas-generales/reconstruir",
+          summary="Reconstruir los contadores de las estadísticas generales",
+          description="Recalcula desde la tabla de permanencia los contadores por grupo con los que se componen las estadísticas generales",
+          response_model=Dict[str, Any])
+async def reconstruir_estadisticas():
+    """Reconstruye los contadores de permanencia del dashboard."""
+    try:
+        contadores = await estadisticas_service.reconstruir_contadores()
+        print(f"Contadores de permanencia reconstruidos: {contadores['registros']} registros")
+        return contadores
+    except Exception as e:
+        print(f"Error al reconstruir los contadores de permanencia: {e}")
+        print(f"Traceback: {traceback.format_exc()}")
+        raise HTTPException(status_code=500, detail=f"Error al reconstruir los contadores: {str(e)}")
+
+@router.get("/estadisticas-totales",
+          summary="Obtener los conteos de las tarjetas del dashboard",
+          description="Retorna el número de registros de permanencia de cada indicador sin descargar la tabla",
+          response_model=Dict[str, Any])
+@cached_response(TABLA_PERMANENCIA)
+async def get_estadisticas_totales(
+    modo: str = Query("exact", pattern="^(exact|planned|estimated)$", description="Modo de conteo: exact, planned o estimated")
+):
+    """Obtiene los conteos del dashboard con peticiones de solo cabeceras."""
+    try:
+        conteos = await asyncio.gather(*(
+            permanencia_data.count(filtros, modo) for filtros in CONTEOS_DASHBOARD.values()
+        ))
+        return {"totals": dict(zip(CONTEOS_DASHBOARD, conteos)), "modo": modo}
         
-        programa_stats = [
-            {"programa": programa, "value": count} 
-            for programa, count in programa_count.items()
+    except Exception as e:
+        print(f"Error en get_estadisticas_totales: {e}")
+        print(f"Traceback: {traceback.format_exc()}")
+        raise HTTPException(status_code=500, detail=f"Error al obtener los conteos del dashboard: {str(e)}")
+
+@router.get("/estadisticas/cubo",
+          summary="Consultar el cubo de estadísticas de permanencia",
+          description="Retorna registros, inscritos, matriculados, desertores y graduados agrupados por las dimensiones de group_by (servicio, estrato, programa, riesgo, vulnerabilidad, periodo) y filtrados por cualquiera de ellas, desde los contadores pre-agregados de permanencia; cada filtro acepta varios valores repitiendo el parámetro",
+          response_model=Dict[str, Any])
+async def get_cubo(
+    group_by: str = Query("", description="Dimensiones separadas por comas, vacío para el total"),
+    servicio: Optional[List[str]] = Query(None, description="Servicios"),
+    estrato: Optional[List[int]] = Query(None, description="Estratos"),
+    programa: Optional[List[str]] = Query(None, description="Programas académicos"),
+    riesgo: Optional[List[str]] = Query(None, description="Niveles de riesgo de deserción"),
+    vulnerabilidad: Optional[List[str]] = Query(None, description="Tipos de vulnerabilidad"),
+    periodo: Optional[List[str]] = Query(None, description="Periodos")
+):
+    """Obtiene un corte o agregación del cubo de permanencia."""
+    parametros = list(dict.fromkeys(p.strip() for p in group_by.split(",") if p.strip()))
+    for parametro in parametros:
+        if parametro not in PARAMETROS_CUBO:
+            raise HTTPException(status_code=400, detail=f"No se puede agrupar por '{parametro}'; use: {', '.join(PARAMETROS_CUBO)}")
+    
+    valores = {
+        "servicio": servicio, "estrato": estrato, "programa": programa,
+        "riesgo": riesgo, "vulnerabilidad": vulnerabilidad, "periodo": periodo
+    }
+    filtros = {parametro: lista for parametro, lista in valores.items() if lista}
+    try:
+        grupos = await estadisticas_service.get_cubo(
+            [PARAMETROS_CUBO[parametro] for parametro in parametros],
+            {PARAMETROS_CUBO[parametro]: lista for parametro, lista in filtros.items()}
+        )
+        filas = [
+            {**{parametro: grupo[PARAMETROS_CUBO[parametro]] for parametro in parametros},
+             **{medida: grupo[medida] for medida in MEDIDAS_CUBO}}
+            for grupo in grupos
         ]
-        programa_stats.sort(key=lambda x: x["value"], reverse=True)
-        
-        # Limitar a top 5 programas
-        if len(programa_stats) > 5:
-            programa_stats = programa_stats[:5]
-        
-        # Para edades de desertores necesitarías una columna edad en tu tabla
-        # Por ahora devolvemos array vacío
-        edad_desertores = []
-        
         return {
-            "totals": {
-                "inscritos": estudiantes_inscritos,
-                "matriculados": estudiantes_matriculados,
-                "desertores": desertores,
-                "graduados": graduados
-            },
-            "programaStats": programa_stats,
-            "riesgoDesercionData": riesgo_desercion_data,
-            "tutoriaData": tutoria_data,
-            "vulnerabilidadData": vulnerabilidad_data,
-            "serviciosData": servicios_data,
-            "edadDesertores": edad_desertores,
-            "estratoInscritos": estrato_inscritos
+            "group_by": parametros,
+            "filters": filtros,
+            "rows": filas,
+            "total": {medida: sum(fila[medida] for fila in filas) for medida in MEDIDAS_CUBO}
         }
         
     except Exception as e:
-        print(f"Error en get_estadisticas: {e}")
+        print(f"Error en get_cubo: {e}")
         print(f"Traceback: {traceback.format_exc()}")
-        raise HTTPException(status_code=500, detail=f"Error al obtener estadísticas: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error al consultar el cubo de permanencia: {str(e)}")
 
 @router.get("/datos-permanencia", 
           summary="Obtener datos para el gráfico de Estrato por Servicio",
           description="Retorna datos para el gráfico de distribución de estratos por servicio")
+@cached_response(TABLA_PERMANENCIA)
 async def get_datos_permanencia():
     """Obtiene datos para el gráfico de estrato vs servicio."""
     try:
         print(f"Consultando tabla: {TABLA_PERMANENCIA}")
         
         # Consultar datos reales de la tabla de permanencia
-        permanencia_data = supabase.table(TABLA_PERMANENCIA).select("*").execute()
+        registros_permanencia = await permanencia_data.get_all()
         
-        if not permanencia_data or not hasattr(permanencia_data, 'data') or not permanencia_data.data:
+        if not registros_permanencia:
             print("No se encontraron datos en la tabla permanencia")
             return []
         
-        print(f"Devolviendo {len(permanencia_data.data)} registros de la base de datos")
-        return permanencia_data.data
+        print(f"Devolviendo {len(registros_permanencia)} registros de la base de datos")
+        return registros_permanencia
         
     except Exception as e:
         print(f"Error en get_datos_permanencia: {e}")
@@ -182,22 +202,23 @@ async def get_datos_permanencia():
         raise HTTPException(status_code=500, detail=f"Error al obtener datos de permanencia: {str(e)}")
 
 @router.get("/estrato-servicio")
+@cached_response(TABLA_PERMANENCIA)
 async def get_estrato_servicio():
     """Obtiene datos para el gráfico de Estrato por Servicio."""
     try:
         print(f"Consultando tabla: {TABLA_PERMANENCIA}")
         
         # Consultar datos reales
-        permanencia_data = supabase.table(TABLA_PERMANENCIA).select("*").execute()
+        registros_permanencia = await permanencia_data.get_all()
         
-        if not permanencia_data or not permanencia_data.data:
+        if not registros_permanencia:
             print("No se encontraron datos en la tabla permanencia")
             return []
         
         # Agrupar datos por servicio y estrato
         estrato_servicio = {}
         
-        for item in permanencia_data.data:
+        for item in registros_permanencia:
             servicio = item.get("servicio")
             estrato = item.get("estrato")
             inscritos = item.get("inscritos", 0)
@@ -219,6 +240,85 @@ async def get_estrato_servicio():
         print(f"Traceback: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=f"Error al obtener datos de estrato por servicio: {str(e)}")
 
+async def tendencias_tiempo(meses: int = 12) -> Dict[str, Any]:
+    """
+    Obtiene los registros por servicio de los últimos meses, agrupados en Postgres.
+    
+    Args:
+        meses: Número de meses, incluido el actual
+    
+    Returns:
+        Diccionario con categories (meses YYYY-MM) y series ({"name", "data"} por
+        servicio, de mayor a menor total)
+    """
+    fecha_actual = datetime.now()
+    categorias = [(fecha_actual - timedelta(days=30 * i)).strftime("%Y-%m") for i in range(meses - 1, -1, -1)]
+    conteos = await estadisticas_data.get_servicios_por_mes(f"{categorias[0]}-01T00:00:00+00:00")
+    
+    por_servicio: Dict[str, Dict[str, int]] = {}
+    for fila in conteos:
+        if fila.get("servicio") and fila.get("mes") in categorias:
+            servicio = por_servicio.setdefault(fila["servicio"], {})
+            servicio[fila["mes"]] = servicio.get(fila["mes"], 0) + fila["cantidad"]
+    
+    series = [
+        {"name": servicio, "data": [valores.get(mes, 0) for mes in categorias]}
+        for servicio, valores in por_servicio.items()
+    ]
+    series.sort(key=lambda serie: sum(serie["data"]), reverse=True)
+    return {"categories": categorias, "series": series}
+
+@router.get("/dashboard",
+          summary="Obtener los gráficos del dashboard en una sola respuesta",
+          description="Retorna los gráficos pedidos en charts (separados por comas; por defecto todos: " + ", ".join(GRAFICOS_DASHBOARD) + "). Todos se componen de una sola lectura de los contadores de permanencia; datos-permanencia descarga la tabla y tendencias-tiempo agrupa por mes en Postgres solo si se piden",
+          response_model=Dict[str, Any])
+@cached_response(TABLA_PERMANENCIA)
+async def get_dashboard(
+    charts: str = Query(",".join(GRAFICOS_DASHBOARD), description="Gráficos separados por comas")
+):
+    """Obtiene varios gráficos del dashboard desde los mismos datos."""
+    nombres = list(dict.fromkeys(nombre.strip() for nombre in charts.split(",") if nombre.strip()))
+    for nombre in nombres:
+        if nombre not in GRAFICOS_DASHBOARD:
+            raise HTTPException(status_code=400, detail=f"El gráfico '{nombre}' no existe; use: {', '.join(GRAFICOS_DASHBOARD)}")
+    
+    try:
+        # Una sola lectura de los contadores; las consultas que no salen de ellos van en paralelo
+        async def sin_consulta():
+            return None
+        
+        marginales, registros, tendencias = await asyncio.gather(
+            estadisticas_service.get_marginales(),
+            permanencia_data.get_all() if "datos-permanencia" in nombres else sin_consulta(),
+            tendencias_tiempo() if "tendencias-tiempo" in nombres else sin_consulta()
+        )
+        
+        graficos = {}
+        for nombre in nombres:
+            if nombre == "estadisticas-generales":
+                graficos[nombre] = (
+                    componer_estadisticas(marginales, REGLAS_ESTADISTICAS) if marginales["registros"] else estadisticas_vacias()
+                )
+            elif nombre == "datos-permanencia":
+                graficos[nombre] = registros or []
+            elif nombre == "estrato-servicio":
+                graficos[nombre] = estrato_servicio(marginales)
+            elif nombre == "programas-distribucion":
+                graficos[nombre] = programas_distribucion(marginales)
+            elif nombre == "riesgo-desercion":
+                graficos[nombre] = riesgo_desercion(marginales)
+            elif nombre == "programa-riesgo":
+                graficos[nombre] = programa_riesgo(marginales)
+            else:
+                graficos[nombre] = tendencias
+        
+        return {"charts": graficos, "registros": marginales["registros"]}
+        
+    except Exception as e:
+        print(f"Error en get_dashboard: {e}")
+        print(f"Traceback: {traceback.format_exc()}")
+        raise HTTPException(status_code=500, detail=f"Error al obtener los gráficos del dashboard: {str(e)}")
+
 # Alias para mantener compatibilidad
 @router.get("/estadisticas")
 async def get_estadisticas_alias():
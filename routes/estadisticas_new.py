@@ -1,9 +1,12 @@
 from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 import random
 from datetime import datetime, timedelta
 
-from config import supabase
+from config import supabase_async
+from data.cache import cached_response
+from data.estadisticas_data import EstadisticasData
+from services.estadisticas_service import EstadisticasService, ReglasEstadisticas
 
 router = APIRouter()
 
@@ -42,8 +45,23 @@ TIPOS_VULNERABILIDAD = [
     "Económica"
 ]
 
-# Tabla de permanencia para consultas
+# Tabla de permanencia para consultas. Las funciones con cached_response solo
+# obtienen los datos reales: los datos de muestra y los valores aleatorios se
+# generan en cada petición, para no servirlos desde la caché
 TABLA_PERMANENCIA = "permanencia"
+estadisticas_service = EstadisticasService()
+# Agregaciones calculadas en Postgres (scripts/crear_funciones_estadisticas.sql)
+estadisticas_data = EstadisticasData()
+
+# Reglas de las estadísticas generales: totales como número de registros con valor,
+# valores exactos de riesgo y tutoría, y las categorías fijas de este módulo
+REGLAS_ESTADISTICAS = ReglasEstadisticas(
+    totales="conteo",
+    vulnerabilidades=TIPOS_VULNERABILIDAD,
+    servicios=SERVICIOS,
+    estratos=ESTRATOS,
+    estrato_por_inscritos=False
+)
 
 @router.get("/estadisticas-generales", 
           summary="Obtener estadísticas generales para el dashboard",
@@ -52,11 +70,11 @@ TABLA_PERMANENCIA = "permanencia"
 async def get_estadisticas():
     """Obtiene estadísticas generales para el dashboard."""
     try:
-        # Consultar datos reales de la tabla de permanencia
-        permanencia_data = supabase.table(TABLA_PERMANENCIA).select("*").execute()
+        # Componer las estadísticas desde los contadores de permanencia
+        estadisticas = await _estadisticas_generales()
         
         # Si no hay datos, generar datos de muestra
-        if not permanencia_data.data or len(permanencia_data.data) == 0:
+        if estadisticas is None:
             print("No se encontraron datos de permanencia, generando datos de muestra")
             total_estudiantes = 100
             estudiantes_inscritos = total_estudiantes
@@ -125,129 +143,28 @@ async def get_estadisticas():
                 "estratoInscritos": estrato_inscritos
             }
         
-        # Procesar los datos reales
-        total_estudiantes = len(permanencia_data.data)
-        
-        # Contar estudiantes inscritos, matriculados, desertores y graduados
-        estudiantes_inscritos = sum(1 for item in permanencia_data.data if item.get("inscritos", 0) > 0)
-        estudiantes_matriculados = sum(1 for item in permanencia_data.data if item.get("matriculados", 0) > 0)
-        desertores = sum(1 for item in permanencia_data.data if item.get("desertores", 0) > 0)
-        graduados = sum(1 for item in permanencia_data.data if item.get("graduados", 0) > 0)
-        
-        # Usar los datos reales tal como están, sin aplicar valores por defecto
-        # Esto asegura que las estadísticas reflejen exactamente lo que hay en la base de datos
-        print(f"Datos reales: Inscritos={estudiantes_inscritos}, Matriculados={estudiantes_matriculados}, Desertores={desertores}, Graduados={graduados}")
-        
-        # Datos para RiesgoDesercionChart
-        riesgo_count = {"Alto": 0, "Medio": 0, "Bajo": 0}
-        for item in permanencia_data.data:
-            riesgo = item.get("riesgo_desercion")
-            if riesgo in ["Alto", "Muy Alto"]:
-                riesgo_count["Alto"] += 1
-            elif riesgo == "Medio":
-                riesgo_count["Medio"] += 1
-            elif riesgo in ["Bajo", "Muy bajo"]:
-                riesgo_count["Bajo"] += 1
-        
-        riesgo_desercion_data = [
-            {"riesgo": nivel, "cantidad": count} 
-            for nivel, count in riesgo_count.items()
-        ]
-        
-        # Datos para TutoriaDonutChart
-        requieren_tutoria = sum(1 for item in permanencia_data.data if item.get("requiere_tutoria") == "Sí")
-        no_requieren_tutoria = total_estudiantes - requieren_tutoria
-        
-        tutoria_data = [
-            {"name": "Requieren", "value": requieren_tutoria},
-            {"name": "No requieren", "value": no_requieren_tutoria}
-        ]
-        
-        # Datos para VulnerabilidadBarChart
-        vulnerabilidad_count = {tipo: 0 for tipo in TIPOS_VULNERABILIDAD}
-        for item in permanencia_data.data:
-            tipo = item.get("tipo_vulnerabilidad")
-            if tipo and tipo in vulnerabilidad_count:
-                vulnerabilidad_count[tipo] += 1
-        
-        vulnerabilidad_data = [
-            {"name": tipo, "cantidad": count} 
-            for tipo, count in vulnerabilidad_count.items()
-        ]
-        
-        # Datos para ServiciosBarChart
-        servicios_count = {servicio: 0 for servicio in SERVICIOS}
-        for item in permanencia_data.data:
-            servicio = item.get("servicio")
-            if servicio and servicio in servicios_count:
-                servicios_count[servicio] += 1
-        
-        servicios_data = [
-            {"name": servicio, "cantidad": count} 
-            for servicio, count in servicios_count.items()
-        ]
-        
-        # Datos para ScatterChartPanel (estrato vs inscritos)
-        estrato_count = {estrato: 0 for estrato in ESTRATOS}
-        for item in permanencia_data.data:
-            try:
-                estrato = int(item.get("estrato", 0))
-                if estrato in estrato_count:
-                    estrato_count[estrato] += 1
-            except (ValueError, TypeError):
-                continue
-        
-        estrato_inscritos = [
-            {"estrato": estrato, "inscritos": count} 
-            for estrato, count in estrato_count.items()
-        ]
-        
-        # Datos para el gráfico de programas
-        programa_count = {}
-        for item in permanencia_data.data:
-            programa = item.get("estudiante_programa_academico")
-            if programa:
-                if programa in programa_count:
-                    programa_count[programa] += 1
-                else:
-                    programa_count[programa] = 1
-        
-        # Convertir a lista y ordenar por cantidad
-        programa_stats = [
-            {"programa": programa, "value": count} 
-            for programa, count in programa_count.items()
-        ]
-        programa_stats.sort(key=lambda x: x["value"], reverse=True)
-        
-        # Limitar a los 5 programas principales
-        if len(programa_stats) > 5:
-            programa_stats = programa_stats[:5]
-        
-        # Edades de desertores (dato simulado ya que no tenemos edades reales)
-        edad_desertores = [
-            {"edad": edad, "cantidad": random.randint(1, 5)}
-            for edad in range(18, 30)
-        ]
+        # Las estadísticas reflejan exactamente lo que hay en la base de datos, sin valores por defecto
+        totals = estadisticas["totals"]
+        print(f"Datos reales: Inscritos={totals['inscritos']}, Matriculados={totals['matriculados']}, Desertores={totals['desertores']}, Graduados={totals['graduados']}")
         
+        # Edades de desertores (dato simulado ya que no tenemos edades reales), sin
+        # modificar las estadísticas de la caché
         return {
-            "totals": {
-                "inscritos": estudiantes_inscritos,
-                "matriculados": estudiantes_matriculados,
-                "desertores": desertores,
-                "graduados": graduados
-            },
-            "programaStats": programa_stats,
-            "riesgoDesercionData": riesgo_desercion_data,
-            "tutoriaData": tutoria_data,
-            "vulnerabilidadData": vulnerabilidad_data,
-            "serviciosData": servicios_data,
-            "edadDesertores": edad_desertores,
-            "estratoInscritos": estrato_inscritos
+            **estadisticas,
+            "edadDesertores": [
+                {"edad": edad, "cantidad": random.randint(1, 5)}
+                for edad in range(18, 30)
+            ]
         }
     except Exception as e:
         print(f"Error al obtener estadísticas generales: {e}")
         raise HTTPException(status_code=500, detail=f"Error al obtener estadísticas generales: {str(e)}")
 
+@cached_response(TABLA_PERMANENCIA)
+async def _estadisticas_generales():
+    """Estadísticas reales del dashboard, o None si no hay datos."""
+    return await estadisticas_service.get_estadisticas_generales(REGLAS_ESTADISTICAS)
+
 
 @router.get("/datos-permanencia", 
           summary="Obtener datos para el gráfico de Estrato por Servicio",
@@ -256,10 +173,10 @@ async def get_datos_permanencia():
     """Obtiene datos para el gráfico de estrato vs servicio."""
     try:
         # Consultar datos reales de la tabla de permanencia
-        permanencia_data = supabase.table(TABLA_PERMANENCIA).select("*").execute()
+        registros = await _registros_permanencia()
         
         # Si no hay datos, generar datos de muestra
-        if not permanencia_data.data or len(permanencia_data.data) == 0:
+        if not registros:
             print("No se encontraron datos de permanencia, generando datos de muestra")
             datos = []
             
@@ -290,11 +207,17 @@ async def get_datos_permanencia():
             return datos
         
         # Si hay datos reales, devolverlos directamente
-        return permanencia_data.data
+        return registros
     except Exception as e:
         print(f"Error al obtener datos de permanencia: {e}")
         raise HTTPException(status_code=500, detail=f"Error al obtener datos de permanencia: {str(e)}")
 
+@cached_response(TABLA_PERMANENCIA)
+async def _registros_permanencia():
+    """Registros de la tabla de permanencia."""
+    permanencia_data = await supabase_async.table(TABLA_PERMANENCIA).select("*").execute()
+    return permanencia_data.data
+
 
 @router.get("/estrato-servicio", 
           summary="Obtener datos para el gráfico de Estrato por Servicio",
@@ -332,14 +255,11 @@ async def get_estrato_servicio():
 async def get_programas_distribucion():
     """Obtiene datos para el gráfico de distribución por programa académico."""
     try:
-        # Consultar datos reales de la tabla de permanencia
-        permanencia_data = supabase.table(TABLA_PERMANENCIA).select(
-            "estudiante_programa_academico", 
-            "inscritos"
-        ).execute()
+        # Inscritos de los programas principales, agrupados en Postgres
+        datos_programas = await _programas_distribucion()
         
         # Si no hay datos, generar datos de muestra
-        if not permanencia_data.data or len(permanencia_data.data) == 0:
+        if not datos_programas:
             print("No se encontraron datos de permanencia, generando datos de muestra")
             datos_programas = []
             
@@ -369,59 +289,29 @@ async def get_programas_distribucion():
                 datos_programas = datos_programas[:5]
                 if otros > 0:
                     datos_programas.append({"programa": "Otros programas", "value": otros})
-            
-            return datos_programas
-        
-        # Procesar los datos reales
-        programas_count = {}
-        
-        # Contar estudiantes por programa
-        for item in permanencia_data.data:
-            programa = item.get("estudiante_programa_academico")
-            if not programa:
-                programa = "Otros programas"
-            
-            # Incrementar el contador para este programa
-            if programa in programas_count:
-                try:
-                    inscritos = int(item.get("inscritos", 1))
-                    if inscritos == 0:
-                        inscritos = 1
-                except (ValueError, TypeError):
-                    inscritos = 1
-                    
-                programas_count[programa] += inscritos
-            else:
-                try:
-                    inscritos = int(item.get("inscritos", 1))
-                    if inscritos == 0:
-                        inscritos = 1
-                except (ValueError, TypeError):
-                    inscritos = 1
-                    
-                programas_count[programa] = inscritos
-        
-        # Convertir a formato para el gráfico
-        datos_programas = [
-            {"programa": programa, "value": count} 
-            for programa, count in programas_count.items()
-        ]
-        
-        # Ordenar por cantidad descendente
-        datos_programas.sort(key=lambda x: x["value"], reverse=True)
-        
-        # Limitar a los 5 programas principales
-        if len(datos_programas) > 5:
-            otros = sum(item["value"] for item in datos_programas[5:])
-            datos_programas = datos_programas[:5]
-            if otros > 0:
-                datos_programas.append({"programa": "Otros programas", "value": otros})
         
         return datos_programas
     except Exception as e:
         print(f"Error al obtener datos de programas: {e}")
         raise HTTPException(status_code=500, detail=f"Error al obtener datos de programas: {str(e)}")
 
+@cached_response(TABLA_PERMANENCIA)
+async def _programas_distribucion():
+    """Inscritos de los 5 programas principales y del resto, o [] si no hay datos."""
+    datos_programas = await estadisticas_data.get_programas_distribucion()
+    
+    # Ordenar por cantidad descendente (sin modificar las filas de la caché)
+    datos_programas = sorted(datos_programas, key=lambda x: x["value"], reverse=True)
+    
+    # Limitar a los 5 programas principales
+    if len(datos_programas) > 5:
+        otros = sum(item["value"] for item in datos_programas[5:])
+        datos_programas = datos_programas[:5]
+        if otros > 0:
+            datos_programas.append({"programa": "Otros programas", "value": otros})
+    
+    return datos_programas
+
 
 @router.get("/riesgo-desercion", 
           summary="Obtener datos para el gráfico de riesgo de deserción",
@@ -429,13 +319,11 @@ async def get_programas_distribucion():
 async def get_riesgo_desercion():
     """Obtiene datos para el gráfico de riesgo de deserción."""
     try:
-        # Consultar datos reales de la tabla de permanencia
-        permanencia_data = supabase.table(TABLA_PERMANENCIA).select(
-            "riesgo_desercion"
-        ).execute()
+        # Registros por nivel de riesgo, agrupados en Postgres
+        datos_riesgo = await _riesgo_desercion()
         
         # Si no hay datos, generar datos de muestra
-        if not permanencia_data.data or len(permanencia_data.data) == 0:
+        if datos_riesgo is None:
             print("No se encontraron datos de permanencia, generando datos de muestra")
             total_estudiantes = 100
             datos_riesgo = []
@@ -456,40 +344,27 @@ async def get_riesgo_desercion():
                     "name": nivel,
                     "value": cantidad
                 })
-            
-            return datos_riesgo
-        
-        # Procesar los datos reales
-        riesgo_count = {}
-        
-        # Contar estudiantes por nivel de riesgo
-        for item in permanencia_data.data:
-            riesgo = item.get("riesgo_desercion")
-            if not riesgo or riesgo not in NIVELES_RIESGO:
-                riesgo = "Bajo"  # Valor predeterminado
-            
-            # Incrementar el contador para este nivel de riesgo
-            if riesgo in riesgo_count:
-                riesgo_count[riesgo] += 1
-            else:
-                riesgo_count[riesgo] = 1
-        
-        # Asegurarse de que todos los niveles de riesgo estén representados
-        for nivel in NIVELES_RIESGO:
-            if nivel not in riesgo_count:
-                riesgo_count[nivel] = 0
-        
-        # Convertir a formato para el gráfico
-        datos_riesgo = [
-            {"name": nivel, "value": count} 
-            for nivel, count in riesgo_count.items()
-        ]
         
         return datos_riesgo
     except Exception as e:
         print(f"Error al obtener datos de riesgo de deserción: {e}")
         raise HTTPException(status_code=500, detail=f"Error al obtener datos de riesgo de deserción: {str(e)}")
 
+@cached_response(TABLA_PERMANENCIA)
+async def _riesgo_desercion():
+    """Registros por nivel de riesgo, o None si no hay datos."""
+    conteos = await estadisticas_data.get_riesgo_desercion()
+    if not conteos:
+        return None
+    
+    # Los niveles desconocidos ya vienen contados como "Bajo"; todos los niveles
+    # se reportan, en el orden de NIVELES_RIESGO
+    riesgo_count = {fila["riesgo"]: fila["cantidad"] for fila in conteos}
+    return [
+        {"name": nivel, "value": riesgo_count.get(nivel, 0)}
+        for nivel in NIVELES_RIESGO
+    ]
+
 
 @router.get("/servicios-tiempo", 
           summary="Obtener datos de servicios a lo largo del tiempo",
@@ -497,12 +372,6 @@ async def get_riesgo_desercion():
 async def get_servicios_tiempo():
     """Obtiene datos de uso de servicios a lo largo del tiempo."""
     try:
-        # Consultar datos reales de la tabla de permanencia
-        permanencia_data = supabase.table(TABLA_PERMANENCIA).select(
-            "servicio", 
-            "createdAt"
-        ).execute()
-        
         # Usamos los últimos 12 meses
         meses = []
         fecha_actual = datetime.now()
@@ -511,8 +380,11 @@ async def get_servicios_tiempo():
             fecha = fecha_actual - timedelta(days=30*i)
             meses.insert(0, fecha.strftime("%Y-%m"))
         
+        # Registros por servicio y mes de creación desde el primer mes, agrupados en Postgres
+        servicios_por_mes = await _servicios_por_mes(tuple(meses))
+        
         # Si no hay datos, generar datos de muestra
-        if not permanencia_data.data or len(permanencia_data.data) == 0:
+        if servicios_por_mes is None:
             print("No se encontraron datos de permanencia, generando datos de muestra")
             
             # Generar datos para cada servicio
@@ -545,28 +417,6 @@ async def get_servicios_tiempo():
                 "series": datos
             }
         
-        # Procesar los datos reales
-        servicios_por_mes = {servicio: {mes: 0 for mes in meses} for servicio in SERVICIOS}
-        
-        # Contar servicios por mes
-        for item in permanencia_data.data:
-            servicio = item.get("servicio")
-            fecha_str = item.get("createdAt")
-            
-            if not servicio or servicio not in SERVICIOS:
-                continue
-                
-            try:
-                # Convertir la fecha ISO a objeto datetime
-                fecha = datetime.fromisoformat(fecha_str.replace("Z", "+00:00"))
-                mes = fecha.strftime("%Y-%m")
-                
-                # Solo contar si el mes está en nuestro rango
-                if mes in meses:
-                    servicios_por_mes[servicio][mes] += 1
-            except (ValueError, TypeError, AttributeError):
-                continue
-        
         # Convertir a formato para el gráfico
         datos = []
         for servicio in SERVICIOS:
@@ -589,6 +439,23 @@ async def get_servicios_tiempo():
         print(f"Error al obtener datos de servicios en el tiempo: {e}")
         raise HTTPException(status_code=500, detail=f"Error al obtener datos de servicios en el tiempo: {str(e)}")
 
+@cached_response(TABLA_PERMANENCIA)
+async def _servicios_por_mes(meses: Tuple[str, ...]):
+    """Registros por servicio y mes, o None si no hay datos."""
+    conteos = await estadisticas_data.get_servicios_por_mes(f"{meses[0]}-01T00:00:00+00:00")
+    if not conteos:
+        return None
+    
+    servicios_por_mes = {servicio: {mes: 0 for mes in meses} for servicio in SERVICIOS}
+    
+    # Ubicar los conteos de cada servicio conocido en los meses del rango
+    for fila in conteos:
+        servicio = fila.get("servicio")
+        mes = fila.get("mes")
+        if servicio in servicios_por_mes and mes in servicios_por_mes[servicio]:
+            servicios_por_mes[servicio][mes] += fila["cantidad"]
+    return servicios_por_mes
+
 
 @router.get("/programa-riesgo", 
           summary="Obtener datos para el gráfico de programa vs riesgo",
@@ -596,14 +463,11 @@ async def get_servicios_tiempo():
 async def get_programa_riesgo():
     """Obtiene datos para el gráfico de programa vs riesgo."""
     try:
-        # Consultar datos reales de la tabla de permanencia
-        permanencia_data = supabase.table(TABLA_PERMANENCIA).select(
-            "estudiante_programa_academico", 
-            "riesgo_desercion"
-        ).execute()
+        # Registros por programa y riesgo de los 5 programas principales, agrupados en Postgres
+        programa_riesgo = await _programa_riesgo()
         
         # Si no hay datos, generar datos de muestra
-        if not permanencia_data.data or len(permanencia_data.data) == 0:
+        if not programa_riesgo:
             print("No se encontraron datos de permanencia, generando datos de muestra")
             programa_riesgo = []
             
@@ -617,57 +481,26 @@ async def get_programa_riesgo():
                 }
                 programa_riesgo.append(datos_programa)
             
-            return programa_riesgo
-        
-        # Procesar los datos reales
-        programa_riesgo_count = {}
-        
-        # Contar estudiantes por programa y nivel de riesgo
-        for item in permanencia_data.data:
-            programa = item.get("estudiante_programa_academico")
-            riesgo = item.get("riesgo_desercion")
-            
-            if not programa or not riesgo:
-                continue
-                
-            # Simplificar los niveles de riesgo a bajo, medio, alto
-            if riesgo in ["Muy bajo", "Bajo"]:
-                nivel_riesgo = "bajo"
-            elif riesgo == "Medio":
-                nivel_riesgo = "medio"
-            else:  # Alto, Muy Alto
-                nivel_riesgo = "alto"
-            
-            # Inicializar el contador para este programa si no existe
-            if programa not in programa_riesgo_count:
-                programa_riesgo_count[programa] = {"bajo": 0, "medio": 0, "alto": 0}
-            
-            # Incrementar el contador para este nivel de riesgo
-            programa_riesgo_count[programa][nivel_riesgo] += 1
-        
-        # Convertir a formato para el gráfico
-        programa_riesgo = []
-        for programa, riesgos in programa_riesgo_count.items():
-            datos_programa = {
-                "programa": programa,
-                "bajo": riesgos["bajo"],
-                "medio": riesgos["medio"],
-                "alto": riesgos["alto"]
-            }
-            programa_riesgo.append(datos_programa)
-        
-        # Ordenar por cantidad total de estudiantes (descendente)
-        programa_riesgo.sort(key=lambda x: x["bajo"] + x["medio"] + x["alto"], reverse=True)
-        
-        # Limitar a los 5 programas principales
-        if len(programa_riesgo) > 5:
-            programa_riesgo = programa_riesgo[:5]
         
         return programa_riesgo
     except Exception as e:
         print(f"Error al obtener datos de programa vs riesgo: {e}")
         raise HTTPException(status_code=500, detail=f"Error al obtener datos de programa vs riesgo: {str(e)}")
 
+@cached_response(TABLA_PERMANENCIA)
+async def _programa_riesgo():
+    """Registros por programa y riesgo de los 5 programas principales."""
+    # Las filas ya vienen ordenadas por total de registros (descendente)
+    return [
+        {
+            "programa": fila["programa"],
+            "bajo": fila["bajo"],
+            "medio": fila["medio"],
+            "alto": fila["alto"]
+        }
+        for fila in await estadisticas_data.get_programa_riesgo(5)
+    ]
+
 
 # Agregar un alias para mantener compatibilidad con el frontend actual
 @router.get("/tendencias-tiempo", 
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
@@ -6,7 +6,9 @@ from services.estudiantes_service import EstudiantesService
 from models.estudiantes import (
     EstudianteCreate, EstudianteResponse, EstudianteUpdate
 )
-from utils.responses import success_response, error_response, handle_exception
+from utils.responses import success_response, error_response, handle_exception, parse_fields, parse_sort
+from data.estudiantes_data import EstudiantesData, CAMPOS_ORDEN
+from config import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT
 
 import re
 
@@ -15,16 +17,67 @@ service = EstudiantesService()
 
 @router.get("/estudiantes", 
           summary="Obtener todos los estudiantes",
-          description="Retorna una lista de todos los estudiantes registrados",
+          description="Retorna una lista de todos los estudiantes registrados, opcionalmente filtrados por programa académico, semestre, estrato o riesgo de deserción y ordenados por sort (\"-campo\" para orden descendente). Con limit o cursor retorna una página y el cursor de la siguiente en next_cursor",
           response_model=Dict[str, Any],
           tags=["Estudiantes"])
-async def get_estudiantes():
+async def get_estudiantes(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="Número máximo de estudiantes por página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en next_cursor por la página anterior (con los mismos filtros y orden)"),
+    fields: Optional[str] = Query(None, description="Columnas a retornar separadas por comas"),
+    programa_academico: Optional[str] = Query(None, description="Filtrar por programa académico"),
+    semestre: Optional[int] = Query(None, ge=1, le=10, description="Filtrar por semestre"),
+    estrato: Optional[int] = Query(None, ge=1, le=6, description="Filtrar por estrato"),
+    riesgo_desercion: Optional[str] = Query(None, description="Filtrar por riesgo de deserción"),
+    sort: Optional[str] = Query(None, description=f"Campo de orden, con \"-\" para orden descendente: {', '.join(CAMPOS_ORDEN)}")
+):
     try:
-        estudiantes = service.get_all_estudiantes()
-        return success_response(estudiantes, "Estudiantes obtenidos exitosamente")
+        columns, _ = parse_fields(fields)
+        order_by, descending = parse_sort(sort, list(CAMPOS_ORDEN))
+        filters = EstudiantesData.build_filters(
+            programa_academico=programa_academico,
+            semestre=semestre,
+            estrato=estrato,
+            riesgo_desercion=riesgo_desercion
+        )
+        if limit is None and cursor is None:
+            estudiantes = await service.get_all_estudiantes(columns, filters, order_by, descending)
+            return success_response(estudiantes, "Estudiantes obtenidos exitosamente")
+        
+        estudiantes, next_cursor = await service.get_estudiantes_page(
+            limit or DEFAULT_PAGE_LIMIT, cursor, columns, filters, order_by, descending
+        )
+        return success_response(estudiantes, "Estudiantes obtenidos exitosamente", next_cursor)
     except Exception as e:
         return handle_exception(e, "obtener estudiantes")
 
+@router.get("/estudiantes/buscar", 
+          summary="Buscar estudiantes",
+          description="Busca estudiantes por nombres, apellidos, documento o correo, completos o parciales, sin distinguir tildes ni mayúsculas y tolerando errores de escritura. Retorna los resultados más parecidos primero",
+          response_model=Dict[str, Any],
+          tags=["Estudiantes"])
+async def buscar_estudiantes(
+    q: str = Query(..., min_length=1, max_length=100, description="Texto buscado"),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_LIMIT, description="Número máximo de resultados")
+):
+    try:
+        estudiantes = await service.buscar_estudiantes(q, limit)
+        return success_response(estudiantes, f"Se encontraron {len(estudiantes)} estudiantes")
+    except Exception as e:
+        return handle_exception(e, "buscar estudiantes")
+
+@router.get("/estudiantes/{estudiante_id}/resumen", 
+          summary="Obtener el resumen de un estudiante",
+          description="Retorna el estudiante, el número de registros en cada servicio y una línea de tiempo con todos sus registros en orden cronológico. Los servicios se consultan de forma concurrente; los que fallan se reportan en errores",
+          response_model=Dict[str, Any],
+          tags=["Estudiantes"])
+async def get_resumen_estudiante(estudiante_id: str):
+    try:
+        resumen = await service.get_resumen_estudiante(estudiante_id)
+        if resumen is None:
+            return error_response("Estudiante no encontrado", "Estudiante no encontrado", 404)
+        return success_response(resumen, "Resumen del estudiante obtenido exitosamente")
+    except Exception as e:
+        return handle_exception(e, "obtener el resumen del estudiante")
 
 @router.post("/estudiantes", 
            summary="Crear un nuevo estudiante",
@@ -88,15 +141,14 @@ async def create_estudiante(datos: Dict[str, Any]):
         if not correo.endswith("@unicesar.edu.co"):
             return error_response("El correo debe ser institucional (@unicesar.edu.co)", "Correo inválido")
         
-        from data.estudiantes_data import EstudiantesData
         estudiantes_data = EstudiantesData()
 
-        correo_existente = estudiantes_data.get_by_correo(datos.get("correo"))
+        correo_existente = await estudiantes_data.get_by_correo(datos.get("correo"))
         if correo_existente:
             return error_response("Ya existe un estudiante registrado con este correo", "Correo duplicado")
 
         # Crear estudiante
-        result = service.create_estudiante(datos)
+        result = await service.create_estudiante(datos)
         return success_response(result, "Estudiante registrado exitosamente")
     except Exception as e:
         return handle_exception(e, "crear estudiante")
@@ -1,18 +1,20 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File
 from typing import Dict, Any, List
 import io
-import pandas as pd
 import uuid
 import traceback
 from datetime import datetime
 
-from config import supabase
+from data.base_data import BaseData
 from utils.responses import success_response, error_response, handle_exception
 
 router = APIRouter()
+intervenciones_data = BaseData("intervenciones_grupales")
 
 # Función para convertir fechas de formato DD-MM-YYYY a YYYY-MM-DD
 def convert_date_format(date_str):
+    import pandas as pd
+    
     if not date_str or pd.isna(date_str):
         return None
     try:
@@ -36,6 +38,9 @@ def convert_date_format(date_str):
           description="Permite cargar intervenciones grupales masivamente desde un archivo CSV")
 async def importar_intervenciones(file: UploadFile = File(...)):
     """Importa intervenciones grupales desde un archivo CSV."""
+    # pandas se importa en el primer uso para no retrasar el arranque del servidor
+    import pandas as pd
+    
     try:
         print(f"Recibiendo archivo CSV de intervenciones: {file.filename}")
         
@@ -50,6 +55,7 @@ async def importar_intervenciones(file: UploadFile = File(...)):
         inserted = 0
         errors = []
         processed_data = []
+        pendientes = []
         
         # Mapeo de columnas del CSV a campos de la base de datos
         # Este mapeo debe ajustarse según las columnas exactas de tu CSV
@@ -142,21 +148,8 @@ async def importar_intervenciones(file: UploadFile = File(...)):
                 else:
                     intervencion_data["efectividad"] = "N/A"
                 
-                print(f"Creando intervención grupal: {intervencion_data}")
-                
-                # Insertar en la base de datos
-                response = supabase.table("intervenciones_grupales").insert(intervencion_data).execute()
-                
-                if response.data:
-                    inserted += 1
-                    processed_data.append({
-                        "fila": index + 1,
-                        "asignatura": intervencion_data.get("asignatura_intervenir", ""),
-                        "docente": intervencion_data.get("nombre_docente_asignatura", ""),
-                        "procesado": True
-                    })
-                else:
-                    raise Exception("No se pudo crear la intervención grupal, respuesta vacía")
+                # Las intervenciones válidas se insertan por bloques al final
+                pendientes.append((index, intervencion_data))
                 
             except Exception as e:
                 error_msg = f"Error en fila {index+1}: {str(e)}"
@@ -172,6 +165,34 @@ async def importar_intervenciones(file: UploadFile = File(...)):
                     "procesado": False
                 })
         
+        # Insertar en la base de datos
+        resultado = await intervenciones_data.create_many([datos for _, datos in pendientes])
+        errores_bloque = {}
+        for error_bloque in resultado["errors"]:
+            for posicion in range(error_bloque["start"], error_bloque["end"]):
+                errores_bloque[posicion] = error_bloque["error"]
+        
+        for posicion, ((index, intervencion_data), id) in enumerate(zip(pendientes, resultado["ids"])):
+            if id is not None:
+                inserted += 1
+                processed_data.append({
+                    "fila": index + 1,
+                    "asignatura": intervencion_data.get("asignatura_intervenir", ""),
+                    "docente": intervencion_data.get("nombre_docente_asignatura", ""),
+                    "procesado": True
+                })
+            else:
+                error = errores_bloque.get(posicion, "No se pudo crear la intervención grupal, respuesta vacía")
+                errors.append(f"Error en fila {index+1}: {error}")
+                processed_data.append({
+                    "fila": index + 1,
+                    "asignatura": intervencion_data.get("asignatura_intervenir", ""),
+                    "error": error,
+                    "procesado": False
+                })
+        
+        processed_data.sort(key=lambda fila: fila["fila"])
+        
         # Retornar respuesta
         return {
             "success": True,
@@ -1,18 +1,21 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File
 from typing import Dict, Any, List
 import io
-import pandas as pd
 import uuid
 import traceback
 from datetime import datetime
 
-from config import supabase
+from data.base_data import BaseData
+from data.estudiantes_data import EstudiantesLoader
 from utils.responses import success_response, error_response, handle_exception
 
 router = APIRouter()
+remisiones_data = BaseData("remisiones_psicologicas")
 
 # Función para convertir fechas de formato DD-MM-YYYY a YYYY-MM-DD
 def convert_date_format(date_str):
+    import pandas as pd
+    
     if not date_str or pd.isna(date_str):
         return None
     try:
@@ -36,6 +39,9 @@ def convert_date_format(date_str):
           description="Permite importar remisiones psicológicas desde un archivo CSV")
 async def importar_remisiones(file: UploadFile = File(...)):
     """Importa remisiones psicológicas desde un archivo CSV."""
+    # pandas se importa en el primer uso para no retrasar el arranque del servidor
+    import pandas as pd
+    
     try:
         print(f"Recibiendo archivo CSV para remisiones psicológicas: {file.filename}")
         
@@ -49,6 +55,12 @@ async def importar_remisiones(file: UploadFile = File(...)):
         # Inicializar contadores
         registros_creados = 0
         errores = 0
+        pendientes = []
+        
+        # Resolver de una vez los estudiantes de todas las filas
+        estudiantes_loader = EstudiantesLoader()
+        if "numero_documento" in df.columns:
+            await estudiantes_loader.load_many("documento", [str(documento) for documento in df["numero_documento"].dropna()])
         
         # Procesar cada fila del CSV
         for index, row in df.iterrows():
@@ -56,9 +68,9 @@ async def importar_remisiones(file: UploadFile = File(...)):
                 # Buscar estudiante por número de documento
                 estudiante_id = None
                 if pd.notna(row.get("numero_documento")):
-                    estudiante = supabase.table("estudiantes").select("id").eq("documento", str(row["numero_documento"])).execute()
-                    if estudiante.data and len(estudiante.data) > 0:
-                        estudiante_id = estudiante.data[0]["id"]
+                    estudiante = await estudiantes_loader.load_by_documento(str(row["numero_documento"]))
+                    if estudiante:
+                        estudiante_id = estudiante["id"]
                         print(f"Estudiante encontrado con ID: {estudiante_id}")
                 
                 # Mapear programa académico correctamente
@@ -110,21 +122,19 @@ async def importar_remisiones(file: UploadFile = File(...)):
                     "updated_at": datetime.now().isoformat()
                 }
                 
-                print(f"Insertando remisión psicológica: {remision_data}")
-                
-                # Insertar en la base de datos
-                response = supabase.table("remisiones_psicologicas").insert(remision_data).execute()
-                if response.data:
-                    registros_creados += 1
-                    print(f"Remisión psicológica creada exitosamente: {response.data[0]['id']}")
-                else:
-                    errores += 1
-                    print("No se pudo crear la remisión psicológica")
+                # Las remisiones válidas se insertan por bloques al final
+                pendientes.append(remision_data)
             except Exception as e:
                 print(f"Error al procesar remisión psicológica en fila {index+2}: {str(e)}")
                 traceback.print_exc()
                 errores += 1
         
+        # Insertar en la base de datos
+        resultado = await remisiones_data.create_many(pendientes)
+        creadas = sum(1 for id in resultado["ids"] if id is not None)
+        registros_creados += creadas
+        errores += len(pendientes) - creadas
+        
         # Retornar respuesta
         return {
             "success": True,
@@ -3,7 +3,8 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime, date, time
 from pydantic import BaseModel, Field
 
-from config import supabase
+from config import supabase_async
+from data.cache import invalidate_table
 from utils.responses import success_response, error_response, handle_exception
 
 router = APIRouter()
@@ -152,7 +153,8 @@ async def create_intervencion_grupal(datos: Dict[str, Any]):
         datos["updated_at"] = now
 
         # Insertar en base de datos
-        result = supabase.table("intervenciones_grupales").insert(datos).execute()
+        result = await supabase_async.table("intervenciones_grupales").insert(datos).execute()
+        invalidate_table("intervenciones_grupales")
 
         if not result.data:
             return error_response("Error al crear la intervención grupal", "No se insertaron datos")
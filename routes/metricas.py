@@ -0,0 +1,59 @@
+from fastapi import APIRouter, HTTPException, Header
+from typing import Dict, Any, Optional
+
+from config import supabase_metrics, supabase_breaker, METRICS_TOKEN
+from data.cache import cache_stats, response_cache_stats
+from data.replica import get_replica
+from data.snapshot import snapshot_status
+from data.versions import get_table_versions
+from data.estudiantes_data import get_estudiantes_index, get_estudiantes_search
+from services.estadisticas_service import get_contadores_permanencia
+
+router = APIRouter()
+
+def verificar_token(token: Optional[str]) -> None:
+    """
+    Verifica el token del endpoint interno de métricas.
+    
+    Args:
+        token: Valor de la cabecera X-Metrics-Token
+        
+    Raises:
+        HTTPException: 404 si no hay token configurado, 403 si el token no coincide
+    """
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if token != METRICS_TOKEN:
+        raise HTTPException(status_code=403, detail="Token de métricas inválido")
+
+@router.get("/internal/metricas", 
+          summary="Obtener las métricas internas",
+          description="Retorna latencia, filas, bytes y errores de las llamadas a Supabase por tabla y operación, junto con el estado del circuito, de las cachés de lecturas y de respuestas, del índice de estudiantes, de las versiones de las tablas (ETag), de los contadores de permanencia, de la réplica local y del snapshot columnar",
+          response_model=Dict[str, Any],
+          include_in_schema=False)
+async def get_metricas(x_metrics_token: Optional[str] = Header(None)):
+    """Obtiene las métricas de las llamadas a Supabase."""
+    verificar_token(x_metrics_token)
+    replica = get_replica()
+    return {
+        "supabase": supabase_metrics.snapshot(),
+        "circuit": supabase_breaker.snapshot(),
+        "cache": cache_stats(),
+        "response_cache": response_cache_stats(),
+        "estudiantes_index": get_estudiantes_index().stats(),
+        "estudiantes_search": get_estudiantes_search().stats(),
+        "table_versions": get_table_versions().stats(),
+        "permanencia_counters": get_contadores_permanencia().stats(),
+        "replica": replica.status() if replica is not None else None,
+        "snapshot": snapshot_status()
+    }
+
+@router.delete("/internal/metricas", 
+             summary="Reiniciar las métricas internas",
+             response_model=Dict[str, Any],
+             include_in_schema=False)
+async def reset_metricas(x_metrics_token: Optional[str] = Header(None)):
+    """Reinicia las métricas de las llamadas a Supabase."""
+    verificar_token(x_metrics_token)
+    supabase_metrics.reset()
+    return {"success": True, "message": "Métricas reiniciadas"}
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import services.Funciones_validar as fv
@@ -13,11 +13,17 @@ from models.permanencia import (
     TallerHabilidadesCreate, TallerHabilidadesResponse,
     SeguimientoAcademicoCreate, SeguimientoAcademicoResponse
 )
-from utils.responses import success_response, error_response, handle_exception
+from utils.responses import success_response, error_response, handle_exception, parse_fields
 
 router = APIRouter()
 service = PermanenciaService()
 
+# Descripción del parámetro fields de los listados de servicios de permanencia
+FIELDS_DESCRIPTION = (
+    "Columnas a retornar separadas por comas. Use estudiantes.<columna> para "
+    "las columnas del estudiante o estudiantes para incluirlo completo"
+)
+
 # Endpoints para Tutoría Académica (POA)
 
 @router.get("/tutoria", 
@@ -25,10 +31,13 @@ service = PermanenciaService()
           description="Retorna una lista de todas las tutorías académicas registradas",
           response_model=Dict[str, Any],
           tags=["Servicios de Permanencia"])
-async def get_tutorias_academicas():
+async def get_tutorias_academicas(
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+):
     """Obtiene todas las tutorías académicas."""
     try:
-        tutorias = service.get_all_tutorias()
+        columns, embedded = parse_fields(fields, ["estudiantes"])
+        tutorias = await service.get_all_tutorias(columns, embedded)
         return success_response(tutorias, "Tutorías académicas obtenidas exitosamente")
     except Exception as e:
         return handle_exception(e, "obtener tutorías académicas")
@@ -101,7 +110,7 @@ async def create_tutoria_academica(datos: Dict[str, Any]):
             return error_response("Faltan datos obligatorios", errores_criticos)
 
         # Crear tutoría
-        result = service.create_tutoria(datos)
+        result = await service.create_tutoria(datos)
         
         return success_response(result, "Tutoría académica registrada exitosamente")
     except Exception as e:
@@ -115,10 +124,13 @@ async def create_tutoria_academica(datos: Dict[str, Any]):
           description="Retorna una lista de todas las asesorías psicológicas registradas",
           response_model=Dict[str, Any],
           tags=["Servicios de Permanencia"])
-async def get_asesorias_psicologicas():
+async def get_asesorias_psicologicas(
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+):
     """Obtiene todas las asesorías psicológicas."""
     try:
-        asesorias = service.get_all_asesorias()
+        columns, embedded = parse_fields(fields, ["estudiantes"])
+        asesorias = await service.get_all_asesorias(columns, embedded)
         return success_response(asesorias, "Asesorías psicológicas obtenidas exitosamente")
     except Exception as e:
         return handle_exception(e, "obtener asesorías psicológicas")
@@ -138,7 +150,7 @@ async def create_asesoria_psicologica(datos: Dict[str, Any]):
             return error_response("Datos inválidos", errores)
 
         # Crear asesoría
-        result = service.create_asesoria(datos)
+        result = await service.create_asesoria(datos)
         
         return success_response(result, "Asesoría psicológica registrada exitosamente")
     except Exception as e:
@@ -151,10 +163,13 @@ async def create_asesoria_psicologica(datos: Dict[str, Any]):
           description="Retorna una lista de todas las orientaciones vocacionales registradas",
           response_model=Dict[str, Any],
           tags=["Servicios de Permanencia"])
-async def get_orientaciones_vocacionales():
+async def get_orientaciones_vocacionales(
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+):
     """Obtiene todas las orientaciones vocacionales."""
     try:
-        orientaciones = service.get_all_orientaciones()
+        columns, embedded = parse_fields(fields, ["estudiantes"])
+        orientaciones = await service.get_all_orientaciones(columns, embedded)
         return success_response(orientaciones, "Orientaciones vocacionales obtenidas exitosamente")
     except Exception as e:
         return handle_exception(e, "obtener orientaciones vocacionales")
@@ -174,7 +189,7 @@ async def create_orientacion_vocacional(datos: Dict[str, Any]):
             return error_response("Datos inválidos", errores)
 
         # Crear orientación
-        result = service.create_orientacion(datos)
+        result = await service.create_orientacion(datos)
         
         return success_response(result, "Orientación vocacional registrada exitosamente")
     except Exception as e:
@@ -187,10 +202,13 @@ async def create_orientacion_vocacional(datos: Dict[str, Any]):
           description="Retorna una lista de todos los registros de comedor universitario",
           response_model=Dict[str, Any],
           tags=["Servicios de Permanencia"])
-async def get_comedores_universitarios():
+async def get_comedores_universitarios(
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+):
     """Obtiene todos los registros de comedor universitario."""
     try:
-        comedores = service.get_all_comedores()
+        columns, embedded = parse_fields(fields, ["estudiantes"])
+        comedores = await service.get_all_comedores(columns, embedded)
         return success_response(comedores, "Registros de comedor universitario obtenidos exitosamente")
     except Exception as e:
         return handle_exception(e, "obtener registros de comedor universitario")
@@ -210,7 +228,7 @@ async def create_comedor_universitario(datos: Dict[str, Any]):
             return error_response("Datos inválidos", errores)
         
         # Crear registro de comedor
-        result = service.create_comedor(datos)
+        result = await service.create_comedor(datos)
         
         return success_response(result, "Registro de comedor universitario creado exitosamente")
     except Exception as e:
@@ -223,10 +241,13 @@ async def create_comedor_universitario(datos: Dict[str, Any]):
           description="Retorna una lista de todos los apoyos socioeconómicos registrados",
           response_model=Dict[str, Any],
           tags=["Servicios de Permanencia"])
-async def get_apoyos_socioeconomicos():
+async def get_apoyos_socioeconomicos(
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+):
     """Obtiene todos los apoyos socioeconómicos."""
     try:
-        apoyos = service.get_all_apoyos()
+        columns, embedded = parse_fields(fields, ["estudiantes"])
+        apoyos = await service.get_all_apoyos(columns, embedded)
         return success_response(apoyos, "Apoyos socioeconómicos obtenidos exitosamente")
     except Exception as e:
         return handle_exception(e, "obtener apoyos socioeconómicos")
@@ -246,7 +267,7 @@ async def create_apoyo_socioeconomico(datos: Dict[str, Any]):
             return error_response("Datos inválidos", errores)
 
         # Crear apoyo
-        result = service.create_apoyo(datos)
+        result = await service.create_apoyo(datos)
         
         return success_response(result, "Apoyo socioeconómico registrado exitosamente")
     except Exception as e:
@@ -259,10 +280,13 @@ async def create_apoyo_socioeconomico(datos: Dict[str, Any]):
           description="Retorna una lista de todos los talleres de habilidades registrados",
           response_model=Dict[str, Any],
           tags=["Servicios de Permanencia"])
-async def get_talleres_habilidades():
+async def get_talleres_habilidades(
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+):
     """Obtiene todos los talleres de habilidades."""
     try:
-        talleres = service.get_all_talleres()
+        columns, embedded = parse_fields(fields, ["estudiantes"])
+        talleres = await service.get_all_talleres(columns, embedded)
         return success_response(talleres, "Talleres de habilidades obtenidos exitosamente")
     except Exception as e:
         return handle_exception(e, "obtener talleres de habilidades")
@@ -283,7 +307,7 @@ async def create_taller_habilidades(datos: Dict[str, Any]):
             return error_response("Datos inválidos", errores)
 
         # Crear taller
-        result = service.create_taller(datos)
+        result = await service.create_taller(datos)
         
         return success_response(result, "Taller de habilidades registrado exitosamente")
     except Exception as e:
@@ -296,10 +320,13 @@ async def create_taller_habilidades(datos: Dict[str, Any]):
           description="Retorna una lista de todos los seguimientos académicos registrados",
           response_model=Dict[str, Any],
           tags=["Servicios de Permanencia"])
-async def get_seguimientos_academicos():
+async def get_seguimientos_academicos(
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+):
     """Obtiene todos los seguimientos académicos."""
     try:
-        seguimientos = service.get_all_seguimientos()
+        columns, embedded = parse_fields(fields, ["estudiantes"])
+        seguimientos = await service.get_all_seguimientos(columns, embedded)
         return success_response(seguimientos, "Seguimientos académicos obtenidos exitosamente")
     except Exception as e:
         return handle_exception(e, "obtener seguimientos académicos")
@@ -368,7 +395,7 @@ async def create_seguimiento_academico(datos: Dict[str, Any]):
             return error_response("Faltan datos obligatorios", errores_criticos)
         
         # Crear seguimiento
-        result = service.create_seguimiento(datos)
+        result = await service.create_seguimiento(datos)
         
         return success_response(result, "Seguimiento académico registrado exitosamente")
     except Exception as e:
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import re
@@ -8,7 +8,7 @@ from services.programas_service import ProgramasService
 from models.programas import (
     ProgramaCreate, ProgramaResponse, ProgramaUpdate
 )
-from utils.responses import success_response, error_response, handle_exception
+from utils.responses import success_response, error_response, handle_exception, parse_fields
 
 router = APIRouter()
 service = ProgramasService()
@@ -28,10 +28,13 @@ FACULTADES_UPC = [
           description="Retorna una lista de todos los programas académicos registrados",
           response_model=Dict[str, Any],
           tags=["Programas"])
-async def get_programas():
+async def get_programas(
+    fields: Optional[str] = Query(None, description="Columnas a retornar separadas por comas")
+):
     """Obtiene todos los programas académicos."""
     try:
-        programas = service.get_all_programas()
+        columns, _ = parse_fields(fields)
+        programas = await service.get_all_programas(columns)
         return success_response(programas, "Programas obtenidos exitosamente")
     except Exception as e:
         return handle_exception(e, "obtener programas")
@@ -82,7 +85,7 @@ async def create_programa(datos: Dict[str, Any]):
 
         
         # Crear programa
-        result = service.create_programa(datos)
+        result = await service.create_programa(datos)
         
         return success_response(result, "Programa registrado exitosamente")
     except ValueError as ve:
@@ -1,12 +1,16 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from typing import List, Dict, Any, Optional
 from datetime import datetime, date
 from pydantic import BaseModel, Field
 
-from config import supabase
-from utils.responses import success_response, error_response, handle_exception
+from config import supabase_async, DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT
+from data.base_data import BaseData
+from data.cache import invalidate_table
+from data.estudiantes_data import EstudiantesLoader, get_estudiantes_loader
+from utils.responses import success_response, error_response, handle_exception, paged_list_response, parse_fields
 
 router = APIRouter()
+remisiones_data = BaseData("remisiones_psicologicas")
 
 # Modelo para crear una remisión psicológica
 class RemisionPsicologicaCreate(BaseModel):
@@ -28,11 +32,20 @@ class RemisionPsicologicaCreate(BaseModel):
           summary="Obtener todas las remisiones psicológicas",
           description="Retorna una lista de todas las remisiones psicológicas registradas",
           response_model=List[Dict[str, Any]])
-async def get_remisiones_psicologicas():
+async def get_remisiones_psicologicas(
+    http_response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="Número máximo de remisiones por página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en la cabecera X-Next-Cursor por la página anterior"),
+    fields: Optional[str] = Query(None, description="Columnas a retornar separadas por comas")
+):
     """Obtiene todas las remisiones psicológicas."""
     try:
-        response = supabase.table("remisiones_psicologicas").select("*").execute()
-        return response.data
+        columns, _ = parse_fields(fields)
+        if limit is not None or cursor is not None:
+            registros, next_cursor = await remisiones_data.get_page(limit or DEFAULT_PAGE_LIMIT, cursor, columns)
+            return paged_list_response(http_response, registros, next_cursor)
+        
+        return await remisiones_data.get_all(columns)
     except Exception as e:
         return handle_exception(e, "obtener remisiones psicológicas")
 
@@ -43,7 +56,7 @@ async def get_remisiones_psicologicas():
 async def get_remision_psicologica(id: str):
     """Obtiene una remisión psicológica por su ID."""
     try:
-        response = supabase.table("remisiones_psicologicas").select("*").eq("id", id).execute()
+        response = await supabase_async.table("remisiones_psicologicas").select("*").eq("id", id).execute()
         if not response.data:
             return error_response(f"Remisión psicológica con ID {id} no encontrada", "Remisión no encontrada", 404)
         
@@ -55,7 +68,7 @@ async def get_remision_psicologica(id: str):
            summary="Crear una nueva remisión psicológica",
            description="Registra una nueva remisión psicológica",
            response_model=Dict[str, Any])
-async def create_remision_psicologica(remision: RemisionPsicologicaCreate):
+async def create_remision_psicologica(remision: RemisionPsicologicaCreate, estudiantes_loader: EstudiantesLoader = Depends(get_estudiantes_loader)):
     """Crea una nueva remisión psicológica."""
     try:
         # Convertir el modelo Pydantic a diccionario
@@ -74,9 +87,9 @@ async def create_remision_psicologica(remision: RemisionPsicologicaCreate):
             print(f"Estableciendo programa_academico por defecto: {remision_dict['programa_academico']}")
             
         # Buscar estudiante por número de documento
-        estudiante = supabase.table("estudiantes").select("id").eq("documento", remision_dict["numero_documento"]).execute()
-        if estudiante.data and len(estudiante.data) > 0:
-            remision_dict["estudiante_id"] = estudiante.data[0]["id"]
+        estudiante = await estudiantes_loader.load_by_documento(remision_dict["numero_documento"])
+        if estudiante:
+            remision_dict["estudiante_id"] = estudiante["id"]
             print(f"Estudiante encontrado con ID: {remision_dict['estudiante_id']}")
         else:
             # Si no se encuentra el estudiante, establecer estudiante_id como NULL
@@ -95,7 +108,8 @@ async def create_remision_psicologica(remision: RemisionPsicologicaCreate):
         print(f"Remisión a insertar: {remision_dict}")
         
         # Insertar en la base de datos
-        response = supabase.table("remisiones_psicologicas").insert(remision_dict).execute()
+        response = await supabase_async.table("remisiones_psicologicas").insert(remision_dict).execute()
+        invalidate_table("remisiones_psicologicas")
         
         if response.data and len(response.data) > 0:
             return success_response(response.data[0], "Remisión psicológica registrada exitosamente")
@@ -115,7 +129,7 @@ async def update_remision_psicologica(id: str, remision: Dict[str, Any]):
     """Actualiza una remisión psicológica existente."""
     try:
         # Verificar si la remisión existe
-        check_response = supabase.table("remisiones_psicologicas").select("*").eq("id", id).execute()
+        check_response = await supabase_async.table("remisiones_psicologicas").select("*").eq("id", id).execute()
         if not check_response.data:
             return error_response(f"Remisión psicológica con ID {id} no encontrada", "Remisión no encontrada", 404)
         
@@ -123,7 +137,8 @@ async def update_remision_psicologica(id: str, remision: Dict[str, Any]):
         remision["updated_at"] = datetime.now().isoformat()
         
         # Actualizar remisión
-        response = supabase.table("remisiones_psicologicas").update(remision).eq("id", id).execute()
+        response = await supabase_async.table("remisiones_psicologicas").update(remision).eq("id", id).execute()
+        invalidate_table("remisiones_psicologicas")
         
         return success_response(response.data[0], "Remisión psicológica actualizada exitosamente")
     except Exception as e:
@@ -137,12 +152,13 @@ async def delete_remision_psicologica(id: str):
     """Elimina una remisión psicológica existente."""
     try:
         # Verificar si la remisión existe
-        check_response = supabase.table("remisiones_psicologicas").select("*").eq("id", id).execute()
+        check_response = await supabase_async.table("remisiones_psicologicas").select("*").eq("id", id).execute()
         if not check_response.data:
             return error_response(f"Remisión psicológica con ID {id} no encontrada", "Remisión no encontrada", 404)
         
         # Eliminar remisión
-        response = supabase.table("remisiones_psicologicas").delete().eq("id", id).execute()
+        response = await supabase_async.table("remisiones_psicologicas").delete().eq("id", id).execute()
+        invalidate_table("remisiones_psicologicas")
         
         return success_response({"id": id}, "Remisión psicológica eliminada exitosamente")
     except Exception as e:
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import re
@@ -11,11 +11,23 @@ from models.servicios import (
     ServicioCreate, ServicioResponse, ServicioUpdate,
     AsistenciaBase, AsistenciaCreate, AsistenciaResponse
 )
-from utils.responses import success_response, error_response, handle_exception
+from utils.responses import success_response, error_response, handle_exception, paged_list_response, parse_fields
+from data.base_data import BaseData
+from data.cache import invalidate_table
+from data.estudiantes_data import EstudiantesLoader, get_estudiantes_loader
+from config import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT
 
 router = APIRouter()
 service = ServiciosService()
 
+# Acceso a datos de las tablas consultadas directamente desde este router
+software_solicitudes_data = BaseData("software_solicitudes")
+software_estudiantes_data = BaseData("software_estudiantes")
+asistencias_actividades_data = BaseData("asistencias_actividades")
+fichas_docente_data = BaseData("fichas_docente")
+intervenciones_grupales_data = BaseData("intervenciones_grupales")
+remisiones_psicologicas_data = BaseData("remisiones_psicologicas")
+
 FACULTADES_UPC = [
     "Facultad Ciencias Administrativas contables y económicas",
     "Facultad de bellas artes",
@@ -30,14 +42,23 @@ TIPOS_VALIDOS = ["Psicologia", "Tutoria", "Orientación", "Acompañamiento", "Se
 # Endpoints para Servicios
 @router.get("/servicios", 
           summary="Obtener todos los servicios",
-          description="Retorna una lista de todos los servicios registrados",
+          description="Retorna una lista de todos los servicios registrados. Con limit o cursor retorna una página y el cursor de la siguiente en next_cursor",
           response_model=Dict[str, Any],
           tags=["Servicios"])
-async def get_servicios():
+async def get_servicios(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="Número máximo de servicios por página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en next_cursor por la página anterior"),
+    fields: Optional[str] = Query(None, description="Columnas a retornar separadas por comas")
+):
     """Obtiene todos los servicios."""
     try:
-        servicios = service.get_all_servicios()
-        return success_response(servicios, "Servicios obtenidos exitosamente")
+        columns, _ = parse_fields(fields)
+        if limit is None and cursor is None:
+            servicios = await service.get_all_servicios(columns)
+            return success_response(servicios, "Servicios obtenidos exitosamente")
+        
+        servicios, next_cursor = await service.get_servicios_page(limit or DEFAULT_PAGE_LIMIT, cursor, columns)
+        return success_response(servicios, "Servicios obtenidos exitosamente", next_cursor)
     except Exception as e:
         return handle_exception(e, "obtener servicios")
 
@@ -96,7 +117,7 @@ async def create_servicio(datos: Dict[str, Any]):
             return error_response(f"El tipo debe ser uno de: {', '.join(TIPOS_VALIDOS)}", "Tipo inválido")
     
         # Crear servicio
-        result = service.create_servicio(datos)
+        result = await service.create_servicio(datos)
         
         return success_response(result, "Servicio registrado exitosamente")
     except Exception as e:
@@ -107,14 +128,23 @@ async def create_servicio(datos: Dict[str, Any]):
 # Endpoints para Asistencias
 @router.get("/asistencias", 
           summary="Obtener todas las asistencias",
-          description="Retorna una lista de todas las asistencias registradas",
+          description="Retorna una lista de todas las asistencias registradas. Con limit o cursor retorna una página y el cursor de la siguiente en next_cursor",
           response_model=Dict[str, Any],
           tags=["Asistencias"])
-async def get_asistencias():
+async def get_asistencias(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="Número máximo de asistencias por página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en next_cursor por la página anterior"),
+    fields: Optional[str] = Query(None, description="Columnas a retornar separadas por comas")
+):
     """Obtiene todas las asistencias."""
     try:
-        asistencias = service.asistencias_data.get_all()
-        return success_response(asistencias, "Asistencias obtenidas exitosamente")
+        columns, _ = parse_fields(fields)
+        if limit is None and cursor is None:
+            asistencias = await service.get_all_asistencias(columns)
+            return success_response(asistencias, "Asistencias obtenidas exitosamente")
+        
+        asistencias, next_cursor = await service.get_asistencias_page(limit or DEFAULT_PAGE_LIMIT, cursor, columns)
+        return success_response(asistencias, "Asistencias obtenidas exitosamente", next_cursor)
     except Exception as e:
         return handle_exception(e, "obtener asistencias")
 
@@ -187,7 +217,7 @@ async def create_asistencia(datos: Dict[str, Any]):
                 return error_response("Las observaciones no deben superar los 255 caracteres", "Observaciones demasiado largas")
 
         # Crear asistencia
-        result = service.create_asistencia(datos)
+        result = await service.create_asistencia(datos)
         
         return success_response(result, "Asistencia registrada exitosamente")
     except Exception as e:
@@ -203,12 +233,22 @@ async def create_asistencia(datos: Dict[str, Any]):
           description="Retorna una lista de todas las solicitudes de software registradas",
           response_model=List[Dict[str, Any]],
           tags=["Software Solicitudes"])
-async def get_software_solicitudes():
+async def get_software_solicitudes(
+    http_response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="Número máximo de registros por página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en la cabecera X-Next-Cursor por la página anterior"),
+    fields: Optional[str] = Query(None, description="Columnas a retornar separadas por comas")
+):
     """Obtiene todas las solicitudes de software."""
     try:
-        from config import supabase
-        response = supabase.table("software_solicitudes").select("*").execute()
-        return response.data
+        columns, _ = parse_fields(fields)
+        if limit is not None or cursor is not None:
+            registros, next_cursor = await software_solicitudes_data.get_page(limit or DEFAULT_PAGE_LIMIT, cursor, columns)
+            return paged_list_response(http_response, registros, next_cursor)
+        
+        return await software_solicitudes_data.get_all(columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"Error al obtener solicitudes de software: {e}")
         raise HTTPException(status_code=500, detail=f"Error al obtener solicitudes de software: {str(e)}")
@@ -221,8 +261,8 @@ async def get_software_solicitudes():
 async def get_software_solicitud(id: str):
     """Obtiene una solicitud de software por su ID."""
     try:
-        from config import supabase
-        response = supabase.table("software_solicitudes").select("*").eq("id", id).execute()
+        from config import supabase_async
+        response = await supabase_async.table("software_solicitudes").select("*").eq("id", id).execute()
         if not response.data:
             return error_response(f"Solicitud de software con ID {id} no encontrada", "Solicitud no encontrada", 404)
         
@@ -238,7 +278,7 @@ async def get_software_solicitud(id: str):
 async def create_software_solicitud(solicitud: Dict[str, Any]):
     """Crea una nueva solicitud de software."""
     try:
-        from config import supabase
+        from config import supabase_async
         from datetime import datetime
         
         print(f"Datos recibidos para solicitud de software: {solicitud}")
@@ -291,7 +331,8 @@ async def create_software_solicitud(solicitud: Dict[str, Any]):
         
         # Insertar la solicitud en la base de datos
         try:
-            response = supabase.table("software_solicitudes").insert(solicitud_filtrada).execute()
+            response = await supabase_async.table("software_solicitudes").insert(solicitud_filtrada).execute()
+            invalidate_table("software_solicitudes")
             print(f"Respuesta de la base de datos: {response.data}")
             
             if response.data and len(response.data) > 0:
@@ -318,10 +359,10 @@ async def create_software_solicitud(solicitud: Dict[str, Any]):
 async def update_software_solicitud(id: str, datos: Dict[str, Any]):
     """Actualiza una solicitud de software existente."""
     try:
-        from config import supabase
+        from config import supabase_async
         
         # Verificar si la solicitud existe
-        check_response = supabase.table("software_solicitudes").select("*").eq("id", id).execute()
+        check_response = await supabase_async.table("software_solicitudes").select("*").eq("id", id).execute()
         if not check_response.data:
             return error_response(f"Solicitud de software con ID {id} no encontrada", "Solicitud no encontrada", 404)
         
@@ -329,7 +370,8 @@ async def update_software_solicitud(id: str, datos: Dict[str, Any]):
         datos["updated_at"] = datetime.now().isoformat()
         
         # Actualizar solicitud
-        response = supabase.table("software_solicitudes").update(datos).eq("id", id).execute()
+        response = await supabase_async.table("software_solicitudes").update(datos).eq("id", id).execute()
+        invalidate_table("software_solicitudes")
         
         return success_response(response.data[0], "Solicitud de software actualizada exitosamente")
     except Exception as e:
@@ -343,15 +385,16 @@ async def update_software_solicitud(id: str, datos: Dict[str, Any]):
 async def delete_software_solicitud(id: str):
     """Elimina una solicitud de software existente."""
     try:
-        from config import supabase
+        from config import supabase_async
         
         # Verificar si la solicitud existe
-        check_response = supabase.table("software_solicitudes").select("*").eq("id", id).execute()
+        check_response = await supabase_async.table("software_solicitudes").select("*").eq("id", id).execute()
         if not check_response.data:
             return error_response(f"Solicitud de software con ID {id} no encontrada", "Solicitud no encontrada", 404)
         
         # Eliminar solicitud
-        response = supabase.table("software_solicitudes").delete().eq("id", id).execute()
+        response = await supabase_async.table("software_solicitudes").delete().eq("id", id).execute()
+        invalidate_table("software_solicitudes")
         
         return success_response({"id": id}, "Solicitud de software eliminada exitosamente")
     except Exception as e:
@@ -363,12 +406,22 @@ async def delete_software_solicitud(id: str):
           description="Retorna una lista de todos los estudiantes de software registrados",
           response_model=List[Dict[str, Any]],
           tags=["Software Estudiantes"])
-async def get_software_estudiantes():
+async def get_software_estudiantes(
+    http_response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="Número máximo de registros por página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en la cabecera X-Next-Cursor por la página anterior"),
+    fields: Optional[str] = Query(None, description="Columnas a retornar separadas por comas")
+):
     """Obtiene todos los estudiantes de software."""
     try:
-        from config import supabase
-        response = supabase.table("software_estudiantes").select("*").execute()
-        return response.data
+        columns, _ = parse_fields(fields)
+        if limit is not None or cursor is not None:
+            registros, next_cursor = await software_estudiantes_data.get_page(limit or DEFAULT_PAGE_LIMIT, cursor, columns)
+            return paged_list_response(http_response, registros, next_cursor)
+        
+        return await software_estudiantes_data.get_all(columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"Error al obtener estudiantes de software: {e}")
         raise HTTPException(status_code=500, detail=f"Error al obtener estudiantes de software: {str(e)}")
@@ -381,7 +434,7 @@ async def get_software_estudiantes():
 async def create_software_estudiante(estudiante: Dict[str, Any]):
     """Crea un nuevo estudiante de software."""
     try:
-        from config import supabase
+        from config import supabase_async
         import uuid
         
         print("\n\n===== DATOS RECIBIDOS DEL FRONTEND =====")
@@ -400,7 +453,7 @@ async def create_software_estudiante(estudiante: Dict[str, Any]):
                 try:
                     nombre_proyecto = estudiante["solicitud_id"]
                     print(f"Buscando solicitud con nombre: {nombre_proyecto}")
-                    solicitud = supabase.table("software_solicitudes").select("id").eq("nombre_proyecto", nombre_proyecto).execute()
+                    solicitud = await supabase_async.table("software_solicitudes").select("id").eq("nombre_proyecto", nombre_proyecto).execute()
                     if solicitud.data and len(solicitud.data) > 0:
                         estudiante["solicitud_id"] = solicitud.data[0]["id"]
                         print(f"Encontrada solicitud con ID: {estudiante['solicitud_id']}")
@@ -460,7 +513,8 @@ async def create_software_estudiante(estudiante: Dict[str, Any]):
         
         # Insertar el estudiante filtrado
         print("\n===== INTENTANDO INSERTAR EN LA BASE DE DATOS =====")
-        response = supabase.table("software_estudiantes").insert(estudiante_filtrado).execute()
+        response = await supabase_async.table("software_estudiantes").insert(estudiante_filtrado).execute()
+        invalidate_table("software_estudiantes")
         print(f"Respuesta de la base de datos: {response.data}")
         
         if response.data and len(response.data) > 0:
@@ -489,12 +543,22 @@ async def create_software_estudiante(estudiante: Dict[str, Any]):
           description="Retorna una lista de todas las asistencias a actividades registradas",
           response_model=List[Dict[str, Any]],
           tags=["Asistencias a Actividades"])
-async def get_asistencias_actividades():
+async def get_asistencias_actividades(
+    http_response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="Número máximo de registros por página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en la cabecera X-Next-Cursor por la página anterior"),
+    fields: Optional[str] = Query(None, description="Columnas a retornar separadas por comas")
+):
     """Obtiene todas las asistencias a actividades."""
     try:
-        from config import supabase
-        response = supabase.table("asistencias_actividades").select("*").execute()
-        return response.data
+        columns, _ = parse_fields(fields)
+        if limit is not None or cursor is not None:
+            registros, next_cursor = await asistencias_actividades_data.get_page(limit or DEFAULT_PAGE_LIMIT, cursor, columns)
+            return paged_list_response(http_response, registros, next_cursor)
+        
+        return await asistencias_actividades_data.get_all(columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"Error al obtener asistencias a actividades: {e}")
         raise HTTPException(status_code=500, detail=f"Error al obtener asistencias a actividades: {str(e)}")
@@ -504,10 +568,10 @@ async def get_asistencias_actividades():
            description="Registra una nueva asistencia a actividad",
            response_model=Dict[str, Any],
            tags=["Asistencias a Actividades"])
-async def create_asistencia_actividad(asistencia: Dict[str, Any]):
+async def create_asistencia_actividad(asistencia: Dict[str, Any], estudiantes_loader: EstudiantesLoader = Depends(get_estudiantes_loader)):
     """Crea una nueva asistencia a actividad."""
     try:
-        from config import supabase
+        from config import supabase_async
         
         print(f"Datos recibidos para asistencia a actividad: {asistencia}")
         
@@ -517,9 +581,9 @@ async def create_asistencia_actividad(asistencia: Dict[str, Any]):
         
         # Buscar estudiante por número de documento si está disponible
         if "numero_documento" in asistencia and "estudiante_id" not in asistencia:
-            estudiante = supabase.table("estudiantes").select("id").eq("documento", asistencia["numero_documento"]).execute()
-            if estudiante.data and len(estudiante.data) > 0:
-                asistencia["estudiante_id"] = estudiante.data[0]["id"]
+            estudiante = await estudiantes_loader.load_by_documento(asistencia["numero_documento"])
+            if estudiante:
+                asistencia["estudiante_id"] = estudiante["id"]
                 print(f"Estudiante encontrado con ID: {asistencia['estudiante_id']}")
             else:
                 # Si no se encuentra el estudiante, establecer estudiante_id como NULL
@@ -551,7 +615,8 @@ async def create_asistencia_actividad(asistencia: Dict[str, Any]):
         print(f"Asistencia filtrada: {asistencia_filtrada}")
         
         # Insertar en la base de datos
-        response = supabase.table("asistencias_actividades").insert(asistencia_filtrada).execute()
+        response = await supabase_async.table("asistencias_actividades").insert(asistencia_filtrada).execute()
+        invalidate_table("asistencias_actividades")
         print(f"Respuesta de la base de datos: {response.data}")
         
         if response.data and len(response.data) > 0:
@@ -568,12 +633,22 @@ async def create_asistencia_actividad(asistencia: Dict[str, Any]):
            description="Retorna una lista de todas las remisiones psicológicas registradas",
            response_model=List[Dict[str, Any]],
            tags=["Remisiones Psicológicas"])
-async def get_remisiones_psicologicas():
+async def get_remisiones_psicologicas(
+    http_response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="Número máximo de registros por página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en la cabecera X-Next-Cursor por la página anterior"),
+    fields: Optional[str] = Query(None, description="Columnas a retornar separadas por comas")
+):
     """Obtiene todas las remisiones psicológicas."""
     try:
-        from config import supabase
-        response = supabase.table("remisiones_psicologicas").select("*").execute()
-        return response.data
+        columns, _ = parse_fields(fields)
+        if limit is not None or cursor is not None:
+            registros, next_cursor = await remisiones_psicologicas_data.get_page(limit or DEFAULT_PAGE_LIMIT, cursor, columns)
+            return paged_list_response(http_response, registros, next_cursor)
+        
+        return await remisiones_psicologicas_data.get_all(columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"Error al obtener remisiones psicológicas: {e}")
         raise HTTPException(status_code=500, detail=f"Error al obtener remisiones psicológicas: {str(e)}")
@@ -583,10 +658,10 @@ async def get_remisiones_psicologicas():
            description="Registra una nueva remisión psicológica",
            response_model=Dict[str, Any],
            tags=["Remisiones Psicológicas"])
-async def create_remision_psicologica(remision: Dict[str, Any]):
+async def create_remision_psicologica(remision: Dict[str, Any], estudiantes_loader: EstudiantesLoader = Depends(get_estudiantes_loader)):
     """Crea una nueva remisión psicológica."""
     try:
-        from config import supabase
+        from config import supabase_async
         from datetime import datetime
         
         print(f"Datos recibidos para remisión psicológica: {remision}")
@@ -603,9 +678,9 @@ async def create_remision_psicologica(remision: Dict[str, Any]):
         
         # Buscar estudiante por número de documento si está disponible
         if "numero_documento" in remision and "estudiante_id" not in remision:
-            estudiante = supabase.table("estudiantes").select("id").eq("documento", remision["numero_documento"]).execute()
-            if estudiante.data and len(estudiante.data) > 0:
-                remision["estudiante_id"] = estudiante.data[0]["id"]
+            estudiante = await estudiantes_loader.load_by_documento(remision["numero_documento"])
+            if estudiante:
+                remision["estudiante_id"] = estudiante["id"]
                 print(f"Estudiante encontrado con ID: {remision['estudiante_id']}")
             else:
                 # Si no se encuentra el estudiante, establecer estudiante_id como NULL
@@ -634,7 +709,8 @@ async def create_remision_psicologica(remision: Dict[str, Any]):
         
         # Insertar en la base de datos
         try:
-            response = supabase.table("remisiones_psicologicas").insert(remision_filtrada).execute()
+            response = await supabase_async.table("remisiones_psicologicas").insert(remision_filtrada).execute()
+            invalidate_table("remisiones_psicologicas")
             print(f"Respuesta de la base de datos: {response.data}")
             
             if response.data and len(response.data) > 0:
@@ -657,12 +733,22 @@ async def create_remision_psicologica(remision: Dict[str, Any]):
           description="Retorna una lista de todas las fichas docente registradas",
           response_model=List[Dict[str, Any]],
           tags=["Fichas Docente"])
-async def get_fichas_docente():
+async def get_fichas_docente(
+    http_response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="Número máximo de registros por página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en la cabecera X-Next-Cursor por la página anterior"),
+    fields: Optional[str] = Query(None, description="Columnas a retornar separadas por comas")
+):
     """Obtiene todas las fichas docente."""
     try:
-        from config import supabase
-        response = supabase.table("fichas_docente").select("*").execute()
-        return response.data
+        columns, _ = parse_fields(fields)
+        if limit is not None or cursor is not None:
+            registros, next_cursor = await fichas_docente_data.get_page(limit or DEFAULT_PAGE_LIMIT, cursor, columns)
+            return paged_list_response(http_response, registros, next_cursor)
+        
+        return await fichas_docente_data.get_all(columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"Error al obtener fichas docente: {e}")
         raise HTTPException(status_code=500, detail=f"Error al obtener fichas docente: {str(e)}")
@@ -675,7 +761,7 @@ async def get_fichas_docente():
 async def create_ficha_docente(ficha: Dict[str, Any]):
     """Crea una nueva ficha docente."""
     try:
-        from config import supabase
+        from config import supabase_async
         import re
         from datetime import datetime
         
@@ -696,13 +782,13 @@ async def create_ficha_docente(ficha: Dict[str, Any]):
         # Verificar duplicados solo si no es una actualización
         if not ficha.get("id"):
             # Verificar duplicado por documento
-            existe_doc = supabase.table("fichas_docente").select("id").eq("documento_identidad", doc).execute()
+            existe_doc = await supabase_async.table("fichas_docente").select("id").eq("documento_identidad", doc).execute()
             if existe_doc.data and len(existe_doc.data) > 0:
                 print(f"Ya existe una ficha con documento {doc}: {existe_doc.data}")
                 return error_response("Ya existe una ficha docente con este número de documento", "Documento duplicado")
             
             # Verificar duplicado de correo institucional
-            existe_correo = supabase.table("fichas_docente").select("id").eq("correo_institucional", correo).execute()
+            existe_correo = await supabase_async.table("fichas_docente").select("id").eq("correo_institucional", correo).execute()
             if existe_correo.data and len(existe_correo.data) > 0:
                 print(f"Ya existe una ficha con correo {correo}: {existe_correo.data}")
                 return error_response("Ya existe una ficha docente con este correo institucional", "Correo duplicado")
@@ -732,7 +818,8 @@ async def create_ficha_docente(ficha: Dict[str, Any]):
         
         # Insertar en la base de datos
         try:
-            response = supabase.table("fichas_docente").insert(ficha_filtrada).execute()
+            response = await supabase_async.table("fichas_docente").insert(ficha_filtrada).execute()
+            invalidate_table("fichas_docente")
             print(f"Respuesta de la base de datos: {response.data}")
             
             if response.data and len(response.data) > 0:
@@ -756,12 +843,22 @@ async def create_ficha_docente(ficha: Dict[str, Any]):
           description="Retorna una lista de todas las intervenciones grupales registradas",
           response_model=List[Dict[str, Any]],
           tags=["Intervenciones Grupales"])
-async def get_intervenciones_grupales():
+async def get_intervenciones_grupales(
+    http_response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="Número máximo de registros por página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en la cabecera X-Next-Cursor por la página anterior"),
+    fields: Optional[str] = Query(None, description="Columnas a retornar separadas por comas")
+):
     """Obtiene todas las intervenciones grupales."""
     try:
-        from config import supabase
-        response = supabase.table("intervenciones_grupales").select("*").execute()
-        return response.data
+        columns, _ = parse_fields(fields)
+        if limit is not None or cursor is not None:
+            registros, next_cursor = await intervenciones_grupales_data.get_page(limit or DEFAULT_PAGE_LIMIT, cursor, columns)
+            return paged_list_response(http_response, registros, next_cursor)
+        
+        return await intervenciones_grupales_data.get_all(columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"Error al obtener intervenciones grupales: {e}")
         raise HTTPException(status_code=500, detail=f"Error al obtener intervenciones grupales: {str(e)}")
@@ -774,6 +871,7 @@ async def get_intervenciones_grupales():
 async def create_intervencion_grupal(datos: Dict[str, Any]):
     """Crea una nueva intervención grupal."""
     try:
+        from config import supabase_async
         import re
 
         # Campos requeridos
@@ -854,7 +952,8 @@ async def create_intervencion_grupal(datos: Dict[str, Any]):
         datos["updated_at"] = now
 
         # Insertar en base de datos
-        result = supabase.table("intervenciones_grupales").insert(datos).execute()
+        result = await supabase_async.table("intervenciones_grupales").insert(datos).execute()
+        invalidate_table("intervenciones_grupales")
 
         if not result.data:
             return error_response("Error al crear la intervención grupal", "No se insertaron datos")
@@ -874,8 +973,8 @@ async def create_intervencion_grupal(datos: Dict[str, Any]):
 async def get_remisiones_psicologicas():
     """Obtiene todas las remisiones psicológicas."""
     try:
-        from config import supabase
-        response = supabase.table("remisiones_psicologicas").select("*").execute()
+        from config import supabase_async
+        response = await supabase_async.table("remisiones_psicologicas").select("*").execute()
         return response.data
     except Exception as e:
         print(f"Error al obtener remisiones psicológicas: {e}")
@@ -886,10 +985,10 @@ async def get_remisiones_psicologicas():
            description="Registra una nueva remisión psicológica",
            response_model=Dict[str, Any],
            tags=["Remisiones Psicológicas"])
-async def create_remision_psicologica(remision: Dict[str, Any]):
+async def create_remision_psicologica(remision: Dict[str, Any], estudiantes_loader: EstudiantesLoader = Depends(get_estudiantes_loader)):
     """Crea una nueva remisión psicológica."""
     try:
-        from config import supabase
+        from config import supabase_async
         # Manejar el campo estudiante_programa_academico_academico
         if "estudiante_programa_academico_academico" in remision:
             # Asegurarse de que también exista el campo estudiante_programa_academico
@@ -897,9 +996,9 @@ async def create_remision_psicologica(remision: Dict[str, Any]):
         
         # Buscar estudiante por número de documento si está disponible
         if "numero_documento" in remision and "estudiante_id" not in remision:
-            estudiante = supabase.table("estudiantes").select("id").eq("documento", remision["numero_documento"]).execute()
-            if estudiante.data and len(estudiante.data) > 0:
-                remision["estudiante_id"] = estudiante.data[0]["id"]
+            estudiante = await estudiantes_loader.load_by_documento(remision["numero_documento"])
+            if estudiante:
+                remision["estudiante_id"] = estudiante["id"]
             else:
                 # Si no se encuentra el estudiante, establecer estudiante_id como NULL
                 remision["estudiante_id"] = None
@@ -929,7 +1028,8 @@ async def create_remision_psicologica(remision: Dict[str, Any]):
         print(f"Remisión filtrada: {remision_filtrada}")
         
         # Insertar la remisión filtrada
-        response = supabase.table("remisiones_psicologicas").insert(remision_filtrada).execute()
+        response = await supabase_async.table("remisiones_psicologicas").insert(remision_filtrada).execute()
+        invalidate_table("remisiones_psicologicas")
         return response.data[0]
     except Exception as e:
         print(f"Error al crear remisión psicológica: {e}")
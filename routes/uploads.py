@@ -1,15 +1,19 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File
 from typing import Dict, Any, List
 import io
-import pandas as pd
 import uuid
 import traceback
 from datetime import datetime
 
-from config import supabase
+from config import supabase_async
+from data.cache import invalidate_table
+from data.estudiantes_data import EstudiantesLoader
+from services.estadisticas_service import get_contadores_permanencia
 
 # Función para convertir fechas de formato DD-MM-YYYY a YYYY-MM-DD
 def convert_date_format(date_str):
+    import pandas as pd
+    
     if not date_str or pd.isna(date_str):
         return None
     try:
@@ -35,6 +39,9 @@ router = APIRouter()
           description="Permite cargar datos masivamente desde un archivo CSV para diferentes entidades del sistema")
 async def upload_csv(file: UploadFile = File(...), tipo: str = None):
     """Carga datos desde un archivo CSV."""
+    # pandas se importa en el primer uso para no retrasar el arranque del servidor
+    import pandas as pd
+    
     try:
         print(f"Recibiendo archivo CSV: {file.filename}, tipo: {tipo}")
         
@@ -60,7 +67,7 @@ async def upload_csv(file: UploadFile = File(...), tipo: str = None):
             # Primero verificar la estructura de la tabla estudiantes
             try:
                 # Verificar si la tabla estudiantes existe y tiene las columnas necesarias
-                table_info = supabase.table("estudiantes").select("*").limit(1).execute()
+                table_info = await supabase_async.table("estudiantes").select("*").limit(1).execute()
                 
                 # Si llegamos aquí, la tabla existe, pero necesitamos verificar sus columnas
                 # Esto lo haremos indirectamente intentando obtener la estructura
@@ -80,101 +87,118 @@ async def upload_csv(file: UploadFile = File(...), tipo: str = None):
                 # Podría ser que la tabla no existe o hay otro problema
                 columnas_disponibles = ["id", "documento", "tipo_documento", "nombres", "apellidos", "correo", "programa_academico", "semestre"]
             
+            # Resolver de una vez los estudiantes existentes de todas las filas
+            estudiantes_loader = EstudiantesLoader()
+            documentos = [str(documento) for documento in df["estudiante_numero_documento"].dropna()]
+            existentes = await estudiantes_loader.load_many("documento", documentos)
+            estudiantes_ids = {documento: estudiante["id"] for documento, estudiante in zip(documentos, existentes) if estudiante}
+            
+            # Preparar los estudiantes que no existen (uno por documento)
+            nuevos_estudiantes = {}
+            fallos_estudiantes = {}
+            programas_ids = {}
+            for index, row in df.iterrows():
+                documento = str(row["estudiante_numero_documento"]) if pd.notna(row["estudiante_numero_documento"]) else None
+                if not documento or documento in estudiantes_ids or documento in nuevos_estudiantes or documento in fallos_estudiantes:
+                    continue
+                programa_academico = str(row["estudiante_programa_academico"]) if pd.notna(row["estudiante_programa_academico"]) else None
+                
+                try:
+                    # Primero, buscar o crear el programa
+                    programa_id = programas_ids.get(programa_academico)
+                    if programa_academico and programa_id is None:
+                        programa = await supabase_async.table("programas").select("id").eq("nombre", programa_academico).execute()
+                        if programa.data and len(programa.data) > 0:
+                            programa_id = programa.data[0]["id"]
+                        else:
+                            # Crear un nuevo programa
+                            nuevo_programa = {
+                                "nombre": programa_academico,
+                                "facultad": "Sin asignar",
+                                "codigo": f"PROG-{len(programa_academico)}-{str(uuid.uuid4())[:8]}",
+                                "nivel": "Pregrado"  # Valor por defecto para el campo obligatorio
+                            }
+                            programa_response = await supabase_async.table("programas").insert(nuevo_programa).execute()
+                            invalidate_table("programas")
+                            programa_id = programa_response.data[0]["id"]
+                        programas_ids[programa_academico] = programa_id
+                except Exception as e:
+                    print(f"Error en fila {index+1}: {e}")
+                    fallos_estudiantes[documento] = str(e)
+                    continue
+                
+                # Crear el estudiante - Usar solo campos que sabemos que existen
+                # Extraer el semestre si está disponible en el CSV
+                semestre = None
+                if "estudiante_semestre" in row and pd.notna(row["estudiante_semestre"]):
+                    try:
+                        semestre = int(row["estudiante_semestre"])
+                    except:
+                        semestre = 1
+                else:
+                    semestre = 1  # Valor por defecto
+                    
+                estudiante_data = {
+                    "documento": documento,
+                    "tipo_documento": "CC",  # Valor por defecto
+                    "nombres": f"Estudiante {documento}",  # Siempre proporcionar un valor para nombres
+                    "apellidos": f"Apellido {documento}",   # Siempre proporcionar un valor para apellidos
+                    "correo": f"{documento}@ejemplo.com",   # Siempre proporcionar un valor para correo
+                    "programa_academico": programa_academico or "Programa no especificado",  # Siempre proporcionar un valor para programa_academico
+                    "semestre": semestre  # Siempre proporcionar un valor para semestre
+                }
+                
+                # Agregar programa_id si existe la columna
+                if "programa_id" in columnas_disponibles and programa_id:
+                    estudiante_data["programa_id"] = programa_id
+                
+                # Agregar campos adicionales si están disponibles en la tabla
+                if "semestre" in columnas_disponibles and "estudiante_semestre" in row and pd.notna(row["estudiante_semestre"]):
+                    try:
+                        estudiante_data["semestre"] = int(row["estudiante_semestre"])
+                    except:
+                        estudiante_data["semestre"] = 1
+                
+                if "estrato" in columnas_disponibles and "estudiante_estrato" in row and pd.notna(row["estudiante_estrato"]):
+                    try:
+                        estudiante_data["estrato"] = int(row["estudiante_estrato"])
+                    except:
+                        estudiante_data["estrato"] = 1
+                
+                if "riesgo_desercion" in columnas_disponibles and "estudiante_riesgo_desercion" in row and pd.notna(row["estudiante_riesgo_desercion"]):
+                    estudiante_data["riesgo_desercion"] = str(row["estudiante_riesgo_desercion"]).lower()
+                
+                nuevos_estudiantes[documento] = estudiante_data
+            
+            # Crear los estudiantes con un upsert atómico por bloque: si otra petición
+            # crea el mismo estudiante entre tanto, se obtiene su ID en lugar de un duplicado
+            if nuevos_estudiantes:
+                print(f"Creando {len(nuevos_estudiantes)} estudiantes nuevos")
+                documentos_nuevos = list(nuevos_estudiantes)
+                resultado = await estudiantes_loader.data.upsert_many_by_documento(list(nuevos_estudiantes.values()))
+                for documento, estudiante_id in zip(documentos_nuevos, resultado["ids"]):
+                    if estudiante_id:
+                        estudiantes_ids[documento] = estudiante_id
+                for error in resultado["errors"]:
+                    for documento in documentos_nuevos[error["start"]:error["end"]]:
+                        fallos_estudiantes[documento] = error["error"]
+            
             # Procesar cada fila del CSV
             for index, row in df.iterrows():
                 try:
-                    # 1. Primero, buscar o crear el estudiante
+                    # 1. Obtener el ID del estudiante, resuelto o creado antes
                     documento = str(row["estudiante_numero_documento"]) if pd.notna(row["estudiante_numero_documento"]) else None
                     programa_academico = str(row["estudiante_programa_academico"]) if pd.notna(row["estudiante_programa_academico"]) else None
                     
                     if not documento:
                         raise ValueError("El número de documento del estudiante es obligatorio")
                     
-                    # Buscar si el estudiante ya existe
-                    estudiante_existente = supabase.table("estudiantes").select("*").eq("documento", documento).execute()
+                    estudiante_id = estudiantes_ids.get(documento)
+                    if not estudiante_id:
+                        raise Exception(f"No se pudo crear el estudiante: {fallos_estudiantes.get(documento, 'respuesta vacía')}")
                     
-                    estudiante_id = None
-                    
-                    if estudiante_existente.data and len(estudiante_existente.data) > 0:
-                        # El estudiante ya existe, usar su ID
-                        estudiante_id = estudiante_existente.data[0]["id"]
-                        print(f"Estudiante encontrado con ID: {estudiante_id}")
-                    else:
-                        # Crear un nuevo estudiante
-                        # Primero, buscar o crear el programa
-                        programa_id = None
-                        if programa_academico:
-                            programa = supabase.table("programas").select("id").eq("nombre", programa_academico).execute()
-                            if programa.data and len(programa.data) > 0:
-                                programa_id = programa.data[0]["id"]
-                            else:
-                                # Crear un nuevo programa
-                                nuevo_programa = {
-                                    "nombre": programa_academico,
-                                    "facultad": "Sin asignar",
-                                    "codigo": f"PROG-{len(programa_academico)}-{str(uuid.uuid4())[:8]}",
-                                    "nivel": "Pregrado"  # Valor por defecto para el campo obligatorio
-                                }
-                                programa_response = supabase.table("programas").insert(nuevo_programa).execute()
-                                programa_id = programa_response.data[0]["id"]
-                        
-                        # Crear el estudiante - Usar solo campos que sabemos que existen
-                        # Extraer el semestre si está disponible en el CSV
-                        semestre = None
-                        if "estudiante_semestre" in row and pd.notna(row["estudiante_semestre"]):
-                            try:
-                                semestre = int(row["estudiante_semestre"])
-                            except:
-                                semestre = 1
-                        else:
-                            semestre = 1  # Valor por defecto
-                            
-                        estudiante_data = {
-                            "documento": documento,
-                            "tipo_documento": "CC",  # Valor por defecto
-                            "nombres": f"Estudiante {documento}",  # Siempre proporcionar un valor para nombres
-                            "apellidos": f"Apellido {documento}",   # Siempre proporcionar un valor para apellidos
-                            "correo": f"{documento}@ejemplo.com",   # Siempre proporcionar un valor para correo
-                            "programa_academico": programa_academico or "Programa no especificado",  # Siempre proporcionar un valor para programa_academico
-                            "semestre": semestre  # Siempre proporcionar un valor para semestre
-                        }
-                        
-                        # Agregar programa_id si existe la columna
-                        if "programa_id" in columnas_disponibles and programa_id:
-                            estudiante_data["programa_id"] = programa_id
-                        
-                        # Agregar campos adicionales si están disponibles en la tabla
-                        if "semestre" in columnas_disponibles and "estudiante_semestre" in row and pd.notna(row["estudiante_semestre"]):
-                            try:
-                                estudiante_data["semestre"] = int(row["estudiante_semestre"])
-                            except:
-                                estudiante_data["semestre"] = 1
-                        
-                        if "estrato" in columnas_disponibles and "estudiante_estrato" in row and pd.notna(row["estudiante_estrato"]):
-                            try:
-                                estudiante_data["estrato"] = int(row["estudiante_estrato"])
-                            except:
-                                estudiante_data["estrato"] = 1
-                        
-                        if "riesgo_desercion" in columnas_disponibles and "estudiante_riesgo_desercion" in row and pd.notna(row["estudiante_riesgo_desercion"]):
-                            estudiante_data["riesgo_desercion"] = str(row["estudiante_riesgo_desercion"]).lower()
-                        
-                        # Crear el estudiante
-                        print(f"Creando nuevo estudiante: {estudiante_data}")
-                        try:
-                            estudiante_response = supabase.table("estudiantes").insert(estudiante_data).execute()
-                            if estudiante_response.data and len(estudiante_response.data) > 0:
-                                estudiante_id = estudiante_response.data[0]["id"]
-                                print(f"Estudiante creado con ID: {estudiante_id}")
-                            else:
-                                print(f"Error al crear estudiante, respuesta vacía")
-                                raise Exception("No se pudo crear el estudiante, respuesta vacía")
-                        except Exception as e:
-                            print(f"Error en fila {index+1}: {e}")
-                            if hasattr(e, 'json'):
-                                error_json = e.json()
-                                print(f"Error en fila {index+1}: {error_json}")
-                            raise e
+                    # Registros asociados a la fila que no se pudieron crear
+                    fallos_registros = []
                     
                     # 2. Procesar datos de POVAU si corresponde
                     if "POVAU_tipo_participante" in row and pd.notna(row["POVAU_tipo_participante"]) and estudiante_id:
@@ -187,11 +211,13 @@ async def upload_csv(file: UploadFile = File(...), tipo: str = None):
                             
                             # Insertar en POVAU
                             print(f"Creando registro POVAU: {povau_data}")
-                            supabase.table("povau").insert(povau_data).execute()
+                            await supabase_async.table("povau").insert(povau_data).execute()
+                            invalidate_table("povau")
                             print("Registro POVAU creado correctamente")
                         except Exception as e:
                             print(f"Error al crear registro POVAU: {str(e)}")
-                            # No interrumpir el proceso si falla la creación del registro
+                            # No interrumpir el proceso, pero reportar el registro que no se creó
+                            fallos_registros.append(f"Error al crear registro POVAU: {str(e)}")
                     
                     # 3. Procesar datos de POA si corresponde
                     if "POA_ciclo_formacion" in row and pd.notna(row["POA_ciclo_formacion"]) and estudiante_id:
@@ -205,20 +231,22 @@ async def upload_csv(file: UploadFile = File(...), tipo: str = None):
                             
                             # Insertar en POA
                             print(f"Creando registro POA: {poa_data}")
-                            supabase.table("poa").insert(poa_data).execute()
+                            await supabase_async.table("poa").insert(poa_data).execute()
+                            invalidate_table("poa")
                             print("Registro POA creado correctamente")
                         except Exception as e:
                             print(f"Error al crear registro POA: {str(e)}")
-                            # No interrumpir el proceso si falla la creación del registro
+                            # No interrumpir el proceso, pero reportar el registro que no se creó
+                            fallos_registros.append(f"Error al crear registro POA: {str(e)}")
                     
                     # 4. Procesar datos de Comedor Universitario si corresponde
                     if "ComedorUniversitario_condicion_socioeconomica" in row and pd.notna(row["ComedorUniversitario_condicion_socioeconomica"]) and estudiante_id:
                         try:
                             # Obtener datos del estudiante para completar campos obligatorios
-                            estudiante_info = supabase.table("estudiantes").select("*").eq("id", estudiante_id).execute()
+                            estudiante_info = await estudiantes_loader.load_by_id(estudiante_id)
                             nombre_estudiante = ""
-                            if estudiante_info.data and len(estudiante_info.data) > 0:
-                                nombre_estudiante = f"{estudiante_info.data[0].get('nombres', '')} {estudiante_info.data[0].get('apellidos', '')}"
+                            if estudiante_info:
+                                nombre_estudiante = f"{estudiante_info.get('nombres', '')} {estudiante_info.get('apellidos', '')}"
                             
                             comedor_data = {
                                 "estudiante_id": estudiante_id,
@@ -232,11 +260,13 @@ async def upload_csv(file: UploadFile = File(...), tipo: str = None):
                             
                             # Insertar en Comedor
                             print(f"Creando registro Comedor con tipo_comida: {comedor_data}")
-                            supabase.table("comedor_universitario").insert(comedor_data).execute()
+                            await supabase_async.table("comedor_universitario").insert(comedor_data).execute()
+                            invalidate_table("comedor_universitario")
                             print("Registro Comedor creado correctamente")
                         except Exception as e:
                             print(f"Error al crear registro Comedor: {str(e)}")
-                            # No interrumpir el proceso si falla la creación del registro
+                            # No interrumpir el proceso, pero reportar el registro que no se creó
+                            fallos_registros.append(f"Error al crear registro Comedor: {str(e)}")
                     
                     # 5. Procesar datos de Registro de Beneficio si corresponde
                     if "RegistroBeneficio_fecha_inscripcion" in row and pd.notna(row["RegistroBeneficio_fecha_inscripcion"]) and estudiante_id:
@@ -252,11 +282,13 @@ async def upload_csv(file: UploadFile = File(...), tipo: str = None):
                             
                             # Insertar el registro de beneficio
                             print(f"Creando registro de beneficio: {beneficio_data}")
-                            supabase.table("registro_beneficios").insert(beneficio_data).execute()
+                            await supabase_async.table("registro_beneficios").insert(beneficio_data).execute()
+                            invalidate_table("registro_beneficios")
                             print("Registro de beneficio creado correctamente")
                         except Exception as e:
                             print(f"Error al crear registro de beneficio: {str(e)}")
-                            # No interrumpir el proceso si falla la creación del registro
+                            # No interrumpir el proceso, pero reportar el registro que no se creó
+                            fallos_registros.append(f"Error al crear registro de beneficio: {str(e)}")
                     
                     # 6. Procesar datos de Solicitud de Atención Individual si corresponde
                     if "SolicitudAtencionIndividual_fecha_atencion" in row and pd.notna(row["SolicitudAtencionIndividual_fecha_atencion"]) and estudiante_id:
@@ -269,11 +301,13 @@ async def upload_csv(file: UploadFile = File(...), tipo: str = None):
                             
                             # Insertar la solicitud de atención
                             print(f"Creando solicitud de atención: {atencion_data}")
-                            supabase.table("solicitudes_atencion").insert(atencion_data).execute()
+                            await supabase_async.table("solicitudes_atencion").insert(atencion_data).execute()
+                            invalidate_table("solicitudes_atencion")
                             print("Solicitud de atención creada correctamente")
                         except Exception as e:
                             print(f"Error al crear solicitud de atención: {str(e)}")
-                            # No interrumpir el proceso si falla la creación del registro
+                            # No interrumpir el proceso, pero reportar el registro que no se creó
+                            fallos_registros.append(f"Error al crear solicitud de atención: {str(e)}")
                     
                     # 7. Procesar datos de Intervención Grupal si corresponde
                     if "IntervencionGrupal_fecha_solicitud" in row and pd.notna(row["IntervencionGrupal_fecha_solicitud"]) and estudiante_id:
@@ -313,27 +347,29 @@ async def upload_csv(file: UploadFile = File(...), tipo: str = None):
                             
                             # Insertar la intervención grupal
                             print(f"Creando intervención grupal: {intervencion_data}")
-                            supabase.table("intervenciones_grupales").insert(intervencion_data).execute()
+                            await supabase_async.table("intervenciones_grupales").insert(intervencion_data).execute()
+                            invalidate_table("intervenciones_grupales")
                             print("Intervención grupal creada correctamente")
                         except Exception as e:
                             print(f"Error al crear intervención grupal: {str(e)}")
-                            # No interrumpir el proceso si falla la creación del registro
+                            # No interrumpir el proceso, pero reportar el registro que no se creó
+                            fallos_registros.append(f"Error al crear intervención grupal: {str(e)}")
                     
                     # 8. Procesar remisiones psicológicas si corresponde
                     if "RemisionPsicologica_fecha_remision" in row and pd.notna(row["RemisionPsicologica_fecha_remision"]) and estudiante_id:
                         try:
                             # Obtener datos del estudiante para completar campos obligatorios
-                            estudiante_info = supabase.table("estudiantes").select("*").eq("id", estudiante_id).execute()
+                            estudiante_info = await estudiantes_loader.load_by_id(estudiante_id)
                             nombre_estudiante = ""
                             numero_documento = ""
                             programa_academico = ""
                             semestre = "1"
                             
-                            if estudiante_info.data and len(estudiante_info.data) > 0:
-                                nombre_estudiante = f"{estudiante_info.data[0].get('nombres', '')} {estudiante_info.data[0].get('apellidos', '')}"
-                                numero_documento = estudiante_info.data[0].get('documento', '')
-                                programa_academico = estudiante_info.data[0].get('programa_academico', '')
-                                semestre = str(estudiante_info.data[0].get('semestre', '1'))
+                            if estudiante_info:
+                                nombre_estudiante = f"{estudiante_info.get('nombres', '')} {estudiante_info.get('apellidos', '')}"
+                                numero_documento = estudiante_info.get('documento', '')
+                                programa_academico = estudiante_info.get('programa_academico', '')
+                                semestre = str(estudiante_info.get('semestre', '1'))
                             else:
                                 # Si no se encuentra el estudiante, usar datos del CSV
                                 nombre_estudiante = f"Estudiante {row['estudiante_numero_documento']}" if pd.notna(row.get('estudiante_numero_documento')) else "Estudiante sin nombre"
@@ -360,11 +396,13 @@ async def upload_csv(file: UploadFile = File(...), tipo: str = None):
                             
                             # Insertar la remisión psicológica
                             print(f"Creando remisión psicológica con todos los campos obligatorios: {remision_psico_data}")
-                            supabase.table("remisiones_psicologicas").insert(remision_psico_data).execute()
+                            await supabase_async.table("remisiones_psicologicas").insert(remision_psico_data).execute()
+                            invalidate_table("remisiones_psicologicas")
                             print("Remisión psicológica creada correctamente")
                         except Exception as e:
                             print(f"Error al crear remisión psicológica: {str(e)}")
-                            # No interrumpir el proceso si falla la creación del registro
+                            # No interrumpir el proceso, pero reportar el registro que no se creó
+                            fallos_registros.append(f"Error al crear remisión psicológica: {str(e)}")
                     
                     # 9. Procesar formato de asistencia si corresponde
                     if "FormatoAsistencia_numero_asistencia" in row and pd.notna(row["FormatoAsistencia_numero_asistencia"]) and estudiante_id:
@@ -377,11 +415,13 @@ async def upload_csv(file: UploadFile = File(...), tipo: str = None):
                             
                             # Insertar el formato de asistencia
                             print(f"Creando formato de asistencia: {asistencia_data}")
-                            supabase.table("formatos_asistencia").insert(asistencia_data).execute()
+                            await supabase_async.table("formatos_asistencia").insert(asistencia_data).execute()
+                            invalidate_table("formatos_asistencia")
                             print("Formato de asistencia creado correctamente")
                         except Exception as e:
                             print(f"Error al crear formato de asistencia: {str(e)}")
-                            # No interrumpir el proceso si falla la creación del registro
+                            # No interrumpir el proceso, pero reportar el registro que no se creó
+                            fallos_registros.append(f"Error al crear formato de asistencia: {str(e)}")
                     
                     # 10. Procesar datos de permanencia
                     # Crear un registro en la tabla permanencia para estadísticas
@@ -409,17 +449,26 @@ async def upload_csv(file: UploadFile = File(...), tipo: str = None):
                         
                         # Insertar en la tabla permanencia
                         print(f"Creando registro de permanencia: {permanencia_data}")
-                        supabase.table("permanencia").insert(permanencia_data).execute()
+                        response = await supabase_async.table("permanencia").insert(permanencia_data).execute()
+                        # Sumar el registro a los contadores del dashboard; sin representación
+                        # de vuelta, marginales() detecta el cambio por la versión de la tabla
+                        get_contadores_permanencia().add(response.data)
+                        invalidate_table("permanencia")
                     except Exception as e:
                         print(f"Error al crear registro de permanencia: {str(e)}")
-                        # No interrumpir el proceso si falla la creación del registro de permanencia
+                        # No interrumpir el proceso, pero reportar el registro que no se creó
+                        fallos_registros.append(f"Error al crear registro de permanencia: {str(e)}")
+                    
+                    for fallo in fallos_registros:
+                        errors.append(f"Error en fila {index+1}: {fallo}")
                     
                     # Añadir a los datos procesados
                     processed_data.append({
                         "documento": documento,
                         "programa": programa_academico,
                         "estudiante_id": estudiante_id,
-                        "procesado": True
+                        "procesado": True,
+                        "errores": fallos_registros
                     })
                     
                     inserted += 1
@@ -18,7 +18,7 @@ async def get_usuarios():
     """Obtiene todos los usuarios."""
     
     try:
-        usuarios = service.get_all_usuarios()
+        usuarios = await service.get_all_usuarios()
         return success_response(usuarios, "Usuarios obtenidos exitosamente")
     except Exception as e:
         return handle_exception(e, "obtener usuarios")
@@ -50,7 +50,7 @@ async def create_usuario(datos: Dict[str, Any]):
             return error_response("La contraseña es obligatoria", "La contraseña es obligatoria")
         
         # Crear usuario
-        result = service.create_usuario(datos)
+        result = await service.create_usuario(datos)
         
         return success_response(result, "Usuario registrado exitosamente")
     except ValueError as ve:
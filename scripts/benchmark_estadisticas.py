@@ -0,0 +1,224 @@
+"""
+Microbenchmark del motor de estadísticas generales.
+
+Compara, sobre registros de permanencia sintéticos, el cálculo anterior de
+/estadisticas-generales con el motor de services/estadisticas_service.py, y
+verifica que ambos producen el mismo resultado con las reglas de
+routes/estadisticas.py y de routes/estadisticas_new.py:
+
+- anterior: respuesta JSON de PostgREST convertida en una lista de diccionarios
+  y un recorrido de la lista por cada indicador
+- motor: respuesta CSV de PostgREST leída a columnas (BaseData.get_frame) y
+  calcular_estadisticas en una pasada vectorizada
+- contadores: componer_estadisticas desde las marginales ya calculadas, como
+  responden los endpoints con ContadoresPermanencia; se verifica además que
+  sumar las marginales de dos mitades da el mismo resultado que la tabla completa
+
+Se mide desde el cuerpo de la respuesta ya recibido; la red no se incluye,
+aunque el CSV también es varias veces más pequeño que el JSON.
+
+Uso:
+    python scripts/benchmark_estadisticas.py [filas ...]   (por defecto 10000 100000 1000000)
+"""
+
+import json
+import random
+import sys
+import os
+import time
+
+# Añadir el directorio raíz al path para importar los servicios
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.base_data import read_csv_frame
+from services.estadisticas_service import (
+    ReglasEstadisticas, calcular_estadisticas, calcular_marginales, componer_estadisticas, sumar_marginales,
+    COLUMNAS_ESTADISTICAS, COLUMNAS_CATEGORICAS
+)
+
+SERVICIOS = ["POA", "POVAU", "Comedor", "POPS", "Intervención Grupal", "Atención Individual"]
+ESTRATOS = [1, 2, 3, 4, 5, 6]
+NIVELES_RIESGO = ["Muy bajo", "Bajo", "Medio", "Alto", "Muy Alto"]
+TIPOS_VULNERABILIDAD = ["Académica", "Social", "Psicológica", "Económica"]
+PROGRAMAS = [f"PROGRAMA {i}" for i in range(40)]
+PERIODOS = [f"{anio}-{semestre}" for anio in range(2020, 2025) for semestre in (1, 2)]
+
+REGLAS_SUMA = ReglasEstadisticas(totales="suma", normalizar=True)
+REGLAS_CONTEO = ReglasEstadisticas(
+    totales="conteo",
+    vulnerabilidades=TIPOS_VULNERABILIDAD,
+    servicios=SERVICIOS,
+    estratos=ESTRATOS,
+    estrato_por_inscritos=False
+)
+
+def generar_registros(filas: int, semilla: int = 42) -> list:
+    """Genera registros de permanencia sintéticos."""
+    aleatorio = random.Random(semilla)
+    return [
+        {
+            "servicio": aleatorio.choice(SERVICIOS),
+            "estrato": aleatorio.choice(ESTRATOS),
+            "inscritos": 1,
+            "matriculados": aleatorio.randint(0, 1),
+            "desertores": aleatorio.randint(0, 1),
+            "graduados": aleatorio.randint(0, 1),
+            "estudiante_programa_academico": aleatorio.choice(PROGRAMAS),
+            "riesgo_desercion": aleatorio.choice(NIVELES_RIESGO),
+            "tipo_vulnerabilidad": aleatorio.choice(TIPOS_VULNERABILIDAD),
+            "periodo": aleatorio.choice(PERIODOS),
+            "requiere_tutoria": aleatorio.choice(["Sí", "No"])
+        }
+        for _ in range(filas)
+    ]
+
+def estadisticas_anteriores_suma(datos: list) -> dict:
+    """Cálculo anterior de routes/estadisticas.py (un recorrido por indicador)."""
+    total = len(datos)
+    riesgo_count = {"Alto": 0, "Medio": 0, "Bajo": 0}
+    for item in datos:
+        riesgo = item.get("riesgo_desercion", "").lower()
+        if riesgo in ["alto", "muy alto"]:
+            riesgo_count["Alto"] += 1
+        elif riesgo == "medio":
+            riesgo_count["Medio"] += 1
+        elif riesgo in ["bajo", "muy bajo"]:
+            riesgo_count["Bajo"] += 1
+    requieren = sum(1 for item in datos if item.get("requiere_tutoria", "").lower() == "sí")
+    vulnerabilidad_count = {}
+    for item in datos:
+        tipo = item.get("tipo_vulnerabilidad")
+        if tipo:
+            vulnerabilidad_count[tipo] = vulnerabilidad_count.get(tipo, 0) + 1
+    servicios_count = {}
+    for item in datos:
+        servicio = item.get("servicio")
+        if servicio:
+            servicios_count[servicio] = servicios_count.get(servicio, 0) + 1
+    estrato_count = {}
+    for item in datos:
+        try:
+            estrato = int(item.get("estrato", 0))
+            inscritos = int(item.get("inscritos", 0))
+            if estrato > 0:
+                estrato_count[estrato] = estrato_count.get(estrato, 0) + inscritos
+        except (ValueError, TypeError):
+            continue
+    programa_count = {}
+    for item in datos:
+        programa = item.get("estudiante_programa_academico")
+        if programa:
+            programa_count[programa] = programa_count.get(programa, 0) + 1
+    programa_stats = [{"programa": p, "value": c} for p, c in programa_count.items()]
+    programa_stats.sort(key=lambda x: x["value"], reverse=True)
+    return {
+        "totals": {col: sum(item.get(col, 0) for item in datos) for col in ("inscritos", "matriculados", "desertores", "graduados")},
+        "programaStats": programa_stats[:5],
+        "riesgoDesercionData": [{"riesgo": n, "cantidad": c} for n, c in riesgo_count.items()],
+        "tutoriaData": [{"name": "Requieren", "value": requieren}, {"name": "No requieren", "value": total - requieren}],
+        "vulnerabilidadData": [{"name": t, "cantidad": c} for t, c in vulnerabilidad_count.items()],
+        "serviciosData": [{"name": s, "cantidad": c} for s, c in servicios_count.items()],
+        "edadDesertores": [],
+        "estratoInscritos": [{"estrato": e, "inscritos": c} for e, c in estrato_count.items()]
+    }
+
+def estadisticas_anteriores_conteo(datos: list) -> dict:
+    """Cálculo anterior de routes/estadisticas_new.py (un recorrido por indicador)."""
+    total = len(datos)
+    riesgo_count = {"Alto": 0, "Medio": 0, "Bajo": 0}
+    for item in datos:
+        riesgo = item.get("riesgo_desercion")
+        if riesgo in ["Alto", "Muy Alto"]:
+            riesgo_count["Alto"] += 1
+        elif riesgo == "Medio":
+            riesgo_count["Medio"] += 1
+        elif riesgo in ["Bajo", "Muy bajo"]:
+            riesgo_count["Bajo"] += 1
+    requieren = sum(1 for item in datos if item.get("requiere_tutoria") == "Sí")
+    vulnerabilidad_count = {tipo: 0 for tipo in TIPOS_VULNERABILIDAD}
+    for item in datos:
+        tipo = item.get("tipo_vulnerabilidad")
+        if tipo and tipo in vulnerabilidad_count:
+            vulnerabilidad_count[tipo] += 1
+    servicios_count = {servicio: 0 for servicio in SERVICIOS}
+    for item in datos:
+        servicio = item.get("servicio")
+        if servicio and servicio in servicios_count:
+            servicios_count[servicio] += 1
+    estrato_count = {estrato: 0 for estrato in ESTRATOS}
+    for item in datos:
+        try:
+            estrato = int(item.get("estrato", 0))
+            if estrato in estrato_count:
+                estrato_count[estrato] += 1
+        except (ValueError, TypeError):
+            continue
+    programa_count = {}
+    for item in datos:
+        programa = item.get("estudiante_programa_academico")
+        if programa:
+            programa_count[programa] = programa_count.get(programa, 0) + 1
+    programa_stats = [{"programa": p, "value": c} for p, c in programa_count.items()]
+    programa_stats.sort(key=lambda x: x["value"], reverse=True)
+    return {
+        "totals": {col: sum(1 for item in datos if item.get(col, 0) > 0) for col in ("inscritos", "matriculados", "desertores", "graduados")},
+        "programaStats": programa_stats[:5],
+        "riesgoDesercionData": [{"riesgo": n, "cantidad": c} for n, c in riesgo_count.items()],
+        "tutoriaData": [{"name": "Requieren", "value": requieren}, {"name": "No requieren", "value": total - requieren}],
+        "vulnerabilidadData": [{"name": t, "cantidad": c} for t, c in vulnerabilidad_count.items()],
+        "serviciosData": [{"name": s, "cantidad": c} for s, c in servicios_count.items()],
+        "edadDesertores": [],
+        "estratoInscritos": [{"estrato": e, "inscritos": c} for e, c in estrato_count.items()]
+    }
+
+def medir(funcion, *args, repeticiones: int = 3) -> float:
+    """Retorna el mejor tiempo en milisegundos de varias ejecuciones."""
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(*args)
+        mejor = min(mejor, (time.perf_counter() - inicio) * 1000)
+    return mejor
+
+def cuerpo_csv(registros: list) -> bytes:
+    """Serializa los registros como la respuesta CSV de PostgREST."""
+    import pandas as pd
+    
+    return pd.DataFrame.from_records(registros, columns=list(COLUMNAS_ESTADISTICAS)).to_csv(index=False).encode("utf-8")
+
+def main(tamanos: list) -> None:
+    # Primera llamada fuera de la medición: importa pandas y numpy
+    calcular_estadisticas(generar_registros(10), REGLAS_SUMA)
+    
+    print(f"{'filas':>10} {'reglas':>8} {'JSON (MB)':>10} {'CSV (MB)':>9} {'anterior (ms)':>14} {'motor (ms)':>11} {'aceleración':>12} {'contadores (ms)':>16}")
+    for filas in tamanos:
+        registros = generar_registros(filas)
+        cuerpo_json = json.dumps(registros).encode("utf-8")
+        csv = cuerpo_csv(registros)
+        repeticiones = 1 if filas >= 1000000 else 3
+        mitad = filas // 2
+        marginales = sumar_marginales(calcular_marginales(registros[:mitad]), calcular_marginales(registros[mitad:]))
+        for nombre, anterior, reglas in (
+            ("suma", estadisticas_anteriores_suma, REGLAS_SUMA),
+            ("conteo", estadisticas_anteriores_conteo, REGLAS_CONTEO)
+        ):
+            def calculo_anterior():
+                return anterior(json.loads(cuerpo_json))
+            
+            def calculo_motor():
+                frame = read_csv_frame(csv, list(COLUMNAS_ESTADISTICAS), list(COLUMNAS_CATEGORICAS))
+                return calcular_estadisticas(frame, reglas)
+            
+            esperado = calculo_anterior()
+            if esperado != calculo_motor():
+                raise AssertionError(f"El motor no coincide con el cálculo anterior ({nombre}, {filas} filas)")
+            if esperado != componer_estadisticas(marginales, reglas):
+                raise AssertionError(f"Los contadores no coinciden con el cálculo anterior ({nombre}, {filas} filas)")
+            t_anterior = medir(calculo_anterior, repeticiones=repeticiones)
+            t_motor = medir(calculo_motor, repeticiones=repeticiones)
+            t_contadores = medir(componer_estadisticas, marginales, reglas, repeticiones=100)
+            print(f"{filas:>10} {nombre:>8} {len(cuerpo_json) / 1e6:>10.1f} {len(csv) / 1e6:>9.1f} "
+                  f"{t_anterior:>14.1f} {t_motor:>11.1f} {t_anterior / t_motor:>11.1f}x {t_contadores:>16.3f}")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000])
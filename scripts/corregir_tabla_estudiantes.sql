@@ -115,5 +115,34 @@ BEGIN
 END
 $$;
 
+-- Índices del listado de estudiantes (GET /api/estudiantes): filtros por programa,
+-- semestre, estrato y riesgo de deserción, y paginación por llave (columna de orden, id)
+DO $$
+DECLARE
+    columna TEXT;
+BEGIN
+    CREATE INDEX IF NOT EXISTS idx_estudiantes_created_at_id ON estudiantes (created_at, id);
+    
+    FOREACH columna IN ARRAY ARRAY['programa_academico', 'semestre', 'estrato', 'riesgo_desercion', 'apellidos', 'nombres'] LOOP
+        IF EXISTS (SELECT FROM information_schema.columns 
+                  WHERE table_schema = 'public' 
+                  AND table_name = 'estudiantes' 
+                  AND column_name = columna) THEN
+            EXECUTE format('CREATE INDEX IF NOT EXISTS %I ON estudiantes (%I, id)', 'idx_estudiantes_' || columna || '_id', columna);
+        ELSE
+            RAISE NOTICE 'La columna % no existe en la tabla estudiantes, no se crea su índice', columna;
+        END IF;
+    END LOOP;
+    
+    -- Filtro combinado más frecuente: estudiantes de un programa en un semestre
+    IF EXISTS (SELECT FROM information_schema.columns 
+              WHERE table_schema = 'public' AND table_name = 'estudiantes' AND column_name = 'programa_academico')
+       AND EXISTS (SELECT FROM information_schema.columns 
+              WHERE table_schema = 'public' AND table_name = 'estudiantes' AND column_name = 'semestre') THEN
+        CREATE INDEX IF NOT EXISTS idx_estudiantes_programa_semestre ON estudiantes (programa_academico, semestre, id);
+    END IF;
+END
+$$;
+
 -- Verificar si hay datos en la tabla
 SELECT COUNT(*) AS total_estudiantes FROM estudiantes;
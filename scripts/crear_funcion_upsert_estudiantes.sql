@@ -0,0 +1,54 @@
+-- Script para crear la función de upsert atómico de estudiantes por documento
+-- La usan EstudiantesData.upsert_by_documento / upsert_many_by_documento (buscar_o_crear
+-- y la importación CSV) para obtener el ID de cada estudiante en una sola llamada
+
+-- El upsert requiere una restricción única sobre documento
+CREATE UNIQUE INDEX IF NOT EXISTS estudiantes_documento_key ON estudiantes (documento);
+
+-- Crea los estudiantes que no existen y retorna todos los estudiantes de la lista
+-- (los existentes sin modificar). Si un documento se repite en la lista se usa
+-- su primera aparición.
+--
+-- Cada registro debe incluir documento. Las columnas que no incluye toman el
+-- valor por defecto de la tabla (por ejemplo tipo_documento = 'CC'), igual que
+-- en un INSERT que las omite; una llave presente con null guarda NULL. Los
+-- valores por defecto se evalúan una vez por llamada, salvo id, que se genera
+-- para cada estudiante.
+CREATE OR REPLACE FUNCTION upsert_estudiantes(registros JSONB)
+RETURNS SETOF estudiantes
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    valores_por_defecto JSONB;
+BEGIN
+    -- jsonb_populate_record sobre NULL::estudiantes deja en NULL las columnas
+    -- ausentes, por eso se parte de un objeto con los valores por defecto
+    EXECUTE (
+        SELECT 'SELECT jsonb_build_object(' ||
+               COALESCE(string_agg(format('%L, %s', column_name, column_default), ', '), '') || ')'
+        FROM information_schema.columns
+        WHERE table_schema = current_schema()
+          AND table_name = 'estudiantes'
+          AND column_default IS NOT NULL
+          AND column_name <> 'id'
+    ) INTO valores_por_defecto;
+
+    RETURN QUERY
+    WITH escritos AS (
+        INSERT INTO estudiantes
+        SELECT (jsonb_populate_record(
+            NULL::estudiantes,
+            valores_por_defecto || jsonb_build_object('id', uuid_generate_v4()) || elemento.valor
+        )).*
+        FROM (
+            SELECT DISTINCT ON (valor->>'documento') valor
+            FROM jsonb_array_elements(registros) WITH ORDINALITY AS e(valor, posicion)
+            ORDER BY valor->>'documento', posicion
+        ) AS elemento
+        -- La actualización no cambia nada: solo permite que RETURNING incluya los estudiantes existentes
+        ON CONFLICT (documento) DO UPDATE SET documento = EXCLUDED.documento
+        RETURNING *
+    )
+    SELECT * FROM escritos;
+END;
+$$;
@@ -0,0 +1,66 @@
+-- Script para crear las funciones de agregación de la tabla permanencia
+-- Las usa EstadisticasData (data/estadisticas_data.py) en los gráficos de
+-- routes/estadisticas_new.py: cada función agrupa en Postgres y retorna una fila
+-- por grupo, en lugar de descargar la tabla completa para contarla en Python
+
+-- Inscritos por programa académico. Los registros sin programa cuentan en
+-- "Otros programas" y los registros sin inscritos (o con cero) cuentan como uno.
+CREATE OR REPLACE FUNCTION estadisticas_programas_distribucion()
+RETURNS TABLE (programa TEXT, value BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT COALESCE(NULLIF(estudiante_programa_academico, ''), 'Otros programas')::TEXT,
+           SUM(CASE WHEN COALESCE(inscritos, 0) = 0 THEN 1 ELSE inscritos END)::BIGINT
+    FROM permanencia
+    GROUP BY 1;
+$$;
+
+-- Registros por nivel de riesgo de deserción. Los niveles desconocidos o vacíos
+-- cuentan como "Bajo".
+CREATE OR REPLACE FUNCTION estadisticas_riesgo_desercion()
+RETURNS TABLE (riesgo TEXT, cantidad BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT (CASE
+                WHEN riesgo_desercion IN ('Muy bajo', 'Bajo', 'Medio', 'Alto', 'Muy Alto') THEN riesgo_desercion
+                ELSE 'Bajo'
+            END)::TEXT,
+           COUNT(*)
+    FROM permanencia
+    GROUP BY 1;
+$$;
+
+-- Registros por programa académico y riesgo simplificado (bajo: Muy bajo y Bajo;
+-- medio: Medio; alto: cualquier otro valor), de los programas con más registros.
+-- Los registros sin programa o sin riesgo no se cuentan.
+CREATE OR REPLACE FUNCTION estadisticas_programa_riesgo(limite INTEGER DEFAULT 5)
+RETURNS TABLE (programa TEXT, bajo BIGINT, medio BIGINT, alto BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT estudiante_programa_academico::TEXT,
+           COUNT(*) FILTER (WHERE riesgo_desercion IN ('Muy bajo', 'Bajo')),
+           COUNT(*) FILTER (WHERE riesgo_desercion = 'Medio'),
+           COUNT(*) FILTER (WHERE riesgo_desercion NOT IN ('Muy bajo', 'Bajo', 'Medio'))
+    FROM permanencia
+    WHERE estudiante_programa_academico <> '' AND riesgo_desercion <> ''
+    GROUP BY estudiante_programa_academico
+    ORDER BY COUNT(*) DESC, estudiante_programa_academico
+    LIMIT limite;
+$$;
+
+-- Registros por servicio y mes de creación (YYYY-MM en UTC) desde una fecha.
+CREATE OR REPLACE FUNCTION estadisticas_servicios_por_mes(desde TIMESTAMP WITH TIME ZONE)
+RETURNS TABLE (servicio TEXT, mes TEXT, cantidad BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT servicio::TEXT,
+           to_char(created_at AT TIME ZONE 'UTC', 'YYYY-MM'),
+           COUNT(*)
+    FROM permanencia
+    WHERE created_at >= desde
+    GROUP BY 1, 2;
+$$;
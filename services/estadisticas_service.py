@@ -0,0 +1,788 @@
+from typing import Dict, List, Any, Optional, Tuple
+import asyncio
+import time
+
+from config import PERMANENCIA_COUNTERS_REFRESH
+from data.base_data import BaseData
+from data.snapshot import ColumnarSnapshot, get_snapshot
+from data.versions import TableVersions, get_table_versions, split_version
+
+# Tabla de permanencia sobre la que se calculan las estadísticas
+TABLA_PERMANENCIA = "permanencia"
+
+# Columnas de permanencia que usan las estadísticas del dashboard
+COLUMNAS_ESTADISTICAS = (
+    "servicio", "estrato", "inscritos", "matriculados", "desertores", "graduados",
+    "estudiante_programa_academico", "riesgo_desercion", "tipo_vulnerabilidad", "periodo", "requiere_tutoria"
+)
+
+# Columnas de texto, que se cargan como categóricas
+COLUMNAS_CATEGORICAS = (
+    "servicio", "estudiante_programa_academico", "riesgo_desercion", "tipo_vulnerabilidad", "periodo",
+    "requiere_tutoria"
+)
+
+# Columnas por las que se agrupan los contadores de permanencia
+DIMENSIONES = (
+    "servicio", "estrato", "estudiante_programa_academico", "riesgo_desercion", "tipo_vulnerabilidad",
+    "periodo", "requiere_tutoria"
+)
+
+# Columnas de las tarjetas de totales
+COLUMNAS_TOTALES = ("inscritos", "matriculados", "desertores", "graduados")
+
+# Dimensiones del cubo de permanencia: contadores por cada combinación de valores
+DIMENSIONES_CUBO = (
+    "servicio", "estrato", "estudiante_programa_academico", "riesgo_desercion", "tipo_vulnerabilidad", "periodo"
+)
+
+# Medidas de cada celda del cubo: número de registros, suma de cada columna de totales y
+# registros sin inscritos (nulo o cero)
+MEDIDAS_CUBO = ("registros",) + COLUMNAS_TOTALES + ("sin_inscritos",)
+
+# Niveles de riesgo de deserción, en el orden del gráfico /riesgo-desercion
+NIVELES_RIESGO = ("Muy bajo", "Bajo", "Medio", "Alto", "Muy Alto")
+
+# Agrupación de los niveles de riesgo del gráfico de riesgo de deserción
+NIVELES_RIESGO_AGRUPADOS = {
+    "Alto": "Alto",
+    "Muy Alto": "Alto",
+    "Medio": "Medio",
+    "Bajo": "Bajo",
+    "Muy bajo": "Bajo"
+}
+
+class ReglasEstadisticas:
+    """Reglas con las que un endpoint calcula las estadísticas generales."""
+    
+    def __init__(self, totales: str = "suma", normalizar: bool = False, valor_tutoria: str = "Sí",
+                 vulnerabilidades: Optional[List[str]] = None, servicios: Optional[List[str]] = None,
+                 estratos: Optional[List[int]] = None, estrato_por_inscritos: bool = True,
+                 top_programas: int = 5):
+        """
+        Inicializa las reglas.
+        
+        Args:
+            totales: "suma" suma las columnas de totales; "conteo" cuenta los
+                registros con valor mayor que cero
+            normalizar: Si riesgo y tutoría se comparan sin distinguir mayúsculas
+            valor_tutoria: Valor de requiere_tutoria de quienes requieren tutoría
+            vulnerabilidades: Tipos de vulnerabilidad a reportar (incluidos los que
+                no tienen registros), None para los que aparecen en los datos
+            servicios: Servicios a reportar, None para los que aparecen en los datos
+            estratos: Estratos a reportar, None para los mayores que cero que
+                aparecen en los datos
+            estrato_por_inscritos: Si cada estrato suma los inscritos (True) o
+                cuenta los registros (False)
+            top_programas: Número de programas con más registros a reportar
+        """
+        if totales not in ("suma", "conteo"):
+            raise ValueError(f"La regla de totales '{totales}' no es válida")
+        self.totales = totales
+        self.normalizar = normalizar
+        self.valor_tutoria = valor_tutoria.lower() if normalizar else valor_tutoria
+        self.vulnerabilidades = vulnerabilidades
+        self.servicios = servicios
+        self.estratos = estratos
+        self.estrato_por_inscritos = estrato_por_inscritos
+        self.top_programas = top_programas
+        self.niveles_riesgo = {
+            (nivel.lower() if normalizar else nivel): grupo for nivel, grupo in NIVELES_RIESGO_AGRUPADOS.items()
+        }
+
+def _factorizar(columna) -> Tuple[Any, List[Any]]:
+    """
+    Codifica una columna categórica: un código entero por registro (-1 para
+    los nulos) y los valores distintos en orden de aparición.
+    """
+    import pandas as pd
+    
+    codigos, valores = pd.factorize(columna, sort=False)
+    return codigos, list(valores)
+
+def _conteos(codigos, num_valores: int, pesos=None):
+    """Cuenta (o suma pesos) por código, ignorando los códigos nulos."""
+    import numpy as np
+    
+    validos = codigos >= 0
+    return np.bincount(
+        codigos[validos],
+        weights=pesos[validos] if pesos is not None else None,
+        minlength=num_valores
+    )
+
+def _valor_python(valor: Any) -> Any:
+    """Convierte un escalar de numpy en el valor de Python equivalente."""
+    return valor.item() if hasattr(valor, "item") else valor
+
+def marginales_vacias() -> Dict[str, Any]:
+    """
+    Crea las marginales de una tabla sin registros.
+    
+    Returns:
+        Diccionario con registros, totales y dimensiones en cero y el cubo vacío
+    """
+    return {
+        "registros": 0,
+        "totales": {col: {"suma": 0, "positivos": 0} for col in COLUMNAS_TOTALES},
+        "dimensiones": {dimension: {} for dimension in DIMENSIONES},
+        "cubo": {}
+    }
+
+def _calcular_cubo(codificadas: Dict[str, Tuple[Any, List[Any]]], medidas: List[Any]) -> Dict[Tuple, List[int]]:
+    """
+    Agrupa los registros por la combinación de sus valores en DIMENSIONES_CUBO.
+    
+    Los códigos de cada dimensión se combinan en una sola llave entera (en base
+    número de valores + 1, con el cero para los nulos) que se agrupa con
+    np.unique y np.bincount.
+    
+    Args:
+        codificadas: Por dimensión, los códigos por registro y los valores distintos
+        medidas: Pesos por registro de cada medida de MEDIDAS_CUBO después de registros
+    
+    Returns:
+        Diccionario tupla de valores (None para los nulos) -> lista de MEDIDAS_CUBO
+    """
+    import numpy as np
+    
+    bases = [len(codificadas[dimension][1]) + 1 for dimension in DIMENSIONES_CUBO]
+    if np.prod(bases, dtype=float) < 2 ** 62:
+        llave = np.zeros(len(codificadas[DIMENSIONES_CUBO[0]][0]), dtype=np.int64)
+        for dimension, base in zip(DIMENSIONES_CUBO, bases):
+            llave = llave * base + (np.asarray(codificadas[dimension][0], dtype=np.int64) + 1)
+        llaves, inversa = np.unique(llave, return_inverse=True)
+        codigos_celda = []
+        for base in reversed(bases):
+            llaves, residuo = np.divmod(llaves, base)
+            codigos_celda.insert(0, residuo - 1)
+    else:
+        # Demasiados valores para una llave de 64 bits: se agrupan las filas de códigos
+        filas = np.column_stack([np.asarray(codificadas[dimension][0], dtype=np.int64) for dimension in DIMENSIONES_CUBO])
+        celdas, inversa = np.unique(filas, axis=0, return_inverse=True)
+        codigos_celda = list(celdas.T)
+    inversa = inversa.ravel()
+    
+    # Valores de cada celda por dimensión; el código -1 toma el último elemento (None)
+    valores_celda = []
+    for dimension, codigos in zip(DIMENSIONES_CUBO, codigos_celda):
+        valores = np.array([_valor_python(valor) for valor in codificadas[dimension][1]] + [None], dtype=object)
+        valores_celda.append(valores[codigos].tolist())
+    num_celdas = len(valores_celda[0])
+    totales_celda = [np.bincount(inversa, minlength=num_celdas).tolist()] + [
+        np.bincount(inversa, weights=pesos, minlength=num_celdas).tolist() for pesos in medidas
+    ]
+    return {
+        celda: [int(total) for total in totales]
+        for celda, totales in zip(zip(*valores_celda), zip(*totales_celda))
+    }
+
+def calcular_marginales(registros: Any, cubo: bool = True) -> Dict[str, Any]:
+    """
+    Calcula las marginales de los registros de permanencia en una sola pasada
+    vectorizada: los contadores por grupo de los que salen todas las
+    estadísticas generales.
+    
+    Cada columna de DIMENSIONES se codifica una vez (pd.factorize) y los
+    contadores de cada valor se obtienen con np.bincount.
+    
+    Args:
+        registros: DataFrame con COLUMNAS_ESTADISTICAS (idealmente con las columnas
+            de texto categóricas, como las retorna get_frame) o lista de registros
+        cubo: Si además se calcula el cubo, que solo usan los contadores
+    
+    Returns:
+        Diccionario con:
+        - registros: número de registros
+        - totales: por columna de COLUMNAS_TOTALES, "suma" y "positivos"
+          (registros con valor mayor que cero)
+        - dimensiones: por columna de DIMENSIONES, valor -> "registros",
+          "inscritos" (suma) y "con_inscritos" (registros con inscritos no nulo);
+          los estratos como enteros
+        - cubo: por combinación de valores de DIMENSIONES_CUBO, la lista de
+          MEDIDAS_CUBO (consultar_cubo); vacío si cubo es False
+    """
+    # pandas se importa en el primer uso para no retrasar el arranque del servidor
+    import numpy as np
+    import pandas as pd
+    
+    if isinstance(registros, pd.DataFrame):
+        df = {col: registros[col] if col in registros else pd.Series([None] * len(registros), dtype=object)
+              for col in COLUMNAS_ESTADISTICAS}
+    else:
+        # Una lista por columna: más rápido que construir un DataFrame desde los diccionarios
+        df = {col: pd.Series([registro.get(col) for registro in registros], dtype=object)
+              for col in COLUMNAS_ESTADISTICAS}
+    
+    marginales = marginales_vacias()
+    marginales["registros"] = len(registros)
+    
+    # Totales
+    numericas = {col: pd.to_numeric(df[col], errors="coerce") for col in COLUMNAS_TOTALES}
+    for col, valores in numericas.items():
+        valores = valores.fillna(0).to_numpy()
+        marginales["totales"][col] = {
+            "suma": int(valores.sum()),
+            "positivos": int(np.count_nonzero(valores > 0))
+        }
+    
+    # Inscritos de cada registro, para sumarlos por grupo
+    inscritos = numericas["inscritos"].to_numpy(dtype=float)
+    con_inscritos = ~np.isnan(inscritos)
+    pesos_inscritos = np.where(con_inscritos, np.trunc(inscritos), 0)
+    pesos_con_inscritos = con_inscritos.astype(float)
+    
+    codificadas = {}
+    for dimension in DIMENSIONES:
+        if dimension == "estrato":
+            # Los estratos se agrupan como enteros; los no numéricos quedan fuera
+            estrato = pd.to_numeric(df["estrato"], errors="coerce").to_numpy(dtype=float)
+            validos = ~np.isnan(estrato)
+            codigos = np.full(len(estrato), -1, dtype=np.int64)
+            codigos_validos, valores = _factorizar(np.trunc(estrato[validos]).astype(np.int64))
+            codigos[validos] = codigos_validos
+        else:
+            codigos, valores = _factorizar(df[dimension])
+        codificadas[dimension] = (codigos, valores)
+        num_valores = len(valores)
+        grupos = zip(
+            valores,
+            _conteos(codigos, num_valores).tolist(),
+            _conteos(codigos, num_valores, pesos_inscritos).tolist(),
+            _conteos(codigos, num_valores, pesos_con_inscritos).tolist()
+        )
+        marginales["dimensiones"][dimension] = {
+            _valor_python(valor): {"registros": int(cantidad), "inscritos": int(suma), "con_inscritos": int(con)}
+            for valor, cantidad, suma, con in grupos
+        }
+    
+    if cubo:
+        pesos = [numericas[col].fillna(0).to_numpy(dtype=float) for col in COLUMNAS_TOTALES]
+        marginales["cubo"] = _calcular_cubo(codificadas, pesos + [(pesos[0] == 0).astype(float)])
+    return marginales
+
+def sumar_marginales(destino: Dict[str, Any], origen: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Suma unas marginales sobre otras; los grupos nuevos se agregan al final.
+    
+    Args:
+        destino: Marginales que se modifican
+        origen: Marginales a sumar
+    
+    Returns:
+        Las marginales de destino
+    """
+    destino["registros"] += origen["registros"]
+    for col, contadores in origen["totales"].items():
+        for nombre, valor in contadores.items():
+            destino["totales"][col][nombre] += valor
+    for dimension, grupos in origen["dimensiones"].items():
+        grupos_destino = destino["dimensiones"].setdefault(dimension, {})
+        for valor, contadores in grupos.items():
+            actuales = grupos_destino.get(valor)
+            if actuales is None:
+                grupos_destino[valor] = dict(contadores)
+            else:
+                for nombre, cantidad in contadores.items():
+                    actuales[nombre] += cantidad
+    cubo = destino.setdefault("cubo", {})
+    for celda, medidas in origen.get("cubo", {}).items():
+        actuales = cubo.get(celda)
+        if actuales is None:
+            cubo[celda] = list(medidas)
+        else:
+            for i, cantidad in enumerate(medidas):
+                actuales[i] += cantidad
+    return destino
+
+def _por_categoria(grupos: Dict[Any, Dict[str, int]], categorias: Optional[List[Any]]) -> List[Tuple[Any, int]]:
+    """
+    Obtiene los registros de cada valor de una dimensión.
+    
+    Args:
+        grupos: Contadores de la dimensión por valor
+        categorias: Valores a reportar en ese orden (con cero si no aparecen),
+            None para los valores no vacíos en orden de aparición
+    
+    Returns:
+        Lista de pares (valor, cantidad)
+    """
+    if categorias is not None:
+        return [(categoria, grupos[categoria]["registros"] if categoria in grupos else 0) for categoria in categorias]
+    return [(valor, contadores["registros"]) for valor, contadores in grupos.items() if valor]
+
+def componer_estadisticas(marginales: Dict[str, Any], reglas: ReglasEstadisticas) -> Dict[str, Any]:
+    """
+    Compone las estadísticas generales del dashboard a partir de las marginales,
+    en tiempo proporcional al número de grupos y no al de registros.
+    
+    Args:
+        marginales: Marginales de los registros (calcular_marginales)
+        reglas: Reglas del endpoint
+    
+    Returns:
+        Diccionario con totals, programaStats, riesgoDesercionData, tutoriaData,
+        vulnerabilidadData, serviciosData, edadDesertores y estratoInscritos
+    """
+    dimensiones = marginales["dimensiones"]
+    
+    # Totales
+    contador_total = "suma" if reglas.totales == "suma" else "positivos"
+    totals = {col: contadores[contador_total] for col, contadores in marginales["totales"].items()}
+    
+    # Riesgo de deserción y tutoría: reglas aplicadas sobre los valores distintos
+    riesgo_count = {"Alto": 0, "Medio": 0, "Bajo": 0}
+    for valor, cantidad in _por_categoria(dimensiones["riesgo_desercion"], None):
+        nivel = str(valor).lower() if reglas.normalizar else valor
+        grupo = reglas.niveles_riesgo.get(nivel)
+        if grupo:
+            riesgo_count[grupo] += cantidad
+    
+    requieren_tutoria = 0
+    for valor, cantidad in _por_categoria(dimensiones["requiere_tutoria"], None):
+        if (str(valor).lower() if reglas.normalizar else valor) == reglas.valor_tutoria:
+            requieren_tutoria += cantidad
+    
+    vulnerabilidad = _por_categoria(dimensiones["tipo_vulnerabilidad"], reglas.vulnerabilidades)
+    servicios = _por_categoria(dimensiones["servicio"], reglas.servicios)
+    
+    # Estratos: inscritos (o registros) por estrato
+    estratos = dimensiones["estrato"]
+    contador_estrato = "inscritos" if reglas.estrato_por_inscritos else "registros"
+    if reglas.estratos is not None:
+        estrato_inscritos = [
+            (e, estratos[e][contador_estrato] if e in estratos else 0) for e in reglas.estratos
+        ]
+    else:
+        # Por inscritos solo cuentan los estratos con algún registro con inscritos
+        estrato_inscritos = [
+            (e, contadores[contador_estrato]) for e, contadores in estratos.items()
+            if e > 0 and (contadores["con_inscritos"] > 0 or not reglas.estrato_por_inscritos)
+        ]
+    
+    # Programas con más registros (en empate, el que aparece primero)
+    programas = _por_categoria(dimensiones["estudiante_programa_academico"], None)
+    programas.sort(key=lambda par: par[1], reverse=True)
+    
+    return {
+        "totals": totals,
+        "programaStats": [
+            {"programa": programa, "value": cantidad} for programa, cantidad in programas[:reglas.top_programas]
+        ],
+        "riesgoDesercionData": [
+            {"riesgo": nivel, "cantidad": cantidad} for nivel, cantidad in riesgo_count.items()
+        ],
+        "tutoriaData": [
+            {"name": "Requieren", "value": requieren_tutoria},
+            {"name": "No requieren", "value": marginales["registros"] - requieren_tutoria}
+        ],
+        "vulnerabilidadData": [{"name": tipo, "cantidad": cantidad} for tipo, cantidad in vulnerabilidad],
+        "serviciosData": [{"name": servicio, "cantidad": cantidad} for servicio, cantidad in servicios],
+        "edadDesertores": [],
+        "estratoInscritos": [
+            {"estrato": int(e), "inscritos": int(cantidad)} for e, cantidad in estrato_inscritos
+        ]
+    }
+
+def consultar_cubo(marginales: Dict[str, Any], group_by: List[str],
+                   filtros: Optional[Dict[str, List[Any]]] = None) -> List[Dict[str, Any]]:
+    """
+    Responde un corte o agregación del cubo de permanencia sin recorrer los registros.
+    
+    Args:
+        marginales: Marginales con el cubo (calcular_marginales)
+        group_by: Dimensiones de DIMENSIONES_CUBO por las que se agrupa; vacío
+            para un único total
+        filtros: Por dimensión, los valores aceptados (None para los nulos)
+    
+    Returns:
+        Una fila por grupo con sus valores de group_by y las MEDIDAS_CUBO, de
+        mayor a menor número de registros
+    
+    Raises:
+        ValueError: Si alguna dimensión no pertenece al cubo
+    """
+    filtros = filtros or {}
+    for dimension in list(group_by) + list(filtros):
+        if dimension not in DIMENSIONES_CUBO:
+            raise ValueError(f"La dimensión '{dimension}' no pertenece al cubo")
+    
+    posiciones = {dimension: i for i, dimension in enumerate(DIMENSIONES_CUBO)}
+    condiciones = [(posiciones[dimension], set(valores)) for dimension, valores in filtros.items()]
+    agrupar = [posiciones[dimension] for dimension in group_by]
+    
+    grupos: Dict[Tuple, List[int]] = {}
+    for celda, medidas in marginales["cubo"].items():
+        if not all(celda[i] in valores for i, valores in condiciones):
+            continue
+        clave = tuple(celda[i] for i in agrupar)
+        actuales = grupos.get(clave)
+        if actuales is None:
+            grupos[clave] = list(medidas)
+        else:
+            for i, cantidad in enumerate(medidas):
+                actuales[i] += cantidad
+    
+    filas = [
+        {**dict(zip(group_by, clave)), **dict(zip(MEDIDAS_CUBO, medidas))}
+        for clave, medidas in grupos.items()
+    ]
+    filas.sort(key=lambda fila: fila["registros"], reverse=True)
+    return filas
+
+def programas_distribucion(marginales: Dict[str, Any], top: int = 5) -> List[Dict[str, Any]]:
+    """
+    Compone desde el cubo el gráfico de distribución por programa académico, con
+    las reglas de estadisticas_programas_distribucion: los registros sin programa
+    cuentan en "Otros programas" y los registros sin inscritos cuentan como uno.
+    
+    Args:
+        marginales: Marginales con el cubo
+        top: Programas que se reportan; el resto se suma en "Otros programas"
+    
+    Returns:
+        Lista de {"programa", "value"} de mayor a menor
+    """
+    valores: Dict[Any, int] = {}
+    for fila in consultar_cubo(marginales, ["estudiante_programa_academico"]):
+        programa = fila["estudiante_programa_academico"] or "Otros programas"
+        valores[programa] = valores.get(programa, 0) + fila["inscritos"] + fila["sin_inscritos"]
+    
+    datos = [{"programa": programa, "value": valor} for programa, valor in valores.items()]
+    datos.sort(key=lambda x: x["value"], reverse=True)
+    if len(datos) > top:
+        otros = sum(item["value"] for item in datos[top:])
+        datos = datos[:top]
+        if otros > 0:
+            datos.append({"programa": "Otros programas", "value": otros})
+    return datos
+
+def riesgo_desercion(marginales: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Compone desde el cubo el gráfico de riesgo de deserción; los niveles
+    desconocidos o vacíos cuentan como "Bajo".
+    
+    Args:
+        marginales: Marginales con el cubo
+    
+    Returns:
+        Lista de {"name", "value"} en el orden de NIVELES_RIESGO
+    """
+    conteos = {nivel: 0 for nivel in NIVELES_RIESGO}
+    for fila in consultar_cubo(marginales, ["riesgo_desercion"]):
+        nivel = fila["riesgo_desercion"] if fila["riesgo_desercion"] in conteos else "Bajo"
+        conteos[nivel] += fila["registros"]
+    return [{"name": nivel, "value": cantidad} for nivel, cantidad in conteos.items()]
+
+def programa_riesgo(marginales: Dict[str, Any], limite: int = 5) -> List[Dict[str, Any]]:
+    """
+    Compone desde el cubo el gráfico de programa vs riesgo, con las reglas de
+    estadisticas_programa_riesgo: bajo (Muy bajo y Bajo), medio y alto (cualquier
+    otro nivel), sin los registros sin programa o sin riesgo.
+    
+    Args:
+        marginales: Marginales con el cubo
+        limite: Número de programas
+    
+    Returns:
+        Lista de {"programa", "bajo", "medio", "alto"} de los programas con más
+        registros, de mayor a menor
+    """
+    grupos: Dict[Any, Dict[str, Any]] = {}
+    for fila in consultar_cubo(marginales, ["estudiante_programa_academico", "riesgo_desercion"]):
+        programa, riesgo = fila["estudiante_programa_academico"], fila["riesgo_desercion"]
+        if not programa or not riesgo:
+            continue
+        grupo = grupos.setdefault(programa, {"programa": programa, "bajo": 0, "medio": 0, "alto": 0})
+        nivel = "bajo" if riesgo in ("Muy bajo", "Bajo") else "medio" if riesgo == "Medio" else "alto"
+        grupo[nivel] += fila["registros"]
+    
+    datos = sorted(grupos.values(), key=lambda g: (-(g["bajo"] + g["medio"] + g["alto"]), str(g["programa"])))
+    return datos[:limite]
+
+def estrato_servicio(marginales: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Compone desde el cubo el gráfico de estrato por servicio: los inscritos de
+    cada servicio y estrato, sin los registros sin servicio o sin estrato.
+    
+    Args:
+        marginales: Marginales con el cubo
+    
+    Returns:
+        Lista de {"servicio", "estrato", "cantidad"}
+    """
+    return [
+        {"servicio": fila["servicio"], "estrato": fila["estrato"], "cantidad": fila["inscritos"]}
+        for fila in consultar_cubo(marginales, ["servicio", "estrato"])
+        if fila["servicio"] and fila["estrato"]
+    ]
+
+def calcular_estadisticas(registros: Any, reglas: ReglasEstadisticas) -> Dict[str, Any]:
+    """
+    Calcula todas las estadísticas generales del dashboard sobre los registros
+    de permanencia: sus marginales en una pasada vectorizada y las reglas de
+    cada gráfico sobre los grupos.
+    
+    Args:
+        registros: DataFrame con COLUMNAS_ESTADISTICAS o lista de registros
+        reglas: Reglas del endpoint
+    
+    Returns:
+        Diccionario con totals, programaStats, riesgoDesercionData, tutoriaData,
+        vulnerabilidadData, serviciosData, edadDesertores y estratoInscritos
+    """
+    return componer_estadisticas(calcular_marginales(registros, cubo=False), reglas)
+
+class ContadoresPermanencia:
+    """
+    Contadores de permanencia por grupo compartidos por el proceso.
+    
+    Guardan las marginales de la tabla (registros, inscritos y totales por
+    servicio, estrato, programa, riesgo, vulnerabilidad, periodo y tutoría), de
+    modo que las estadísticas del dashboard se componen sin leer la tabla. Se
+    calculan completos en la primera lectura y luego se mantienen con add en
+    cada inserción hecha desde este proceso.
+    
+    Las escrituras de otros procesos se detectan con la versión de la tabla
+    (data/versions.py): si cambió sin que este proceso haya insertado, o si tras
+    una inserción propia su número de registros no coincide con los contadores,
+    se reconstruyen antes de responder. Además se reconstruyen en
+    segundo plano cada refresh segundos, o a pedido con rebuild.
+    
+    Si permanencia tiene snapshot columnar (data/snapshot.py), la reconstrucción
+    solo descarga los registros nuevos: las marginales de cada segmento se
+    calculan una vez sobre los archivos mapeados y se suman.
+    """
+    
+    def __init__(self, data: Optional[BaseData] = None, refresh: float = PERMANENCIA_COUNTERS_REFRESH,
+                 versions: Optional[TableVersions] = None, snapshot: Optional[ColumnarSnapshot] = None):
+        """
+        Inicializa los contadores.
+        
+        Args:
+            data: Acceso a datos de permanencia, por defecto BaseData("permanencia")
+            refresh: Segundos tras los cuales se reconstruyen, 0 para no reconstruirlos
+            versions: Versiones de las tablas, por defecto las compartidas
+            snapshot: Snapshot columnar de permanencia, por defecto el compartido
+                si la tabla está en SNAPSHOT_TABLES
+        """
+        self.data = data if data is not None else BaseData(TABLA_PERMANENCIA)
+        self.refresh = refresh
+        self.versions = versions if versions is not None else get_table_versions()
+        self.snapshot = snapshot if snapshot is not None else get_snapshot(self.data.table_name)
+        # Marginales de cada segmento del snapshot, por nombre de segmento
+        self._por_segmento: Dict[str, Dict[str, Any]] = {}
+        self.built_at: Optional[float] = None
+        self.rebuilds = 0
+        self.updates = 0
+        self._marginales: Optional[Dict[str, Any]] = None
+        # Versión de la tabla que reflejan los contadores, None tras una inserción
+        # propia (la próxima versión observada se verifica antes de adoptarla)
+        self._version: Optional[str] = None
+        self._lock = asyncio.Lock()
+        self._reconstruccion: Optional[asyncio.Task] = None
+        # Registros insertados mientras se descarga la tabla, para aplicarlos después
+        self._pendientes: Optional[List[Dict[str, Any]]] = None
+    
+    async def rebuild(self, full: bool = False) -> int:
+        """
+        Reconstruye los contadores desde la tabla completa.
+        
+        Args:
+            full: Con snapshot, recargarlo completo en lugar de agregarle solo los
+                registros nuevos (refleja también modificaciones y borrados)
+        
+        Returns:
+            Número de registros contados
+        """
+        async with self._lock:
+            return await self._rebuild(full)
+    
+    async def _rebuild(self, full: bool = False) -> int:
+        """Descarga la tabla y reemplaza los contadores; se llama con el candado tomado."""
+        self._pendientes = []
+        try:
+            version = await self.versions.version(self.data.table_name)
+            if self.snapshot is not None:
+                await self.snapshot.refresh(full)
+                if not full and not self.snapshot.matches(version):
+                    # Lo incremental solo agrega inserciones: si el snapshot no coincide
+                    # con la versión hubo modificaciones o borrados
+                    await self.snapshot.refresh(full=True)
+                marginales = self._marginales_snapshot()
+            else:
+                # Desde Supabase y no desde la réplica: las importaciones escriben directamente
+                # en la tabla y los contadores deben coincidir con su versión
+                registros = await self.data.get_frame(
+                    list(COLUMNAS_ESTADISTICAS) + ["id"], list(COLUMNAS_CATEGORICAS), use_replica=False
+                )
+                marginales = calcular_marginales(registros)
+            if self._pendientes:
+                # Las inserciones que ya alcanzó la descarga no se cuentan dos veces
+                if self.snapshot is not None:
+                    descargados = {id for _, frame in self.snapshot.segments(["id"]) for id in frame["id"]}
+                else:
+                    descargados = set(registros["id"].astype(str))
+                nuevos = [r for r in self._pendientes if str(r.get("id")) not in descargados]
+                if nuevos:
+                    sumar_marginales(marginales, calcular_marginales(nuevos))
+            self._marginales = marginales
+            self._version = version
+            self.built_at = time.monotonic()
+            self.rebuilds += 1
+        finally:
+            self._pendientes = None
+        return self._marginales["registros"]
+    
+    def _marginales_snapshot(self) -> Dict[str, Any]:
+        """Suma las marginales de los segmentos del snapshot, calculando solo las de los nuevos."""
+        marginales = marginales_vacias()
+        por_segmento = {}
+        for nombre, frame in self.snapshot.segments(list(COLUMNAS_ESTADISTICAS)):
+            por_segmento[nombre] = self._por_segmento.get(nombre) or calcular_marginales(frame)
+            sumar_marginales(marginales, por_segmento[nombre])
+        self._por_segmento = por_segmento
+        return marginales
+    
+    async def marginales(self) -> Dict[str, Any]:
+        """
+        Obtiene las marginales actuales, calculándolas si es la primera lectura o
+        si otro proceso modificó la tabla.
+        
+        Returns:
+            Marginales de permanencia (no deben modificarse)
+        """
+        version = await self.versions.version(self.data.table_name)
+        if self._marginales is None or (self._version is not None and version != self._version):
+            async with self._lock:
+                # Otra lectura pudo haberlos reconstruido mientras se esperaba el candado
+                if self._marginales is None or (self._version is not None and version != self._version):
+                    await self._rebuild()
+        elif self._version is None:
+            async with self._lock:
+                # Tras una inserción propia la versión solo se adopta si su número de
+                # registros coincide con los contadores; si no, otro proceso también escribió
+                if self._version is None:
+                    if split_version(version)[0] == self._marginales["registros"]:
+                        self._version = version
+                    else:
+                        await self._rebuild()
+        if self.refresh and time.monotonic() - self.built_at > self.refresh and self._reconstruccion is None:
+            self._reconstruccion = asyncio.ensure_future(self._reconstruir())
+        return self._marginales
+    
+    async def _reconstruir(self) -> None:
+        """Reconstruye los contadores en segundo plano, conservando los anteriores si falla."""
+        try:
+            await self.rebuild()
+        except Exception as e:
+            print(f"Error al reconstruir los contadores de permanencia: {e}")
+            self.built_at = time.monotonic()
+        finally:
+            self._reconstruccion = None
+    
+    def add(self, registros: List[Dict[str, Any]]) -> None:
+        """
+        Suma a los contadores registros de permanencia recién insertados.
+        
+        Args:
+            registros: Registros insertados, con id
+        """
+        if not registros:
+            return
+        if self._pendientes is not None:
+            self._pendientes.extend(registros)
+        if self._marginales is not None:
+            sumar_marginales(self._marginales, calcular_marginales(registros))
+            self.updates += len(registros)
+        self._version = None
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Obtiene el estado de los contadores.
+        
+        Returns:
+            Diccionario con los registros contados, los grupos por dimensión, las
+            celdas del cubo, su antigüedad en segundos y las reconstrucciones y
+            registros sumados
+        """
+        return {
+            "registros": self._marginales["registros"] if self._marginales is not None else None,
+            "grupos": {
+                dimension: len(grupos) for dimension, grupos in self._marginales["dimensiones"].items()
+            } if self._marginales is not None else {},
+            "celdas": len(self._marginales["cubo"]) if self._marginales is not None else None,
+            "age": round(time.monotonic() - self.built_at, 1) if self.built_at is not None else None,
+            "rebuilds": self.rebuilds,
+            "updates": self.updates
+        }
+
+# Contadores de permanencia compartidos del proceso
+_contadores_permanencia: Optional[ContadoresPermanencia] = None
+
+def get_contadores_permanencia() -> ContadoresPermanencia:
+    """
+    Obtiene los contadores de permanencia compartidos, creándolos si no existen.
+    
+    Returns:
+        Contadores de permanencia
+    """
+    global _contadores_permanencia
+    if _contadores_permanencia is None:
+        _contadores_permanencia = ContadoresPermanencia()
+    return _contadores_permanencia
+
+class EstadisticasService:
+    """Servicio para las estadísticas de permanencia."""
+    
+    def __init__(self):
+        """Inicializa el servicio de estadísticas."""
+        self.contadores = get_contadores_permanencia()
+    
+    async def get_estadisticas_generales(self, reglas: ReglasEstadisticas) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene las estadísticas generales del dashboard desde los contadores.
+        
+        Args:
+            reglas: Reglas del endpoint
+        
+        Returns:
+            Estadísticas calculadas o None si la tabla no tiene registros
+        """
+        marginales = await self.contadores.marginales()
+        if not marginales["registros"]:
+            return None
+        return componer_estadisticas(marginales, reglas)
+    
+    async def get_marginales(self) -> Dict[str, Any]:
+        """
+        Obtiene las marginales y el cubo actuales de los contadores.
+        
+        Returns:
+            Marginales de permanencia (no deben modificarse)
+        """
+        return await self.contadores.marginales()
+    
+    async def get_cubo(self, group_by: List[str], filtros: Optional[Dict[str, List[Any]]] = None) -> List[Dict[str, Any]]:
+        """
+        Consulta el cubo de permanencia de los contadores.
+        
+        Args:
+            group_by: Dimensiones de DIMENSIONES_CUBO por las que se agrupa
+            filtros: Por dimensión, los valores aceptados
+        
+        Returns:
+            Una fila por grupo con sus valores y las MEDIDAS_CUBO
+        """
+        marginales = await self.contadores.marginales()
+        return consultar_cubo(marginales, group_by, filtros)
+    
+    async def reconstruir_contadores(self) -> Dict[str, Any]:
+        """
+        Reconstruye los contadores desde la tabla completa.
+        
+        Returns:
+            Estado de los contadores reconstruidos
+        """
+        await self.contadores.rebuild(full=True)
+        return self.contadores.stats()
@@ -1,10 +1,48 @@
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
+import asyncio
 import uuid
 
+from data.base_data import BaseData
 from data.estudiantes_data import EstudiantesData
+from data.permanencia_data import (
+    TutoriasAcademicasData, AsesoriasPsicologicasData, OrientacionesVocacionalesData,
+    ComedoresUniversitariosData, ApoyosSocioeconomicosData, TalleresHabilidadesData,
+    SeguimientosAcademicosData
+)
+from data.servicios_data import AsistenciasData
 from models.estudiantes import EstudianteCreate, EstudianteResponse, EstudianteUpdate
 
+# Servicios incluidos en el resumen de un estudiante: nombre, acceso a datos y campos
+# de fecha del registro en orden de preferencia (si ninguno tiene valor se usa created_at)
+SERVICIOS_RESUMEN = (
+    ("tutorias_academicas", TutoriasAcademicasData(), ("fecha_asignacion",)),
+    ("asesorias_psicologicas", AsesoriasPsicologicasData(), ("fecha_atencion",)),
+    ("orientaciones_vocacionales", OrientacionesVocacionalesData(), ("fecha_ingreso_programa",)),
+    ("comedores_universitarios", ComedoresUniversitariosData(), ("fecha_solicitud",)),
+    ("apoyos_socioeconomicos", ApoyosSocioeconomicosData(), ()),
+    ("talleres_habilidades", TalleresHabilidadesData(), ("fecha_taller",)),
+    ("seguimientos_academicos", SeguimientosAcademicosData(), ()),
+    ("remisiones_psicologicas", BaseData("remisiones_psicologicas"), ("fecha",)),
+    ("asistencias", AsistenciasData(), ("fecha",)),
+)
+
+def _fecha_registro(registro: Dict[str, Any], campos: Tuple[str, ...]) -> Optional[str]:
+    """
+    Obtiene la fecha de un registro para la línea de tiempo.
+    
+    Args:
+        registro: Registro del servicio
+        campos: Campos de fecha en orden de preferencia
+        
+    Returns:
+        Fecha en formato ISO o None si el registro no tiene fecha
+    """
+    for campo in campos + ("created_at",):
+        if registro.get(campo):
+            return str(registro[campo])
+    return None
+
 class EstudiantesService:
     """Servicio para la gestión de estudiantes."""
     
@@ -12,16 +50,55 @@ class EstudiantesService:
         """Inicializa el servicio de estudiantes."""
         self.data = EstudiantesData()
     
-    def get_all_estudiantes(self) -> List[Dict[str, Any]]:
+    async def get_all_estudiantes(self, columns: Optional[List[str]] = None, filters: Optional[Dict[str, Any]] = None,
+                                  order_by: Optional[str] = None, descending: bool = False) -> List[Dict[str, Any]]:
         """
         Obtiene todos los estudiantes.
         
+        Args:
+            columns: Columnas a retornar, None para todas
+            filters: Filtros construidos con EstudiantesData.build_filters
+            order_by: Columna de orden, None sin orden
+            descending: Si el orden es descendente
+            
         Returns:
             Lista de estudiantes
         """
-        return self.data.get_all()
+        return await self.data.get_all(columns, filters, order_by, descending)
+    
+    async def get_estudiantes_page(self, limit: int, cursor: Optional[str] = None, columns: Optional[List[str]] = None,
+                                   filters: Optional[Dict[str, Any]] = None, order_by: Optional[str] = None,
+                                   descending: bool = False) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Obtiene una página de estudiantes.
+        
+        Args:
+            limit: Número máximo de estudiantes
+            cursor: Cursor de la página anterior
+            columns: Columnas a retornar, None para todas
+            filters: Filtros construidos con EstudiantesData.build_filters
+            order_by: Columna de orden, None para el orden de creación
+            descending: Si el orden es descendente
+            
+        Returns:
+            Tupla con los estudiantes y el cursor de la página siguiente
+        """
+        return await self.data.get_page(limit, cursor, columns, filters, order_by, descending)
     
-    def get_estudiante_by_id(self, id: str) -> Optional[Dict[str, Any]]:
+    async def buscar_estudiantes(self, texto: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Busca estudiantes por nombres, apellidos, documento o correo.
+        
+        Args:
+            texto: Texto buscado, completo o parcial
+            limit: Número máximo de resultados
+            
+        Returns:
+            Estudiantes encontrados, del más al menos parecido
+        """
+        return await self.data.buscar(texto, limit)
+    
+    async def get_estudiante_by_id(self, id: str) -> Optional[Dict[str, Any]]:
         """
         Obtiene un estudiante por su ID.
         
@@ -31,9 +108,65 @@ class EstudiantesService:
         Returns:
             Estudiante encontrado o None si no existe
         """
-        return self.data.get_by_id(id)
+        return await self.data.get_by_id(id)
+    
+    async def get_resumen_estudiante(self, id: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene el estudiante junto con los registros de todos los servicios en los
+        que participa, consultando las tablas de forma concurrente.
+        
+        Args:
+            id: ID del estudiante
+            
+        Returns:
+            Diccionario con el estudiante, los conteos por servicio, la línea de tiempo
+            en orden cronológico (los registros sin fecha al final) y los servicios que
+            no se pudieron consultar; None si el estudiante no existe
+        """
+        async def registros_servicio(data: BaseData) -> List[Dict[str, Any]]:
+            if hasattr(data, "get_by_estudiante"):
+                return await data.get_by_estudiante(id)
+            return await data.get_all(filters={"estudiante_id": id})
+        
+        resultados = await asyncio.gather(
+            self.data.get_by_id(id),
+            *(registros_servicio(data) for _, data, _ in SERVICIOS_RESUMEN),
+            return_exceptions=True
+        )
+        estudiante = resultados[0]
+        if isinstance(estudiante, Exception):
+            raise estudiante
+        if not estudiante:
+            return None
+        
+        conteos = {}
+        errores = {}
+        linea_tiempo = []
+        for (servicio, _, campos), registros in zip(SERVICIOS_RESUMEN, resultados[1:]):
+            # Un servicio que falla no impide construir el resumen de los demás
+            if isinstance(registros, Exception):
+                print(f"Error al consultar {servicio} para el resumen del estudiante {id}: {str(registros)}")
+                errores[servicio] = str(registros)
+                conteos[servicio] = 0
+                continue
+            conteos[servicio] = len(registros)
+            for registro in registros:
+                linea_tiempo.append({
+                    "servicio": servicio,
+                    "fecha": _fecha_registro(registro, campos),
+                    "registro": registro
+                })
+        
+        linea_tiempo.sort(key=lambda evento: (evento["fecha"] is None, evento["fecha"] or ""))
+        return {
+            "estudiante": estudiante,
+            "conteos": conteos,
+            "total": len(linea_tiempo),
+            "linea_tiempo": linea_tiempo,
+            "errores": errores
+        }
     
-    def get_estudiante_by_documento(self, documento: str) -> Optional[Dict[str, Any]]:
+    async def get_estudiante_by_documento(self, documento: str) -> Optional[Dict[str, Any]]:
         """
         Obtiene un estudiante por su número de documento.
         
@@ -43,9 +176,9 @@ class EstudiantesService:
         Returns:
             Estudiante encontrado o None si no existe
         """
-        return self.data.get_by_documento(documento)
+        return await self.data.get_by_documento(documento)
     
-    def create_estudiante(self, estudiante: Dict[str, Any]) -> Dict[str, Any]:
+    async def create_estudiante(self, estudiante: Dict[str, Any]) -> Dict[str, Any]:
         """
         Crea un nuevo estudiante.
         
@@ -55,9 +188,9 @@ class EstudiantesService:
         Returns:
             Estudiante creado
         """
-        return self.data.create(estudiante)
+        return await self.data.create(estudiante)
     
-    def update_estudiante(self, id: str, estudiante: Dict[str, Any]) -> Dict[str, Any]:
+    async def update_estudiante(self, id: str, estudiante: Dict[str, Any]) -> Dict[str, Any]:
         """
         Actualiza un estudiante existente.
         
@@ -68,9 +201,9 @@ class EstudiantesService:
         Returns:
             Estudiante actualizado
         """
-        return self.data.update(id, estudiante)
+        return await self.data.update(id, estudiante)
     
-    def delete_estudiante(self, id: str) -> bool:
+    async def delete_estudiante(self, id: str) -> bool:
         """
         Elimina un estudiante.
         
@@ -80,9 +213,9 @@ class EstudiantesService:
         Returns:
             True si se eliminó correctamente, False en caso contrario
         """
-        return self.data.delete(id)
+        return await self.data.delete(id)
     
-    def buscar_o_crear_estudiante(self, datos_estudiante: Dict[str, Any]) -> str:
+    async def buscar_o_crear_estudiante(self, datos_estudiante: Dict[str, Any]) -> str:
         """
         Busca un estudiante por número de documento o crea uno nuevo si no existe.
         
@@ -92,4 +225,4 @@ class EstudiantesService:
         Returns:
             ID del estudiante
         """
-        return self.data.buscar_o_crear(datos_estudiante)
+        return await self.data.buscar_o_crear(datos_estudiante)
@@ -38,16 +38,21 @@ class PermanenciaService:
     
     # Métodos para Tutorías Académicas
     
-    def get_all_tutorias(self) -> List[Dict[str, Any]]:
+    async def get_all_tutorias(self, columns: Optional[List[str]] = None, embedded: Optional[Dict[str, Optional[List[str]]]] = None) -> List[Dict[str, Any]]:
         """
         Obtiene todas las tutorías académicas con datos del estudiante.
         
+        Args:
+            columns: Columnas a retornar, None para todas
+            embedded: Recursos embebidos y sus columnas, None para incluir
+                todas las columnas del estudiante
+            
         Returns:
             Lista de tutorías académicas
         """
-        return self.tutorias_data.get_with_estudiante()
+        return await self.tutorias_data.get_with_estudiante(columns, embedded)
     
-    def create_tutoria(self, tutoria_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def create_tutoria(self, tutoria_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Crea una nueva tutoría académica.
         
@@ -72,7 +77,7 @@ class PermanenciaService:
         }
         
         # Buscar o crear estudiante
-        estudiante_id = self.estudiantes_data.buscar_o_crear(datos_estudiante)
+        estudiante_id = await self.estudiantes_data.buscar_o_crear(datos_estudiante)
         
         # Crear tutoría académica
         tutoria = {
@@ -83,23 +88,28 @@ class PermanenciaService:
             "acciones_apoyo": tutoria_data.get("acciones_apoyo") or ""
         }
         
-        result = self.tutorias_data.create(tutoria)
+        result = await self.tutorias_data.create(tutoria)
         result["estudiante"] = datos_estudiante
         
         return result
     
     # Métodos para Asesorías Psicológicas
     
-    def get_all_asesorias(self) -> List[Dict[str, Any]]:
+    async def get_all_asesorias(self, columns: Optional[List[str]] = None, embedded: Optional[Dict[str, Optional[List[str]]]] = None) -> List[Dict[str, Any]]:
         """
         Obtiene todas las asesorías psicológicas con datos del estudiante.
         
+        Args:
+            columns: Columnas a retornar, None para todas
+            embedded: Recursos embebidos y sus columnas, None para incluir
+                todas las columnas del estudiante
+            
         Returns:
             Lista de asesorías psicológicas
         """
-        return self.asesorias_data.get_with_estudiante()
+        return await self.asesorias_data.get_with_estudiante(columns, embedded)
     
-    def create_asesoria(self, asesoria_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def create_asesoria(self, asesoria_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Crea una nueva asesoría psicológica.
         
@@ -124,7 +134,7 @@ class PermanenciaService:
         }
         
         # Buscar o crear estudiante
-        estudiante_id = self.estudiantes_data.buscar_o_crear(datos_estudiante)
+        estudiante_id = await self.estudiantes_data.buscar_o_crear(datos_estudiante)
         
         # Crear asesoría psicológica
         asesoria = {
@@ -135,23 +145,28 @@ class PermanenciaService:
             "seguimiento": asesoria_data.get("seguimiento") or ""
         }
         
-        result = self.asesorias_data.create(asesoria)
+        result = await self.asesorias_data.create(asesoria)
         result["estudiante"] = datos_estudiante
         
         return result
     
     # Métodos para Orientaciones Vocacionales
     
-    def get_all_orientaciones(self) -> List[Dict[str, Any]]:
+    async def get_all_orientaciones(self, columns: Optional[List[str]] = None, embedded: Optional[Dict[str, Optional[List[str]]]] = None) -> List[Dict[str, Any]]:
         """
         Obtiene todas las orientaciones vocacionales con datos del estudiante.
         
+        Args:
+            columns: Columnas a retornar, None para todas
+            embedded: Recursos embebidos y sus columnas, None para incluir
+                todas las columnas del estudiante
+            
         Returns:
             Lista de orientaciones vocacionales
         """
-        return self.orientaciones_data.get_with_estudiante()
+        return await self.orientaciones_data.get_with_estudiante(columns, embedded)
     
-    def create_orientacion(self, orientacion_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def create_orientacion(self, orientacion_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Crea una nueva orientación vocacional.
         
@@ -176,7 +191,7 @@ class PermanenciaService:
         }
         
         # Buscar o crear estudiante
-        estudiante_id = self.estudiantes_data.buscar_o_crear(datos_estudiante)
+        estudiante_id = await self.estudiantes_data.buscar_o_crear(datos_estudiante)
         
         # Crear orientación vocacional
         orientacion = {
@@ -187,23 +202,28 @@ class PermanenciaService:
             "observaciones": orientacion_data.get("observaciones") or ""
         }
         
-        result = self.orientaciones_data.create(orientacion)
+        result = await self.orientaciones_data.create(orientacion)
         result["estudiante"] = datos_estudiante
         
         return result
     
     # Métodos para Comedor Universitario
     
-    def get_all_comedores(self) -> List[Dict[str, Any]]:
+    async def get_all_comedores(self, columns: Optional[List[str]] = None, embedded: Optional[Dict[str, Optional[List[str]]]] = None) -> List[Dict[str, Any]]:
         """
         Obtiene todos los registros de comedor universitario con datos del estudiante.
         
+        Args:
+            columns: Columnas a retornar, None para todas
+            embedded: Recursos embebidos y sus columnas, None para incluir
+                todas las columnas del estudiante
+            
         Returns:
             Lista de registros de comedor universitario
         """
-        return self.comedores_data.get_with_estudiante()
+        return await self.comedores_data.get_with_estudiante(columns, embedded)
     
-    def create_comedor(self, comedor_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def create_comedor(self, comedor_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Crea un nuevo registro de comedor universitario.
         
@@ -228,7 +248,7 @@ class PermanenciaService:
         }
         
         # Buscar o crear estudiante
-        estudiante_id = self.estudiantes_data.buscar_o_crear(datos_estudiante)
+        estudiante_id = await self.estudiantes_data.buscar_o_crear(datos_estudiante)
         
         # Crear registro de comedor universitario
         comedor = {
@@ -241,23 +261,28 @@ class PermanenciaService:
             "observaciones": comedor_data.get("observaciones") or ""
         }
         
-        result = self.comedores_data.create(comedor)
+        result = await self.comedores_data.create(comedor)
         result["estudiante"] = datos_estudiante
         
         return result
     
     # Métodos para Apoyos Socioeconómicos
     
-    def get_all_apoyos(self) -> List[Dict[str, Any]]:
+    async def get_all_apoyos(self, columns: Optional[List[str]] = None, embedded: Optional[Dict[str, Optional[List[str]]]] = None) -> List[Dict[str, Any]]:
         """
         Obtiene todos los apoyos socioeconómicos con datos del estudiante.
         
+        Args:
+            columns: Columnas a retornar, None para todas
+            embedded: Recursos embebidos y sus columnas, None para incluir
+                todas las columnas del estudiante
+            
         Returns:
             Lista de apoyos socioeconómicos
         """
-        return self.apoyos_data.get_with_estudiante()
+        return await self.apoyos_data.get_with_estudiante(columns, embedded)
     
-    def create_apoyo(self, apoyo_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def create_apoyo(self, apoyo_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Crea un nuevo apoyo socioeconómico.
         
@@ -282,7 +307,7 @@ class PermanenciaService:
         }
         
         # Buscar o crear estudiante
-        estudiante_id = self.estudiantes_data.buscar_o_crear(datos_estudiante)
+        estudiante_id = await self.estudiantes_data.buscar_o_crear(datos_estudiante)
         
         # Crear apoyo socioeconómico
         apoyo = {
@@ -291,23 +316,28 @@ class PermanenciaService:
             "observaciones": apoyo_data.get("observaciones") or ""
         }
         
-        result = self.apoyos_data.create(apoyo)
+        result = await self.apoyos_data.create(apoyo)
         result["estudiante"] = datos_estudiante
         
         return result
     
     # Métodos para Talleres de Habilidades
     
-    def get_all_talleres(self) -> List[Dict[str, Any]]:
+    async def get_all_talleres(self, columns: Optional[List[str]] = None, embedded: Optional[Dict[str, Optional[List[str]]]] = None) -> List[Dict[str, Any]]:
         """
         Obtiene todos los talleres de habilidades con datos del estudiante.
         
+        Args:
+            columns: Columnas a retornar, None para todas
+            embedded: Recursos embebidos y sus columnas, None para incluir
+                todas las columnas del estudiante
+            
         Returns:
             Lista de talleres de habilidades
         """
-        return self.talleres_data.get_with_estudiante()
+        return await self.talleres_data.get_with_estudiante(columns, embedded)
     
-    def create_taller(self, taller_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def create_taller(self, taller_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Crea un nuevo taller de habilidades.
         
@@ -332,7 +362,7 @@ class PermanenciaService:
         }
         
         # Buscar o crear estudiante
-        estudiante_id = self.estudiantes_data.buscar_o_crear(datos_estudiante)
+        estudiante_id = await self.estudiantes_data.buscar_o_crear(datos_estudiante)
         
         # Crear taller de habilidades
         taller = {
@@ -342,23 +372,28 @@ class PermanenciaService:
             "observaciones": taller_data.get("observaciones") or ""
         }
         
-        result = self.talleres_data.create(taller)
+        result = await self.talleres_data.create(taller)
         result["estudiante"] = datos_estudiante
         
         return result
     
     # Métodos para Seguimientos Académicos
     
-    def get_all_seguimientos(self) -> List[Dict[str, Any]]:
+    async def get_all_seguimientos(self, columns: Optional[List[str]] = None, embedded: Optional[Dict[str, Optional[List[str]]]] = None) -> List[Dict[str, Any]]:
         """
         Obtiene todos los seguimientos académicos con datos del estudiante.
         
+        Args:
+            columns: Columnas a retornar, None para todas
+            embedded: Recursos embebidos y sus columnas, None para incluir
+                todas las columnas del estudiante
+            
         Returns:
             Lista de seguimientos académicos
         """
-        return self.seguimientos_data.get_with_estudiante()
+        return await self.seguimientos_data.get_with_estudiante(columns, embedded)
     
-    def create_seguimiento(self, seguimiento_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def create_seguimiento(self, seguimiento_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Crea un nuevo seguimiento académico.
         
@@ -383,7 +418,7 @@ class PermanenciaService:
         }
         
         # Buscar o crear estudiante
-        estudiante_id = self.estudiantes_data.buscar_o_crear(datos_estudiante)
+        estudiante_id = await self.estudiantes_data.buscar_o_crear(datos_estudiante)
         
         # Crear seguimiento académico
         seguimiento = {
@@ -392,7 +427,7 @@ class PermanenciaService:
             "observaciones_permanencia": seguimiento_data.get("observaciones_permanencia")
         }
         
-        result = self.seguimientos_data.create(seguimiento)
+        result = await self.seguimientos_data.create(seguimiento)
         result["estudiante"] = datos_estudiante
         
         return result
@@ -12,16 +12,19 @@ class ProgramasService:
         """Inicializa el servicio con acceso a datos de programas."""
         self.data = ProgramasData()
     
-    def get_all_programas(self) -> List[Dict[str, Any]]:
+    async def get_all_programas(self, columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
         Obtiene todos los programas académicos.
         
+        Args:
+            columns: Columnas a retornar, None para todas
+            
         Returns:
             Lista de programas
         """
-        return self.data.get_all()
+        return await self.data.get_all(columns)
     
-    def get_programa_by_id(self, id: str) -> Optional[Dict[str, Any]]:
+    async def get_programa_by_id(self, id: str) -> Optional[Dict[str, Any]]:
         """
         Obtiene un programa por su ID.
         
@@ -31,9 +34,9 @@ class ProgramasService:
         Returns:
             Programa encontrado o None si no existe
         """
-        return self.data.get_by_id(id)
+        return await self.data.get_by_id(id)
     
-    def get_programa_by_codigo(self, codigo: str) -> Optional[Dict[str, Any]]:
+    async def get_programa_by_codigo(self, codigo: str) -> Optional[Dict[str, Any]]:
         """
         Obtiene un programa por su código.
         
@@ -43,9 +46,9 @@ class ProgramasService:
         Returns:
             Programa encontrado o None si no existe
         """
-        return self.data.get_by_codigo(codigo)
+        return await self.data.get_by_codigo(codigo)
     
-    def get_programas_by_facultad(self, facultad: str) -> List[Dict[str, Any]]:
+    async def get_programas_by_facultad(self, facultad: str) -> List[Dict[str, Any]]:
         """
         Obtiene programas por facultad.
         
@@ -55,9 +58,9 @@ class ProgramasService:
         Returns:
             Lista de programas de la facultad
         """
-        return self.data.get_by_facultad(facultad)
+        return await self.data.get_by_facultad(facultad)
     
-    def get_programas_by_nivel(self, nivel: str) -> List[Dict[str, Any]]:
+    async def get_programas_by_nivel(self, nivel: str) -> List[Dict[str, Any]]:
         """
         Obtiene programas por nivel.
         
@@ -67,18 +70,18 @@ class ProgramasService:
         Returns:
             Lista de programas del nivel especificado
         """
-        return self.data.get_by_nivel(nivel)
+        return await self.data.get_by_nivel(nivel)
     
-    def get_programas_activos(self) -> List[Dict[str, Any]]:
+    async def get_programas_activos(self) -> List[Dict[str, Any]]:
         """
         Obtiene todos los programas activos.
         
         Returns:
             Lista de programas activos
         """
-        return self.data.get_activos()
+        return await self.data.get_activos()
     
-    def create_programa(self, programa_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def create_programa(self, programa_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Crea un nuevo programa.
         
@@ -89,13 +92,13 @@ class ProgramasService:
             Programa creado
         """
         # Verificar si ya existe un programa con el mismo código
-        existing = self.data.get_by_codigo(programa_data.get("codigo"))
+        existing = await self.data.get_by_codigo(programa_data.get("codigo"))
         if existing:
             raise ValueError(f"Ya existe un programa con el código {programa_data.get('codigo')}")
         
-        return self.data.create(programa_data)
+        return await self.data.create(programa_data)
     
-    def update_programa(self, id: str, programa_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def update_programa(self, id: str, programa_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Actualiza un programa existente.
         
@@ -107,19 +110,19 @@ class ProgramasService:
             Programa actualizado
         """
         # Verificar si el programa existe
-        existing = self.data.get_by_id(id)
+        existing = await self.data.get_by_id(id)
         if not existing:
             raise ValueError(f"No existe un programa con el ID {id}")
         
         # Si se está actualizando el código, verificar que no exista otro programa con ese código
         if "codigo" in programa_data and programa_data["codigo"] != existing["codigo"]:
-            codigo_check = self.data.get_by_codigo(programa_data["codigo"])
+            codigo_check = await self.data.get_by_codigo(programa_data["codigo"])
             if codigo_check and codigo_check["id"] != id:
                 raise ValueError(f"Ya existe otro programa con el código {programa_data['codigo']}")
         
-        return self.data.update(id, programa_data)
+        return await self.data.update(id, programa_data)
     
-    def delete_programa(self, id: str) -> bool:
+    async def delete_programa(self, id: str) -> bool:
         """
         Elimina un programa.
         
@@ -130,8 +133,8 @@ class ProgramasService:
             True si se eliminó correctamente, False en caso contrario
         """
         # Verificar si el programa existe
-        existing = self.data.get_by_id(id)
+        existing = await self.data.get_by_id(id)
         if not existing:
             raise ValueError(f"No existe un programa con el ID {id}")
         
-        return self.data.delete(id)
+        return await self.data.delete(id)
@@ -1,4 +1,4 @@
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 import uuid
 
@@ -13,16 +13,33 @@ class ServiciosService:
         self.data = ServiciosData()
         self.asistencias_data = AsistenciasData()
     
-    def get_all_servicios(self) -> List[Dict[str, Any]]:
+    async def get_all_servicios(self, columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
         Obtiene todos los servicios.
         
+        Args:
+            columns: Columnas a retornar, None para todas
+            
         Returns:
             Lista de servicios
         """
-        return self.data.get_all()
+        return await self.data.get_all(columns)
+    
+    async def get_servicios_page(self, limit: int, cursor: Optional[str] = None, columns: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Obtiene una página de servicios.
+        
+        Args:
+            limit: Número máximo de servicios
+            cursor: Cursor de la página anterior
+            columns: Columnas a retornar, None para todas
+            
+        Returns:
+            Tupla con los servicios y el cursor de la página siguiente
+        """
+        return await self.data.get_page(limit, cursor, columns)
     
-    def get_servicio_by_id(self, id: str) -> Optional[Dict[str, Any]]:
+    async def get_servicio_by_id(self, id: str) -> Optional[Dict[str, Any]]:
         """
         Obtiene un servicio por su ID.
         
@@ -32,9 +49,9 @@ class ServiciosService:
         Returns:
             Servicio encontrado o None si no existe
         """
-        return self.data.get_by_id(id)
+        return await self.data.get_by_id(id)
     
-    def get_servicios_by_tipo(self, tipo: str) -> List[Dict[str, Any]]:
+    async def get_servicios_by_tipo(self, tipo: str) -> List[Dict[str, Any]]:
         """
         Obtiene servicios por tipo.
         
@@ -44,18 +61,18 @@ class ServiciosService:
         Returns:
             Lista de servicios del tipo especificado
         """
-        return self.data.get_by_tipo(tipo)
+        return await self.data.get_by_tipo(tipo)
     
-    def get_servicios_activos(self) -> List[Dict[str, Any]]:
+    async def get_servicios_activos(self) -> List[Dict[str, Any]]:
         """
         Obtiene todos los servicios activos.
         
         Returns:
             Lista de servicios activos
         """
-        return self.data.get_activos()
+        return await self.data.get_activos()
     
-    def create_servicio(self, servicio_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def create_servicio(self, servicio_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Crea un nuevo servicio.
         
@@ -65,9 +82,9 @@ class ServiciosService:
         Returns:
             Servicio creado
         """
-        return self.data.create(servicio_data)
+        return await self.data.create(servicio_data)
     
-    def update_servicio(self, id: str, servicio_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def update_servicio(self, id: str, servicio_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Actualiza un servicio existente.
         
@@ -79,13 +96,13 @@ class ServiciosService:
             Servicio actualizado
         """
         # Verificar si el servicio existe
-        existing = self.data.get_by_id(id)
+        existing = await self.data.get_by_id(id)
         if not existing:
             raise ValueError(f"No existe un servicio con el ID {id}")
         
-        return self.data.update(id, servicio_data)
+        return await self.data.update(id, servicio_data)
     
-    def delete_servicio(self, id: str) -> bool:
+    async def delete_servicio(self, id: str) -> bool:
         """
         Elimina un servicio.
         
@@ -96,15 +113,41 @@ class ServiciosService:
             True si se eliminó correctamente, False en caso contrario
         """
         # Verificar si el servicio existe
-        existing = self.data.get_by_id(id)
+        existing = await self.data.get_by_id(id)
         if not existing:
             raise ValueError(f"No existe un servicio con el ID {id}")
         
-        return self.data.delete(id)
+        return await self.data.delete(id)
     
     # Métodos para asistencias
     
-    def get_asistencias_by_estudiante(self, estudiante_id: str) -> List[Dict[str, Any]]:
+    async def get_all_asistencias(self, columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Obtiene todas las asistencias.
+        
+        Args:
+            columns: Columnas a retornar, None para todas
+            
+        Returns:
+            Lista de asistencias
+        """
+        return await self.asistencias_data.get_all(columns)
+    
+    async def get_asistencias_page(self, limit: int, cursor: Optional[str] = None, columns: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Obtiene una página de asistencias.
+        
+        Args:
+            limit: Número máximo de asistencias
+            cursor: Cursor de la página anterior
+            columns: Columnas a retornar, None para todas
+            
+        Returns:
+            Tupla con las asistencias y el cursor de la página siguiente
+        """
+        return await self.asistencias_data.get_page(limit, cursor, columns)
+    
+    async def get_asistencias_by_estudiante(self, estudiante_id: str) -> List[Dict[str, Any]]:
         """
         Obtiene asistencias por estudiante.
         
@@ -114,9 +157,9 @@ class ServiciosService:
         Returns:
             Lista de asistencias del estudiante
         """
-        return self.asistencias_data.get_by_estudiante(estudiante_id)
+        return await self.asistencias_data.get_by_estudiante(estudiante_id)
     
-    def get_asistencias_by_servicio(self, servicio_id: str) -> List[Dict[str, Any]]:
+    async def get_asistencias_by_servicio(self, servicio_id: str) -> List[Dict[str, Any]]:
         """
         Obtiene asistencias por servicio.
         
@@ -126,9 +169,9 @@ class ServiciosService:
         Returns:
             Lista de asistencias al servicio
         """
-        return self.asistencias_data.get_by_servicio(servicio_id)
+        return await self.asistencias_data.get_by_servicio(servicio_id)
     
-    def get_asistencias_by_fecha(self, fecha_inicio: str, fecha_fin: str) -> List[Dict[str, Any]]:
+    async def get_asistencias_by_fecha(self, fecha_inicio: str, fecha_fin: str) -> List[Dict[str, Any]]:
         """
         Obtiene asistencias por rango de fechas.
         
@@ -139,9 +182,9 @@ class ServiciosService:
         Returns:
             Lista de asistencias en el rango de fechas
         """
-        return self.asistencias_data.get_by_fecha(fecha_inicio, fecha_fin)
+        return await self.asistencias_data.get_by_fecha(fecha_inicio, fecha_fin)
     
-    def create_asistencia(self, asistencia_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def create_asistencia(self, asistencia_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Crea una nueva asistencia.
         
@@ -151,9 +194,9 @@ class ServiciosService:
         Returns:
             Asistencia creada
         """
-        return self.asistencias_data.create(asistencia_data)
+        return await self.asistencias_data.create(asistencia_data)
     
-    def update_asistencia(self, id: str, asistencia_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def update_asistencia(self, id: str, asistencia_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Actualiza una asistencia existente.
         
@@ -165,13 +208,13 @@ class ServiciosService:
             Asistencia actualizada
         """
         # Verificar si la asistencia existe
-        existing = self.asistencias_data.get_by_id(id)
+        existing = await self.asistencias_data.get_by_id(id)
         if not existing:
             raise ValueError(f"No existe una asistencia con el ID {id}")
         
-        return self.asistencias_data.update(id, asistencia_data)
+        return await self.asistencias_data.update(id, asistencia_data)
     
-    def delete_asistencia(self, id: str) -> bool:
+    async def delete_asistencia(self, id: str) -> bool:
         """
         Elimina una asistencia.
         
@@ -182,8 +225,8 @@ class ServiciosService:
             True si se eliminó correctamente, False en caso contrario
         """
         # Verificar si la asistencia existe
-        existing = self.asistencias_data.get_by_id(id)
+        existing = await self.asistencias_data.get_by_id(id)
         if not existing:
             raise ValueError(f"No existe una asistencia con el ID {id}")
         
-        return self.asistencias_data.delete(id)
+        return await self.asistencias_data.delete(id)
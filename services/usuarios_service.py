@@ -18,16 +18,16 @@ class UsuariosService:
         self.ALGORITHM = "HS256"
         self.ACCESS_TOKEN_EXPIRE_MINUTES = 30
     
-    def get_all_usuarios(self) -> List[Dict[str, Any]]:
+    async def get_all_usuarios(self) -> List[Dict[str, Any]]:
         """
         Obtiene todos los usuarios.
         
         Returns:
             Lista de usuarios
         """
-        return self.data.get_all()
+        return await self.data.get_all()
     
-    def get_usuario_by_id(self, id: str) -> Optional[Dict[str, Any]]:
+    async def get_usuario_by_id(self, id: str) -> Optional[Dict[str, Any]]:
         """
         Obtiene un usuario por su ID.
         
@@ -37,9 +37,9 @@ class UsuariosService:
         Returns:
             Usuario encontrado o None si no existe
         """
-        return self.data.get_by_id(id)
+        return await self.data.get_by_id(id)
     
-    def get_usuario_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+    async def get_usuario_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """
         Obtiene un usuario por su email.
         
@@ -49,9 +49,9 @@ class UsuariosService:
         Returns:
             Usuario encontrado o None si no existe
         """
-        return self.data.get_by_email(email)
+        return await self.data.get_by_email(email)
     
-    def get_usuarios_by_rol(self, rol: str) -> List[Dict[str, Any]]:
+    async def get_usuarios_by_rol(self, rol: str) -> List[Dict[str, Any]]:
         """
         Obtiene usuarios por rol.
         
@@ -61,16 +61,16 @@ class UsuariosService:
         Returns:
             Lista de usuarios con el rol especificado
         """
-        return self.data.get_by_rol(rol)
+        return await self.data.get_by_rol(rol)
     
-    def get_usuarios_activos(self) -> List[Dict[str, Any]]:
+    async def get_usuarios_activos(self) -> List[Dict[str, Any]]:
         """
         Obtiene todos los usuarios activos.
         
         Returns:
             Lista de usuarios activos
         """
-        return self.data.get_activos()
+        return await self.data.get_activos()
     
     def _hash_password(self, password: str) -> str:
         """
@@ -86,7 +86,7 @@ class UsuariosService:
         # como bcrypt o Argon2
         return hashlib.sha256(password.encode()).hexdigest()
     
-    def create_usuario(self, usuario_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def create_usuario(self, usuario_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Crea un nuevo usuario.
         
@@ -97,7 +97,7 @@ class UsuariosService:
             Usuario creado
         """
         # Verificar si ya existe un usuario con el mismo email
-        existing = self.data.get_by_email(usuario_data.get("email"))
+        existing = await self.data.get_by_email(usuario_data.get("email"))
         if existing:
             raise ValueError(f"Ya existe un usuario con el email {usuario_data.get('email')}")
         
@@ -105,9 +105,9 @@ class UsuariosService:
         if "password" in usuario_data:
             usuario_data["password"] = self._hash_password(usuario_data["password"])
         
-        return self.data.create(usuario_data)
+        return await self.data.create(usuario_data)
     
-    def update_usuario(self, id: str, usuario_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def update_usuario(self, id: str, usuario_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Actualiza un usuario existente.
         
@@ -119,13 +119,13 @@ class UsuariosService:
             Usuario actualizado
         """
         # Verificar si el usuario existe
-        existing = self.data.get_by_id(id)
+        existing = await self.data.get_by_id(id)
         if not existing:
             raise ValueError(f"No existe un usuario con el ID {id}")
         
         # Si se está actualizando el email, verificar que no exista otro usuario con ese email
         if "email" in usuario_data and usuario_data["email"] != existing["email"]:
-            email_check = self.data.get_by_email(usuario_data["email"])
+            email_check = await self.data.get_by_email(usuario_data["email"])
             if email_check and email_check["id"] != id:
                 raise ValueError(f"Ya existe otro usuario con el email {usuario_data['email']}")
         
@@ -133,9 +133,9 @@ class UsuariosService:
         if "password" in usuario_data:
             usuario_data["password"] = self._hash_password(usuario_data["password"])
         
-        return self.data.update(id, usuario_data)
+        return await self.data.update(id, usuario_data)
     
-    def delete_usuario(self, id: str) -> bool:
+    async def delete_usuario(self, id: str) -> bool:
         """
         Elimina un usuario.
         
@@ -146,13 +146,13 @@ class UsuariosService:
             True si se eliminó correctamente, False en caso contrario
         """
         # Verificar si el usuario existe
-        existing = self.data.get_by_id(id)
+        existing = await self.data.get_by_id(id)
         if not existing:
             raise ValueError(f"No existe un usuario con el ID {id}")
         
-        return self.data.delete(id)
+        return await self.data.delete(id)
     
-    def authenticate_user(self, email: str, password: str) -> Optional[Dict[str, Any]]:
+    async def authenticate_user(self, email: str, password: str) -> Optional[Dict[str, Any]]:
         """
         Autentica un usuario por email y contraseña.
         
@@ -163,7 +163,7 @@ class UsuariosService:
         Returns:
             Usuario autenticado o None si la autenticación falla
         """
-        user = self.data.get_by_email(email)
+        user = await self.data.get_by_email(email)
         if not user:
             return None
         
@@ -194,7 +194,7 @@ class UsuariosService:
         encoded_jwt = jwt.encode(to_encode, self.SECRET_KEY, algorithm=self.ALGORITHM)
         return encoded_jwt
     
-    def login(self, email: str, password: str) -> Optional[Token]:
+    async def login(self, email: str, password: str) -> Optional[Token]:
         """
         Inicia sesión de un usuario.
         
@@ -205,7 +205,7 @@ class UsuariosService:
         Returns:
             Token de acceso o None si la autenticación falla
         """
-        user = self.authenticate_user(email, password)
+        user = await self.authenticate_user(email, password)
         if not user:
             return None
         
@@ -1,18 +1,4 @@
-import os
-from dotenv import load_dotenv
-from supabase import create_client, Client
+# Compatibilidad: el cliente síncrono se crea una sola vez, en su primer uso, en config/database.py
+from config.database import supabase
 
-# Cargar variables de entorno
-load_dotenv()
-
-# Configuración de Supabase
-supabase_url = os.getenv("SUPABASE_URL")
-supabase_key = os.getenv("SUPABASE_KEY")
-
-# Inicializar cliente de Supabase
-try:
-    supabase: Client = create_client(supabase_url, supabase_key)
-    print(f"Conexión a Supabase establecida correctamente: {supabase_url}")
-except Exception as e:
-    print(f"Error al conectar con Supabase: {e}")
-    raise
+__all__ = ['supabase']
@@ -1,21 +1,9 @@
-import os
-from dotenv import load_dotenv
-from supabase import create_client, Client
-
-# Cargar variables de entorno
-load_dotenv()
-
-# Configuración de Supabase
-supabase_url = os.getenv("SUPABASE_URL")
-supabase_key = os.getenv("SUPABASE_KEY")
-
-print(f"SUPABASE_URL: {supabase_url}")
-print(f"SUPABASE_KEY: {supabase_key[:10]}...")
-
 try:
-    # Inicializar cliente de Supabase
-    supabase: Client = create_client(supabase_url, supabase_key)
-    print("Conexión a Supabase establecida correctamente")
+    # Cliente compartido de la configuración (respeta SUPABASE_BACKEND=fake para probar sin red)
+    from config.database import supabase, supabase_url, supabase_key
+    
+    print(f"SUPABASE_URL: {supabase_url}")
+    print(f"SUPABASE_KEY: {supabase_key[:10]}...")
     
     # Verificar si la tabla usuarios existe
     try:
@@ -0,0 +1,23 @@
+import os
+import sys
+
+# Las pruebas usan el backend simulado de Supabase (utils/fake_postgrest.py), sin red
+os.environ["SUPABASE_BACKEND"] = "fake"
+os.environ.setdefault("PERMANENCIA_COUNTERS_REFRESH", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from config import supabase_fake_store
+from data import cache
+from data.versions import get_table_versions
+
+@pytest.fixture
+def store():
+    """Backend simulado vacío, con las cachés y versiones de las tablas descartadas."""
+    supabase_fake_store.tables.clear()
+    cache._table_caches.clear()
+    cache._response_caches.clear()
+    get_table_versions()._versiones.clear()
+    yield supabase_fake_store
+    supabase_fake_store.tables.clear()
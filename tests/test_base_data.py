@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from data.base_data import BaseData, decode_cursor, encode_cursor
+
+def test_cursor_ida_y_vuelta():
+    cursor = encode_cursor({"id": "abc", "created_at": "2024-01-01T00:00:00+00:00"})
+    assert decode_cursor(cursor) == ("2024-01-01T00:00:00+00:00", "abc")
+    assert decode_cursor(encode_cursor({"id": 7, "nombre": None}, "nombre")) == (None, 7)
+
+@pytest.mark.parametrize("cursor", ["no-es-base64!", encode_cursor({"id": None})])
+def test_cursor_invalido(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+def test_write_many_por_bloques(store):
+    data = BaseData("actas")
+    filas = [{"titulo": f"acta {i}"} for i in range(5)]
+    resultado = asyncio.run(data.create_many(filas, chunk_size=2))
+    
+    assert resultado["errors"] == []
+    assert len(resultado["ids"]) == 5 and all(resultado["ids"])
+    assert [fila["titulo"] for fila in store.tables["actas"]] == [f"acta {i}" for i in range(5)]
+
+def test_write_many_separa_llaves_distintas(store):
+    data = BaseData("actas")
+    filas = [{"titulo": "a", "estado": "abierta"}, {"titulo": "b"}, {"titulo": "c"}]
+    resultado = asyncio.run(data.create_many(filas, chunk_size=10))
+    
+    assert resultado["errors"] == []
+    # Sin estado en la petición, la base de datos aplicaría su valor por defecto en lugar de NULL
+    assert [("estado" in fila) for fila in store.tables["actas"]] == [True, False, False]
+
+def test_write_many_reporta_bloques_fallidos(store):
+    store.load({"actas": [{"id": "dup", "titulo": "existente"}]})
+    data = BaseData("actas")
+    filas = [{"id": "x1", "titulo": "a"}, {"id": "dup", "titulo": "b"}, {"id": "x3", "titulo": "c"}]
+    resultado = asyncio.run(data.create_many(filas, chunk_size=2))
+    
+    assert resultado["ids"] == [None, None, "x3"]
+    assert [(error["start"], error["end"]) for error in resultado["errors"]] == [(0, 2)]
+
+def test_write_many_rechaza_bloque_vacio(store):
+    with pytest.raises(ValueError):
+        asyncio.run(BaseData("actas").create_many([{"titulo": "a"}], chunk_size=0))
+    assert store.tables.get("actas", []) == []
+
+def test_upsert_many_no_aplica_bloques_fallidos(store):
+    store.load({"servicios": [
+        {"id": "s1", "codigo": "A", "nombre": "uno", "updated_at": "2024-01-01T00:00:00+00:00"},
+        {"id": "s2", "codigo": "B", "nombre": "dos", "updated_at": "2024-01-01T00:00:00+00:00"},
+    ]})
+    data = BaseData("servicios")
+    # La segunda fila toma el código de s2, así que el bloque completo debe fallar
+    filas = [{"id": "s1", "codigo": "A", "nombre": "nuevo"}, {"id": "s3", "codigo": "B", "nombre": "tres"}]
+    resultado = asyncio.run(data.upsert_many(filas, chunk_size=2))
+    
+    assert [(error["start"], error["end"]) for error in resultado["errors"]] == [(0, 2)]
+    assert [(fila["id"], fila["nombre"]) for fila in store.tables["servicios"]] == [("s1", "uno"), ("s2", "dos")]
+    assert store.tables["servicios"][0]["updated_at"] == "2024-01-01T00:00:00+00:00"
+
+def test_upsert_many_actualiza_updated_at(store):
+    store.load({"servicios": [{"id": "s1", "codigo": "A", "nombre": "uno", "updated_at": "2024-01-01T00:00:00+00:00"}]})
+    resultado = asyncio.run(BaseData("servicios").upsert_many([{"id": "s1", "codigo": "A", "nombre": "nuevo"}]))
+    
+    assert resultado["errors"] == []
+    fila = store.tables["servicios"][0]
+    assert fila["nombre"] == "nuevo" and fila["updated_at"] > "2024-01-01T00:00:00+00:00"
@@ -0,0 +1,87 @@
+import asyncio
+
+from data.cache import ResponseCache
+from data.versions import TableVersions
+
+def nueva_cache(**opciones):
+    return ResponseCache("actas", ttl=60, stale_ttl=0, versions=TableVersions(ttl=0), **opciones)
+
+def test_single_flight(store):
+    cache = nueva_cache()
+    llamadas = []
+    
+    async def calcular():
+        llamadas.append(1)
+        await asyncio.sleep(0.01)
+        return {"total": len(llamadas)}
+    
+    async def escenario():
+        return await asyncio.gather(*(cache.get_or_compute("llave", calcular) for _ in range(5)))
+    
+    resultados = asyncio.run(escenario())
+    assert len(llamadas) == 1
+    assert all(resultado is resultados[0] for resultado in resultados)
+    assert cache.stats()["computations"] == 1
+
+def test_invalidate_descarta_respuestas_y_calculos_en_curso(store):
+    cache = nueva_cache()
+    valores = iter(range(10))
+    iniciado = asyncio.Event()
+    
+    async def calcular():
+        iniciado.set()
+        await asyncio.sleep(0.01)
+        return next(valores)
+    
+    async def escenario():
+        assert await cache.get_or_compute("llave", calcular) == 0
+        assert await cache.get_or_compute("llave", calcular) == 0
+        cache.invalidate()
+        assert await cache.get_or_compute("llave", calcular) == 1
+        
+        # Una escritura mientras se calcula deja el resultado sin guardar
+        iniciado.clear()
+        en_curso = asyncio.ensure_future(cache.get_or_compute("otra", calcular))
+        await iniciado.wait()
+        cache.invalidate()
+        assert await en_curso == 2
+        assert await cache.get_or_compute("otra", calcular) == 3
+    
+    asyncio.run(escenario())
+
+def test_cambio_de_version_recalcula(store):
+    store.load({"actas": [{"titulo": "a"}]})
+    cache = nueva_cache()
+    valores = iter(range(10))
+    
+    async def calcular():
+        return next(valores)
+    
+    async def escenario():
+        assert await cache.get_or_compute("llave", calcular) == 0
+        assert await cache.get_or_compute("llave", calcular) == 0
+        # Inserción hecha por otro proceso: solo cambia la versión de la tabla
+        store.load({"actas": [{"titulo": "b"}]})
+        assert await cache.get_or_compute("llave", calcular) == 1
+    
+    asyncio.run(escenario())
+
+def test_excepciones_no_se_guardan(store):
+    cache = nueva_cache()
+    intentos = []
+    
+    async def calcular():
+        intentos.append(1)
+        if len(intentos) == 1:
+            raise RuntimeError("fallo transitorio")
+        return "ok"
+    
+    async def escenario():
+        try:
+            await cache.get_or_compute("llave", calcular)
+        except RuntimeError:
+            pass
+        return await cache.get_or_compute("llave", calcular)
+    
+    assert asyncio.run(escenario()) == "ok"
+    assert len(intentos) == 2
@@ -0,0 +1,68 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from data.cache import invalidate_table
+
+def registro(**campos):
+    base = {
+        "servicio": "POA", "estrato": 1, "inscritos": 1, "matriculados": 1, "desertores": 0, "graduados": 0,
+        "riesgo_desercion": "Alto", "tipo_vulnerabilidad": "Social", "requiere_tutoria": "Sí",
+        "estudiante_programa_academico": "Derecho", "periodo": "2024-1"
+    }
+    base.update(campos)
+    return base
+
+REGISTROS = [
+    registro(),
+    registro(servicio="Comedor", estrato=2, inscritos=3, riesgo_desercion="Bajo"),
+    registro(riesgo_desercion="desconocido", estudiante_programa_academico="Enfermería"),
+    registro(servicio="Comedor", estudiante_programa_academico=None, riesgo_desercion="Medio")
+]
+
+@pytest.fixture
+def client(store):
+    store.load({"permanencia": [dict(r) for r in REGISTROS]})
+    invalidate_table("permanencia")
+    return TestClient(main.app)
+
+def test_dashboard_coincide_con_los_endpoints(client):
+    respuesta = client.get("/api/dashboard")
+    assert respuesta.status_code == 200
+    dashboard = respuesta.json()
+    graficos = dashboard["charts"]
+    
+    assert dashboard["registros"] == 4
+    assert list(graficos) == [
+        "estadisticas-generales", "datos-permanencia", "estrato-servicio", "programas-distribucion",
+        "riesgo-desercion", "programa-riesgo", "tendencias-tiempo"
+    ]
+    assert graficos["estadisticas-generales"] == client.get("/api/estadisticas-generales").json()
+    assert len(graficos["datos-permanencia"]) == len(client.get("/api/datos-permanencia").json()) == 4
+    
+    por_clave = lambda filas: sorted(sorted(fila.items()) for fila in filas)
+    assert por_clave(graficos["estrato-servicio"]) == por_clave(client.get("/api/estrato-servicio").json())
+
+def test_dashboard_compone_los_graficos_agrupados(client):
+    graficos = client.get("/api/dashboard?charts=riesgo-desercion,programas-distribucion").json()["charts"]
+    
+    assert list(graficos) == ["riesgo-desercion", "programas-distribucion"]
+    # Los niveles desconocidos cuentan como "Bajo"
+    assert {fila["name"]: fila["value"] for fila in graficos["riesgo-desercion"]} == {
+        "Muy bajo": 0, "Bajo": 2, "Medio": 1, "Alto": 1, "Muy Alto": 0
+    }
+    # Los registros sin programa cuentan en "Otros programas"
+    assert {fila["programa"]: fila["value"] for fila in graficos["programas-distribucion"]} == {
+        "Derecho": 4, "Enfermería": 1, "Otros programas": 1
+    }
+
+def test_dashboard_refleja_las_escrituras(client, store):
+    assert client.get("/api/dashboard?charts=estadisticas-generales").json()["registros"] == 4
+    store.load({"permanencia": [registro(servicio="Comedor")]})
+    invalidate_table("permanencia")
+    assert client.get("/api/dashboard?charts=estadisticas-generales").json()["registros"] == 5
+
+def test_dashboard_rechaza_graficos_desconocidos(client):
+    respuesta = client.get("/api/dashboard?charts=riesgo-desercion,otro")
+    assert respuesta.status_code == 400
+    assert "otro" in respuesta.json()["detail"]
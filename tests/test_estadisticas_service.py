@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from data.versions import TableVersions
+from services.estadisticas_service import (
+    ContadoresPermanencia, calcular_marginales, consultar_cubo, sumar_marginales
+)
+
+def registro(**campos):
+    base = {
+        "servicio": "POA", "estrato": 1, "inscritos": 1, "matriculados": 1, "desertores": 0, "graduados": 0,
+        "riesgo_desercion": "Alto", "tipo_vulnerabilidad": "Social", "requiere_tutoria": "Sí",
+        "estudiante_programa_academico": "Derecho", "periodo": "2024-1"
+    }
+    base.update(campos)
+    return base
+
+REGISTROS = [
+    registro(),
+    registro(servicio="Comedor", estrato=2, inscritos=3),
+    registro(estrato=None, riesgo_desercion="Bajo", graduados=1),
+    registro(servicio="Comedor", estudiante_programa_academico="Enfermería", periodo="2024-2")
+]
+
+def test_calcular_marginales():
+    marginales = calcular_marginales(REGISTROS)
+    
+    assert marginales["registros"] == 4
+    assert marginales["totales"]["inscritos"] == {"suma": 6, "positivos": 4}
+    assert marginales["totales"]["graduados"]["suma"] == 1
+    assert marginales["dimensiones"]["servicio"]["Comedor"]["registros"] == 2
+    assert marginales["dimensiones"]["servicio"]["Comedor"]["inscritos"] == 4
+    assert sum(medidas[0] for medidas in marginales["cubo"].values()) == 4
+
+def test_sumar_marginales_equivale_a_calcularlas_juntas():
+    marginales = calcular_marginales(REGISTROS[:1])
+    sumar_marginales(marginales, calcular_marginales(REGISTROS[1:]))
+    assert marginales == calcular_marginales(REGISTROS)
+
+def test_consultar_cubo():
+    marginales = calcular_marginales(REGISTROS)
+    
+    por_servicio = {fila["servicio"]: fila for fila in consultar_cubo(marginales, ["servicio"])}
+    assert por_servicio["POA"]["registros"] == 2 and por_servicio["Comedor"]["inscritos"] == 4
+    
+    filas = consultar_cubo(marginales, ["estrato"], {"servicio": ["POA"]})
+    assert {fila["estrato"]: fila["registros"] for fila in filas} == {1: 1, None: 1}
+    
+    assert consultar_cubo(marginales, [])[0]["registros"] == 4
+    with pytest.raises(ValueError):
+        consultar_cubo(marginales, ["requiere_tutoria"])
+
+def test_contadores_detectan_escrituras_de_otro_proceso(store):
+    store.load({"permanencia": [dict(r) for r in REGISTROS[:2]]})
+    contadores = ContadoresPermanencia(refresh=0, versions=TableVersions(ttl=0))
+    
+    async def escenario():
+        assert (await contadores.marginales())["registros"] == 2
+        # Inserción propia sumada con add, y otra hecha "desde otro proceso" sin add
+        propio = [{**registro(), "id": "propio"}]
+        store.load({"permanencia": propio})
+        contadores.add(propio)
+        store.load({"permanencia": [registro(servicio="Comedor")]})
+        return await contadores.marginales()
+    
+    marginales = asyncio.run(escenario())
+    assert marginales["registros"] == 4
+    assert contadores.rebuilds == 2
@@ -0,0 +1,17 @@
+from fastapi.testclient import TestClient
+
+import main
+
+def test_listado_filtra_por_semestre(store):
+    store.load({"estudiantes": [
+        {"id": "a", "documento": "100", "nombres": "Ana", "semestre": 3, "estrato": 1},
+        {"id": "b", "documento": "200", "nombres": "Luis", "semestre": 4, "estrato": 2}
+    ]})
+    client = TestClient(main.app)
+    
+    respuesta = client.get("/api/estudiantes?semestre=3")
+    assert respuesta.status_code == 200
+    assert [e["id"] for e in respuesta.json()["data"]] == ["a"]
+    
+    assert client.get("/api/estudiantes?semestre=11").status_code == 422
+    assert client.get("/api/estudiantes?semestre=tercero").status_code == 422
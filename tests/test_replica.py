@@ -0,0 +1,68 @@
+import json
+import sqlite3
+
+import pytest
+
+from data.replica import LocalReplica
+
+FILAS = [
+    {"id": 1, "nombre": "Ana", "estrato": 1, "activo": True, "programa": None},
+    {"id": 2, "nombre": "andrés", "estrato": 3, "activo": False, "programa": "Derecho"},
+    {"id": 3, "nombre": "Beatriz", "estrato": 5, "activo": True, "programa": "Enfermería"}
+]
+
+def ids(filters):
+    """IDs de FILAS que cumplen los filtros traducidos por LocalReplica._where."""
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE filas (data TEXT)")
+    conn.executemany("INSERT INTO filas VALUES (?)", [(json.dumps(fila),) for fila in FILAS])
+    condiciones, params = LocalReplica._where(filters)
+    sql = "SELECT data FROM filas" + (" WHERE " + " AND ".join(condiciones) if condiciones else "")
+    return sorted(json.loads(data)["id"] for (data,) in conn.execute(sql, params))
+
+@pytest.mark.parametrize("filters, esperados", [
+    (None, [1, 2, 3]),
+    ({"estrato": 3}, [2]),
+    ({"estrato": ("gte", 3)}, [2, 3]),
+    ({"estrato": ("neq", 3), "activo": ("is_", "true")}, [1, 3]),
+    ({"programa": ("is_", None)}, [1]),
+    ({"nombre": ("like", "A%")}, [1]),
+    ({"nombre": ("ilike", "an*")}, [1, 2]),
+    ({"id": ("in_", [1, 3])}, [1, 3]),
+    ({"id": ("in_", [])}, [])
+])
+def test_where(filters, esperados):
+    assert ids(filters) == esperados
+
+@pytest.mark.parametrize("filters, esperados", [
+    ({"estrato": "3"}, [2]),
+    ({"estrato": ("gt", "2")}, [2, 3]),
+    ({"estrato": ("in_", ["1", "5"])}, [1, 3]),
+    ({"estrato": ("neq", "3")}, [1, 3]),
+    ({"activo": "true"}, [1, 3]),
+    ({"activo": ("eq", "false")}, [2]),
+    ({"programa": ("in_", ["Derecho", 5])}, [2])
+])
+def test_where_convierte_el_valor_al_tipo_del_campo(filters, esperados):
+    # PostgREST convierte los valores del filtro al tipo de la columna
+    assert ids(filters) == esperados
+
+def test_select_filtra_con_valores_de_texto():
+    replica = LocalReplica(["estudiantes"])
+    replica.apply("estudiantes", [
+        {"id": "a", "documento": "100", "semestre": 3},
+        {"id": "b", "documento": "200", "semestre": 4}
+    ])
+    assert [e["id"] for e in replica.select("estudiantes", {"semestre": "3"})] == ["a"]
+    assert [e["id"] for e in replica.select("estudiantes", {"semestre": 3})] == ["a"]
+    assert [e["id"] for e in replica.select("estudiantes", {"documento": 200})] == ["b"]
+    assert replica.count("estudiantes", {"semestre": ("in_", ["3", "4"])}) == 2
+
+def test_where_rechaza_operador_desconocido():
+    with pytest.raises(ValueError):
+        LocalReplica._where({"id": ("between", 1)})
+
+def test_where_no_lleva_el_nombre_de_columna_al_sql():
+    condiciones, params = LocalReplica._where({"x') OR 1=1 --": 1})
+    assert "OR" not in " ".join(condiciones)
+    assert params[0] == "$.\"x') OR 1=1 --\""
@@ -0,0 +1,84 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from utils.resilience import CircuitBreaker, CircuitOpenError, ResilientTransport
+
+def test_circuito_abre_tras_el_umbral():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.snapshot()["rejected"] == 1
+
+def test_exito_reinicia_los_fallos():
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.failures == 1
+
+def test_medio_abierto_deja_pasar_una_prueba():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    breaker.opened_at = time.monotonic() - 31
+    
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+    
+    # Si la prueba falla el circuito vuelve a abrirse; si funciona, se cierra
+    breaker.record_failure()
+    assert breaker.state == "open"
+    breaker.opened_at = time.monotonic() - 31
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+def test_umbral_cero_desactiva_el_circuito():
+    breaker = CircuitBreaker(failure_threshold=0)
+    for _ in range(10):
+        breaker.record_failure()
+    assert breaker.allow()
+
+class TransporteFijo(httpx.AsyncBaseTransport):
+    """Transporte que responde con los códigos de estado indicados, en orden."""
+    
+    def __init__(self, estados):
+        self.estados = list(estados)
+        self.peticiones = 0
+    
+    async def handle_async_request(self, request):
+        self.peticiones += 1
+        return httpx.Response(self.estados.pop(0))
+
+def pedir(transport, metodo="GET"):
+    async def escenario():
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await client.request(metodo, "http://supabase.local/rest/v1/actas")
+    return asyncio.run(escenario())
+
+def test_error_del_servidor_no_cuenta_como_caida():
+    breaker = CircuitBreaker(failure_threshold=1)
+    respuesta = pedir(ResilientTransport(TransporteFijo([500]), breaker, backoff_base=0))
+    assert respuesta.status_code == 500
+    assert breaker.state == "closed" and breaker.failures == 0
+
+def test_estados_transitorios_se_reintentan_y_abren_el_circuito():
+    breaker = CircuitBreaker(failure_threshold=2)
+    transporte = TransporteFijo([503, 503, 200])
+    with pytest.raises(CircuitOpenError):
+        pedir(ResilientTransport(transporte, breaker, backoff_base=0))
+    assert transporte.peticiones == 2
+    assert breaker.state == "open"
+
+def test_escrituras_no_se_reintentan():
+    breaker = CircuitBreaker(failure_threshold=5)
+    transporte = TransporteFijo([503, 200])
+    respuesta = pedir(ResilientTransport(transporte, breaker, backoff_base=0), "POST")
+    assert respuesta.status_code == 503 and transporte.peticiones == 1
@@ -0,0 +1,98 @@
+from typing import Dict, Tuple, Optional
+import asyncio
+import hashlib
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from data.versions import TableVersions, get_table_versions
+
+# Recurso condicional: tablas de las que depende la respuesta y política Cache-Control
+Recurso = Tuple[Tuple[str, ...], str]
+
+# Inicio del cuerpo de error_response, que no debe quedar asociado a una versión
+_CUERPO_ERROR = b'{"success":false'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Compara la cabecera If-None-Match con una ETag (comparación débil).
+    
+    Args:
+        if_none_match: Valor de la cabecera, None si no viene
+        etag: ETag actual del recurso
+    
+    Returns:
+        True si alguna de las ETags de la cabecera coincide con la actual
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    actual = etag[2:] if etag.startswith("W/") else etag
+    for candidata in if_none_match.split(","):
+        candidata = candidata.strip()
+        if candidata.startswith("W/"):
+            candidata = candidata[2:]
+        if candidata == actual:
+            return True
+    return False
+
+class ConditionalGetMiddleware(BaseHTTPMiddleware):
+    """
+    Responde 304 Not Modified a las peticiones GET cuya ETag no ha cambiado.
+    
+    La ETag de un recurso se calcula con la ruta, los parámetros de la petición y
+    la versión de las tablas de las que depende, antes de ejecutar el endpoint: si
+    coincide con If-None-Match el endpoint no se ejecuta ni se consulta la tabla.
+    Las respuestas 200 exitosas llevan la ETag y la política Cache-Control del recurso.
+    """
+    
+    def __init__(self, app, resources: Dict[str, Recurso], versions: Optional[TableVersions] = None):
+        """
+        Inicializa el middleware.
+        
+        Args:
+            app: Aplicación ASGI
+            resources: Ruta -> (tablas, Cache-Control) de los recursos condicionales
+            versions: Versiones de las tablas, por defecto las compartidas
+        """
+        super().__init__(app)
+        self.resources = resources
+        self.versions = versions if versions is not None else get_table_versions()
+    
+    async def _etag(self, request: Request, tables: Tuple[str, ...]) -> str:
+        """Calcula la ETag débil de la petición con las versiones de sus tablas."""
+        versiones = await asyncio.gather(*(self.versions.version(tabla) for tabla in tables))
+        partes = [request.url.path, request.url.query]
+        partes.extend(f"{tabla}={version}" for tabla, version in zip(tables, versiones))
+        return 'W/"' + hashlib.sha1("|".join(partes).encode()).hexdigest()[:24] + '"'
+    
+    async def dispatch(self, request: Request, call_next) -> Response:
+        recurso = self.resources.get(request.url.path) if request.method == "GET" else None
+        if recurso is None:
+            return await call_next(request)
+        
+        tablas, cache_control = recurso
+        try:
+            etag = await self._etag(request, tablas)
+        except Exception as e:
+            # Sin versión la petición se atiende completa, sin ETag
+            print(f"Error al obtener la versión de {', '.join(tablas)}: {str(e)}")
+            return await call_next(request)
+        
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+        
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+        
+        # Los endpoints reportan los errores con código 200 y success en false; esas
+        # respuestas no se asocian a la versión para no repetirlas con un 304
+        cuerpo = b"".join([parte async for parte in response.body_iterator])
+        headers = dict(response.headers)
+        if not cuerpo.startswith(_CUERPO_ERROR):
+            headers["etag"] = etag
+            headers["cache-control"] = cache_control
+        return Response(content=cuerpo, status_code=response.status_code, headers=headers, media_type=response.media_type)
@@ -0,0 +1,575 @@
+from typing import Dict, List, Any, Optional, Tuple, Callable
+from datetime import datetime, timezone
+import asyncio
+import csv
+import io
+import json
+import random
+import re
+import threading
+import time
+import uuid
+
+import httpx
+
+# Parámetros de PostgREST que no son filtros
+PARAMETROS_RESERVADOS = ("select", "order", "limit", "offset", "columns", "on_conflict")
+
+# Restricciones únicas por defecto, tomadas de los scripts SQL del proyecto
+UNIQUE_CONSTRAINTS = {
+    "estudiantes": [("documento",)],
+    "servicios": [("codigo",)],
+}
+
+class FakePostgrestError(Exception):
+    """Error que el backend simulado retorna como respuesta de PostgREST."""
+    
+    def __init__(self, status: int, code: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+def _dividir(texto: str, separador: str = ",") -> List[str]:
+    """Divide por el separador ignorando los que están entre paréntesis o comillas."""
+    partes, actual, nivel, comillas = [], [], 0, False
+    for caracter in texto:
+        if caracter == '"':
+            comillas = not comillas
+        elif not comillas and caracter == "(":
+            nivel += 1
+        elif not comillas and caracter == ")":
+            nivel -= 1
+        if caracter == separador and nivel == 0 and not comillas:
+            partes.append("".join(actual))
+            actual = []
+        else:
+            actual.append(caracter)
+    if actual or partes:
+        partes.append("".join(actual))
+    return partes
+
+def _sin_comillas(valor: str) -> str:
+    return valor[1:-1] if len(valor) >= 2 and valor[0] == valor[-1] == '"' else valor
+
+def _comparable(valor_fila: Any, valor: str) -> Tuple[Any, Any]:
+    """Convierte el valor del filtro (texto) al tipo del valor almacenado."""
+    if isinstance(valor_fila, bool):
+        return valor_fila, valor.lower() == "true"
+    if isinstance(valor_fila, (int, float)):
+        try:
+            return valor_fila, float(valor)
+        except ValueError:
+            return str(valor_fila), valor
+    return str(valor_fila), valor
+
+def _patron(valor: str, ignorar_mayusculas: bool) -> "re.Pattern":
+    """Convierte un patrón like de PostgREST (* o %, _) en una expresión regular."""
+    regex = "".join(
+        ".*" if c in "*%" else "." if c == "_" else re.escape(c)
+        for c in valor
+    )
+    return re.compile(regex, re.IGNORECASE | re.DOTALL if ignorar_mayusculas else re.DOTALL)
+
+def _evaluar(valor_fila: Any, operador: str, valor: str) -> bool:
+    """Evalúa un operador de PostgREST sobre un valor almacenado."""
+    if operador == "is":
+        objetivo = {"null": None, "true": True, "false": False}.get(valor.lower(), valor)
+        return valor_fila is objetivo if objetivo is None or isinstance(objetivo, bool) else False
+    if operador == "in":
+        valores = [_sin_comillas(v.strip()) for v in _dividir(valor.strip()[1:-1])] if valor.strip() not in ("()", "") else []
+        return valor_fila is not None and any(a == b for a, b in (_comparable(valor_fila, v) for v in valores))
+    if valor_fila is None:
+        return False
+    if operador in ("like", "ilike"):
+        return _patron(valor, operador == "ilike").fullmatch(str(valor_fila)) is not None
+    
+    a, b = _comparable(valor_fila, valor)
+    try:
+        if operador == "eq":
+            return a == b
+        if operador == "neq":
+            return a != b
+        if operador == "gt":
+            return a > b
+        if operador == "gte":
+            return a >= b
+        if operador == "lt":
+            return a < b
+        if operador == "lte":
+            return a <= b
+    except TypeError:
+        return False
+    raise FakePostgrestError(400, "PGRST100", f"Operador no soportado por el backend simulado: {operador}")
+
+def _upsert_estudiantes(store: "FakePostgrestStore", params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Equivalente de la función upsert_estudiantes de scripts/crear_funcion_upsert_estudiantes.sql."""
+    existentes = {str(fila.get("documento")): fila for fila in store._rows("estudiantes")}
+    resultado, nuevos = [], {}
+    for registro in params.get("registros") or []:
+        documento = str(registro.get("documento"))
+        if documento in existentes:
+            resultado.append(dict(existentes[documento]))
+        else:
+            nuevos.setdefault(documento, registro)
+    return resultado + store._insert("estudiantes", list(nuevos.values()), None, None)
+
+# Niveles de riesgo que reconocen las funciones de scripts/crear_funciones_estadisticas.sql
+_NIVELES_RIESGO = ("Muy bajo", "Bajo", "Medio", "Alto", "Muy Alto")
+
+def _programas_distribucion(store: "FakePostgrestStore", params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Equivalente de la función estadisticas_programas_distribucion."""
+    conteo: Dict[str, int] = {}
+    for fila in store._rows("permanencia"):
+        programa = fila.get("estudiante_programa_academico") or "Otros programas"
+        conteo[programa] = conteo.get(programa, 0) + (fila.get("inscritos") or 1)
+    return [{"programa": programa, "value": valor} for programa, valor in conteo.items()]
+
+def _riesgo_desercion(store: "FakePostgrestStore", params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Equivalente de la función estadisticas_riesgo_desercion."""
+    conteo: Dict[str, int] = {}
+    for fila in store._rows("permanencia"):
+        riesgo = fila.get("riesgo_desercion") if fila.get("riesgo_desercion") in _NIVELES_RIESGO else "Bajo"
+        conteo[riesgo] = conteo.get(riesgo, 0) + 1
+    return [{"riesgo": riesgo, "cantidad": cantidad} for riesgo, cantidad in conteo.items()]
+
+def _programa_riesgo(store: "FakePostgrestStore", params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Equivalente de la función estadisticas_programa_riesgo."""
+    conteo: Dict[str, Dict[str, int]] = {}
+    for fila in store._rows("permanencia"):
+        programa, riesgo = fila.get("estudiante_programa_academico"), fila.get("riesgo_desercion")
+        if not programa or not riesgo:
+            continue
+        nivel = "bajo" if riesgo in ("Muy bajo", "Bajo") else "medio" if riesgo == "Medio" else "alto"
+        conteo.setdefault(programa, {"bajo": 0, "medio": 0, "alto": 0})[nivel] += 1
+    filas = [{"programa": programa, **niveles} for programa, niveles in conteo.items()]
+    filas.sort(key=lambda f: (-(f["bajo"] + f["medio"] + f["alto"]), f["programa"]))
+    return filas[:int(params.get("limite", 5))]
+
+def _servicios_por_mes(store: "FakePostgrestStore", params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Equivalente de la función estadisticas_servicios_por_mes."""
+    desde = datetime.fromisoformat(str(params["desde"]))
+    if desde.tzinfo is None:
+        desde = desde.replace(tzinfo=timezone.utc)
+    conteo: Dict[Tuple[str, str], int] = {}
+    for fila in store._rows("permanencia"):
+        try:
+            creado = datetime.fromisoformat(str(fila.get("created_at")).replace("Z", "+00:00"))
+        except ValueError:
+            continue
+        if creado.tzinfo is None:
+            creado = creado.replace(tzinfo=timezone.utc)
+        if creado < desde:
+            continue
+        llave = (fila.get("servicio"), creado.astimezone(timezone.utc).strftime("%Y-%m"))
+        conteo[llave] = conteo.get(llave, 0) + 1
+    return [{"servicio": servicio, "mes": mes, "cantidad": cantidad} for (servicio, mes), cantidad in conteo.items()]
+
+class FakePostgrestStore:
+    """Backend PostgREST en memoria para pruebas y mediciones sin Supabase.
+    
+    Implementa sobre tablas en memoria el subconjunto del protocolo HTTP de
+    PostgREST que genera postgrest-py: select con proyección y recursos
+    embebidos, filtros (eq, neq, gt, gte, lt, lte, like, ilike, is, in, not,
+    or/and), order, limit/offset, conteo por Content-Range, respuestas CSV
+    (Accept: text/csv), insert, upsert, update, delete y funciones RPC registradas.
+    """
+    
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0,
+                 unique_constraints: Optional[Dict[str, List[Tuple[str, ...]]]] = None):
+        """
+        Inicializa el backend simulado.
+        
+        Args:
+            latency_ms: Latencia fija inyectada en cada petición
+            jitter_ms: Latencia adicional aleatoria (uniforme entre 0 y este valor)
+            unique_constraints: Columnas únicas por tabla, por defecto UNIQUE_CONSTRAINTS
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.unique_constraints = UNIQUE_CONSTRAINTS if unique_constraints is None else unique_constraints
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.rpcs: Dict[str, Callable[["FakePostgrestStore", Dict[str, Any]], Any]] = {
+            # Los scripts de creación de tablas usan exec_sql; aquí no hay esquema que crear
+            "exec_sql": lambda store, params: None,
+            "upsert_estudiantes": _upsert_estudiantes,
+            "estadisticas_programas_distribucion": _programas_distribucion,
+            "estadisticas_riesgo_desercion": _riesgo_desercion,
+            "estadisticas_programa_riesgo": _programa_riesgo,
+            "estadisticas_servicios_por_mes": _servicios_por_mes
+        }
+        self.requests = 0
+        self._lock = threading.Lock()
+    
+    def load(self, data: Dict[str, List[Dict[str, Any]]]) -> None:
+        """
+        Carga registros en las tablas, completando id y marcas de tiempo.
+        
+        Args:
+            data: Diccionario tabla -> lista de registros
+        """
+        with self._lock:
+            for tabla, registros in data.items():
+                self._insert(tabla, registros, None, None)
+    
+    def load_file(self, path: str) -> None:
+        """
+        Carga registros desde un archivo JSON con el formato de load.
+        
+        Args:
+            path: Ruta del archivo
+        """
+        with open(path, encoding="utf-8") as archivo:
+            self.load(json.load(archivo))
+        print(f"Backend simulado cargado desde {path}: " + ", ".join(f"{t}={len(r)}" for t, r in self.tables.items()))
+    
+    def register_rpc(self, name: str, function: Callable[["FakePostgrestStore", Dict[str, Any]], Any]) -> None:
+        """
+        Registra una función RPC.
+        
+        Args:
+            name: Nombre de la función
+            function: Función que recibe el backend y los parámetros y retorna el resultado
+        """
+        self.rpcs[name] = function
+    
+    def delay(self) -> float:
+        """Obtiene la latencia a inyectar en una petición, en segundos."""
+        return (self.latency_ms + random.uniform(0, self.jitter_ms)) / 1000
+    
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        """
+        Atiende una petición HTTP dirigida a PostgREST.
+        
+        Args:
+            request: Petición generada por postgrest-py
+        
+        Returns:
+            Respuesta con el formato de PostgREST
+        """
+        with self._lock:
+            self.requests += 1
+            try:
+                return self._handle(request)
+            except FakePostgrestError as e:
+                return httpx.Response(e.status, json={"code": e.code, "message": e.message, "details": None, "hint": None})
+    
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        ruta = request.url.path.split("/rest/v1/", 1)[-1].strip("/")
+        params = request.url.params
+        prefer = request.headers.get("prefer", "")
+        
+        if ruta.startswith("rpc/"):
+            nombre = ruta[4:]
+            if nombre not in self.rpcs:
+                raise FakePostgrestError(404, "PGRST202", f"Could not find the function public.{nombre}")
+            argumentos = json.loads(request.content or b"{}") if request.method == "POST" else dict(params)
+            return httpx.Response(200, json=self.rpcs[nombre](self, argumentos))
+        
+        tabla = ruta
+        filtros = [(k, v) for k, v in params.multi_items() if k not in PARAMETROS_RESERVADOS]
+        
+        if request.method in ("GET", "HEAD"):
+            return self._select(request, tabla, params, filtros, prefer)
+        
+        if request.method == "POST":
+            cuerpo = json.loads(request.content or b"[]")
+            registros = cuerpo if isinstance(cuerpo, list) else [cuerpo]
+            columnas = params.get("columns")
+            on_conflict = None
+            if "resolution=merge-duplicates" in prefer or "resolution=ignore-duplicates" in prefer:
+                on_conflict = tuple(c.strip() for c in params.get("on_conflict", "id").split(","))
+            resultado = self._insert(
+                tabla,
+                registros,
+                columnas.split(",") if columnas else None,
+                on_conflict,
+                ignorar="resolution=ignore-duplicates" in prefer
+            )
+            return self._representation(201, resultado, prefer)
+        
+        if request.method == "PATCH":
+            cambios = json.loads(request.content or b"{}")
+            ahora = datetime.now(timezone.utc).isoformat()
+            filas = self._rows(tabla)
+            actualizados = [
+                (registro, {**registro, "updated_at": ahora, **cambios})
+                for registro in filas if self._cumple(tabla, registro, filtros)
+            ]
+            # Las filas se validan con los valores nuevos de todas y solo entonces se modifican
+            vigentes = {id(registro): nuevo for registro, nuevo in actualizados}
+            for registro, nuevo in actualizados:
+                self._check_unique(tabla, nuevo, candidatos=[
+                    vigentes.get(id(fila), fila) for fila in filas if fila is not registro
+                ])
+            for registro, nuevo in actualizados:
+                registro.update(nuevo)
+            return self._representation(200, [dict(nuevo) for _, nuevo in actualizados], prefer)
+        
+        if request.method == "DELETE":
+            conservados, resultado = [], []
+            for registro in self._rows(tabla):
+                (resultado if self._cumple(tabla, registro, filtros) else conservados).append(registro)
+            self.tables[tabla] = conservados
+            return self._representation(200, resultado, prefer)
+        
+        raise FakePostgrestError(405, "PGRST117", f"Método no soportado: {request.method}")
+    
+    def _rows(self, tabla: str) -> List[Dict[str, Any]]:
+        return self.tables.setdefault(tabla, [])
+    
+    def _columns(self, tabla: str) -> set:
+        columnas = set()
+        for registro in self._rows(tabla):
+            columnas.update(registro)
+        return columnas
+    
+    def _check_column(self, tabla: str, columna: str) -> None:
+        """Falla como PostgreSQL si la tabla tiene datos y ninguno tiene la columna."""
+        columnas = self._columns(tabla)
+        if columnas and columna not in columnas and columna != "*":
+            raise FakePostgrestError(400, "42703", f"column {tabla}.{columna} does not exist")
+    
+    def _select(self, request: httpx.Request, tabla: str, params, filtros, prefer: str) -> httpx.Response:
+        registros = [r for r in self._rows(tabla) if self._cumple(tabla, r, filtros)]
+        total = len(registros)
+        
+        if params.get("order"):
+            registros = self._ordenar(tabla, registros, params["order"])
+        
+        inicio = int(params.get("offset", 0))
+        limite = int(params["limit"]) if params.get("limit") else None
+        rango = request.headers.get("range")
+        if rango and "-" in rango:
+            desde, _, hasta = rango.partition("-")
+            inicio = int(desde)
+            limite = int(hasta) - inicio + 1 if hasta else None
+        registros = registros[inicio:inicio + limite if limite is not None else None]
+        
+        filtros_embebidos = [(k, v) for k, v in filtros if "." in k]
+        datos = [self._project(tabla, r, params.get("select", "*"), filtros_embebidos) for r in registros]
+        
+        conteo = str(total) if "count=" in prefer else "*"
+        content_range = f"{inicio}-{inicio + len(datos) - 1}/{conteo}" if datos else f"*/{conteo}"
+        headers = {"content-range": content_range}
+        
+        if "vnd.pgrst.object" in request.headers.get("accept", ""):
+            if len(datos) != 1:
+                raise FakePostgrestError(406, "PGRST116", "JSON object requested, multiple (or no) rows returned")
+            datos = datos[0]
+        
+        if request.method == "HEAD":
+            return httpx.Response(200, headers=headers)
+        if "text/csv" in request.headers.get("accept", ""):
+            return httpx.Response(200, content=self._csv(datos).encode("utf-8"), headers={**headers, "content-type": "text/csv"})
+        return httpx.Response(200, json=datos, headers=headers)
+    
+    @staticmethod
+    def _csv(datos: List[Dict[str, Any]]) -> str:
+        """Serializa los registros como PostgREST: encabezado y NULL como campo vacío."""
+        columnas = list(dict.fromkeys(col for registro in datos for col in registro))
+        salida = io.StringIO()
+        escritor = csv.writer(salida, lineterminator="\n")
+        escritor.writerow(columnas)
+        for registro in datos:
+            fila = []
+            for col in columnas:
+                valor = registro.get(col)
+                if valor is None:
+                    valor = ""
+                elif isinstance(valor, bool):
+                    valor = "true" if valor else "false"
+                elif isinstance(valor, (dict, list)):
+                    valor = json.dumps(valor)
+                fila.append(valor)
+            escritor.writerow(fila)
+        return salida.getvalue()
+    
+    def _cumple(self, tabla: str, registro: Dict[str, Any], filtros: List[Tuple[str, str]]) -> bool:
+        for clave, expresion in filtros:
+            if "." in clave:
+                # Filtro sobre un recurso embebido, se aplica en la proyección
+                continue
+            if clave in ("or", "and", "not.or", "not.and"):
+                negado = clave.startswith("not.")
+                resultado = self._logico(tabla, registro, clave.split(".")[-1], expresion)
+                if resultado == negado:
+                    return False
+                continue
+            self._check_column(tabla, clave)
+            if not self._condicion(registro.get(clave), expresion):
+                return False
+        return True
+    
+    def _condicion(self, valor_fila: Any, expresion: str) -> bool:
+        negado = expresion.startswith("not.")
+        if negado:
+            expresion = expresion[4:]
+        operador, _, valor = expresion.partition(".")
+        return _evaluar(valor_fila, operador, _sin_comillas(valor)) != negado
+    
+    def _logico(self, tabla: str, registro: Dict[str, Any], operador: str, expresion: str) -> bool:
+        """Evalúa una expresión or=(...) / and=(...) con anidamiento."""
+        resultados = []
+        for termino in _dividir(expresion.strip()[1:-1]):
+            termino = termino.strip()
+            negado = termino.startswith("not.")
+            base = termino[4:] if negado else termino
+            if base.startswith("or(") or base.startswith("and("):
+                interno, _, resto = base.partition("(")
+                resultado = self._logico(tabla, registro, interno, "(" + resto)
+                resultados.append(resultado != negado)
+            else:
+                columna, _, condicion = termino.partition(".")
+                resultados.append(self._condicion(registro.get(columna), condicion))
+        return any(resultados) if operador == "or" else all(resultados)
+    
+    def _ordenar(self, tabla: str, registros: List[Dict[str, Any]], orden: str) -> List[Dict[str, Any]]:
+        for termino in reversed(_dividir(orden)):
+            partes = termino.strip().split(".")
+            columna = partes[0]
+            self._check_column(tabla, columna)
+            descendente = "desc" in partes[1:]
+            # PostgreSQL pone los nulos al final en orden ascendente y al inicio en descendente
+            nulos_primero = "nullsfirst" in partes[1:] or (descendente and "nullslast" not in partes[1:])
+            no_nulos = [r for r in registros if r.get(columna) is not None]
+            nulos = [r for r in registros if r.get(columna) is None]
+            no_nulos.sort(key=lambda r: r[columna], reverse=descendente)
+            registros = nulos + no_nulos if nulos_primero else no_nulos + nulos
+        return registros
+    
+    def _project(self, tabla: str, registro: Dict[str, Any], select: str, filtros_embebidos) -> Dict[str, Any]:
+        """Aplica la cláusula select, incluidos los recursos embebidos."""
+        resultado: Dict[str, Any] = {}
+        for item in _dividir(select):
+            item = item.strip()
+            if not item:
+                continue
+            if "(" in item:
+                cabeza, _, interno = item.partition("(")
+                alias, _, recurso = cabeza.rpartition(":")
+                recurso = recurso.split("!")[0]
+                filtros = [(k.split(".", 1)[1], v) for k, v in filtros_embebidos if k.split(".", 1)[0] == recurso]
+                resultado[alias or recurso] = self._embed(tabla, registro, recurso, interno[:-1], filtros)
+            elif item == "*":
+                resultado.update(registro)
+            else:
+                alias, _, columna = item.split("::")[0].rpartition(":")
+                self._check_column(tabla, columna)
+                resultado[alias or columna] = registro.get(columna)
+        return resultado
+    
+    def _embed(self, tabla: str, registro: Dict[str, Any], recurso: str, select: str, filtros) -> Any:
+        """
+        Resuelve un recurso embebido por convención de llaves foráneas:
+        <recurso en singular>_id en el registro (muchos a uno) o
+        <tabla en singular>_id en el recurso (uno a muchos).
+        """
+        llave = recurso.rstrip("s") + "_id"
+        if llave in registro:
+            for relacionado in self._rows(recurso):
+                if relacionado.get("id") == registro[llave] and self._cumple(recurso, relacionado, filtros):
+                    return self._project(recurso, relacionado, select or "*", [])
+            return None
+        
+        inversa = tabla.rstrip("s") + "_id"
+        return [
+            self._project(recurso, relacionado, select or "*", [])
+            for relacionado in self._rows(recurso)
+            if relacionado.get(inversa) == registro.get("id") and self._cumple(recurso, relacionado, filtros)
+        ]
+    
+    def _check_unique(self, tabla: str, registro: Dict[str, Any], excluir: Optional[Dict[str, Any]] = None,
+                      candidatos: Optional[List[Dict[str, Any]]] = None) -> None:
+        """Falla como PostgreSQL si el registro viola la llave primaria o una restricción única."""
+        for columnas in [("id",)] + list(self.unique_constraints.get(tabla, [])):
+            valores = tuple(registro.get(c) for c in columnas)
+            if any(v is None for v in valores):
+                continue
+            for existente in self._rows(tabla) if candidatos is None else candidatos:
+                if existente is not excluir and tuple(existente.get(c) for c in columnas) == valores:
+                    nombre = "pkey" if columnas == ("id",) else "_".join(columnas) + "_key"
+                    raise FakePostgrestError(
+                        409, "23505",
+                        f'duplicate key value violates unique constraint "{tabla}_{nombre}"'
+                    )
+    
+    def _insert(self, tabla: str, registros: List[Dict[str, Any]], columnas: Optional[List[str]],
+                on_conflict: Optional[Tuple[str, ...]], ignorar: bool = False) -> List[Dict[str, Any]]:
+        filas = self._rows(tabla)
+        ahora = datetime.now(timezone.utc).isoformat()
+        nuevos, resultado = [], []
+        # Valores nuevos de las filas que actualiza el upsert, por identidad de la fila
+        actualizados: Dict[int, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+        
+        def vigentes(excluir: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+            """Filas de la tabla con las actualizaciones y las inserciones pendientes de la sentencia."""
+            return [
+                actualizados[id(f)][1] if id(f) in actualizados else f
+                for f in filas + nuevos if f is not excluir
+            ]
+        
+        for registro in registros:
+            if columnas is not None:
+                registro = {c: registro.get(c) for c in columnas}
+            
+            if on_conflict:
+                existente = next(
+                    (f for f in filas + nuevos
+                     if all((actualizados[id(f)][1] if id(f) in actualizados else f).get(c) == registro.get(c)
+                            for c in on_conflict)),
+                    None
+                )
+                if existente is not None:
+                    if not ignorar:
+                        anterior = actualizados[id(existente)][1] if id(existente) in actualizados else existente
+                        actualizado = {**anterior, "updated_at": ahora, **registro}
+                        self._check_unique(tabla, actualizado, candidatos=vigentes(excluir=existente))
+                        actualizados[id(existente)] = (existente, actualizado)
+                        resultado.append(dict(actualizado))
+                    continue
+            
+            fila = {"id": str(uuid.uuid4()), "created_at": ahora, "updated_at": ahora}
+            fila.update({k: v for k, v in registro.items() if v is not None or k not in fila})
+            self._check_unique(tabla, fila, candidatos=vigentes())
+            nuevos.append(fila)
+            resultado.append(dict(fila))
+        
+        # Como en PostgreSQL, la sentencia se aplica completa o no se aplica: las
+        # actualizaciones y las inserciones se guardan solo si todas las filas son válidas
+        for existente, actualizado in actualizados.values():
+            existente.update(actualizado)
+        filas.extend(nuevos)
+        return resultado
+    
+    @staticmethod
+    def _representation(status: int, datos: List[Dict[str, Any]], prefer: str) -> httpx.Response:
+        if "return=minimal" in prefer:
+            return httpx.Response(204 if status == 200 else status)
+        return httpx.Response(status, json=datos, headers={"content-range": f"*/{len(datos)}"})
+
+class FakeAsyncTransport(httpx.AsyncBaseTransport):
+    """Transporte asíncrono que atiende las peticiones con el backend simulado."""
+    
+    def __init__(self, store: FakePostgrestStore):
+        self.store = store
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        espera = self.store.delay()
+        if espera:
+            await asyncio.sleep(espera)
+        return self.store.handle(request)
+
+class FakeSyncTransport(httpx.BaseTransport):
+    """Transporte síncrono que atiende las peticiones con el backend simulado."""
+    
+    def __init__(self, store: FakePostgrestStore):
+        self.store = store
+    
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        espera = self.store.delay()
+        if espera:
+            time.sleep(espera)
+        return self.store.handle(request)
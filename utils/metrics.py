@@ -0,0 +1,116 @@
+from typing import Dict, Any, List, Optional, Tuple
+import time
+
+# Límites superiores (en milisegundos) de los intervalos del histograma de latencia
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+class QueryMetrics:
+    """Métricas de las llamadas a Supabase agrupadas por tabla y operación."""
+    
+    def __init__(self, slow_query_ms: float = 1000):
+        """
+        Inicializa las métricas.
+        
+        Args:
+            slow_query_ms: Latencia a partir de la cual una llamada se registra
+                como consulta lenta, 0 para no registrarlas
+        """
+        self.slow_query_ms = slow_query_ms
+        self.started_at = time.time()
+        self._stats: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    
+    def record(self, table: str, operation: str, elapsed_ms: float, rows: Optional[int] = None,
+               response_bytes: int = 0, error: bool = False, detail: str = "") -> None:
+        """
+        Registra una llamada.
+        
+        Args:
+            table: Tabla (o función RPC) consultada
+            operation: Operación (select, count, insert, upsert, update, delete, rpc)
+            elapsed_ms: Latencia en milisegundos
+            rows: Filas retornadas o afectadas, None si no se conocen
+            response_bytes: Tamaño del cuerpo de la respuesta
+            error: Si la llamada falló
+            detail: Descripción de la llamada para el registro de consultas lentas
+        """
+        stats = self._stats.get((table, operation))
+        if stats is None:
+            stats = {
+                "calls": 0,
+                "errors": 0,
+                "rows": 0,
+                "bytes": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "buckets": [0] * (len(LATENCY_BUCKETS_MS) + 1)
+            }
+            self._stats[(table, operation)] = stats
+        
+        stats["calls"] += 1
+        stats["errors"] += 1 if error else 0
+        stats["rows"] += rows or 0
+        stats["bytes"] += response_bytes
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+        stats["buckets"][self._bucket(elapsed_ms)] += 1
+        
+        if self.slow_query_ms and elapsed_ms >= self.slow_query_ms:
+            print(f"Consulta lenta ({elapsed_ms:.0f} ms, {rows} filas, {response_bytes} bytes): {operation} {table} {detail}")
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Obtiene el estado actual de las métricas.
+        
+        Returns:
+            Diccionario con las métricas por tabla y operación, con la latencia
+            media, la máxima y los percentiles 50 y 95 aproximados por el histograma
+        """
+        tablas: Dict[str, Dict[str, Any]] = {}
+        for (table, operation), stats in sorted(self._stats.items()):
+            tablas.setdefault(table, {})[operation] = {
+                "calls": stats["calls"],
+                "errors": stats["errors"],
+                "rows": stats["rows"],
+                "bytes": stats["bytes"],
+                "avg_ms": round(stats["total_ms"] / stats["calls"], 2),
+                "max_ms": round(stats["max_ms"], 2),
+                "p50_ms": self._percentile(stats["buckets"], 0.50, stats["max_ms"]),
+                "p95_ms": self._percentile(stats["buckets"], 0.95, stats["max_ms"]),
+                "histogram": {
+                    self._bucket_label(i): count for i, count in enumerate(stats["buckets"]) if count
+                }
+            }
+        return {
+            "since": self.started_at,
+            "slow_query_ms": self.slow_query_ms,
+            "tables": tablas
+        }
+    
+    def reset(self) -> None:
+        """Reinicia todas las métricas."""
+        self._stats.clear()
+        self.started_at = time.time()
+    
+    @staticmethod
+    def _bucket(elapsed_ms: float) -> int:
+        """Obtiene el índice del intervalo del histograma de una latencia."""
+        for i, limite in enumerate(LATENCY_BUCKETS_MS):
+            if elapsed_ms <= limite:
+                return i
+        return len(LATENCY_BUCKETS_MS)
+    
+    @staticmethod
+    def _bucket_label(i: int) -> str:
+        """Obtiene la etiqueta de un intervalo del histograma."""
+        return f"<={LATENCY_BUCKETS_MS[i]}ms" if i < len(LATENCY_BUCKETS_MS) else f">{LATENCY_BUCKETS_MS[-1]}ms"
+    
+    @staticmethod
+    def _percentile(buckets: List[int], fraction: float, max_ms: float) -> float:
+        """Aproxima un percentil con el límite superior del intervalo que lo contiene."""
+        objetivo = fraction * sum(buckets)
+        acumulado = 0
+        for i, count in enumerate(buckets):
+            acumulado += count
+            if acumulado >= objetivo:
+                return float(min(LATENCY_BUCKETS_MS[i], round(max_ms, 2))) if i < len(LATENCY_BUCKETS_MS) else round(max_ms, 2)
+        return round(max_ms, 2)
@@ -0,0 +1,203 @@
+from typing import Dict, Any, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+import asyncio
+import random
+import time
+
+import httpx
+
+# Métodos que se pueden repetir sin riesgo de duplicar escrituras
+METODOS_IDEMPOTENTES = ("GET", "HEAD")
+
+# Códigos de estado transitorios que justifican un reintento
+ESTADOS_REINTENTABLES = (429, 502, 503, 504)
+
+# Límite absoluto (time.monotonic) de la llamada en curso, fijado con call_deadline
+_deadline: ContextVar[Optional[float]] = ContextVar("supabase_deadline", default=None)
+
+class CircuitOpenError(httpx.TransportError):
+    """El circuito está abierto: el backend se considera caído y la llamada no se envía."""
+
+class DeadlineExceededError(httpx.TimeoutException):
+    """La llamada agotó su plazo total, contando todos los reintentos."""
+
+@contextmanager
+def call_deadline(seconds: float):
+    """
+    Fija un plazo total para las llamadas a Supabase hechas dentro del bloque.
+    
+    Los plazos anidados solo pueden acortar el plazo vigente, nunca ampliarlo.
+    
+    Args:
+        seconds: Segundos disponibles para todas las llamadas del bloque
+    """
+    limite = time.monotonic() + seconds
+    actual = _deadline.get()
+    token = _deadline.set(limite if actual is None else min(actual, limite))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+class CircuitBreaker:
+    """Circuito que deja de enviar llamadas tras varios fallos consecutivos del backend."""
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        """
+        Inicializa el circuito.
+        
+        Args:
+            failure_threshold: Fallos consecutivos que abren el circuito, 0 lo desactiva
+            reset_timeout: Segundos que el circuito permanece abierto antes de
+                dejar pasar una llamada de prueba
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._trial_started: Optional[float] = None
+    
+    def allow(self) -> bool:
+        """
+        Indica si una llamada puede enviarse.
+        
+        Con el circuito medio abierto solo se deja pasar una llamada de prueba a la vez.
+        
+        Returns:
+            True si la llamada puede enviarse
+        """
+        if not self.failure_threshold or self.state == "closed":
+            return True
+        ahora = time.monotonic()
+        if self.state == "open" and ahora - self.opened_at >= self.reset_timeout:
+            self.state = "half_open"
+            self._trial_started = None
+        # Una prueba que nunca terminó (llamada cancelada) no bloquea el circuito indefinidamente
+        if self.state == "half_open" and (self._trial_started is None or ahora - self._trial_started >= self.reset_timeout):
+            self._trial_started = ahora
+            return True
+        self.rejected += 1
+        return False
+    
+    def record_success(self) -> None:
+        """Registra una llamada exitosa y cierra el circuito."""
+        if self.state != "closed":
+            print("Circuito de Supabase cerrado: el backend responde nuevamente")
+        self.state = "closed"
+        self.failures = 0
+        self._trial_started = None
+    
+    def record_failure(self) -> None:
+        """Registra un fallo del backend y abre el circuito si se alcanzó el umbral."""
+        self.failures += 1
+        self._trial_started = None
+        if self.state == "half_open" or (self.failure_threshold and self.failures >= self.failure_threshold):
+            if self.state != "open":
+                print(f"Circuito de Supabase abierto tras {self.failures} fallos consecutivos")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Obtiene el estado del circuito.
+        
+        Returns:
+            Diccionario con el estado, los fallos consecutivos y las llamadas rechazadas
+        """
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "failure_threshold": self.failure_threshold,
+            "reset_timeout": self.reset_timeout,
+            "rejected": self.rejected
+        }
+
+class ResilientTransport(httpx.AsyncBaseTransport):
+    """Transporte HTTP con reintentos, circuito y plazo total por llamada."""
+    
+    def __init__(self, transport: httpx.AsyncBaseTransport, breaker: CircuitBreaker,
+                 max_retries: int = 3, backoff_base: float = 0.2, backoff_max: float = 5,
+                 deadline: float = 30):
+        """
+        Inicializa el transporte.
+        
+        Args:
+            transport: Transporte que envía cada intento
+            breaker: Circuito compartido por todas las llamadas
+            max_retries: Reintentos de una lectura tras un fallo transitorio
+            backoff_base: Espera base (segundos) del backoff exponencial
+            backoff_max: Espera máxima (segundos) entre intentos
+            deadline: Plazo total (segundos) de una llamada si no hay uno fijado
+                con call_deadline, 0 para no limitarla
+        """
+        self.transport = transport
+        self.breaker = breaker
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.deadline = deadline
+        self.retries = 0
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        limite = _deadline.get()
+        if self.deadline:
+            propio = time.monotonic() + self.deadline
+            limite = propio if limite is None else min(limite, propio)
+        
+        intento = 0
+        while True:
+            if not self.breaker.allow():
+                raise CircuitOpenError("Supabase no está disponible (circuito abierto)", request=request)
+            restante = None if limite is None else limite - time.monotonic()
+            if restante is not None and restante <= 0:
+                raise DeadlineExceededError("Se agotó el plazo de la llamada a Supabase", request=request)
+            
+            try:
+                response = await asyncio.wait_for(self.transport.handle_async_request(request), restante)
+            except asyncio.TimeoutError:
+                self.breaker.record_failure()
+                raise DeadlineExceededError("Se agotó el plazo de la llamada a Supabase", request=request)
+            except httpx.TransportError as e:
+                self.breaker.record_failure()
+                # Un error de conexión garantiza que la petición no llegó, así que
+                # también las escrituras se pueden repetir
+                reintentable = request.method in METODOS_IDEMPOTENTES or isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                espera = self._backoff(intento, None)
+                if not reintentable or not self._puede_reintentar(intento, espera, limite):
+                    raise
+                print(f"Reintentando {request.method} {request.url.path} tras error de transporte: {e}")
+            else:
+                # Otros errores (por ejemplo un 500 por una consulta inválida) son respuestas
+                # del backend y no indican que esté caído
+                if response.status_code not in ESTADOS_REINTENTABLES:
+                    self.breaker.record_success()
+                    return response
+                self.breaker.record_failure()
+                espera = self._backoff(intento, response.headers.get("retry-after"))
+                if (request.method not in METODOS_IDEMPOTENTES
+                        or not self._puede_reintentar(intento, espera, limite)):
+                    return response
+                print(f"Reintentando {request.method} {request.url.path} tras estado {response.status_code}")
+                await response.aclose()
+            
+            self.retries += 1
+            intento += 1
+            await asyncio.sleep(espera)
+    
+    def _backoff(self, intento: int, retry_after: Optional[str]) -> float:
+        """Calcula la espera antes del siguiente intento (backoff exponencial con jitter completo)."""
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** intento))
+    
+    def _puede_reintentar(self, intento: int, espera: float, limite: Optional[float]) -> bool:
+        """Indica si queda presupuesto de reintentos y de tiempo para otro intento."""
+        if intento >= self.max_retries:
+            return False
+        return limite is None or time.monotonic() + espera < limite
+    
+    async def aclose(self) -> None:
+        await self.transport.aclose()
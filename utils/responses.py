@@ -1,23 +1,46 @@
-from typing import Dict, Any, Optional, List, Union
-from fastapi import HTTPException
+from typing import Dict, Any, Optional, List, Union, Tuple
+from fastapi import HTTPException, Response
 from fastapi.responses import JSONResponse
 
-def success_response(data: Any = None, message: str = "Operación exitosa") -> Dict[str, Any]:
+# Cabecera con el cursor de la página siguiente en los endpoints que retornan listas
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def success_response(data: Any = None, message: str = "Operación exitosa", next_cursor: Optional[str] = None) -> Dict[str, Any]:
     """
     Crea una respuesta de éxito estándar.
     
     Args:
         data: Datos a incluir en la respuesta
         message: Mensaje de éxito
+        next_cursor: Cursor de la página siguiente en respuestas paginadas
         
     Returns:
         Respuesta de éxito
     """
-    return {
+    response = {
         "success": True,
         "message": message,
         "data": data
     }
+    if next_cursor:
+        response["next_cursor"] = next_cursor
+    return response
+
+def paged_list_response(response: Response, data: List[Any], next_cursor: Optional[str] = None) -> List[Any]:
+    """
+    Prepara una página de registros para endpoints que retornan una lista.
+    
+    Args:
+        response: Respuesta HTTP en la que se añade la cabecera del cursor
+        data: Registros de la página
+        next_cursor: Cursor de la página siguiente
+        
+    Returns:
+        Registros de la página
+    """
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return data
 
 def error_response(error: str, message: str = "Ha ocurrido un error", status_code: int = 400) -> Dict[str, Any]:
     """
@@ -97,3 +120,72 @@ def filter_valid_fields(data: Dict[str, Any], valid_fields: List[str]) -> Dict[s
         Diccionario con solo los campos válidos
     """
     return {k: v for k, v in data.items() if k in valid_fields}
+
+def parse_fields(fields: Optional[str], embeddable: Optional[List[str]] = None) -> Tuple[Optional[List[str]], Optional[Dict[str, Optional[List[str]]]]]:
+    """
+    Interpreta el parámetro fields de los endpoints que retornan listas.
+    
+    El parámetro es una lista separada por comas. Un campo "recurso.columna"
+    proyecta una columna de un recurso embebido y un campo "recurso" lo
+    incluye completo; los recursos embebidos no pedidos se omiten.
+    
+    Args:
+        fields: Valor del parámetro, por ejemplo "id,nivel_riesgo,estudiantes.nombres"
+        embeddable: Recursos embebidos que admite el endpoint
+        
+    Returns:
+        Tupla con las columnas de la tabla y los recursos embebidos con sus
+        columnas; (None, None) si no se pidió una proyección
+        
+    Raises:
+        ValueError: Si algún campo no es válido
+    """
+    if not fields or not fields.strip():
+        return None, None
+    
+    embeddable = embeddable or []
+    columns: List[str] = []
+    embedded: Dict[str, Optional[List[str]]] = {}
+    
+    for field in (f.strip() for f in fields.split(",")):
+        if not field:
+            continue
+        recurso, _, columna = field.partition(".")
+        if columna:
+            if recurso not in embeddable:
+                raise ValueError(f"El campo '{field}' no es válido")
+            if recurso not in embedded:
+                embedded[recurso] = []
+            if embedded[recurso] is not None and columna not in embedded[recurso]:
+                embedded[recurso].append(columna)
+        elif field in embeddable:
+            embedded[field] = None
+        elif field not in columns:
+            columns.append(field)
+    
+    return columns or None, embedded
+
+def parse_sort(sort: Optional[str], allowed: List[str]) -> Tuple[Optional[str], bool]:
+    """
+    Interpreta el parámetro sort de los endpoints que retornan listas.
+    
+    Args:
+        sort: Columna de orden, con el prefijo "-" para orden descendente,
+            por ejemplo "-estrato"
+        allowed: Columnas por las que admite ordenar el endpoint
+        
+    Returns:
+        Tupla con la columna (None si no se pidió un orden) y si el orden es descendente
+        
+    Raises:
+        ValueError: Si la columna no es válida
+    """
+    if not sort or not sort.strip():
+        return None, False
+    
+    sort = sort.strip()
+    descending = sort.startswith("-")
+    column = sort.lstrip("-")
+    if column not in allowed:
+        raise ValueError(f"No se puede ordenar por '{column}'. Campos permitidos: {', '.join(allowed)}")
+    return column, descending